@@ -10,10 +10,12 @@ import {
   apiResetContext,
   apiSendMessage,
 } from "./chat-api.js";
+import { ChatSocket } from "./chat-socket.js";
 
 marked.setOptions({ gfm: true, breaks: true });
 const logger = createLogger("chat-ui");
 const LAST_SESSION_ID_KEY = "legalcodex:last_session_id";
+const chatSocket = new ChatSocket();
 
 /**
  * POST /auth/login
@@ -538,13 +540,16 @@ createApp({
       await this.decorateCodeBlocks();
 
       try {
-        const response = await apiSendMessage(this.currentSessionId, message);
-        const shouldAutoScroll = this.isNearMessagesBottom();
-        this.messages = [...this.messages, this.createMessage("assistant", response.response)];
-        await this.decorateCodeBlocks();
-
-        if (shouldAutoScroll) {
-          await this.scrollMessagesToBottom();
+        const streamed = await this.streamMessage(this.currentSessionId, message);
+        if (!streamed) {
+          const response = await apiSendMessage(this.currentSessionId, message);
+          const shouldAutoScroll = this.isNearMessagesBottom();
+          this.messages = [...this.messages, this.createMessage("assistant", response.response)];
+          await this.decorateCodeBlocks();
+
+          if (shouldAutoScroll) {
+            await this.scrollMessagesToBottom();
+          }
         }
       } catch (err) {
         this.setChatError(err instanceof Error ? err.message : "Unable to send message.");
@@ -553,6 +558,35 @@ createApp({
       }
     },
 
+    /**
+     * Send a message over the chat socket, rendering the reply as it streams in.
+     * Returns false, without sending, when the socket cannot be opened so that the
+     * caller falls back to the HTTP route.
+     */
+    async streamMessage(sessionId, message) {
+      try {
+        await chatSocket.connect();
+      } catch (err) {
+        logger.warn("Chat socket unavailable, using HTTP.", err);
+        return false;
+      }
+
+      const reply = this.createMessage("assistant", "");
+      this.messages = [...this.messages, reply];
+      const entry = this.messages[this.messages.length - 1];
+
+      await chatSocket.sendMessage(sessionId, message, (text) => {
+        const shouldAutoScroll = this.isNearMessagesBottom();
+        entry.content += text;
+        entry.rendered = this.renderMarkdown(entry.content);
+        if (shouldAutoScroll) {
+          this.scrollMessagesToBottom();
+        }
+      });
+      await this.decorateCodeBlocks();
+      return true;
+    },
+
     /**
      * Login submit handler.
      * Uses try/finally to guarantee UI unlock even if network errors occur.
@@ -583,6 +617,7 @@ createApp({
       this.isSubmitting = true;
       this.clearError();
       try {
+        chatSocket.close();
         await apiLogout();
       } finally {
         this.isSubmitting = false;
@@ -0,0 +1,126 @@
+/**
+ * WebSocket chat transport (/api/v1/chat/ws).
+ *
+ * One connection, authenticated by the session cookie at the handshake, carries the
+ * requests of every session. Each request gets an id; the frames the server sends back
+ * carry it, so several turns may stream at once.
+ */
+const SOCKET_PATH = "/api/v1/chat/ws";
+
+export class ChatSocket {
+  constructor() {
+    this.socket = null;
+    this.opening = null;
+    this.nextId = 1;
+    this.pending = new Map(); // request id -> { resolve, reject, onDelta, parts }
+  }
+
+  /**
+   * Open the connection if needed; resolves once it is usable.
+   * Callers fall back to the HTTP routes when this rejects.
+   */
+  connect() {
+    if (this.socket && this.socket.readyState === WebSocket.OPEN) {
+      return Promise.resolve();
+    }
+    if (this.opening) {
+      return this.opening;
+    }
+
+    const scheme = window.location.protocol === "https:" ? "wss:" : "ws:";
+    this.opening = new Promise((resolve, reject) => {
+      const socket = new WebSocket(`${scheme}//${window.location.host}${SOCKET_PATH}`);
+      socket.onopen = () => {
+        this.socket = socket;
+        this.opening = null;
+        resolve();
+      };
+      socket.onmessage = (event) => this.handleFrame(event.data);
+      socket.onclose = () => {
+        this.opening = null;
+        this.socket = null;
+        this.failPending("Chat connection closed.");
+        reject(new Error("Chat connection closed."));
+      };
+    });
+    return this.opening;
+  }
+
+  close() {
+    if (this.socket) {
+      this.socket.close();
+    }
+  }
+
+  /**
+   * Send a message; `onDelta(text)` is called with each part of the reply as it arrives.
+   * Resolves with `{ response, cancelled }` once the turn has ended.
+   */
+  async sendMessage(sessionId, message, onDelta = () => {}) {
+    const result = await this.request({ type: "send", session_id: sessionId, message }, onDelta);
+    return { response: result.parts.join(""), cancelled: result.type === "cancelled" };
+  }
+
+  /**
+   * Stop a running turn; its sendMessage promise resolves with `cancelled: true`.
+   */
+  cancel(requestId) {
+    this.sendFrame({ type: "cancel", id: requestId });
+  }
+
+  async getContext(sessionId) {
+    const frame = await this.request({ type: "context", session_id: sessionId });
+    return frame.context;
+  }
+
+  async request(frame, onDelta = null) {
+    await this.connect();
+    const id = String(this.nextId++);
+    return new Promise((resolve, reject) => {
+      this.pending.set(id, { resolve, reject, onDelta, parts: [] });
+      this.sendFrame({ ...frame, id });
+    });
+  }
+
+  sendFrame(frame) {
+    if (this.socket && this.socket.readyState === WebSocket.OPEN) {
+      this.socket.send(JSON.stringify(frame));
+    }
+  }
+
+  handleFrame(data) {
+    let frame;
+    try {
+      frame = JSON.parse(data);
+    } catch {
+      return;
+    }
+
+    const request = this.pending.get(frame.id);
+    if (!request) {
+      return;
+    }
+
+    if (frame.type === "delta") {
+      request.parts.push(frame.text);
+      if (request.onDelta) {
+        request.onDelta(frame.text);
+      }
+      return;
+    }
+
+    this.pending.delete(frame.id);
+    if (frame.type === "error") {
+      request.reject(new Error(typeof frame.detail === "string" ? frame.detail : "Request failed."));
+    } else {
+      request.resolve({ ...frame, parts: request.parts });
+    }
+  }
+
+  failPending(detail) {
+    for (const request of this.pending.values()) {
+      request.reject(new Error(detail));
+    }
+    this.pending.clear();
+  }
+}
@@ -11,6 +11,12 @@ from ._cli.cmd_chat import CommandChat
 from ._cli.cmd_chat_remote import CommandChatRemote
 from ._cli.cmd_serve import CommandServe
 from ._cli.cmd_test import CommandTest
+from ._cli.cmd_batch import CommandBatch
+from ._cli.cmd_standin import CommandStandin
+from ._cli.cmd_bench import CommandBench
+from ._cli.cmd_loadtest import CommandLoadTest
+from ._cli.cmd_trace import CommandTrace
+from ._cli.cmd_questions import CommandQuestions
 
 
 
@@ -23,6 +29,12 @@ COMMANDS :List[Type[CliCmd]] = [
     CommandChatRemote,
     CommandServe,
     CommandTest,
+    CommandBatch,
+    CommandStandin,
+    CommandBench,
+    CommandLoadTest,
+    CommandTrace,
+    CommandQuestions,
     # Add new command classes here
 ]
 
@@ -0,0 +1,206 @@
+"""
+Admission control of the chat turns: per-user and global concurrency limits, with fair queueing.
+
+A turn runs when both its user and the server are under their limits. Otherwise it waits in
+its user's queue; freed slots go to the users in turn (round robin), so a user with many
+parallel turns waits behind their own turns and not in front of everyone else's. A turn is
+rejected at once when its user's queue (or the whole queue) is full, and when it has waited
+longer than the maximum wait.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Final, Iterator, Optional
+
+from ._environ import LC_ADMISSION_WAIT, LC_MAX_CONCURRENT_TURNS, LC_MAX_QUEUED_TURNS, LC_MAX_USER_QUEUE, LC_MAX_USER_TURNS
+from ._metrics import counter, histogram
+from ._singleton import Singleton
+from .exceptions import AdmissionRejected, LCValueError
+
+_logger = logging.getLogger(__name__)
+
+
+MAX_CONCURRENT_TURNS    :Final[int]   = 16      # Turns running at once, all users
+MAX_USER_TURNS          :Final[int]   = 2       # Turns running at once, per user
+MAX_USER_QUEUE          :Final[int]   = 4       # Turns waiting, per user
+MAX_QUEUED_TURNS        :Final[int]   = 64      # Turns waiting, all users
+MAX_WAIT_S              :Final[float] = 10.0
+DEFAULT_TURN_S          :Final[float] = 5.0     # Turn duration assumed before any was measured (Retry-After)
+EWMA_ALPHA              :Final[float] = 0.2
+
+QUEUE_FULL  :Final[str] = "queue_full"
+TIMEOUT     :Final[str] = "timeout"
+
+ADMISSIONS = counter("lc_admission_total", "Chat turns by admission outcome (admitted, queued, queue_full, timeout)", ("outcome",))
+ADMISSION_WAIT = histogram("lc_admission_wait_seconds", "Time chat turns waited for admission")
+
+
+@dataclass(frozen=True)
+class AdmissionLimits:
+    max_concurrent: int = MAX_CONCURRENT_TURNS
+    max_per_user:   int = MAX_USER_TURNS
+    max_user_queue: int = MAX_USER_QUEUE
+    max_queued:     int = MAX_QUEUED_TURNS
+    max_wait_s:     float = MAX_WAIT_S
+
+    def __post_init__(self) -> None:
+        if self.max_concurrent < 1 or self.max_per_user < 1:
+            raise LCValueError("Concurrency limits must be at least 1")
+        if self.max_user_queue < 0 or self.max_queued < 0 or self.max_wait_s < 0:
+            raise LCValueError("Queue limits must not be negative")
+
+
+class _Ticket:
+    __slots__ = ("user", "granted", "event")
+
+    def __init__(self, user:str) -> None:
+        self.user = user
+        self.granted = False
+        self.event = threading.Event()
+
+
+class AdmissionController(Singleton):
+    """
+    Process-wide admission of the chat turns; limits come from the environment on first use.
+    """
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._running_total = 0
+        self._running: dict[str, int] = {}
+        self._queues: OrderedDict[str, deque[_Ticket]] = OrderedDict()   # Users in round-robin order
+        self._queued = 0
+        self._turn_s = DEFAULT_TURN_S
+        self.limits = _limits_from_environ()
+
+    def configure(self, limits:AdmissionLimits) -> None:
+        with self._lock:
+            self.limits = limits
+            self._dispatch()
+
+    @contextmanager
+    def admit(self, user:str, max_wait_s:Optional[float]=None) -> Iterator[None]:
+        """
+        Run the block once admitted; raise AdmissionRejected when the turn cannot be admitted
+        within `max_wait_s` (the configured maximum wait by default).
+        """
+        self.acquire(user, max_wait_s)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(user, time.monotonic() - start)
+
+    def acquire(self, user:str, max_wait_s:Optional[float]=None) -> None:
+        start = time.monotonic()
+        with self._lock:
+            limits = self.limits
+            if self._running_total < limits.max_concurrent \
+                    and self._running.get(user, 0) < limits.max_per_user \
+                    and user not in self._queues:
+                self._start(user)
+                ADMISSIONS.inc(outcome="admitted")
+                ADMISSION_WAIT.observe(0.0)
+                return
+            queue = self._queues.get(user)
+            if (queue is not None and len(queue) >= limits.max_user_queue) \
+                    or limits.max_user_queue == 0 or self._queued >= limits.max_queued:
+                ADMISSIONS.inc(outcome=QUEUE_FULL)
+                raise AdmissionRejected("queue full", self._retry_after(user))
+            ticket = _Ticket(user)
+            if queue is None:
+                queue = self._queues[user] = deque()
+            queue.append(ticket)
+            self._queued += 1
+
+        timeout = limits.max_wait_s if max_wait_s is None else min(max_wait_s, limits.max_wait_s)
+        ticket.event.wait(timeout)
+        with self._lock:
+            if not ticket.granted:
+                self._remove(ticket)
+                ADMISSIONS.inc(outcome=TIMEOUT)
+                raise AdmissionRejected("timed out waiting", self._retry_after(user))
+        ADMISSIONS.inc(outcome="queued")
+        ADMISSION_WAIT.observe(time.monotonic() - start)
+
+    def release(self, user:str, duration_s:Optional[float]=None) -> None:
+        with self._lock:
+            self._running_total -= 1
+            remaining = self._running.get(user, 1) - 1
+            if remaining > 0:
+                self._running[user] = remaining
+            else:
+                self._running.pop(user, None)
+            if duration_s is not None:
+                self._turn_s += EWMA_ALPHA * (duration_s - self._turn_s)
+            self._dispatch()
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return {"running": self._running_total, "queued": self._queued}
+
+    def _start(self, user:str) -> None:
+        self._running_total += 1
+        self._running[user] = self._running.get(user, 0) + 1
+
+    def _dispatch(self) -> None:
+        """
+        Grant the free slots to the waiting turns, one user at a time (lock held).
+        """
+        limits = self.limits
+        while self._running_total < limits.max_concurrent:
+            for user, queue in self._queues.items():
+                if self._running.get(user, 0) < limits.max_per_user:
+                    break
+            else:
+                return      # Every waiting user is at their own limit
+            ticket = queue.popleft()
+            self._queued -= 1
+            if queue:
+                self._queues.move_to_end(user)      # Next slot to the next user
+            else:
+                del self._queues[user]
+            self._start(user)
+            ticket.granted = True
+            ticket.event.set()
+
+    def _remove(self, ticket:_Ticket) -> None:
+        queue = self._queues.get(ticket.user)
+        if queue is not None and ticket in queue:
+            queue.remove(ticket)
+            self._queued -= 1
+            if not queue:
+                del self._queues[ticket.user]
+
+    def _retry_after(self, user:str) -> float:
+        """
+        Estimated wait for a slot, in whole seconds, from the average turn duration (lock held).
+        """
+        queue = self._queues.get(user)
+        user_wait = self._turn_s * (len(queue) + 1 if queue else 1) / self.limits.max_per_user
+        server_wait = self._turn_s * (self._queued + 1) / self.limits.max_concurrent
+        return float(max(1, math.ceil(max(user_wait, server_wait))))
+
+
+def _limits_from_environ() -> AdmissionLimits:
+    def number(name:str, default:float) -> float:
+        raw = os.environ.get(name, None)
+        if raw is None:
+            return default
+        try:
+            return float(raw)
+        except ValueError:
+            _logger.warning("Invalid %s=%r; using %g", name, raw, default)
+            return default
+
+    return AdmissionLimits(max_concurrent=int(number(LC_MAX_CONCURRENT_TURNS, MAX_CONCURRENT_TURNS)),
+                           max_per_user=int(number(LC_MAX_USER_TURNS, MAX_USER_TURNS)),
+                           max_user_queue=int(number(LC_MAX_USER_QUEUE, MAX_USER_QUEUE)),
+                           max_queued=int(number(LC_MAX_QUEUED_TURNS, MAX_QUEUED_TURNS)),
+                           max_wait_s=number(LC_ADMISSION_WAIT, MAX_WAIT_S))
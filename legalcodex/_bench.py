@@ -0,0 +1,183 @@
+"""
+Benchmark suite: registered micro and macro benchmarks, and regression comparison.
+
+A benchmark is a generator function registered with @benchmark: it sets up its fixture,
+yields the operation to time, and tears the fixture down when resumed. Each sample times
+`number` calls of the operation and records the time per call.
+"""
+from __future__ import annotations
+
+import fnmatch
+import gc
+import logging
+import math
+import platform
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, ContextManager, Final, Iterator, Literal, Optional
+
+from . import _stats
+from ._stats import percentile, welch_t_test
+from .exceptions import LCValueError
+
+_logger = logging.getLogger(__name__)
+
+
+DEFAULT_WARMUP      :Final[int]   = 1
+DEFAULT_REPETITIONS :Final[int]   = 10
+DEFAULT_ALPHA       :Final[float] = 0.05    # Significance level of the regression test...
+DEFAULT_THRESHOLD   :Final[float] = 0.05    # ...and smallest relative change that is reported
+
+
+Operation = Callable[[], object]
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name:           str
+    description:    str
+    number:         int                                 # Calls of the operation per sample
+    setup:          Callable[[], ContextManager[Operation]]
+
+
+BENCHMARKS : dict[str, Benchmark] = {}
+
+
+def benchmark(name:str, number:int=1) -> Callable[[Callable[[], Iterator[Operation]]], Callable[[], Iterator[Operation]]]:
+    """
+    Register a benchmark generator function under a name.
+    """
+    def register(function:Callable[[], Iterator[Operation]]) -> Callable[[], Iterator[Operation]]:
+        if name in BENCHMARKS:
+            raise LCValueError(f"Benchmark '{name}' is already registered")
+        description = (function.__doc__ or "").strip().splitlines()[0] if function.__doc__ else ""
+        BENCHMARKS[name] = Benchmark(name, description, number, contextmanager(function))
+        return function
+    return register
+
+
+@dataclass
+class BenchmarkResult:
+    name:       str
+    number:     int
+    samples:    list[float] = field(default_factory=list)   # Seconds per call, one per repetition
+
+    @property
+    def mean(self) -> float:
+        return _stats.mean(self.samples)
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(_stats.variance(self.samples))
+
+    def serialize(self) -> dict[str, Any]:
+        return {"number":   self.number,
+                "unit":     "s",
+                "mean":     self.mean,
+                "stdev":    self.stdev,
+                "median":   percentile(self.samples, 50),
+                "p95":      percentile(self.samples, 95),
+                "min":      min(self.samples, default=0.0),
+                "samples":  self.samples}
+
+
+Verdict = Literal["regression", "improvement", "unchanged"]
+
+
+@dataclass(frozen=True)
+class Comparison:
+    name:           str
+    baseline_mean:  float
+    current_mean:   float
+    change:         float       # Relative change of the mean time (positive is slower)
+    p_value:        float
+    verdict:        Verdict
+
+
+def select(patterns:Optional[list[str]]=None) -> list[Benchmark]:
+    """
+    Return the registered benchmarks matching any of the (fnmatch) patterns, or all of them.
+    """
+    if not patterns:
+        return list(BENCHMARKS.values())
+    selected = [bench for name, bench in BENCHMARKS.items() if any(fnmatch.fnmatch(name, pattern) for pattern in patterns)]
+    if not selected:
+        raise LCValueError(f"No benchmark matches {', '.join(patterns)}")
+    return selected
+
+
+def run_benchmark(bench:Benchmark, warmup:int=DEFAULT_WARMUP, repetitions:int=DEFAULT_REPETITIONS) -> BenchmarkResult:
+    result = BenchmarkResult(bench.name, bench.number)
+    with bench.setup() as operation:
+        for repetition in range(warmup + repetitions):
+            gc.collect()
+            start = time.perf_counter_ns()
+            for _ in range(bench.number):
+                operation()
+            elapsed = (time.perf_counter_ns() - start) / 1e9 / bench.number
+            if repetition >= warmup:
+                result.samples.append(elapsed)
+    _logger.debug("Benchmark %s: mean=%.6fs stdev=%.6fs", bench.name, result.mean, result.stdev)
+    return result
+
+
+def run_suite(benchmarks:list[Benchmark],
+              warmup:int=DEFAULT_WARMUP,
+              repetitions:int=DEFAULT_REPETITIONS,
+              progress:Optional[Callable[[BenchmarkResult], None]]=None) -> dict[str, Any]:
+    """
+    Run the benchmarks and return the JSON serializable results.
+    Log records below WARNING are disabled while running, so console output does not dominate the timings.
+    """
+    if repetitions < 2:
+        raise LCValueError("At least 2 repetitions are needed")
+
+    results: dict[str, Any] = {}
+    logging.disable(logging.INFO)
+    try:
+        for bench in benchmarks:
+            result = run_benchmark(bench, warmup, repetitions)
+            results[bench.name] = result.serialize()
+            if progress is not None:
+                progress(result)
+    finally:
+        logging.disable(logging.NOTSET)
+
+    return {"meta": {"created_at":  datetime.now(timezone.utc).isoformat(),
+                     "python":      platform.python_version(),
+                     "platform":    platform.platform(),
+                     "warmup":      warmup,
+                     "repetitions": repetitions},
+            "benchmarks": results}
+
+
+def compare(baseline:dict[str, Any],
+            current:dict[str, Any],
+            alpha:float=DEFAULT_ALPHA,
+            threshold:float=DEFAULT_THRESHOLD) -> list[Comparison]:
+    """
+    Compare the benchmarks present in both results with Welch's t-test.
+    A change is reported when it is statistically significant and larger than the threshold.
+    """
+    comparisons: list[Comparison] = []
+    for name, result in current.get("benchmarks", {}).items():
+        reference = baseline.get("benchmarks", {}).get(name)
+        if reference is None:
+            continue
+        before: list[float] = reference["samples"]
+        after: list[float] = result["samples"]
+        before_mean, after_mean = _stats.mean(before), _stats.mean(after)
+        change = (after_mean - before_mean) / before_mean if before_mean > 0 else 0.0
+        _, p_value = welch_t_test(before, after)
+
+        verdict: Verdict = "unchanged"
+        if p_value < alpha and abs(change) >= threshold:
+            verdict = "regression" if change > 0 else "improvement"
+        comparisons.append(Comparison(name, before_mean, after_mean, change, p_value, verdict))
+    return comparisons
+
+
+# Registered benchmarks
+from . import _benchmarks  # noqa: E402,F401
@@ -0,0 +1,179 @@
+"""
+Benchmarks of the `lc bench` suite (see _bench).
+"""
+from __future__ import annotations
+
+import contextlib
+import os
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Final, Iterator
+
+from ._bench import benchmark, Operation
+from ._deadline import Deadline
+from .ai.message import Message
+from .ai.stream import DeadlineStream
+from .ai.chat.chat_context import ChatContext
+from .ai.chat.chat_session import ChatSession
+from .ai.chat.chat_session_manager import ChatSessionManager, get_path
+from .ai.chat._chat_types import ChatSessionId
+from .ai.engines.mock_engine import MockEngine
+
+
+USERNAME        :Final[str] = "test"
+PASSWORD        :Final[str] = "hello"
+SYSTEM_PROMPT   :Final[str] = "You are a helpful legal assistant."
+THREADS         :Final[int] = 8
+LOOKUPS         :Final[int] = 500       # get_session calls per thread
+
+# Response of the stream benchmarks: many small chunks, no simulated waits
+STREAM_PARAMETERS :Final[dict[str, str]] = {"ttft_ms": "0", "tokens_per_s": "0", "response_tokens": "2000",
+                                            "ttft_sigma": "0", "seed": "1"}
+
+# Startup: a fresh interpreter importing the CLI, and one building the HTTP app
+CLI_IMPORT      :Final[str] = "import legalcodex.__main__"
+APP_CREATE      :Final[str] = "from legalcodex.http_server.app import create_app; create_app()"
+
+_PARAGRAPH :Final[str] = ("The tenant asked whether the landlord may raise the rent during the lease, "
+                          "and what notice is required under the applicable legislation. ") * 4
+
+
+def _session(messages:int) -> ChatSession:
+    session = ChatSession.new_chat_session(username=USERNAME,
+                                           system_prompt=SYSTEM_PROMPT,
+                                           max_messages=max(messages * 2, 20),
+                                           engine_name=MockEngine.NAME,
+                                           summarizer="llm")
+    for index in range(messages):
+        session.context.append(session.engine, Message("user" if index % 2 == 0 else "assistant", f"{index}: {_PARAGRAPH}"))
+    return session
+
+
+def _discard(session_id:ChatSessionId) -> None:
+    """
+    Close a benchmark session and delete the file it was saved to.
+    """
+    ChatSessionManager().close_session(session_id)
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(os.path.join(get_path(), f"{session_id}.json"))
+
+
+@benchmark("context.append_trim", number=200)
+def _context_append_trim() -> Iterator[Operation]:
+    """
+    Append messages to a chat context, trimming and summarizing it periodically.
+    """
+    engine = MockEngine()
+    context = ChatContext(system_prompt=SYSTEM_PROMPT, max_messages=20, summarizer="llm")
+    message = Message.User(_PARAGRAPH)
+    yield lambda: context.append(engine, message)
+
+
+@benchmark("session.save_load", number=20)
+def _session_save_load() -> Iterator[Operation]:
+    """
+    Save a chat session with 20 messages to disk and load it back.
+    """
+    session = _session(20)
+    with tempfile.TemporaryDirectory(prefix="lc-bench-") as path:
+        filename = os.path.join(path, "session.json")
+
+        def save_load() -> None:
+            session.save(filename)
+            ChatSession.load(filename)
+
+        yield save_load
+
+
+@benchmark("manager.get_session_contention")
+def _manager_get_session_contention() -> Iterator[Operation]:
+    """
+    Look up a session from several threads at once.
+    """
+    manager = ChatSessionManager()
+    session = _session(2)
+    manager.add_session(session)
+
+    def lookups() -> None:
+        for _ in range(LOOKUPS):
+            manager.get_session(session.uid)
+
+    with ThreadPoolExecutor(max_workers=THREADS, thread_name_prefix="bench") as pool:
+        try:
+            yield lambda: [future.result() for future in [pool.submit(lookups) for _ in range(THREADS)]]
+        finally:
+            _discard(session.uid)
+
+
+@benchmark("http.turn_roundtrip", number=20)
+def _http_turn_roundtrip() -> Iterator[Operation]:
+    """
+    Chat turn through the HTTP API (in process), with the mock engine.
+    """
+    from fastapi.testclient import TestClient
+    from .http_server.app import create_app
+
+    client = TestClient(create_app())
+    client.post("/api/v1/auth/login", json={"username": USERNAME, "password": PASSWORD}).raise_for_status()
+    response = client.post("/api/v1/chat/sessions", json={"engine": MockEngine.NAME})
+    response.raise_for_status()
+    session_id = ChatSessionId(response.json()["session_id"])
+
+    def turn() -> None:
+        client.post(f"/api/v1/chat/sessions/{session_id}/messages", json={"message": "Can my rent be raised?"}).raise_for_status()
+
+    try:
+        yield turn
+    finally:
+        client.close()
+        _discard(session_id)
+
+
+@benchmark("stream.mock_throughput", number=5)
+def _stream_mock_throughput() -> Iterator[Operation]:
+    """
+    Stream a 2000 token response through the deadline wrapper (per-chunk overhead).
+    """
+    engine = MockEngine(parameters=STREAM_PARAMETERS)
+    messages = [Message("system", SYSTEM_PROMPT), Message.User("Hello")]
+    yield lambda: DeadlineStream(engine.run_messages_stream(messages), Deadline(60.0)).all()
+
+
+@benchmark("stream.openai_standin", number=2)
+def _stream_openai_standin() -> Iterator[Operation]:
+    """
+    Stream a 2000 token response from the local OpenAI stand-in through OpenAIEngine.
+    """
+    from .ai.engines.openai_engine import OpenAIEngine
+    from .ai.engines.openai_standin import OpenAIStandin
+
+    simulator = MockEngine(parameters=STREAM_PARAMETERS).simulator
+    assert simulator is not None
+    messages = [Message("system", SYSTEM_PROMPT), Message.User("Hello")]
+    with OpenAIStandin(simulator) as standin:
+        engine = OpenAIEngine(base_url=standin.base_url, max_retries=0)
+        yield lambda: engine.run_messages_stream(messages).all()
+
+
+def _run_python(code:str) -> Operation:
+    def run() -> None:
+        subprocess.run([sys.executable, "-c", code], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return run
+
+
+@benchmark("startup.cli_import", number=1)
+def _startup_cli_import() -> Iterator[Operation]:
+    """
+    Start a Python interpreter and import the `lc` CLI (the start of every command).
+    """
+    yield _run_python(CLI_IMPORT)
+
+
+@benchmark("startup.app_create", number=1)
+def _startup_app_create() -> Iterator[Operation]:
+    """
+    Start a Python interpreter and build the HTTP app (the start of a server worker).
+    """
+    yield _run_python(APP_CREATE)
@@ -0,0 +1,120 @@
+"""
+Run a JSONL file of prompts through an engine, for evaluation sets and backfills.
+
+Each input line is a JSON object with either a "prompt" (optionally with a "system" prompt)
+or a list of "messages" ({"role", "content"}), and an optional "id".
+Each output line holds the "id", "response", "error", "attempts" and "duration_ms" of an input
+line, in the same order.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from contextlib import contextmanager
+from typing import Any, Optional, IO, Iterator
+
+from .._schema import MessageSchema
+from ..exceptions import LCException
+from ..ai.batch import BatchResult, DEFAULT_CONCURRENCY, DEFAULT_RETRIES
+from ..ai.context import Context
+from ..ai.message import Message
+
+from .engine_cmd import EngineCommand
+
+_logger = logging.getLogger(__name__)
+
+
+class CommandBatch(EngineCommand):
+    title:str = "batch"
+
+    def add_arguments(self, parser:argparse.ArgumentParser)->None:
+        super().add_arguments(parser)
+        parser.add_argument('input', type=str, help='JSONL file of prompts ("-" for stdin)')
+        parser.add_argument('--output', '-o', type=str, default="-", help='JSONL file of results ("-" for stdout)')
+        parser.add_argument('--concurrency', '-c', type=int, default=DEFAULT_CONCURRENCY, help='Maximum number of requests in flight')
+        parser.add_argument('--retries', '-r', type=int, default=DEFAULT_RETRIES, help='Retries of a failed request')
+        parser.add_argument('--system', type=str, default=None, help='System prompt for the items without one')
+
+    def run(self, args:argparse.Namespace)->None:
+        super().run(args)
+
+        ids, contexts = _read_items(args.input, args.system)
+
+        def progress(done:int, total:int, result:BatchResult)->None:
+            print(f"\r[{done}/{total}]", end="", file=sys.stderr, flush=True)
+
+        results = self.engine.run_batch(contexts,
+                                        concurrency=args.concurrency,
+                                        retries=args.retries,
+                                        progress=progress)
+        print(file=sys.stderr)
+
+        _write_results(args.output, ids, results)
+        failures = sum(1 for result in results if not result.ok)
+        _logger.info("Batch complete: %d items, %d failed", len(results), failures)
+        if failures:
+            print(f"{failures} of {len(results)} items failed", file=sys.stderr)
+
+
+def _read_items(path:str, system:Optional[str])->tuple[list[Any], list[Context]]:
+    ids: list[Any] = []
+    contexts: list[Context] = []
+    with _open(path, "r") as file_handle:
+        for line_number, line in enumerate(file_handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+                contexts.append(_to_context(item, system))
+            except (json.JSONDecodeError, ValueError, TypeError, KeyError) as err:
+                raise LCException(f"Invalid batch item on line {line_number}: {err}") from None
+            ids.append(item.get("id", len(ids)))
+    return ids, contexts
+
+
+def _to_context(item:Any, system:Optional[str])->Context:
+    if not isinstance(item, dict):
+        raise ValueError("expected a JSON object")
+
+    if "messages" in item:
+        return [Message.deserialize(MessageSchema.model_validate(message)) for message in item["messages"]]
+
+    prompt = item["prompt"]
+    if not isinstance(prompt, str) or not prompt.strip():
+        raise ValueError("'prompt' must be a non-empty string")
+
+    messages: list[Message] = []
+    system_prompt = item.get("system", system)
+    if system_prompt:
+        messages.append(Message("system", system_prompt))
+    messages.append(Message.User(prompt))
+    return messages
+
+
+def _write_results(path:str, ids:list[Any], results:list[BatchResult])->None:
+    with _open(path, "w") as file_handle:
+        for item_id, result in zip(ids, results):
+            record = {"id":          item_id,
+                      "response":    result.response,
+                      "error":       result.error,
+                      "attempts":    result.attempts,
+                      "duration_ms": round(result.duration_s * 1000, 1)}
+            file_handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+@contextmanager
+def _open(path:str, mode:str)->Iterator[IO[str]]:
+    """
+    Open a text file, or use stdin/stdout for "-".
+    """
+    if path == "-":
+        yield sys.stdin if mode == "r" else sys.stdout
+        return
+    try:
+        file_handle = open(path, mode, encoding="utf-8")
+    except OSError as err:
+        raise LCException(f"Cannot open '{path}': {err}") from None
+    with file_handle:
+        yield file_handle
@@ -0,0 +1,81 @@
+"""
+Run the benchmark suite, optionally comparing the results with a baseline.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from typing import Any
+
+from .._bench import (BENCHMARKS, BenchmarkResult, DEFAULT_ALPHA, DEFAULT_REPETITIONS, DEFAULT_THRESHOLD,
+                      DEFAULT_WARMUP, compare, run_suite, select)
+from ..exceptions import LCException
+from .cli_cmd import CliCmd
+
+_logger = logging.getLogger(__name__)
+
+
+class CommandBench(CliCmd):
+    title: str = "bench"
+
+    def add_arguments(self, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument("benchmarks", nargs="*", metavar="NAME",
+                            help="Benchmarks to run (shell patterns, e.g. 'stream.*'); all by default")
+        parser.add_argument("--list", action="store_true", help="List the benchmarks and exit")
+        parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="Untimed repetitions before measuring")
+        parser.add_argument("--repetitions", "-r", type=int, default=DEFAULT_REPETITIONS, help="Timed repetitions (samples)")
+        parser.add_argument("--output", "-o", type=str, default=None, help="Write the JSON results to this file")
+        parser.add_argument("--compare", type=str, default=None, metavar="BASELINE",
+                            help="Compare with the JSON results of a previous run; fails on regressions")
+        parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help="Significance level of the comparison")
+        parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                            help="Smallest relative change reported by the comparison")
+
+    def run(self, args: argparse.Namespace) -> None:
+        if args.list:
+            for bench in BENCHMARKS.values():
+                print(f"{bench.name:<34} {bench.description}")
+            return
+
+        baseline = _load(args.compare) if args.compare else None
+
+        def progress(result:BenchmarkResult) -> None:
+            print(f"{result.name:<34} {_format(result.mean):>10} ± {_format(result.stdev):<10} ({result.number} calls x {len(result.samples)})")
+
+        results = run_suite(select(args.benchmarks), args.warmup, args.repetitions, progress)
+
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as file:
+                json.dump(results, file, indent=2)
+            print(f"Results written to {args.output}")
+
+        if baseline is None:
+            return
+
+        comparisons = compare(baseline, results, args.alpha, args.threshold)
+        print()
+        for comparison in comparisons:
+            print(f"{comparison.name:<34} {_format(comparison.baseline_mean):>10} -> {_format(comparison.current_mean):<10} "
+                  f"{comparison.change:+7.1%}  p={comparison.p_value:.3f}  {comparison.verdict}")
+
+        regressions = [comparison.name for comparison in comparisons if comparison.verdict == "regression"]
+        if regressions:
+            raise LCException(f"Performance regression in {', '.join(regressions)}")
+
+
+def _load(filename:str) -> dict[str, Any]:
+    try:
+        with open(filename, "r", encoding="utf-8") as file:
+            data: dict[str, Any] = json.load(file)
+    except (OSError, ValueError) as err:
+        raise LCException(f"Cannot read the baseline {filename}: {err}") from None
+    return data
+
+
+def _format(seconds:float) -> str:
+    if seconds >= 1.0:
+        return f"{seconds:.3f}s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f}ms"
+    return f"{seconds * 1e6:.1f}µs"
@@ -12,10 +12,11 @@ from .._user_access import UsersAccess, User
 from ..ai.chat._chat_types import ChatSessionId
 from ..ai.chat.chat_session_manager import ChatSessionManager
 from ..ai.chat import chat_behaviour
+from ..ai.chat._summarizer_selector import SUMMARIZERS, DEFAULT_SUMMARIZER
 from ..ai.stream import Stream
 from ..exceptions import LCException, ChatSessionNotFound
 
-from .engine_cmd import EngineCommand
+from .engine_cmd import EngineCommand, parse_engine_parameters
 
 
 _logger = logging.getLogger(__name__)
@@ -30,6 +31,11 @@ CLI_SESSION_ID :Final[ChatSessionId] = ChatSessionId("cli-session")
 class CommandChat(EngineCommand):
     title: str = "chat"
 
+    def add_arguments(self, parser: argparse.ArgumentParser) -> None:
+        super().add_arguments(parser)
+        parser.add_argument('--summarizer', '-s', action="store", type=str, default=None,
+                            choices=SUMMARIZERS.keys(), help=f'Summarizer for new sessions; default: {DEFAULT_SUMMARIZER}')
+
     def run(self, args: argparse.Namespace) -> None:
         self.set_api_key()
         session_id = get_session_id(args)
@@ -71,7 +77,9 @@ def get_session_id(args:argparse.Namespace)->ChatSessionId:
     # If no session exists, create a new one with the CLI_SESSION_ID
     return chat_behaviour.new_session(user=user,
                                engine_name=args.engine,
-                               model=args.model)
+                               model=args.model,
+                               summarizer=args.summarizer,
+                               parameters=parse_engine_parameters(args.param))
 
 
 def write(msg:str)->None:
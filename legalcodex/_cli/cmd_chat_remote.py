@@ -1,18 +1,29 @@
 """
 Command-line based chat client that connects to a running LegalCodex HTTP API server.
 Used for testing and debugging only.
+
+The client keeps one connection open across requests and streams the replies when the server
+has the streaming route, so the times it reports (connect, time to first byte, first chunk,
+total) probe the deployment rather than the client.
 """
 from __future__ import annotations
 
 import argparse
+import http.client
+import http.cookies
 import json
 import logging
-import urllib.request
-import urllib.error
-import http.cookiejar
-from typing import Any, Final
+import select
+import statistics
+import time
+import urllib.parse
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Final, Iterator, Optional
 
 from .cli_cmd import CliCmd
+from .engine_cmd import parse_engine_parameters
 from ..exceptions import LCException
 
 _logger = logging.getLogger(__name__)
@@ -21,6 +32,10 @@ _logger = logging.getLogger(__name__)
 DEFAULT_BASE_URL: Final[str] = "http://127.0.0.1:8000/api/v1"
 DEFAULT_USERNAME: Final[str] = "test"
 DEFAULT_PASSWORD: Final[str] = "hello"
+DEFAULT_TIMEOUT_S: Final[float] = 60.0
+SOCKET_MARGIN_S: Final[float] = 5.0     # Leave the server time to answer with 504 before the socket gives up
+CONNECT_TIMEOUT_S: Final[float] = 10.0
+TIMINGS_KEPT: Final[int] = 1000
 
 
 class CommandChatRemote(CliCmd):
@@ -33,7 +48,11 @@ class CommandChatRemote(CliCmd):
         parser.add_argument("--engine", default=None, help="Engine name for new sessions")
         parser.add_argument("--model", default=None, help="Model name for new sessions")
         parser.add_argument("--max-turns", type=int, default=None, help="Max messages when creating a new session")
+        parser.add_argument("--summarizer", default=None, help="Summarizer for new sessions (llm, extractive, llm+extractive)")
+        parser.add_argument("--param", action="append", default=[], metavar="KEY=VALUE", help="Engine parameter for new sessions (repeatable)")
         parser.add_argument("--session-id", default=None, help="Open a specific session id instead of creating/reusing the first available")
+        parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_S, help="Time budget of a chat turn, in seconds (sent as X-Request-Timeout)")
+        parser.add_argument("--no-timing", dest="timing", action="store_false", help="Do not print the connect, TTFB and total times of each turn")
 
     def register(self, subparsers: Any) -> None:
         parser = subparsers.add_parser(self.title, help=f"{self.title} Help")
@@ -41,7 +60,7 @@ class CommandChatRemote(CliCmd):
         parser.set_defaults(command=self)
 
     def run(self, args: argparse.Namespace) -> None:
-        client = _RemoteChatClient(args.url)
+        client = _RemoteChatClient(args.url, args.timeout)
         client.login(args.username, args.password)
 
         session_id: str
@@ -52,7 +71,9 @@ class CommandChatRemote(CliCmd):
         else:
             session_id = client.new_session(args.max_turns,
                                             args.engine,
-                                            args.model)
+                                            args.model,
+                                            args.summarizer,
+                                            parse_engine_parameters(args.param))
 
         processor = _RemoteChatCommandProcessor(client, session_id)
 
@@ -69,8 +90,12 @@ class CommandChatRemote(CliCmd):
 
                     processor.execute(prompt)
 
-                    response_text = client.send_message(session_id, prompt)
-                    _print_response(response_text)
+                    print("AI > ", end="", flush=True)
+                    response_text = client.stream_message(session_id, prompt, lambda chunk: print(chunk, end="", flush=True))
+                    print()
+                    _logger.info("Response: %s", response_text)
+                    if args.timing and client.last_timing is not None:
+                        print(f"[{client.last_timing.describe()}]")
 
                 except CommandExecutedException:
                     continue
@@ -84,17 +109,55 @@ class CommandChatRemote(CliCmd):
             client.close()
 
 
+@dataclass(frozen=True)
+class RequestTiming:
+    """
+    Timing of a request to the server, in seconds.
+    """
+    method:        str
+    path:          str
+    status:        int
+    reused:        bool                 # Sent on a kept-alive connection
+    connect_s:     float                # 0.0 on a reused connection
+    ttfb_s:        float                # Until the status line and headers were received
+    total_s:       float                # Until the whole body was read
+    first_chunk_s: Optional[float] = None    # Streamed responses: until the first chunk of content
+
+    def describe(self) -> str:
+        parts = [f"connect {'reused' if self.reused else _ms(self.connect_s)}", f"TTFB {_ms(self.ttfb_s)}"]
+        if self.first_chunk_s is not None:
+            parts.append(f"first chunk {_ms(self.first_chunk_s)}")
+        parts.append(f"total {_ms(self.total_s)}")
+        return " | ".join(parts)
+
+
 class _RemoteChatClient:
+    """
+    Client of the HTTP API over one persistent (keep-alive) connection, reopened when the
+    server closes it. Not thread-safe: use one client per thread.
+    """
     _base_url: str
+    _timeout: float
 
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, timeout: float = DEFAULT_TIMEOUT_S):
         self._base_url = base_url.rstrip("/")
-        self._cookies = http.cookiejar.CookieJar()
-        self._opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self._cookies))
+        self._timeout = timeout
+        url = urllib.parse.urlsplit(self._base_url)
+        self._https = url.scheme == "https"
+        self._host = url.hostname or "127.0.0.1"
+        self._port = url.port
+        self._prefix = url.path.rstrip("/")
+        self._connection: Optional[http.client.HTTPConnection] = None
+        self._cookies: dict[str, str] = {}
+        self._streaming = True          # Until the server shows it has no streaming route
+        self.timings: deque[RequestTiming] = deque(maxlen=TIMINGS_KEPT)
+
+    @property
+    def last_timing(self) -> Optional[RequestTiming]:
+        return self.timings[-1] if self.timings else None
 
     def close(self) -> None:
-        # Nothing to close for urllib but left for symmetry/extensibility.
-        self._opener = None  # type: ignore[assignment]
+        self._disconnect()
 
     def login(self, username: str, password: str) -> None:
         _logger.info("Logging in as %s", username)
@@ -109,11 +172,18 @@ class _RemoteChatClient:
         _logger.info("Closing session %s", session_id)
         self._post_json(f"/chat/sessions/{session_id}/close", payload=None, expect_body=False)
 
-    def new_session(self, max_messages: int | None, engine: str | None, model: str | None) -> str:
-        payload = {
+    def new_session(self,
+                    max_messages: int | None,
+                    engine: str | None,
+                    model: str | None,
+                    summarizer: str | None = None,
+                    parameters: dict[str, str] | None = None) -> str:
+        payload: dict[str, Any] = {
             "max_messages": max_messages,
             "engine": engine,
             "model": model,
+            "summarizer": summarizer,
+            "parameters": parameters,
         }
         payload = {k: v for k, v in payload.items() if v is not None}
         _logger.info("Creating new session with %s", payload)
@@ -139,37 +209,70 @@ class _RemoteChatClient:
         data = self._post_json(
             f"/chat/sessions/{session_id}/messages",
             {"message": message},
+            headers={"X-Request-Timeout": f"{self._timeout:g}", "Idempotency-Key": uuid.uuid4().hex},
         )
         return data.get("response", "") # type: ignore[no-any-return]
 
-    def _get_json(self, path: str) -> Any:
-        req = urllib.request.Request(self._build_url(path))
-        return self._request(req)
-
-    def _post_json(self, path: str, payload: Any | None, expect_body: bool = True) -> Any:
-        data_bytes = json.dumps(payload).encode("utf-8") if payload is not None else None
-        req = urllib.request.Request(self._build_url(path), data=data_bytes, method="POST")
-        req.add_header("Content-Type", "application/json")
-        return self._request(req, expect_body)
+    def stream_message(self, session_id: str, message: str, on_chunk: Callable[[str], None]) -> str:
+        """
+        Send a message and pass the response to `on_chunk` as it is generated; return the whole
+        response. Falls back to send_message when the server cannot stream.
+        """
+        if not self._streaming:
+            response = self.send_message(session_id, message)
+            on_chunk(response)
+            return response
+
+        parts: list[str] = []
+        try:
+            for line in self._stream_lines("POST", f"/chat/sessions/{session_id}/messages/stream", {"message": message},
+                                           headers={"X-Request-Timeout": f"{self._timeout:g}"}):
+                if "delta" in line:
+                    parts.append(line["delta"])
+                    on_chunk(line["delta"])
+                elif "error" in line:
+                    raise LCException(f"HTTP {line.get('status', 500)}: {line['error']}")
+        except _NotFound:
+            _logger.info("The server has no streaming route; falling back to buffered responses")
+            self._streaming = False
+            return self.stream_message(session_id, message, on_chunk)
+        return "".join(parts)
+
+    def ask_questions(self, payload: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        """
+        Submit a batch of questions and yield the result of each one as the server streams it.
+        """
+        return self._stream_lines("POST", "/chat/questions", payload, headers={"X-Request-Timeout": f"{self._timeout:g}"})
 
-    def _request(self, req: urllib.request.Request, expect_body: bool = True) -> Any:
+    def _get_json(self, path: str) -> Any:
+        return self._request("GET", path, None)
+
+    def _post_json(self,
+                   path: str,
+                   payload: Any | None,
+                   expect_body: bool = True,
+                   headers: dict[str, str] | None = None) -> Any:
+        return self._request("POST", path, payload, expect_body, headers)
+
+    def _request(self,
+                 method: str,
+                 path: str,
+                 payload: Any | None,
+                 expect_body: bool = True,
+                 headers: dict[str, str] | None = None) -> Any:
+        resp, start, connect_s, reused, ttfb_s = self._send(method, path, payload, headers)
         try:
-            with self._opener.open(req, timeout=30) as resp:
-                status_code = resp.getcode()
-                raw = resp.read()
-        except urllib.error.HTTPError as err:
-            detail = err.read().decode("utf-8", errors="ignore")
-            raise LCException(f"HTTP {err.code}: {detail or err.reason}") from None
-        except urllib.error.URLError as err:  # includes connection errors
-            raise LCException(f"HTTP request failed: {err.reason}") from None
-
-        if status_code >= 400:
-            raise LCException(f"HTTP {status_code}: unexpected response")
-
-        if not expect_body:
-            return {}
+            raw = resp.read()
+        except (OSError, http.client.HTTPException) as err:
+            self._disconnect()
+            raise LCException(f"HTTP request failed: {err}") from None
+        self._record(RequestTiming(method, path, resp.status, reused, connect_s, ttfb_s, time.perf_counter() - start))
+        self._after(resp)
 
-        if not raw:
+        if resp.status >= 400:
+            raise LCException(f"HTTP {resp.status}: {raw.decode('utf-8', errors='ignore') or resp.reason}")
+
+        if not expect_body or not raw:
             return {}
 
         try:
@@ -177,9 +280,163 @@ class _RemoteChatClient:
         except json.JSONDecodeError as err:
             raise LCException(f"Invalid JSON response: {err}") from None
 
-    def _build_url(self, path: str) -> str:
-        suffix = path if path.startswith("/") else f"/{path}"
-        return f"{self._base_url}{suffix}"
+    def _stream_lines(self,
+                      method: str,
+                      path: str,
+                      payload: Any | None,
+                      headers: dict[str, str] | None = None) -> Iterator[dict[str, Any]]:
+        """
+        Yield the JSON lines of a streamed response as they arrive.
+        """
+        resp, start, connect_s, reused, ttfb_s = self._send(method, path, payload, headers)
+        if resp.status >= 400:
+            raw = resp.read()
+            self._after(resp)
+            if resp.status == 405 or (resp.status == 404 and _detail(raw) == "Not Found"):
+                raise _NotFound()       # No such route (rather than no such session)
+            raise LCException(f"HTTP {resp.status}: {raw.decode('utf-8', errors='ignore') or resp.reason}")
+
+        first_chunk_s: Optional[float] = None
+        complete = False
+        try:
+            while True:
+                line = resp.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                if first_chunk_s is None:
+                    first_chunk_s = time.perf_counter() - start
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as err:
+                    raise LCException(f"Invalid JSON response: {err}") from None
+            complete = True
+        except (OSError, http.client.HTTPException) as err:
+            raise LCException(f"HTTP request failed: {err}") from None
+        finally:
+            self._record(RequestTiming(method, path, resp.status, reused, connect_s, ttfb_s,
+                                       time.perf_counter() - start, first_chunk_s))
+            if complete:
+                self._after(resp)
+            else:
+                self._disconnect()      # The rest of the response was not read
+
+    def _send(self,
+              method: str,
+              path: str,
+              payload: Any | None,
+              headers: dict[str, str] | None) -> tuple[http.client.HTTPResponse, float, float, bool, float]:
+        """
+        Send a request on the kept-alive connection and return the response (status and
+        headers read), the start time, the connect time, whether the connection was reused
+        and the time to the first byte.
+
+        A kept-alive connection the server has closed is detected before it is reused. If
+        the server closes it while the request is sent, the request is retried once on a new
+        connection: when sending failed, the server did not get the request; when only the
+        response is missing, it may have run it, so only GET requests and requests with an
+        Idempotency-Key (which the server answers once) are sent again.
+        """
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request_headers = {"Content-Type": "application/json", **(headers or {})}
+        if self._cookies:
+            request_headers["Cookie"] = "; ".join(f"{name}={value}" for name, value in self._cookies.items())
+
+        replayable = method == "GET" or "Idempotency-Key" in request_headers
+        while True:
+            start = time.perf_counter()
+            if self._connection is not None and _dropped(self._connection):
+                _logger.debug("Kept-alive connection closed by the server; reconnecting")
+                self._disconnect()
+            reused = self._connection is not None
+            connect_s = 0.0
+            sent = False
+            try:
+                connection = self._connection
+                if connection is None:
+                    connection = self._connection = self._new_connection()
+                    connection.connect()
+                    connect_s = time.perf_counter() - start
+                if connection.sock is not None:
+                    connection.sock.settimeout(self._timeout + SOCKET_MARGIN_S)
+                connection.request(method, self._prefix + path, body=body, headers=request_headers)
+                sent = True
+                resp = connection.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as err:
+                self._disconnect()
+                if reused and (not sent or replayable):
+                    _logger.debug("Kept-alive connection closed by the server; retrying on a new connection")
+                    continue
+                raise LCException(f"HTTP request failed: {err}") from None
+            except (OSError, http.client.HTTPException) as err:
+                self._disconnect()
+                raise LCException(f"HTTP request failed: {err}") from None
+            ttfb_s = time.perf_counter() - start
+            self._store_cookies(resp)
+            return resp, start, connect_s, reused, ttfb_s
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        if self._https:
+            return http.client.HTTPSConnection(self._host, self._port, timeout=CONNECT_TIMEOUT_S)
+        return http.client.HTTPConnection(self._host, self._port, timeout=CONNECT_TIMEOUT_S)
+
+    def _after(self, resp: http.client.HTTPResponse) -> None:
+        if resp.will_close:
+            self._disconnect()
+
+    def _disconnect(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _store_cookies(self, resp: http.client.HTTPResponse) -> None:
+        for header in resp.headers.get_all("Set-Cookie") or []:
+            cookie: http.cookies.SimpleCookie = http.cookies.SimpleCookie()
+            try:
+                cookie.load(header)
+            except http.cookies.CookieError:
+                continue
+            for name, morsel in cookie.items():
+                if not morsel.value or morsel["max-age"] == "0":
+                    self._cookies.pop(name, None)
+                else:
+                    self._cookies[name] = morsel.value
+
+    def _record(self, timing: RequestTiming) -> None:
+        self.timings.append(timing)
+        _logger.debug("%s %s -> %d: %s", timing.method, timing.path, timing.status, timing.describe())
+
+
+def _dropped(connection: http.client.HTTPConnection) -> bool:
+    """
+    Whether the server closed an idle kept-alive connection: it is then readable (at its end).
+    """
+    sock = connection.sock
+    if sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+class _NotFound(LCException):
+    def __init__(self) -> None:
+        super().__init__("HTTP 404: Not Found")
+
+
+def _detail(raw: bytes) -> Optional[str]:
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return None
+    return data.get("detail") if isinstance(data, dict) else None
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.1f} ms"
 
 
 class _RemoteChatCommandProcessor:
@@ -209,12 +466,16 @@ class _RemoteChatCommandProcessor:
             self._client.reset_context(self._session_id)
             _write("Chat context reset.")
 
+        def timing_cmd() -> None:
+            _write(_timing_summary(list(self._client.timings)))
+
         self._commands = {
             "exit": exit_cmd,
             "quit": exit_cmd,
             "help": help_cmd,
             "history": history_cmd,
             "reset": reset_cmd,
+            "timing": timing_cmd,
         }
 
     def execute(self, prompt: str) -> None:
@@ -238,8 +499,25 @@ def _write(msg: str) -> None:
     print()
 
 
-def _print_response(content: str) -> None:
-    print("AI > ", end="", flush=True)
-    print(content)
-    _logger.info("Response: %s", content)
+def _timing_summary(timings: list[RequestTiming]) -> str:
+    """
+    Median and worst times of the requests so far, per endpoint.
+    """
+    if not timings:
+        return "No request yet."
+    lines = [f"{'Request':<48} {'n':>4} {'reused':>6} {'TTFB p50':>10} {'first p50':>10} {'total p50':>10} {'total max':>10}"]
+    by_endpoint: dict[str, list[RequestTiming]] = {}
+    for timing in timings:
+        path = timing.path.split("/")
+        if len(path) > 3 and path[1:3] == ["chat", "sessions"]:
+            path[3] = "{id}"
+        by_endpoint.setdefault(f"{timing.method} {'/'.join(path)}", []).append(timing)
+    for endpoint, items in by_endpoint.items():
+        first = [item.first_chunk_s for item in items if item.first_chunk_s is not None]
+        lines.append(f"{endpoint:<48} {len(items):>4} {sum(item.reused for item in items):>6} "
+                     f"{_ms(statistics.median(item.ttfb_s for item in items)):>10} "
+                     f"{_ms(statistics.median(first)) if first else '-':>10} "
+                     f"{_ms(statistics.median(item.total_s for item in items)):>10} "
+                     f"{_ms(max(item.total_s for item in items)):>10}")
+    return "\n".join(lines)
 
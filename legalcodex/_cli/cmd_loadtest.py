@@ -0,0 +1,363 @@
+"""
+Load test of a running LegalCodex HTTP API server.
+
+Virtual users run scripted conversations (login, create a session, a number of turns with
+think time in between, close the session) for a fixed duration, starting gradually over the
+ramp-up period. The test runs once per user count (e.g. 1,2,4,8) and reports, for each step,
+the turn throughput, the error rate and the latency percentiles of every endpoint. The
+capacity is the best throughput of the steps that stay within the error rate and latency limits.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Final, Optional, TypeVar
+
+from .._stats import percentile
+from ..exceptions import LCException, LCValueError
+from .cli_cmd import CliCmd
+from .cmd_chat_remote import DEFAULT_BASE_URL, DEFAULT_PASSWORD, DEFAULT_TIMEOUT_S, DEFAULT_USERNAME, _RemoteChatClient
+from .engine_cmd import parse_engine_parameters
+
+_logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+DEFAULT_USERS           :Final[str]   = "1,2,4,8"
+DEFAULT_DURATION_S      :Final[float] = 30.0
+DEFAULT_RAMP_UP_S       :Final[float] = 5.0
+DEFAULT_TURNS           :Final[int]   = 5
+DEFAULT_THINK_S         :Final[float] = 1.0     # Mean of the (exponential) think time between turns
+DEFAULT_MAX_ERROR_RATE  :Final[float] = 0.01
+
+LOGIN           :Final[str] = "login"
+CREATE_SESSION  :Final[str] = "create_session"
+MESSAGE         :Final[str] = "message"
+CLOSE_SESSION   :Final[str] = "close_session"
+ENDPOINTS       :Final[tuple[str, ...]] = (LOGIN, CREATE_SESSION, MESSAGE, CLOSE_SESSION)
+
+DEFAULT_PROMPTS :Final[tuple[str, ...]] = (
+    "Can my landlord raise the rent during a fixed-term lease?",
+    "How much notice must an employer give before a layoff?",
+    "What is the limitation period for a breach of contract claim?",
+    "Is a verbal agreement to sell a car binding?",
+    "What should a formal demand letter contain?",
+    "Can a non-competition clause prevent me from working in my field?",
+)
+
+
+@dataclass(frozen=True)
+class LoadProfile:
+    users:          int
+    duration_s:     float = DEFAULT_DURATION_S
+    ramp_up_s:      float = DEFAULT_RAMP_UP_S
+    turns:          int   = DEFAULT_TURNS
+    think_s:        float = DEFAULT_THINK_S
+    prompts:        tuple[str, ...] = DEFAULT_PROMPTS
+    engine:         Optional[str] = None
+    parameters:     Optional[dict[str, str]] = None
+
+
+@dataclass
+class EndpointReport:
+    requests:   int
+    errors:     int
+    p50_s:      float
+    p90_s:      float
+    p95_s:      float
+    p99_s:      float
+    max_s:      float
+
+
+@dataclass
+class StepReport:
+    users:          int
+    duration_s:     float               # From the start of the step to the end of its last turn
+    conversations:  int                 # Conversations completed
+    turns:          int                 # Successful chat turns
+    throughput:     float               # Successful chat turns per second
+    error_rate:     float               # Failed requests / requests, all endpoints
+    endpoints:      dict[str, EndpointReport] = field(default_factory=dict)
+    errors:         dict[str, int] = field(default_factory=dict)   # Count per error message
+
+
+ClientFactory = Callable[[], _RemoteChatClient]
+
+
+class _Recorder:
+    """
+    Thread-safe collection of the request latencies and failures of a step.
+    """
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._latencies: dict[str, list[float]] = {name: [] for name in ENDPOINTS}
+        self._failures: dict[str, int] = {name: 0 for name in ENDPOINTS}
+        self._errors: dict[str, int] = {}
+        self._conversations = 0
+
+    def call(self, endpoint:str, function:Callable[[], T]) -> Optional[T]:
+        """
+        Time a request; returns None if it failed.
+        """
+        start = time.perf_counter()
+        try:
+            result = function()
+        except LCException as err:
+            elapsed = time.perf_counter() - start
+            message = str(err)[:120]
+            with self._lock:
+                self._latencies[endpoint].append(elapsed)
+                self._failures[endpoint] += 1
+                self._errors[message] = self._errors.get(message, 0) + 1
+            _logger.debug("%s failed after %.3fs: %s", endpoint, elapsed, err)
+            return None
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._latencies[endpoint].append(elapsed)
+        return result
+
+    def conversation_done(self) -> None:
+        with self._lock:
+            self._conversations += 1
+
+    def report(self, users:int, duration_s:float) -> StepReport:
+        with self._lock:
+            endpoints = {name: _endpoint_report(self._latencies[name], self._failures[name]) for name in ENDPOINTS}
+            errors = dict(sorted(self._errors.items(), key=lambda item: -item[1]))
+            conversations = self._conversations
+        requests = sum(report.requests for report in endpoints.values())
+        failures = sum(report.errors for report in endpoints.values())
+        turns = endpoints[MESSAGE].requests - endpoints[MESSAGE].errors
+        return StepReport(users=users,
+                          duration_s=duration_s,
+                          conversations=conversations,
+                          turns=turns,
+                          throughput=turns / duration_s if duration_s > 0 else 0.0,
+                          error_rate=failures / requests if requests else 0.0,
+                          endpoints=endpoints,
+                          errors=errors)
+
+
+def run_step(profile:LoadProfile,
+             client_factory:ClientFactory,
+             username:str=DEFAULT_USERNAME,
+             password:str=DEFAULT_PASSWORD,
+             stop:Optional[threading.Event]=None,
+             seed:Optional[int]=None) -> StepReport:
+    """
+    Run the virtual users of a profile for its duration and return the measurements.
+    Setting the stop event ends the step early (conversations in progress are closed), and so
+    does a KeyboardInterrupt, which sets it; the measurements of the partial step are returned.
+
+    The turns in progress at the end of the step are waited for and counted, so the
+    throughput is measured over the time until the last of them ends.
+    """
+    if profile.users < 1:
+        raise LCValueError("The number of users must be at least 1")
+    if not profile.prompts:
+        raise LCValueError("At least one prompt is needed")
+
+    stop = stop if stop is not None else threading.Event()
+    recorder = _Recorder()
+    rng = random.Random(seed)
+    start = time.monotonic()
+    end = start + profile.duration_s
+
+    threads = [threading.Thread(target=_virtual_user,
+                                args=(profile, client_factory, recorder, username, password,
+                                      start + profile.ramp_up_s * index / profile.users, end, stop,
+                                      random.Random(rng.random())),
+                                name=f"vu-{index}",
+                                daemon=True)
+               for index in range(profile.users)]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    return recorder.report(profile.users, time.monotonic() - start)
+
+
+def capacity(steps:list[StepReport],
+             max_error_rate:float=DEFAULT_MAX_ERROR_RATE,
+             max_p95_s:Optional[float]=None) -> Optional[StepReport]:
+    """
+    Return the step with the best throughput among those within the error rate
+    and message latency limits, or None if no step qualifies.
+    """
+    qualified = [step for step in steps
+                 if step.error_rate <= max_error_rate
+                 and (max_p95_s is None or step.endpoints[MESSAGE].p95_s <= max_p95_s)
+                 and step.turns > 0]
+    return max(qualified, key=lambda step: step.throughput, default=None)
+
+
+def _virtual_user(profile:LoadProfile,
+                  client_factory:ClientFactory,
+                  recorder:_Recorder,
+                  username:str,
+                  password:str,
+                  start_at:float,
+                  end_at:float,
+                  stop:threading.Event,
+                  rng:random.Random) -> None:
+
+    def running() -> bool:
+        return not stop.is_set() and time.monotonic() < end_at
+
+    def think() -> None:
+        delay = rng.expovariate(1.0 / profile.think_s) if profile.think_s > 0 else 0.0
+        stop.wait(max(min(delay, end_at - time.monotonic()), 0.0))
+
+    stop.wait(max(start_at - time.monotonic(), 0.0))
+    client = client_factory()
+
+    def login() -> bool:
+        client.login(username, password)
+        return True
+
+    def new_session() -> str:
+        return client.new_session(None, profile.engine, None, None, profile.parameters)
+
+    def conversation(session_id:str) -> None:
+        try:
+            for turn in range(profile.turns):
+                if not running():
+                    return
+                prompt = rng.choice(profile.prompts)
+                recorder.call(MESSAGE, lambda: client.send_message(session_id, prompt))
+                if turn < profile.turns - 1:
+                    think()
+            recorder.conversation_done()
+        finally:
+            recorder.call(CLOSE_SESSION, lambda: client.close_session(session_id))
+
+    logged_in = False
+    try:
+        while running():
+            if not logged_in:
+                logged_in = recorder.call(LOGIN, login) is not None
+            if logged_in:
+                session_id = recorder.call(CREATE_SESSION, new_session)
+                if session_id is not None:
+                    conversation(session_id)
+            think()
+    finally:
+        client.close()
+
+
+def _endpoint_report(latencies:list[float], failures:int) -> EndpointReport:
+    return EndpointReport(requests=len(latencies),
+                          errors=failures,
+                          p50_s=percentile(latencies, 50),
+                          p90_s=percentile(latencies, 90),
+                          p95_s=percentile(latencies, 95),
+                          p99_s=percentile(latencies, 99),
+                          max_s=max(latencies, default=0.0))
+
+
+class CommandLoadTest(CliCmd):
+    title: str = "loadtest"
+
+    def add_arguments(self, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument("--url", default=DEFAULT_BASE_URL, help="HTTP API base URL (prefix with /api/v1)")
+        parser.add_argument("--username", default=DEFAULT_USERNAME, help="Username of the virtual users")
+        parser.add_argument("--password", default=DEFAULT_PASSWORD, help="Password of the virtual users")
+        parser.add_argument("--users", "-u", default=DEFAULT_USERS,
+                            help="Comma separated numbers of concurrent users, one test step each")
+        parser.add_argument("--duration", "-d", type=float, default=DEFAULT_DURATION_S, help="Duration of each step, in seconds")
+        parser.add_argument("--ramp-up", type=float, default=DEFAULT_RAMP_UP_S, help="Time to start all the users of a step, in seconds")
+        parser.add_argument("--turns", type=int, default=DEFAULT_TURNS, help="Chat turns per conversation")
+        parser.add_argument("--think-time", type=float, default=DEFAULT_THINK_S, help="Mean think time between turns, in seconds")
+        parser.add_argument("--prompts", default=None, help="File of prompts, one per line (built-in legal questions by default)")
+        parser.add_argument("--engine", default=None, help="Engine of the sessions (e.g. mock, to measure the server alone)")
+        parser.add_argument("--param", action="append", default=[], metavar="KEY=VALUE", help="Engine parameter of the sessions (repeatable)")
+        parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_S, help="Time budget of a chat turn, in seconds")
+        parser.add_argument("--max-error-rate", type=float, default=DEFAULT_MAX_ERROR_RATE, help="Error rate limit of the capacity")
+        parser.add_argument("--max-p95", type=float, default=None, help="p95 chat turn latency limit of the capacity, in seconds")
+        parser.add_argument("--output", "-o", default=None, help="Write the JSON report to this file")
+
+    def run(self, args: argparse.Namespace) -> None:
+        try:
+            user_counts = [int(value) for value in args.users.split(",") if value.strip()]
+        except ValueError:
+            raise LCValueError(f"Invalid user counts '{args.users}'") from None
+
+        prompts = _read_prompts(args.prompts) if args.prompts else DEFAULT_PROMPTS
+        parameters = parse_engine_parameters(args.param)
+
+        def client_factory() -> _RemoteChatClient:
+            return _RemoteChatClient(args.url, args.timeout)
+
+        stop = threading.Event()
+        steps: list[StepReport] = []
+        try:
+            for users in user_counts:
+                profile = LoadProfile(users=users,
+                                      duration_s=args.duration,
+                                      ramp_up_s=args.ramp_up,
+                                      turns=args.turns,
+                                      think_s=args.think_time,
+                                      prompts=prompts,
+                                      engine=args.engine,
+                                      parameters=parameters)
+                print(f"Running {users} users for {args.duration:g}s...")
+                step = run_step(profile, client_factory, args.username, args.password, stop)
+                steps.append(step)
+                _print_step(step)
+                if stop.is_set():
+                    print("Interrupted")
+                    break
+        except KeyboardInterrupt:
+            stop.set()
+            print("Interrupted")
+
+        best = capacity(steps, args.max_error_rate, args.max_p95)
+        if best is None:
+            print("Capacity: no step met the error rate and latency limits")
+        else:
+            print(f"Capacity: {best.throughput:.2f} turns/s with {best.users} users "
+                  f"(p95 turn latency {best.endpoints[MESSAGE].p95_s:.3f}s, error rate {best.error_rate:.2%})")
+
+        if args.output:
+            report: dict[str, Any] = {"url": args.url,
+                                      "capacity_users": best.users if best else None,
+                                      "capacity_throughput": best.throughput if best else None,
+                                      "steps": [asdict(step) for step in steps]}
+            with open(args.output, "w", encoding="utf-8") as file:
+                json.dump(report, file, indent=2)
+            print(f"Report written to {args.output}")
+
+
+def _read_prompts(filename:str) -> tuple[str, ...]:
+    try:
+        with open(filename, "r", encoding="utf-8") as file:
+            prompts = tuple(line.strip() for line in file if line.strip())
+    except OSError as err:
+        raise LCException(f"Cannot read the prompts {filename}: {err}") from None
+    if not prompts:
+        raise LCValueError(f"No prompt in {filename}")
+    return prompts
+
+
+def _print_step(step:StepReport) -> None:
+    print(f"  {step.users} users: {step.turns} turns, {step.throughput:.2f} turns/s, "
+          f"{step.conversations} conversations, error rate {step.error_rate:.2%}")
+    print(f"  {'endpoint':<16}{'requests':>9}{'errors':>8}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for name, report in step.endpoints.items():
+        print(f"  {name:<16}{report.requests:>9}{report.errors:>8}{report.p50_s:>9.3f}{report.p90_s:>9.3f}"
+              f"{report.p95_s:>9.3f}{report.p99_s:>9.3f}{report.max_s:>9.3f}")
+    for message, count in list(step.errors.items())[:5]:
+        print(f"  {count} x {message}")
+    print()
@@ -0,0 +1,99 @@
+"""
+Ask a list of independent questions to a running LegalCodex HTTP API server, concurrently.
+
+The input holds one question per line, or JSON objects with a "question" and an optional
+"id" and "session_id" (to ask the question in an existing session). Each question is asked
+in its own new session otherwise. Results are written as JSON lines as the server answers
+them, in completion order; each holds the "index" of its question in the input.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import time
+from typing import Any, Union
+
+from .cli_cmd import CliCmd
+from .cmd_batch import _open
+from .cmd_chat_remote import DEFAULT_BASE_URL, DEFAULT_PASSWORD, DEFAULT_TIMEOUT_S, DEFAULT_USERNAME, _RemoteChatClient
+from .engine_cmd import parse_engine_parameters
+from ..exceptions import LCException, LCValueError
+
+_logger = logging.getLogger(__name__)
+
+
+class CommandQuestions(CliCmd):
+    title: str = "questions"
+
+    def add_arguments(self, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument("input", help='File of questions, one per line or JSON lines ("-" for stdin)')
+        parser.add_argument("--output", "-o", default="-", help='JSONL file of results ("-" for stdout)')
+        parser.add_argument("--url", default=DEFAULT_BASE_URL, help="HTTP API base URL (prefix with /api/v1)")
+        parser.add_argument("--username", default=DEFAULT_USERNAME, help="Username for API login")
+        parser.add_argument("--password", default=DEFAULT_PASSWORD, help="Password for API login")
+        parser.add_argument("--concurrency", "-c", type=int, default=None,
+                            help="Questions asked at once (server default 4, bounded by its per-user turn limit)")
+        parser.add_argument("--engine", default=None, help="Engine of the new sessions")
+        parser.add_argument("--model", default=None, help="Model of the new sessions")
+        parser.add_argument("--summarizer", default=None, help="Summarizer of the new sessions")
+        parser.add_argument("--param", action="append", default=[], metavar="KEY=VALUE", help="Engine parameter of the new sessions (repeatable)")
+        parser.add_argument("--keep-sessions", action="store_true", help="Keep the sessions of the questions open for follow-ups")
+        parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_S, help="Time budget of each question, in seconds")
+
+    def run(self, args: argparse.Namespace) -> None:
+        questions = read_questions(args.input)
+        payload: dict[str, Any] = {"questions": questions,
+                                   "engine": args.engine,
+                                   "model": args.model,
+                                   "summarizer": args.summarizer,
+                                   "parameters": parse_engine_parameters(args.param) or None,
+                                   "concurrency": args.concurrency,
+                                   "keep_sessions": args.keep_sessions}
+        payload = {key: value for key, value in payload.items() if value is not None}
+
+        client = _RemoteChatClient(args.url, args.timeout)
+        client.login(args.username, args.password)
+
+        start = time.perf_counter()
+        failures = 0
+        done = 0
+        with _open(args.output, "w") as output:
+            for result in client.ask_questions(payload):
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                output.flush()
+                done += 1
+                if result.get("error") is not None:
+                    failures += 1
+                print(f"\r[{done}/{len(questions)}]", end="", file=sys.stderr, flush=True)
+        elapsed = time.perf_counter() - start
+        print(file=sys.stderr)
+
+        _logger.info("Questions complete: %d asked, %d failed, %.1fs", done, failures, elapsed)
+        print(f"{done} questions in {elapsed:.1f}s ({done / elapsed if elapsed else 0.0:.2f}/s), {failures} failed",
+              file=sys.stderr)
+        if done < len(questions):
+            raise LCException(f"The server answered {done} of {len(questions)} questions")
+
+
+def read_questions(path: str) -> list[Union[str, dict[str, Any]]]:
+    questions: list[Union[str, dict[str, Any]]] = []
+    with _open(path, "r") as file:
+        for line_number, line in enumerate(file, start=1):
+            text = line.strip()
+            if not text:
+                continue
+            if not text.startswith("{"):
+                questions.append(text)
+                continue
+            try:
+                item = json.loads(text)
+            except json.JSONDecodeError as err:
+                raise LCValueError(f"Invalid question on line {line_number}: {err}") from None
+            if not isinstance(item, dict) or not isinstance(item.get("question"), str):
+                raise LCValueError(f"Invalid question on line {line_number}: expected a 'question'")
+            questions.append(item)
+    if not questions:
+        raise LCValueError(f"No question in {path}")
+    return questions
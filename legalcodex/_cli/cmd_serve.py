@@ -4,8 +4,6 @@ import argparse
 import logging
 from typing import Final
 
-import uvicorn
-
 from ..exceptions import LCException
 from .cli_cmd import CliCmd
 
@@ -46,9 +44,12 @@ class CommandServe(CliCmd):
 
     def run(self, args: argparse.Namespace) -> None:
         try:
+            import uvicorn
+
             _logger.info("Starting HTTP server on %s:%s", args.host, args.port)
             uvicorn.run(
-                "legalcodex.http_server.app:app",
+                "legalcodex.http_server.app:create_app",
+                factory=True,
                 host=args.host,
                 port=args.port,
                 reload=args.reload,
@@ -0,0 +1,49 @@
+"""
+Run a local OpenAI compatible stand-in server, for offline benchmarks of OpenAIEngine.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+from typing import Final
+
+from ..exceptions import LCException
+from ..ai.engines.mock_engine import MockEngine
+from ..ai.engines.openai_standin import OpenAIStandin
+from .cli_cmd import CliCmd
+from .engine_cmd import parse_engine_parameters
+
+_logger = logging.getLogger(__name__)
+
+HOST:Final[str] = "127.0.0.1"
+PORT:Final[int] = 8090
+
+
+class CommandStandin(CliCmd):
+    title: str = "openai-standin"
+
+    def add_arguments(self, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument("--host", type=str, default=HOST, help="Host interface to bind the server")
+        parser.add_argument("--port", type=int, default=PORT, help="Port to bind the server")
+        parser.add_argument("--profile", type=str, default="realistic", help="Simulation profile (fast, realistic, slow, flaky)")
+        parser.add_argument("--param", "-p", action="append", default=[], metavar="KEY=VALUE",
+                            help="Simulation parameter, as for the mock engine (e.g. ttft_ms=300, rate_limit_rate=0.1)")
+
+    def run(self, args: argparse.Namespace) -> None:
+        parameters = {"profile": args.profile, **(parse_engine_parameters(args.param) or {})}
+        simulator = MockEngine(parameters=parameters).simulator
+        assert simulator is not None
+
+        try:
+            standin = OpenAIStandin(simulator, args.host, args.port)
+        except OSError as err:
+            raise LCException(f"Failed to start the stand-in server: {err}") from None
+
+        print(f"OpenAI stand-in listening on {standin.base_url}")
+        print(f"Use it with: LC_OPENAI_BASE_URL={standin.base_url}")
+        try:
+            standin.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            _logger.info("Stand-in statistics: %s", standin.stats())
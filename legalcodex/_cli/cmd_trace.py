@@ -0,0 +1,109 @@
+"""
+Render the traces exported by the HTTP server (see legalcodex/_tracing.py).
+
+With a request id (or a prefix of one), print the waterfall of its spans; without one,
+list the slowest traces of the file.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+from datetime import datetime, timezone
+from typing import Any, Final
+
+from .._tracing import default_trace_file, read_spans
+from ..exceptions import LCException
+from .cli_cmd import CliCmd
+
+_logger = logging.getLogger(__name__)
+
+BAR_WIDTH   :Final[int] = 40
+NAME_WIDTH  :Final[int] = 56
+DEFAULT_TOP :Final[int] = 20
+
+
+class CommandTrace(CliCmd):
+    title: str = "trace"
+
+    def add_arguments(self, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument("request_id", nargs="?", default=None,
+                            help="Request id (X-Request-ID) or a prefix of it; lists the slowest traces when omitted")
+        parser.add_argument("--file", "-f", default=None, help="JSONL trace file (LC_TRACE_FILE or lc_traces.jsonl by default)")
+        parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="Number of traces listed")
+
+    def run(self, args: argparse.Namespace) -> None:
+        path = args.file or default_trace_file()
+        try:
+            spans = read_spans(path)
+        except OSError as err:
+            raise LCException(f"Cannot read the traces {path}: {err}") from None
+
+        traces: dict[str, list[dict[str, Any]]] = {}
+        for span in spans:
+            traces.setdefault(span["trace_id"], []).append(span)
+
+        if args.request_id is None:
+            _print_slowest(traces, args.top)
+            return
+
+        matches = [trace_id for trace_id in traces if trace_id.startswith(args.request_id)]
+        if not matches:
+            raise LCException(f"No trace for request {args.request_id} in {path}")
+        if len(matches) > 1:
+            raise LCException(f"Request id {args.request_id} is ambiguous: {', '.join(matches[:5])}")
+        for line in render_waterfall(traces[matches[0]]):
+            print(line)
+
+
+def render_waterfall(spans: list[dict[str, Any]]) -> list[str]:
+    """
+    Render the spans of a trace as an indented tree with a time bar per span.
+    """
+    ids = {span["span_id"] for span in spans}
+    children: dict[str | None, list[dict[str, Any]]] = {}
+    for span in spans:
+        parent = span["parent_id"] if span["parent_id"] in ids else None
+        children.setdefault(parent, []).append(span)
+    for siblings in children.values():
+        siblings.sort(key=lambda span: span["start_unix_ns"])
+
+    start = min(span["start_unix_ns"] for span in spans)
+    end = max(span["start_unix_ns"] + span["duration_ns"] for span in spans)
+    total = max(end - start, 1)
+
+    lines = [f"Trace {spans[0]['trace_id']}  {_time(start)}  {total / 1e6:.1f} ms",
+             f"{'span':<{NAME_WIDTH}} {'start':>9} {'duration':>10}  timeline"]
+
+    def walk(span: dict[str, Any], depth: int) -> None:
+        offset = span["start_unix_ns"] - start
+        first = int(offset / total * BAR_WIDTH)
+        width = max(int(span["duration_ns"] / total * BAR_WIDTH), 1)
+        bar = " " * first + "#" * min(width, BAR_WIDTH - first)
+        marker = " !" if span.get("status") == "error" else ""
+        name = ("  " * depth + span["name"])[:NAME_WIDTH]
+        lines.append(f"{name:<{NAME_WIDTH}} {offset / 1e6:>7.1f}ms {span['duration_ns'] / 1e6:>8.1f}ms  |{bar:<{BAR_WIDTH}}|{marker}")
+        details = span.get("attributes", {})
+        if details:
+            lines.append(f"{'':<{2 * depth + 2}}{', '.join(f'{key}={value}' for key, value in details.items())}")
+        for child in children.get(span["span_id"], []):
+            walk(child, depth + 1)
+
+    for root in children.get(None, []):
+        walk(root, 0)
+    return lines
+
+
+def _print_slowest(traces: dict[str, list[dict[str, Any]]], top: int) -> None:
+    roots = []
+    for trace_id, spans in traces.items():
+        root = min(spans, key=lambda span: (span["parent_id"] is not None, span["start_unix_ns"]))
+        roots.append((root["duration_ns"], trace_id, root))
+    roots.sort(reverse=True)
+
+    print(f"{len(traces)} traces; slowest first:")
+    for duration_ns, trace_id, root in roots[:top]:
+        print(f"{trace_id}  {_time(root['start_unix_ns'])}  {duration_ns / 1e6:>9.1f} ms  {root['name']}")
+
+
+def _time(unix_ns: int) -> str:
+    return datetime.fromtimestamp(unix_ns / 1e9, timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3] + "Z"
@@ -11,7 +11,7 @@ from .._environ import LC_API_KEY
 
 from ..ai.engine import Engine
 from ..ai.engines._models import DEFAULT_MODEL
-from ..ai._engine_selector import ENGINES, DEFAULT_ENGINE
+from ..ai._engine_selector import ENGINES, DEFAULT_ENGINE, get_engine
 from ..ai.stream import Stream
 
 from .cli_cmd import CliCmd
@@ -28,7 +28,9 @@ class EngineCommand(CliCmd):
         Run the command logic using the engine.
         """
         assert self._engine is None, "Engine already initialized"
-        self._engine  :Engine = ENGINES[args.engine](args.model)
+        self._engine  :Engine = get_engine(args.engine,
+                                           args.model or DEFAULT_MODEL,
+                                           parse_engine_parameters(args.param))
         _logger.info("Initialized engine: %s", self.engine.name)
 
 
@@ -40,6 +42,7 @@ class EngineCommand(CliCmd):
         """
         parser.add_argument('--engine',    '-e',action="store", type=str, default=DEFAULT_ENGINE, choices=ENGINES.keys(), help='Specify the engine to use')
         parser.add_argument('--model',    '-m',action="store", type=str, default=None,  help=f'Specify the model to use; default: {DEFAULT_MODEL}')
+        parser.add_argument('--param',    '-p',action="append", type=str, default=[], metavar="KEY=VALUE", help='Engine parameter (repeatable)')
 
     @property
     def engine(self)->Engine:
@@ -69,3 +72,19 @@ class EngineCommand(CliCmd):
             os.environ[LC_API_KEY] = key
         except Exception as e:
             raise LCException(f"Error loading OpenAI key: {e}") from None
+
+
+def parse_engine_parameters(values:Optional[list[str]])->Optional[dict[str, str]]:
+    """
+    Parse repeated KEY=VALUE command line arguments into engine parameters.
+    """
+    if not values:
+        return None
+
+    parameters: dict[str, str] = {}
+    for value in values:
+        key, sep, item = value.partition("=")
+        if not sep or not key.strip():
+            raise LCException(f"Invalid engine parameter '{value}'; expected KEY=VALUE")
+        parameters[key.strip()] = item.strip()
+    return parameters
@@ -0,0 +1,57 @@
+"""
+Time budget of a request, passed down from the HTTP route to the engines.
+"""
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+from .exceptions import DeadlineExceeded, LCValueError
+
+
+class Deadline:
+    """
+    Point in time by which a request must be completed.
+
+    Each stage checks the remaining budget and gives up (or degrades) when it runs out,
+    so a request finishes or fails within its budget instead of holding resources.
+    """
+    def __init__(self, seconds:float) -> None:
+        if seconds <= 0:
+            raise LCValueError("The request timeout must be positive")
+        self._budget = seconds
+        self._expires_at = time.monotonic() + seconds
+
+    @property
+    def budget(self) -> float:
+        """
+        Total budget, in seconds.
+        """
+        return self._budget
+
+    def remaining(self) -> float:
+        """
+        Remaining time, in seconds (0.0 once expired).
+        """
+        return max(self._expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self._expires_at
+
+    def check(self, stage:str) -> None:
+        """
+        Raise DeadlineExceeded if the deadline has passed.
+        """
+        if self.expired:
+            raise DeadlineExceeded(stage)
+
+    def timeout(self, default:Optional[float]=None) -> float:
+        """
+        Return the remaining time, bounded by default if given; used as a blocking call timeout.
+        """
+        remaining = self.remaining()
+        return remaining if default is None else min(remaining, default)
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f}s, budget={self._budget:.3f}s)"
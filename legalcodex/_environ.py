@@ -9,8 +9,35 @@ from typing import Final
 # API key
 LC_API_KEY :Final[str] = "LC_API_KEY"
 
+# Base URL of the OpenAI compatible API (e.g. a local stand-in server); the OpenAI API by default
+LC_OPENAI_BASE_URL :Final[str] = "LC_OPENAI_BASE_URL"
+
 LC_ROOT_PATH :Final[str] = "LC_ROOT_PATH"
 LC_FRONTEND_PATH :Final[str] = "LC_FRONTEND_PATH"
 
 # JWT secret key for token signing (development fallback in auth_service.py)
-LC_JWT_SECRET :Final[str] = "LC_JWT_SECRET"
\ No newline at end of file
+LC_JWT_SECRET :Final[str] = "LC_JWT_SECRET"
+# Time budget of a chat turn served over HTTP, in seconds (clients may ask for less with X-Request-Timeout)
+LC_REQUEST_TIMEOUT :Final[str] = "LC_REQUEST_TIMEOUT"
+
+# Tracing: fraction of the requests traced (0 to 1), requests always traced when slower than this (ms), and the JSONL span file
+LC_TRACE_SAMPLE_RATE :Final[str] = "LC_TRACE_SAMPLE_RATE"
+LC_TRACE_SLOW_MS :Final[str] = "LC_TRACE_SLOW_MS"
+LC_TRACE_FILE :Final[str] = "LC_TRACE_FILE"
+
+# Server warm-up: engines to prepare ("name" or "name:model", comma separated; empty for none),
+# number of recent sessions to preload, and the time after which the server reports ready anyway (s)
+LC_WARMUP_ENGINES :Final[str] = "LC_WARMUP_ENGINES"
+LC_WARMUP_SESSIONS :Final[str] = "LC_WARMUP_SESSIONS"
+LC_WARMUP_TIMEOUT :Final[str] = "LC_WARMUP_TIMEOUT"
+
+# Admission of the chat turns: turns running at once (all users, per user), turns waiting (per user, all users),
+# and the longest wait for admission (s)
+LC_MAX_CONCURRENT_TURNS :Final[str] = "LC_MAX_CONCURRENT_TURNS"
+LC_MAX_USER_TURNS :Final[str] = "LC_MAX_USER_TURNS"
+LC_MAX_USER_QUEUE :Final[str] = "LC_MAX_USER_QUEUE"
+LC_MAX_QUEUED_TURNS :Final[str] = "LC_MAX_QUEUED_TURNS"
+LC_ADMISSION_WAIT :Final[str] = "LC_ADMISSION_WAIT"
+
+# Time an Idempotency-Key of a chat turn is remembered (s)
+LC_IDEMPOTENCY_TTL :Final[str] = "LC_IDEMPOTENCY_TTL"
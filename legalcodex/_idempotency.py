@@ -0,0 +1,148 @@
+"""
+Idempotent execution of requests keyed by a client supplied key (e.g. the Idempotency-Key header).
+
+The first request with a key runs; a repeat within the retention window gets the stored result,
+or waits for the first one when it is still running, instead of running again. A request that
+fails is not remembered, so that it can be retried.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Final, Optional, TypeVar
+
+from ._environ import LC_IDEMPOTENCY_TTL
+from ._metrics import counter
+from ._singleton import Singleton
+from .exceptions import IdempotencyKeyReused, RequestInProgress
+
+_logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+IDEMPOTENCY_TTL_S   :Final[float] = 600.0
+MAX_KEYS            :Final[int]   = 10_000
+
+IDEMPOTENT_REQUESTS = counter("lc_idempotent_requests_total",
+                              "Requests with an idempotency key, by outcome (executed, replayed, attached, conflict)",
+                              ("outcome",))
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "done", "result", "error", "expires_at")
+
+    def __init__(self, fingerprint:str) -> None:
+        self.fingerprint = fingerprint
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.expires_at = float("inf")      # Kept while running
+
+
+class IdempotencyStore(Singleton):
+    """
+    Thread-safe store of the results of the requests by key, for the retention window.
+    """
+    def __init__(self) -> None:
+        self.ttl_s = _env_ttl()
+        self.max_keys = MAX_KEYS
+        self._entries: OrderedDict[tuple[str, ...], _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def run(self,
+            key:tuple[str, ...],
+            fingerprint:str,
+            execute:Callable[[], T],
+            wait_s:float) -> tuple[T, bool]:
+        """
+        Return the result of the request with this key and whether it was replayed.
+        The key identifies the request (scope and client key); the fingerprint identifies its
+        content, which must be the same for all the requests with the key.
+
+        Raises:
+            IdempotencyKeyReused: the key was used for a request with another fingerprint.
+            RequestInProgress: the first request is still running after `wait_s`.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._entries.get(key)
+            first = entry is None
+            finished = entry is not None and entry.done.is_set()
+            if entry is None:
+                entry = self._entries[key] = _Entry(fingerprint)
+            elif entry.fingerprint != fingerprint:
+                IDEMPOTENT_REQUESTS.inc(outcome="conflict")
+                raise IdempotencyKeyReused(key[-1])
+
+        if first:
+            return self._execute(key, entry, execute), False
+
+        if not entry.done.wait(wait_s):
+            IDEMPOTENT_REQUESTS.inc(outcome="conflict")
+            raise RequestInProgress(key[-1])
+        if entry.error is not None:
+            raise entry.error
+        IDEMPOTENT_REQUESTS.inc(outcome="replayed" if finished else "attached")
+        return entry.result, True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _execute(self, key:tuple[str, ...], entry:_Entry, execute:Callable[[], T]) -> T:
+        try:
+            result = execute()
+        except BaseException as err:
+            entry.error = err
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]         # A failed request may be retried
+            entry.done.set()
+            raise
+        entry.result = result
+        with self._lock:
+            entry.expires_at = time.monotonic() + self.ttl_s
+            self._entries.move_to_end(key)
+        entry.done.set()
+        IDEMPOTENT_REQUESTS.inc(outcome="executed")
+        return result
+
+    def _evict(self, now:float) -> None:
+        """
+        Drop the expired entries, and the oldest finished ones over the size limit (lock held).
+        The finished entries are in completion order, so the expired ones come first; the
+        running ones, kept, may be anywhere before them.
+        """
+        evicted: list[tuple[str, ...]] = []
+        for key, entry in self._entries.items():
+            if not entry.done.is_set():
+                continue    # Still running: kept
+            if entry.expires_at > now and len(self._entries) - len(evicted) < self.max_keys:
+                break
+            evicted.append(key)
+        for key in evicted:
+            del self._entries[key]
+
+
+def fingerprint(*parts:str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _env_ttl() -> float:
+    raw = os.environ.get(LC_IDEMPOTENCY_TTL, None)
+    if raw is None:
+        return IDEMPOTENCY_TTL_S
+    try:
+        return float(raw)
+    except ValueError:
+        _logger.warning("Invalid %s=%r; using %g", LC_IDEMPOTENCY_TTL, raw, IDEMPOTENCY_TTL_S)
+        return IDEMPOTENCY_TTL_S
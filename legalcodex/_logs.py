@@ -1,9 +1,13 @@
+import atexit
 import logging
+import queue
+import threading
+import time
 from contextlib import contextmanager
-from typing import Generator, Final
+from typing import Callable, Generator, Final, Optional
 import logging.handlers
 
-from ._cli._log_window import log_window
+from ._metrics import counter
 
 MEGABYTES :Final[int] = 1024 * 1024
 FILE_NAME :Final[str] = "lc_server.log"
@@ -11,6 +15,18 @@ FILE_NAME :Final[str] = "lc_server.log"
 MAX_SIZE :Final[int] = 1 * MEGABYTES
 BACKUP_COUNT :Final[int] = 5
 
+QUEUE_SIZE :Final[int] = 10_000         # Records buffered for the writer thread
+
+# Noisy debug loggers of the request path, and their rate limit (records per second per logger)
+RATE_LIMITED_LOGGERS :Final[tuple[str, ...]] = ("legalcodex.ai.chat.chat_context",
+                                                "legalcodex.ai.chat.chat_session_manager")
+RATE_LIMIT :Final[float] = 20.0
+RATE_LIMIT_BURST :Final[int] = 50
+
+LOG_RECORDS_DROPPED = counter("lc_log_records_dropped_total",
+                              "Log records dropped, because the queue was full or by rate limiting",
+                              ("reason",))
+
 
 @contextmanager
 def init_log(verbose:bool, enable_log_window: bool)->Generator[None, None, None]:
@@ -30,6 +46,7 @@ def init_log(verbose:bool, enable_log_window: bool)->Generator[None, None, None]
     root_logger.setLevel(logging.DEBUG)
 
     if enable_log_window:
+        from ._cli._log_window import log_window    # Deferred: imports tkinter
         with log_window():
             yield
             input("Press Enter to exit...")
@@ -72,3 +89,106 @@ def get_log_file_handler(verbose: bool)->logging.Handler:
     handler.setLevel(level)
     handler.setFormatter(logging.Formatter(format))
     return handler
+
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per logger: let through at most `rate` records per second (after a burst)
+    of each of the given loggers (and their children), for records up to `max_level`.
+    """
+    def __init__(self,
+                 loggers:tuple[str, ...]=RATE_LIMITED_LOGGERS,
+                 rate:float=RATE_LIMIT,
+                 burst:int=RATE_LIMIT_BURST,
+                 max_level:int=logging.DEBUG) -> None:
+        super().__init__()
+        self.loggers = loggers
+        self.rate = rate
+        self.burst = float(burst)
+        self.max_level = max_level
+        self.suppressed = 0
+        self._buckets: dict[str, tuple[float, float]] = {}     # logger -> (tokens, last update)
+        self._lock = threading.Lock()
+
+    def filter(self, record:logging.LogRecord) -> bool:
+        if record.levelno > self.max_level or not self._is_limited(record.name):
+            return True
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(record.name, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            allowed = tokens >= 1.0
+            self._buckets[record.name] = (tokens - 1.0 if allowed else tokens, now)
+            if not allowed:
+                self.suppressed += 1
+        if not allowed:
+            LOG_RECORDS_DROPPED.inc(reason="rate_limited")
+        return allowed
+
+    def _is_limited(self, name:str) -> bool:
+        return any(name == logger or name.startswith(logger + ".") for logger in self.loggers)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that never blocks the logging thread: when the queue is full, the record
+    is dropped and counted.
+    """
+    def __init__(self, log_queue:"queue.Queue[logging.LogRecord]") -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record:logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS_DROPPED.inc(reason="queue_full")
+
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)     # type: ignore[attr-defined]  # Wait for room in a full queue
+
+
+_queue_handler : Optional[DroppingQueueHandler] = None
+_listener : Optional[_Listener] = None
+_queue_lock = threading.Lock()
+
+
+def start_log_queue(handlers:Callable[[], list[logging.Handler]], queue_size:int=QUEUE_SIZE) -> DroppingQueueHandler:
+    """
+    Attach the handlers to the root logger behind a bounded queue, written by a background
+    thread, so that logging does not wait on the file or the console. Noisy debug loggers are
+    rate limited. Only the first call builds the handlers and installs the pipeline; the later
+    ones return it.
+    """
+    global _queue_handler, _listener
+    with _queue_lock:
+        if _queue_handler is not None:
+            return _queue_handler
+
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=queue_size)
+        _queue_handler = DroppingQueueHandler(log_queue)
+        _queue_handler.addFilter(RateLimitFilter())
+        _listener = _Listener(log_queue, *handlers(), respect_handler_level=True)
+        _listener.start()
+        logging.getLogger().addHandler(_queue_handler)
+        atexit.register(stop_log_queue)
+        return _queue_handler
+
+
+def stop_log_queue() -> None:
+    """
+    Detach the queue from the root logger and write the records left in it.
+    """
+    global _queue_handler, _listener
+    with _queue_lock:
+        if _queue_handler is None or _listener is None:
+            return
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _queue_handler, _listener = None, None
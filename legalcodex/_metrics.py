@@ -0,0 +1,255 @@
+"""
+In-process metrics: counters and histograms, exported in the Prometheus text format.
+
+Metrics are created (or looked up) by name with counter() and histogram(), usually at module
+level, and updated from the hot paths. Durations are measured with perf_counter_ns.
+"""
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Final, Iterator, Optional, Protocol, Union
+
+from ._singleton import Singleton
+from .exceptions import LCValueError
+
+
+CONTENT_TYPE :Final[str] = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request latencies, from a cache lookup to a long chat turn
+LATENCY_BUCKETS :Final[tuple[float, ...]] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                                             1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 60.0)
+# Lock waits, usually well under a millisecond
+WAIT_BUCKETS :Final[tuple[float, ...]] = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+# Generation throughput, in tokens per second
+RATE_BUCKETS :Final[tuple[float, ...]] = (5.0, 10.0, 20.0, 30.0, 45.0, 60.0, 80.0, 100.0, 150.0, 200.0, 400.0)
+
+LabelValues = tuple[str, ...]
+
+
+class _Lock(Protocol):
+    def acquire(self, blocking: bool = ..., timeout: float = ...) -> bool: ...
+    def release(self) -> None: ...
+
+
+class _Metric(ABC):
+    TYPE : str = ""
+
+    def __init__(self, name:str, help:str, labels:tuple[str, ...]) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    def _key(self, labels:dict[str, str]) -> LabelValues:
+        if len(labels) != len(self.labels):
+            raise LCValueError(f"Metric {self.name} expects the labels {', '.join(self.labels)}")
+        try:
+            return tuple(str(labels[name]) for name in self.labels)
+        except KeyError as err:
+            raise LCValueError(f"Metric {self.name} has no label {err}") from None
+
+    def _label_text(self, key:LabelValues, extra:str="") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labels, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.TYPE}"]
+        lines.extend(self._samples())
+        return lines
+
+    @abstractmethod
+    def _samples(self) -> list[str]:
+        """
+        Return the sample lines of the metric, in the Prometheus text format.
+        """
+        pass
+
+
+class Counter(_Metric):
+    """
+    Monotonic counter; by convention, the name ends with _total.
+    """
+    TYPE = "counter"
+
+    def __init__(self, name:str, help:str, labels:tuple[str, ...]=()) -> None:
+        super().__init__(name, help, labels)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount:float=1.0, /, **labels:str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels:str) -> float:
+        key = self._key(labels)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{self._label_text(key)} {_number(value)}" for key, value in values]
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, buckets:int) -> None:
+        self.counts = [0] * (buckets + 1)      # Last one is +Inf
+        self.total = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """
+    Histogram with fixed upper bounds; the rendered bucket counts are cumulative.
+    """
+    TYPE = "histogram"
+
+    def __init__(self, name:str, help:str, labels:tuple[str, ...]=(), buckets:tuple[float, ...]=LATENCY_BUCKETS) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[LabelValues, _HistogramSeries] = {}
+
+    def observe(self, value:float, /, **labels:str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets))
+            series.counts[index] += 1
+            series.total += value
+            series.count += 1
+
+    @contextmanager
+    def time(self, **labels:str) -> Iterator[None]:
+        """
+        Observe the duration of the block, in seconds (also when it raises).
+        """
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.observe((time.perf_counter_ns() - start) / 1e9, **labels)
+
+    def count(self, **labels:str) -> int:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            return series.count if series is not None else 0
+
+    def sum(self, **labels:str) -> float:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            return series.total if series is not None else 0.0
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            snapshot = sorted((key, list(series.counts), series.total, series.count)
+                              for key, series in self._series.items())
+        lines: list[str] = []
+        for key, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, math.inf), counts):
+                cumulative += bucket_count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{self._label_text(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_text(key)} {_number(total)}")
+            lines.append(f"{self.name}_count{self._label_text(key)} {count}")
+        return lines
+
+
+Metric = Union[Counter, Histogram]
+
+
+class MetricsRegistry(Singleton):
+    """
+    Process-wide registry of the metrics, by name.
+    """
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name:str, help:str, labels:tuple[str, ...]=()) -> Counter:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Counter(name, help, labels)
+        if not isinstance(metric, Counter) or metric.labels != labels:
+            raise LCValueError(f"Metric {name} is already registered with another type or labels")
+        return metric
+
+    def histogram(self, name:str, help:str, labels:tuple[str, ...]=(), buckets:tuple[float, ...]=LATENCY_BUCKETS) -> Histogram:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Histogram(name, help, labels, buckets)
+        if not isinstance(metric, Histogram) or metric.labels != labels:
+            raise LCValueError(f"Metric {name} is already registered with another type or labels")
+        return metric
+
+    def get(self, name:str) -> Optional[Metric]:
+        with self._lock:
+            return self._metrics.get(name)
+
+    def render(self) -> str:
+        """
+        Return all the metrics in the Prometheus text exposition format.
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def counter(name:str, help:str, labels:tuple[str, ...]=()) -> Counter:
+    return MetricsRegistry().counter(name, help, labels)
+
+
+def histogram(name:str, help:str, labels:tuple[str, ...]=(), buckets:tuple[float, ...]=LATENCY_BUCKETS) -> Histogram:
+    return MetricsRegistry().histogram(name, help, labels, buckets)
+
+
+LOCK_WAIT :Final[Histogram] = histogram("lc_lock_wait_seconds", "Time spent waiting to acquire a shared lock", ("lock",), WAIT_BUCKETS)
+CACHE_REQUESTS :Final[Counter] = counter("lc_cache_requests_total", "Cache lookups by result (hit or miss)", ("cache", "result"))
+
+
+@contextmanager
+def timed_lock(lock:_Lock, name:str) -> Iterator[None]:
+    """
+    Acquire a lock, recording the wait in lc_lock_wait_seconds, and release it at the end of the block.
+    """
+    start = time.perf_counter_ns()
+    lock.acquire()
+    LOCK_WAIT.observe((time.perf_counter_ns() - start) / 1e9, lock=name)
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+def cache_lookup(cache:str, hit:bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def _escape(value:str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value:float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
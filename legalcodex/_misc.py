@@ -16,12 +16,12 @@ from ._environ import LC_ROOT_PATH
 @contextmanager
 def log_timer(name: str)->Generator[None, None, None]:
 
-    start = time.time()
-    yield
-    end = time.time()
-
-    logger = logging.getLogger("timer")
-    logger.debug(f"{name} took {end - start:.2f} seconds")
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter_ns() - start) / 1e9
+        logging.getLogger("timer").debug("%s took %.3f seconds", name, elapsed)
 
 
 
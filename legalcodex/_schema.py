@@ -36,7 +36,9 @@ class ChatContextSchema(BaseModel):
     max_messages  : int = Field(..., description="The maximum number of messages to keep in the history before trimming.")
     trim_length   : int = Field(..., description="The number of messages to remove when trimming the history.")
     summary       : str = Field(..., description="A summary of the messages that were removed from the history due to trimming.")
+    summary_levels: list[list[str]] = Field(default_factory=list, description="Hierarchical summaries of the trimmed messages, leaf summaries first.")
     history       : list[MessageSchema] = Field(..., description="The main conversation history, excluding the system prompt and summary.")
+    summarizer    : Optional[str] = Field(default=None, description="The name of the summarization backend used when trimming; the default backend if not set.")
 
 
 class ChatSessionSchema(BaseModel):
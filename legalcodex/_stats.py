@@ -0,0 +1,123 @@
+"""
+Small statistics helpers for latency measurements.
+"""
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from typing import Iterable, Optional, Sequence
+
+
+def percentile(values:Iterable[float], pct:float) -> float:
+    """
+    Return the pct-th percentile (0-100) of the values, with linear interpolation.
+    Returns 0.0 for an empty input.
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    if len(ordered) == 1:
+        return ordered[0]
+
+    rank = (len(ordered) - 1) * min(max(pct, 0.0), 100.0) / 100.0
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+class RollingWindow:
+    """
+    Thread-safe window over the most recent samples.
+    """
+    def __init__(self, size:int) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, value:float) -> None:
+        with self._lock:
+            self._samples.append(value)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def values(self) -> list[float]:
+        with self._lock:
+            return list(self._samples)
+
+    def percentile(self, pct:float, default:Optional[float]=None) -> Optional[float]:
+        """
+        Return the pct-th percentile of the window, or default if it is empty.
+        """
+        values = self.values()
+        if not values:
+            return default
+        return percentile(values, pct)
+
+
+def mean(values:Sequence[float]) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+
+def variance(values:Sequence[float]) -> float:
+    """
+    Sample variance (n - 1 denominator); 0.0 for less than two values.
+    """
+    if len(values) < 2:
+        return 0.0
+    average = mean(values)
+    return sum((value - average) ** 2 for value in values) / (len(values) - 1)
+
+
+def welch_t_test(first:Sequence[float], second:Sequence[float]) -> tuple[float, float]:
+    """
+    Welch's t-test for samples with unequal variances.
+    Returns the t statistic (positive when the second sample has the larger mean) and the two-sided p-value.
+    """
+    if len(first) < 2 or len(second) < 2:
+        return 0.0, 1.0
+
+    var_first = variance(first) / len(first)
+    var_second = variance(second) / len(second)
+    difference = mean(second) - mean(first)
+    error = var_first + var_second
+    if error == 0.0:
+        return (0.0, 1.0) if difference == 0.0 else (math.copysign(math.inf, difference), 0.0)
+
+    t = difference / math.sqrt(error)
+    df = error ** 2 / (var_first ** 2 / (len(first) - 1) + var_second ** 2 / (len(second) - 1))
+    p_value = _regularized_incomplete_beta(df / (df + t * t), df / 2, 0.5)
+    return t, min(max(p_value, 0.0), 1.0)
+
+
+def _regularized_incomplete_beta(x:float, a:float, b:float) -> float:
+    """
+    I_x(a, b), evaluated with a continued fraction (modified Lentz's method).
+    """
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    if x > (a + 1) / (a + b + 2):
+        return 1.0 - _regularized_incomplete_beta(1.0 - x, b, a)
+
+    log_front = math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log(1 - x)
+    tiny = 1.0e-300
+    c = 1.0
+    d = 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    fraction = d
+    for m in range(1, 300):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            fraction *= c * d
+        if abs(c * d - 1.0) < 1.0e-12:
+            break
+    return math.exp(log_front) * fraction / a
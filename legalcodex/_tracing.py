@@ -0,0 +1,285 @@
+"""
+Lightweight tracing: spans around the stages of a request, correlated by the request id.
+
+A trace is started per request with Tracer().trace(); the stages inside it are wrapped with
+span(), which is a cheap no-op outside of a collected trace. The current span is held in a
+context variable, so spans opened in worker threads started with a copied context (as for
+FastAPI sync routes) nest under the request.
+
+A finished trace is exported when it was sampled (LC_TRACE_SAMPLE_RATE) or when it took
+longer than LC_TRACE_SLOW_MS, or when it failed, so the slow and failed requests are kept
+whatever the sample rate.
+Spans are written as JSON lines (LC_TRACE_FILE, lc_traces.jsonl in the root path by default)
+by a background thread, so that the requests (and the event loop) do not wait on the file,
+and rendered with `lc trace`.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Final, Iterator, Optional
+
+from ._environ import LC_TRACE_FILE, LC_TRACE_SAMPLE_RATE, LC_TRACE_SLOW_MS
+from ._metrics import counter
+from ._misc import get_root_path
+from ._singleton import Singleton
+
+_logger = logging.getLogger(__name__)
+
+
+DEFAULT_TRACE_FILE :Final[str] = "lc_traces.jsonl"
+QUEUE_SIZE         :Final[int] = 1_000      # Traces buffered for the writer thread
+
+TRACES_DROPPED = counter("lc_traces_dropped_total", "Traces dropped because the export queue was full")
+
+
+@dataclass
+class Span:
+    trace_id:       str
+    span_id:        str
+    parent_id:      Optional[str]
+    name:           str
+    start_unix_ns:  int
+    duration_ns:    int = 0
+    status:         str = "ok"
+    attributes:     dict[str, Any] = field(default_factory=dict)
+
+
+class _Trace:
+    """
+    Spans of a request being collected.
+    """
+    def __init__(self, trace_id:str, sampled:bool) -> None:
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.start_unix_ns = time.time_ns()
+        self.start_perf_ns = time.perf_counter_ns()
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def new_span(self, name:str, parent_id:Optional[str], attributes:dict[str, Any]) -> tuple[Span, int]:
+        start_perf_ns = time.perf_counter_ns()
+        span = Span(trace_id=self.trace_id,
+                    span_id=uuid.uuid4().hex[:16],
+                    parent_id=parent_id,
+                    name=name,
+                    start_unix_ns=self.start_unix_ns + (start_perf_ns - self.start_perf_ns),
+                    attributes=attributes)
+        return span, start_perf_ns
+
+    def end_span(self, span:Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+
+@dataclass(frozen=True)
+class _Active:
+    trace: _Trace
+    span: Span
+
+
+_current : ContextVar[Optional[_Active]] = ContextVar("lc_current_span", default=None)
+
+
+class SpanExporter(ABC):
+    @abstractmethod
+    def export(self, spans:list[Span]) -> None:
+        pass
+
+    def flush(self) -> None:
+        """
+        Wait until the spans exported so far are written.
+        """
+
+
+class JsonlExporter(SpanExporter):
+    """
+    Append the spans to a file, one JSON object per line.
+
+    export() only queues the spans: a background thread, started on first use, writes them.
+    When the queue is full, the trace is dropped and counted rather than waited for.
+    """
+    def __init__(self, path:str, queue_size:int=QUEUE_SIZE) -> None:
+        self.path = path
+        self.dropped = 0
+        self._queue: queue.Queue[list[Span]] = queue.Queue(maxsize=queue_size)
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def export(self, spans:list[Span]) -> None:
+        self._start_writer()
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            TRACES_DROPPED.inc()
+
+    def flush(self) -> None:
+        if self._writer is not None:
+            self._queue.join()
+
+    def _start_writer(self) -> None:
+        with self._lock:
+            if self._writer is not None:
+                return
+            self._writer = threading.Thread(target=self._write, name="trace-writer", daemon=True)
+            self._writer.start()
+        atexit.register(self.flush)
+
+    def _write(self) -> None:
+        while True:
+            spans = self._queue.get()
+            try:
+                lines = "".join(json.dumps(asdict(span)) + "\n" for span in spans)
+                with open(self.path, "a", encoding="utf-8") as file:
+                    file.write(lines)
+            except OSError as err:
+                _logger.warning("Failed to export trace %s: %s", spans[0].trace_id if spans else "", err)
+            finally:
+                self._queue.task_done()
+
+
+class Tracer(Singleton):
+    """
+    Process-wide tracing configuration; configured from the environment on first use.
+    """
+    def __init__(self) -> None:
+        self._random = random.Random()
+        self.sample_rate = 0.0
+        self.slow_s: Optional[float] = None
+        self.exporter: Optional[SpanExporter] = None
+        self.configure(_env_float(LC_TRACE_SAMPLE_RATE, 0.0),
+                       _env_float(LC_TRACE_SLOW_MS, 0.0) / 1000 or None,
+                       JsonlExporter(default_trace_file()))
+
+    def configure(self,
+                  sample_rate:float=0.0,
+                  slow_s:Optional[float]=None,
+                  exporter:Optional[SpanExporter]=None) -> None:
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.slow_s = slow_s if slow_s is not None and slow_s > 0 else None
+        self.exporter = exporter
+        if self.enabled:
+            _logger.info("Tracing enabled: sample rate=%.3f, slow threshold=%s", self.sample_rate,
+                         f"{self.slow_s:.3f}s" if self.slow_s is not None else "none")
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None and (self.sample_rate > 0 or self.slow_s is not None)
+
+    @contextmanager
+    def trace(self, name:str, trace_id:Optional[str]=None, **attributes:Any) -> Iterator[Optional[Span]]:
+        """
+        Collect the spans of a request under a root span, and export them at the end if the
+        trace is sampled, slow or failed. Yields None when tracing is disabled.
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        trace = _Trace(trace_id or new_request_id(), self._random.random() < self.sample_rate)
+        try:
+            with _span(trace, None, name, attributes) as root:
+                yield root
+        finally:
+            self._export(trace)
+
+    def _export(self, trace:_Trace) -> None:
+        root = next((item for item in trace.spans if item.parent_id is None), None)
+        slow = root is not None and self.slow_s is not None and root.duration_ns >= self.slow_s * 1e9
+        failed = root is not None and root.status == "error"
+        if (trace.sampled or slow or failed) and self.exporter is not None:
+            try:
+                self.exporter.export(sorted(trace.spans, key=lambda span: span.start_unix_ns))
+            except OSError as err:
+                _logger.warning("Failed to export trace %s: %s", trace.trace_id, err)
+
+
+@contextmanager
+def span(name:str, **attributes:Any) -> Iterator[Optional[Span]]:
+    """
+    Record a stage of the current trace; a no-op (yields None) outside of a trace.
+    """
+    active = _current.get()
+    if active is None:
+        yield None
+        return
+    with _span(active.trace, active.span.span_id, name, attributes) as child:
+        yield child
+
+
+def set_attribute(key:str, value:Any) -> None:
+    """
+    Set an attribute of the current span, if any.
+    """
+    active = _current.get()
+    if active is not None:
+        active.span.attributes[key] = value
+
+
+def current_trace_id() -> Optional[str]:
+    active = _current.get()
+    return active.trace.trace_id if active is not None else None
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex
+
+
+def default_trace_file() -> str:
+    return os.environ.get(LC_TRACE_FILE) or os.path.join(get_root_path(), DEFAULT_TRACE_FILE)
+
+
+def read_spans(path:str) -> list[dict[str, Any]]:
+    """
+    Read the spans exported to a JSONL file; malformed lines are skipped.
+    """
+    spans: list[dict[str, Any]] = []
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and "trace_id" in record:
+                spans.append(record)
+    return spans
+
+
+@contextmanager
+def _span(trace:_Trace, parent_id:Optional[str], name:str, attributes:dict[str, Any]) -> Iterator[Span]:
+    span, start_perf_ns = trace.new_span(name, parent_id, attributes)
+    token = _current.set(_Active(trace, span))
+    try:
+        yield span
+    except BaseException as err:
+        span.status = "error"
+        span.attributes.setdefault("error", f"{type(err).__name__}: {err}"[:200])
+        raise
+    finally:
+        _current.reset(token)
+        span.duration_ns = time.perf_counter_ns() - start_perf_ns
+        trace.end_span(span)
+
+
+def _env_float(name:str, default:float) -> float:
+    raw = os.environ.get(name, None)
+    if raw is None:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        _logger.warning("Invalid %s=%r; using %g", name, raw, default)
+        return default
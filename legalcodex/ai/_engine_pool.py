@@ -0,0 +1,100 @@
+"""
+Shared engine instances (flyweights).
+
+Sessions using the same engine configuration share a single Engine instance,
+so provider clients, connection pools and usage counters are created once per
+configuration instead of once per session.
+
+Engines without parameters (one per engine and model) are kept for the life of the
+process. Engines with parameters, which clients choose, are kept in an LRU of at most
+MAX_CONFIGURED_ENGINES. An evicted engine is not closed: the sessions holding it keep
+using it (streams in flight included), and it is released once the last one is gone.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Final, Optional, Mapping
+
+from .._singleton import Singleton
+from ..exceptions import LCValueError
+from .._metrics import cache_lookup, timed_lock
+
+from .engine import Engine, EngineKey
+from ._engine_selector import ENGINES
+
+_logger = logging.getLogger(__name__)
+
+
+MAX_CONFIGURED_ENGINES :Final[int] = 64
+
+
+class EnginePool(Singleton):
+    """
+    Thread-safe pool of engines keyed by (engine name, model, parameters).
+    """
+    _engines    : dict[EngineKey, Engine]              # Without parameters
+    _configured : OrderedDict[EngineKey, Engine]       # With parameters, least recently used first
+
+    def __init__(self, max_configured:int=MAX_CONFIGURED_ENGINES) -> None:
+        self._engines = {}
+        self._configured = OrderedDict()
+        self._max_configured = max_configured
+        self._lock = threading.Lock()
+
+    def get(self,
+            name:str,
+            model:str,
+            parameters:Optional[Mapping[str, str]]=None) -> Engine:
+        """
+        Return the shared engine for the given configuration, creating it on first use.
+        """
+        key = EngineKey.create(name, model, parameters)
+
+        if not key.parameters:
+            engine = self._engines.get(key)
+            cache_lookup("engine_pool", engine is not None)
+            if engine is not None:
+                return engine
+
+        with timed_lock(self._lock, "engine_pool"):
+            if key.parameters:
+                engine = self._configured.get(key)
+                cache_lookup("engine_pool", engine is not None)
+                if engine is not None:
+                    self._configured.move_to_end(key)
+                    return engine
+            else:
+                engine = self._engines.get(key)
+                if engine is not None:
+                    return engine
+
+            engine_cls = ENGINES.get(name, None)
+            if engine_cls is None:
+                raise LCValueError(f"Unknown engine name: {name}")
+            engine = engine_cls(model=model, parameters=parameters)
+            if key.parameters:
+                self._configured[key] = engine
+                while len(self._configured) > self._max_configured:
+                    evicted_key, _ = self._configured.popitem(last=False)
+                    _logger.debug("Evicted shared engine %s", evicted_key)
+            else:
+                self._engines[key] = engine
+            _logger.debug("Created shared engine %s (pool size=%d)", key, len(self._engines) + len(self._configured))
+        return engine
+
+    def engines(self) -> list[Engine]:
+        """
+        Return the engines created so far.
+        """
+        with self._lock:
+            return [*self._engines.values(), *self._configured.values()]
+
+    def clear(self) -> None:
+        """
+        Drop all the shared engines. Sessions keep the instances they already hold.
+        """
+        with self._lock:
+            self._engines.clear()
+            self._configured.clear()
@@ -1,26 +1,87 @@
 """
 Engine selector module to manage different engine implementations.
+
+Engines are registered by name with the path of their class, and imported on first use, so
+that the provider SDKs (e.g. openai) are only loaded by the processes that use them.
 """
-from typing import Type
+from __future__ import annotations
+
+import importlib
+import threading
+from typing import Iterator, MutableMapping, Type, Optional, Mapping, Union
 
+from ..exceptions import LCValueError
 from .engine import Engine
-from .engines.openai_engine import OpenAIEngine
-from .engines.mock_engine import MockEngine
 
 
-ENGINES : dict[str, Type[Engine]] = {
-    OpenAIEngine.NAME:  OpenAIEngine,
-    MockEngine.NAME:    MockEngine,
-}
+class EngineRegistry(MutableMapping[str, Type[Engine]]):
+    """
+    Engine classes by name; a class may be registered as a "module:Class" path
+    (relative to this package), imported the first time it is looked up.
+    """
+    def __init__(self, engines:Mapping[str, Union[str, Type[Engine]]]) -> None:
+        self._engines: dict[str, Union[str, Type[Engine]]] = dict(engines)
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name:str) -> Type[Engine]:
+        engine = self._engines[name]
+        if isinstance(engine, str):
+            with self._lock:
+                engine = self._engines[name]
+                if isinstance(engine, str):
+                    engine = self._engines[name] = _import_engine(engine)
+        return engine
+
+    def __setitem__(self, name:str, engine:Type[Engine]) -> None:
+        self._engines[name] = engine
+
+    def __delitem__(self, name:str) -> None:
+        del self._engines[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._engines)
 
-def get_engine(name: str, model: str) -> Engine:
+    def __len__(self) -> int:
+        return len(self._engines)
+
+    def __contains__(self, name:object) -> bool:
+        return name in self._engines
+
+
+def _import_engine(path:str) -> Type[Engine]:
+    module_name, _, class_name = path.partition(":")
+    engine: Type[Engine] = getattr(importlib.import_module(module_name, __package__), class_name)
+    return engine
+
+
+ENGINES : EngineRegistry = EngineRegistry({
+    "openai":   ".engines.openai_engine:OpenAIEngine",
+    "mock":     ".engines.mock_engine:MockEngine",
+    "router":   ".engines.router_engine:RouterEngine",
+    "hedged":   ".engines.hedged_engine:HedgedEngine",
+    "failover": ".engines.failover_engine:FailoverEngine",
+})
+
+def get_engine(name: str,
+               model: str,
+               parameters: Optional[Mapping[str, str]] = None) -> Engine:
     """
-    Factory function to create an Engine instance based on the given name and model.
+    Return the shared Engine instance for the given name, model and parameters.
     """
-    if name not in ENGINES:
-        raise ValueError(f"Unknown engine name: {name}")
+    from ._engine_pool import EnginePool
+    return EnginePool().get(name, model, parameters)
 
-    engine_cls = ENGINES[name]
-    return engine_cls(model=model)
+def client_parameters(name: Optional[str],
+                      parameters: Optional[Mapping[str, str]]) -> Optional[dict[str, str]]:
+    """
+    Return the engine parameters sent by an HTTP client, checked and clamped
+    (see Engine.CLIENT_PARAMETERS); raise LCValueError if they are not allowed.
+    """
+    if not parameters:
+        return None
+    engine_cls = ENGINES.get(name or DEFAULT_ENGINE, None)
+    if engine_cls is None:
+        raise LCValueError(f"Unknown engine name: {name}")
+    return engine_cls.client_parameters(parameters)
 
-DEFAULT_ENGINE = OpenAIEngine.NAME
+DEFAULT_ENGINE = "openai"
@@ -0,0 +1,149 @@
+"""
+Batch execution of many contexts through an engine, for offline and evaluation workloads.
+"""
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Final, Optional, Callable, Sequence, TYPE_CHECKING
+
+from ..exceptions import LCException, LCValueError, QuotaExceeded
+from .context import Context, snapshot
+
+if TYPE_CHECKING:
+    from .engine import Engine
+
+_logger = logging.getLogger(__name__)
+
+
+DEFAULT_CONCURRENCY :Final[int]   = 8
+DEFAULT_RETRIES     :Final[int]   = 3
+BACKOFF_S           :Final[float] = 1.0     # First retry delay; doubled on each attempt...
+MAX_BACKOFF_S       :Final[float] = 30.0    # ...up to this delay
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """
+    Outcome of one context of a batch.
+    """
+    index:      int                 # Position of the context in the batch
+    response:   Optional[str]       # None if every attempt failed
+    error:      Optional[str]       # Last error if every attempt failed
+    attempts:   int
+    duration_s: float               # Including the retry delays
+
+    @property
+    def ok(self)->bool:
+        return self.error is None
+
+
+BatchProgress = Callable[[int, int, BatchResult], None]    # (done, total, result of the context just completed)
+
+
+def run_batch(engine:Engine,
+              contexts:Sequence[Context],
+              concurrency:int=DEFAULT_CONCURRENCY,
+              retries:int=DEFAULT_RETRIES,
+              progress:Optional[BatchProgress]=None)->list[BatchResult]:
+    """
+    Run every context through the engine with at most `concurrency` requests in flight.
+
+    A failed request is retried up to `retries` times with exponential backoff. When the
+    provider reports an exceeded quota, every worker pauses so the batch backs off as a whole
+    instead of hammering the quota. Invalid requests (LCValueError) are not retried.
+
+    Results are returned in the order of the contexts; failures are reported in the results,
+    not raised.
+    """
+    if concurrency < 1:
+        raise LCValueError("concurrency must be at least 1")
+    if retries < 0:
+        raise LCValueError("retries must not be negative")
+
+    total = len(contexts)
+    results: list[Optional[BatchResult]] = [None] * total
+    throttle = _Throttle()
+    lock = threading.Lock()
+    done = 0
+
+    def run_one(index:int)->None:
+        nonlocal done
+        result = _run_with_retries(engine, index, contexts[index], retries, throttle)
+        with lock:
+            results[index] = result
+            done += 1
+            completed = done
+        if not result.ok:
+            _logger.warning("Batch item %d failed after %d attempts: %s", index, result.attempts, result.error)
+        if progress is not None:
+            progress(completed, total, result)
+
+    _logger.info("Running a batch of %d contexts with engine '%s' (concurrency=%d)", total, engine.name, concurrency)
+    with ThreadPoolExecutor(max_workers=min(concurrency, max(total, 1)), thread_name_prefix="batch") as pool:
+        for future in [pool.submit(run_one, index) for index in range(total)]:
+            future.result()
+
+    assert all(result is not None for result in results)
+    return [result for result in results if result is not None]
+
+
+def _run_with_retries(engine:Engine,
+                      index:int,
+                      context:Context,
+                      retries:int,
+                      throttle:_Throttle)->BatchResult:
+    request = snapshot(context)     # May be run several times
+    start = time.perf_counter()
+    error = ""
+    attempt = 0
+    while attempt <= retries:
+        attempt += 1
+        throttle.wait()
+        try:
+            response = engine.run_messages_stream(request).all()
+            return BatchResult(index, response, None, attempt, time.perf_counter() - start)
+        except LCValueError as err:
+            error = str(err)
+            break
+        except QuotaExceeded as err:
+            error = str(err)
+            if attempt <= retries:
+                throttle.pause(_backoff(attempt, jitter=False))
+        except LCException as err:
+            error = str(err)
+            if attempt <= retries:
+                time.sleep(_backoff(attempt))
+    return BatchResult(index, None, error or "Request failed", attempt, time.perf_counter() - start)
+
+
+def _backoff(attempt:int, jitter:bool=True)->float:
+    """
+    Exponential backoff, with full jitter unless the delay is shared by the whole batch.
+    """
+    delay = min(BACKOFF_S * 2 ** (attempt - 1), MAX_BACKOFF_S)
+    return random.uniform(0.0, delay) if jitter else delay
+
+
+class _Throttle:
+    """
+    Pause shared by the workers of a batch.
+    """
+    def __init__(self)->None:
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds:float)->None:
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+        _logger.info("Quota exceeded; pausing the batch for %.1fs", seconds)
+
+    def wait(self)->None:
+        with self._lock:
+            delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
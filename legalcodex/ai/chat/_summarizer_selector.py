@@ -0,0 +1,30 @@
+"""
+Summarizer selector module to manage the summarization backends available to chat sessions.
+"""
+from typing import Final
+
+from ...exceptions import LCValueError
+
+from .chat_summarizer import Summarizer, LLMSummarizer, FallbackSummarizer
+from .extractive_summarizer import ExtractiveSummarizer
+
+
+LLM_WITH_FALLBACK :Final[str] = "llm+extractive"
+
+SUMMARIZERS : dict[str, Summarizer] = {
+    LLMSummarizer.NAME:         LLMSummarizer(),
+    ExtractiveSummarizer.NAME:  ExtractiveSummarizer(),
+    LLM_WITH_FALLBACK:          FallbackSummarizer(LLM_WITH_FALLBACK, LLMSummarizer(), ExtractiveSummarizer()),
+}
+
+DEFAULT_SUMMARIZER :Final[str] = LLM_WITH_FALLBACK
+
+
+def get_summarizer(name: str) -> Summarizer:
+    """
+    Return the summarizer registered under the given name.
+    """
+    summarizer = SUMMARIZERS.get(name, None)
+    if summarizer is None:
+        raise LCValueError(f"Unknown summarizer name: {name}")
+    return summarizer
@@ -2,13 +2,15 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 import logging
-from typing import Optional, Final, TypeVar, Callable, Iterator
+from typing import Optional, Final, TypeVar, Callable, Iterator, Mapping
 
 
 from ..._schema import ChatContextSchema
 from ..._types import JSON_DICT
 from ..._prompts import CHAT_SYSTEM_PROMPT
 from ..._user_access import User
+from ..._deadline import Deadline
+from ..._tracing import span
 
 from ..stream import Stream
 from ..message import Message
@@ -54,7 +56,9 @@ def close_session(session_id:ChatSessionId)->None:
 def new_session(user:User,
                 max_messages:Optional[int]=None,
                 engine_name :Optional[str]=None,
-                model       :Optional[str]=None
+                model       :Optional[str]=None,
+                summarizer  :Optional[str]=None,
+                parameters  :Optional[Mapping[str, str]]=None
                 )->ChatSessionId:
     """
     Create a new chat session for the given user and return its session id.
@@ -70,20 +74,25 @@ def new_session(user:User,
             max_messages=max_messages if max_messages is not None else _DEFAULT_MAX_MESSAGES,
             engine_name=engine_name,
             model=model,
-            trim_length=None
+            trim_length=None,
+            summarizer=summarizer,
+            parameters=parameters
         )
     ChatSessionManager().add_session(session)
     return session.uid
 
 
 def send_message(session_id:ChatSessionId,
-                 user_message: str) -> Stream:
+                 user_message: str,
+                 deadline: Optional[Deadline] = None) -> Stream:
     """
     Send a user message to the char and get the assistant's response.
         - The user message is appended to the context history.
+        - The turn is bounded by the deadline, if given.
     """
-    session = ChatSessionManager().get_session(session_id)
-    return session.send_message(user_message)
+    with span("session.get", session_id=session_id):
+        session = ChatSessionManager().get_session(session_id)
+    return session.send_message(user_message, deadline)
 
 
 
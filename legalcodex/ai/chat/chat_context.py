@@ -5,21 +5,31 @@ import logging
 from typing import Final, Optional, Iterable, Type, TypeVar
 import json
 
-from ...exceptions import LCValueError
+from ...exceptions import LCValueError, DeadlineExceeded
 from ..._types import JSON_DICT
+from ..._deadline import Deadline
 from ..._schema import ChatContextSchema
+from ..._metrics import Histogram, histogram
+from ..._tracing import span
 
 from ..engine import Engine
 from ..message import Message
 from ..context import BaseContext
 
 
-from .chat_summarizer import summarize_overflow
+from .summary_hierarchy import SummaryHierarchy
+from .chat_summarizer import Summarizer
+from ._summarizer_selector import get_summarizer, DEFAULT_SUMMARIZER
 
 
 
 _logger = logging.getLogger(__name__)
 
+
+SUMMARY_MIN_BUDGET_S :Final[float] = 10.0  # Summarization is deferred when less time than this is left in the request
+
+SUMMARIZATION :Final[Histogram] = histogram("lc_summarization_seconds", "Time to summarize the trimmed history", ("summarizer",))
+
 T = TypeVar("T", bound="ChatContext")
 
 class ChatContext(BaseContext):
@@ -32,16 +42,19 @@ class ChatContext(BaseContext):
     _system_prompt: Final[Message]  # The system prompt that is always included at the beginning of the message history
     _max_messages: Final[int]       # maximum number of messages to keep in the history before trimming
     _trim_length: Final[int]        # number of messages to remove when trimming the history
+    _summarizer: Final[Summarizer]  # backend used to summarize the trimmed messages
 
     _history: list[Message]         # The main conversation history, excluding the system prompt and summary
-    _summary: str                   # A summary of the messages that were removed from the history due to trimming
+    _summaries: SummaryHierarchy    # Hierarchical summary of the messages that were removed from the history due to trimming
     _is_dirty: bool                 # Indicates if the context has unsaved changes
 
     def __init__(self,  system_prompt: str,
                         max_messages: int,
                         trim_length:Optional[int]=None,
                         summary:Optional[str]=None,
-                        history:Optional[list[Message]]=None
+                        history:Optional[list[Message]]=None,
+                        summary_levels:Optional[list[list[str]]]=None,
+                        summarizer:Optional[str]=None
                         ) -> None:
 
         if max_messages <= 4:
@@ -50,9 +63,13 @@ class ChatContext(BaseContext):
         self._system_prompt = Message("system", system_prompt.strip())
         self._max_messages = max_messages
         self._trim_length = max(trim_length if trim_length is not None else int(max_messages/2), 1)
+        self._summarizer = get_summarizer(summarizer or DEFAULT_SUMMARIZER)
 
         self._history = history or []
-        self._summary = summary or ""
+        if summary_levels:
+            self._summaries = SummaryHierarchy(summary_levels)
+        else:
+            self._summaries = SummaryHierarchy.from_legacy(summary or "")
         self._is_dirty = False
 
     @property
@@ -61,14 +78,22 @@ class ChatContext(BaseContext):
 
     @property
     def summary(self) -> str:
-        return self._summary
+        return self._summaries.render()
+
+    @property
+    def summarizer(self) -> str:
+        return self._summarizer.NAME
+
+    @property
+    def summary_levels(self) -> list[list[str]]:
+        return self._summaries.levels
 
     def reset(self)-> None:
         """
         Reset the conversation context, clearing the history and summary but keeping the system prompt.
         """
         self._history = []
-        self._summary = ""
+        self._summaries.clear()
         self._is_dirty = True
 
 
@@ -78,21 +103,23 @@ class ChatContext(BaseContext):
         """
         yield self._system_prompt
 
-        if self._summary:
-            yield Message("system", "Summary: " + self._summary)
+        if self._summaries:
+            yield Message("system", "Summary: " + self._summaries.render())
 
         yield from self._history
 
-    def append(self, engine: Engine, message: Message) -> None:
+    def append(self, engine: Engine, message: Message, deadline: Optional[Deadline] = None) -> None:
         """
         Append a message to the history.
+        With a deadline, the summarization of the trimmed messages is deferred to a later
+        turn when the request is short on time.
         """
         _logger.debug("Appending message to history: %s", message)
         self._history.append(message)
         self._is_dirty = True
 
         if len(self._history) > self._max_messages:
-            self._trim(engine)
+            self._trim(engine, deadline)
 
     @classmethod
     def deserialize(cls: Type[T], data:ChatContextSchema) -> T:
@@ -104,7 +131,9 @@ class ChatContext(BaseContext):
                         max_messages=data.max_messages,
                         trim_length=data.trim_length,
                         summary=data.summary,
-                        history=[Message.deserialize(msg) for msg in data.history])
+                        history=[Message.deserialize(msg) for msg in data.history],
+                        summary_levels=data.summary_levels,
+                        summarizer=data.summarizer)
         return instance
 
     def serialize(self) -> ChatContextSchema:
@@ -114,14 +143,20 @@ class ChatContext(BaseContext):
         return self.SCHEMA (    system_prompt = self._system_prompt.content,
                                 max_messages =  int(self._max_messages),
                                 trim_length =  int(self._trim_length),
-                                summary =  self._summary,
-                                history = [ msg.serialize() for msg in self._history ]
+                                summary =  self.summary,
+                                summary_levels = self._summaries.levels,
+                                history = [ msg.serialize() for msg in self._history ],
+                                summarizer = self._summarizer.NAME
             )
 
-    def _trim(self, engine:Engine) -> None:
+    def _trim(self, engine:Engine, deadline:Optional[Deadline]=None) -> None:
         """
         Trim the message history to the specified maximum number of turns.
         """
+        if deadline is not None and deadline.remaining() < SUMMARY_MIN_BUDGET_S and self._can_defer_trim():
+            _logger.info("Deferring history trimming: %.1fs left in the request", deadline.remaining())
+            return
+
         _logger.info("Trimming chat history. Current length=%d, max=%d", len(self._history), self._max_messages)
         try:
             #split the history into the part to keep and the overflow
@@ -131,26 +166,36 @@ class ChatContext(BaseContext):
             assert len(keep) + len(overflow) == len(self._history)
             assert len(keep) >=0 and len(overflow) >= 0
 
-            new_summary = summarize_overflow(engine, self._summary, overflow)
-
-            _logger.debug("History trimmed. Kept %d messages, summarized %d messages into %d chars",
-                          len(keep), len(overflow), len(new_summary) if new_summary else 0)
+            with SUMMARIZATION.time(summarizer=self._summarizer.NAME), \
+                 span("summarize", summarizer=self._summarizer.NAME, messages=len(overflow)):
+                self._summaries.add(self._summarizer, engine, overflow, deadline)
 
-            _logger.debug("New summary content: %s", new_summary)
+            _logger.debug("History trimmed. Kept %d messages, summarized %d messages. Summary depth=%d",
+                          len(keep), len(overflow), self._summaries.depth)
 
             self._history = keep
-            self._summary = new_summary if new_summary else self._summary
             self._is_dirty = True
 
 
 
         except Exception as err:
+            if isinstance(err, DeadlineExceeded) and self._can_defer_trim():
+                _logger.warning("Summarization ran out of time; deferring history trimming: %s", err)
+                return
+
             _logger.error("Failed to summarize overflow; keeping full history")
             _logger.exception(err)
             _logger.warning("Trimming History without summarization. This may lead to loss of important context.")
             self._history = self._history[self._trim_length:]
             self._is_dirty = True
 
+    def _can_defer_trim(self) -> bool:
+        """
+        Return True if trimming may wait for a later turn: the history may exceed
+        max_messages by up to one trim block before it must be trimmed.
+        """
+        return len(self._history) <= self._max_messages + self._trim_length
+
     def clear_dirty(self) -> None:
         """Mark the context as clean after persisting changes."""
         self._is_dirty = False
@@ -163,8 +208,9 @@ class ChatContext(BaseContext):
         return (self._system_prompt == other._system_prompt and
                 self._max_messages == other._max_messages and
                 self._trim_length == other._trim_length and
+                self._summarizer.NAME == other._summarizer.NAME and
                 self._history == other._history and
-                self._summary == other._summary)
+                self._summaries == other._summaries)
 
 
     def __len__(self) -> int:
@@ -0,0 +1,174 @@
+"""
+Batches of independent questions, asked concurrently through the chat sessions.
+
+Each question is asked in a new session created with the setup of the batch, or in an
+existing session given with the question. The questions of the same existing session are
+asked in order; all the others run in parallel, up to the concurrency of the batch. Every
+question is a chat turn: it has its own time budget and goes through admission control.
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Final, Iterator, Mapping, Optional, Sequence
+
+from ..._admission import AdmissionController
+from ..._deadline import Deadline
+from ..._tracing import span
+from ..._user_access import User
+from ...exceptions import LCException, LCValueError
+from . import chat_behaviour
+from ._chat_types import ChatSessionId
+
+_logger = logging.getLogger(__name__)
+
+
+DEFAULT_CONCURRENCY :Final[int] = 4
+MAX_QUESTIONS       :Final[int] = 100
+
+
+@dataclass(frozen=True)
+class Question:
+    text:       str
+    id:         Optional[str] = None
+    session_id: Optional[ChatSessionId] = None      # Existing session; a new one if not set
+
+
+@dataclass(frozen=True)
+class SessionSetup:
+    """
+    Parameters of the sessions created for the questions (see chat_behaviour.new_session).
+    """
+    engine:       Optional[str] = None
+    model:        Optional[str] = None
+    max_messages: Optional[int] = None
+    summarizer:   Optional[str] = None
+    parameters:   Optional[Mapping[str, str]] = None
+
+
+@dataclass(frozen=True)
+class QuestionResult:
+    index:      int                     # Position of the question in the batch
+    id:         Optional[str]
+    session_id: Optional[str]
+    response:   Optional[str]           # None if the question failed
+    error:      Optional[LCException]
+    duration_s: float
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def ask_questions(user: User,
+                  questions: Sequence[Question],
+                  setup: SessionSetup = SessionSetup(),
+                  concurrency: int = DEFAULT_CONCURRENCY,
+                  timeout_s: float = 60.0,
+                  keep_sessions: bool = False) -> Iterator[QuestionResult]:
+    """
+    Ask the questions and yield their results as they complete (not in the batch order).
+
+    The concurrency is bounded by the turns a user may run at once (admission control), so
+    that the questions do not overflow the user's admission queue. The sessions created for
+    the questions are closed (and saved) after their answer unless `keep_sessions`.
+    Failures are reported in the results, not raised. Closing the iterator early cancels the
+    questions not started yet. Invalid batches raise LCValueError at once, before any
+    question is asked.
+    """
+    if len(questions) > MAX_QUESTIONS:
+        raise LCValueError(f"A batch holds at most {MAX_QUESTIONS} questions")
+    if concurrency < 1:
+        raise LCValueError("concurrency must be at least 1")
+    for question in questions:
+        if not question.text.strip():
+            raise LCValueError("Questions must not be empty")
+
+    return _ask_all(user, questions, setup, concurrency, timeout_s, keep_sessions)
+
+
+def _ask_all(user: User,
+             questions: Sequence[Question],
+             setup: SessionSetup,
+             concurrency: int,
+             timeout_s: float,
+             keep_sessions: bool) -> Iterator[QuestionResult]:
+    if not questions:
+        return
+    lanes = _lanes(questions)
+    workers = min(concurrency, AdmissionController().limits.max_per_user, len(lanes))
+    _logger.info("Asking %d questions for user %s (%d in parallel)", len(questions), user.username, workers)
+
+    results: queue.Queue[QuestionResult] = queue.Queue()
+
+    def ask_lane(lane: list[int]) -> None:
+        for index in lane:
+            results.put(_ask(user, index, questions[index], setup, timeout_s, keep_sessions))
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="questions")
+    try:
+        for lane in lanes:
+            pool.submit(contextvars.copy_context().run, ask_lane, lane)     # Spans nest under the request
+        for _ in range(len(questions)):
+            yield results.get()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _lanes(questions: Sequence[Question]) -> list[list[int]]:
+    """
+    Group the questions that must run in order: those of the same existing session.
+    """
+    lanes: list[list[int]] = []
+    by_session: dict[str, list[int]] = {}
+    for index, question in enumerate(questions):
+        if question.session_id is None:
+            lanes.append([index])
+            continue
+        lane = by_session.get(question.session_id)
+        if lane is None:
+            lane = by_session[question.session_id] = []
+            lanes.append(lane)
+        lane.append(index)
+    return lanes
+
+
+def _ask(user: User,
+         index: int,
+         question: Question,
+         setup: SessionSetup,
+         timeout_s: float,
+         keep_sessions: bool) -> QuestionResult:
+    start = time.perf_counter()
+    session_id: Optional[ChatSessionId] = question.session_id
+    created = False
+    try:
+        deadline = Deadline(timeout_s)
+        with span("question", index=index):
+            with AdmissionController().admit(user.username, deadline.remaining()):
+                if session_id is None:
+                    session_id = chat_behaviour.new_session(user=user,
+                                                            max_messages=setup.max_messages,
+                                                            engine_name=setup.engine,
+                                                            model=setup.model,
+                                                            summarizer=setup.summarizer,
+                                                            parameters=setup.parameters)
+                    created = True
+                response = chat_behaviour.send_message(session_id, question.text, deadline).all()
+        return QuestionResult(index, question.id, session_id, response, None, time.perf_counter() - start)
+    except LCException as err:
+        _logger.warning("Question %d failed: %s", index, err)
+        return QuestionResult(index, question.id, session_id, None, err, time.perf_counter() - start)
+    except Exception as err:        # Reported like the other failures: the batch waits for every result
+        _logger.exception("Question %d failed: %s", index, err)
+        return QuestionResult(index, question.id, session_id, None, LCException("Internal error"), time.perf_counter() - start)
+    finally:
+        if created and not keep_sessions and session_id is not None:
+            try:
+                chat_behaviour.close_session(session_id)
+            except LCException as err:
+                _logger.warning("Failed to close the session %s of question %d: %s", session_id, index, err)
@@ -5,7 +5,7 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime, timezone
-from typing import TypeVar, Type, Optional, Any, Final, NewType, cast, Callable, Iterator
+from typing import TypeVar, Type, Optional, Any, Final, NewType, cast, Callable, Iterator, Mapping
 from uuid import uuid4
 
 from ...serialization import Serializable
@@ -13,10 +13,13 @@ from ...exceptions import LCValueError, LCException
 from ..._user_access import User, UsersAccess
 from ..._misc import serialize_datetime, parse_datetime
 from ..._schema import ChatSessionSchema
+from ..._deadline import Deadline
+from ..._tracing import span
 
-from ..stream import Stream
+from ..stream import Stream, DeadlineStream
+from ..context import Context, SimpleContext
 from ..engine import Engine
-from .._engine_selector import ENGINES, DEFAULT_ENGINE
+from .._engine_selector import ENGINES, DEFAULT_ENGINE, get_engine
 from ..engines._models import MODELS, DEFAULT_MODEL
 
 from .chat_context import ChatContext
@@ -112,12 +115,17 @@ class ChatSession(Serializable[ChatSessionSchema]):
                          max_messages:int,
                          engine_name: str,
                          model:Optional[str] = None,
-                         trim_length:Optional[int] = None) -> T:
+                         trim_length:Optional[int] = None,
+                         summarizer:Optional[str] = None,
+                         parameters:Optional[Mapping[str, str]] = None) -> T:
         user = UsersAccess.get_instance().find(username)
-        context = ChatContext(system_prompt=system_prompt, max_messages=max_messages, trim_length=trim_length)
+        context = ChatContext(system_prompt=system_prompt,
+                              max_messages=max_messages,
+                              trim_length=trim_length,
+                              summarizer=summarizer)
         created_at = datetime.now(timezone.utc)
 
-        engine = _get_engine(engine_name, model)
+        engine = _get_engine(engine_name, model, parameters)
 
         return cls(
             uid=cls._new_session_id(),
@@ -129,28 +137,42 @@ class ChatSession(Serializable[ChatSessionSchema]):
 
 
 
-    def send_message(self, user_message: str) -> Stream:
+    def send_message(self, user_message: str, deadline: Optional[Deadline] = None) -> Stream:
         """
         Send a user message to the char and get the assistant's response.
             - The user message is appended to the context history.
+            - With a deadline, every stage of the turn is bounded by it: summarization is
+              deferred when time is short and the response stream is cut when it expires
+              (DeadlineExceeded).
         """
         prompt = user_message.strip()
         if not prompt:
             raise LCValueError("user_message must not be empty")
 
+        if deadline is not None:
+            deadline.check("starting the chat turn")
+
         context = self._context
 
 
         message = Message.User(prompt)
-        context.append(self._engine, message)
+        with span("context.append", role="user"):
+            context.append(self._engine, message, deadline)
 
-        response = self._engine.run_messages_stream(context)
+        with span("engine.request", engine=self._engine.NAME, model=self._engine.model):
+            if deadline is None:
+                response = self._engine.run_messages_stream(context)
+            else:
+                deadline.check("preparing the request")
+                turn_context: Context = SimpleContext(context, deadline=deadline)
+                response = DeadlineStream(self._engine.run_messages_stream(turn_context), deadline)
 
         _logger.debug("Chat turn completed. History size=%d", len(context))
 
         def on_end(content:str)->None:
             message= Message(role="assistant", content=content)
-            context.append(self._engine, message)
+            with span("context.append", role="assistant"):
+                context.append(self._engine, message, deadline)
             _logger.debug("Appended assistant message to context: %s", message)
 
         return _ChatStream(response, on_end)
@@ -162,19 +184,18 @@ class ChatSession(Serializable[ChatSessionSchema]):
 
 
 def _get_engine(name:Optional[str],
-                model:Optional[str])->Engine:
+                model:Optional[str],
+                parameters:Optional[Mapping[str, str]]=None)->Engine:
 
     model = model if model is not None else DEFAULT_MODEL
     engine_name = name if name is not None else DEFAULT_ENGINE
 
-    engine_cls = ENGINES.get(engine_name, None)
-
-    if engine_cls is None:
+    if engine_name not in ENGINES:
         raise LCValueError(f"Unknown engine name: {name}")
 
     if model not in MODELS:
         raise LCValueError(f"Model '{model}' is not available")
-    return engine_cls(model=model)
+    return get_engine(engine_name, model, parameters)
 
 
 _StreamEndCallback = Callable[[str], None]
@@ -184,15 +205,17 @@ class _ChatStream(Stream):
     A wrapper around the engine's response stream with
     a callback for when the stream ends.
     """
-    _stream:Optional[Stream]
+    _stream:Stream
     _callback: _StreamEndCallback
+    _ended: bool
 
     def __init__(self, stream: Stream, callback:_StreamEndCallback):
         self._stream = stream
         self._callback = callback
+        self._ended = False
 
     def __iter__(self)-> Iterator[str]:
-        if self._stream is None:
+        if self._ended:
             raise LCException("Stream has already ended")
 
         chunks:list[str] = []
@@ -204,4 +227,11 @@ class _ChatStream(Stream):
         finally:
             content = "".join(chunks)
             self._callback(content)
-            self._stream = None # Mark stream as ended to prevent further iteration
+            self._ended = True # Prevent further iteration
+
+    def close(self)->None:
+        """
+        Close the engine's stream (e.g. to cancel the turn). The consumer's generator may
+        already have ended when its loop was left, so the stream is kept for this.
+        """
+        self._stream.close()
@@ -2,18 +2,22 @@
 from __future__ import annotations
 import logging
 import threading
-from typing import Dict, cast, Iterator
+from typing import Dict, Final, cast, Iterator
 import os
 
 from ..._user_access import User
 from ..._misc import get_root_path
 from ...exceptions import ChatSessionNotFound
 from ..._singleton import Singleton
+from ..._metrics import Histogram, cache_lookup, histogram, timed_lock
+from ..._tracing import span
 from .chat_session import ChatSession
 from ._chat_types import ChatSessionInfo, ChatSessionId
 
 _logger = logging.getLogger(__name__)
 
+SESSION_IO :Final[Histogram] = histogram("lc_session_io_seconds", "Time to save or load a chat session file", ("operation",))
+LOCK_NAME  :Final[str] = "session_manager"
 
 
 
@@ -38,7 +42,7 @@ class ChatSessionManager(Singleton):
         # TODO: Manage description
         """
 
-        with self._lock:
+        with timed_lock(self._lock, LOCK_NAME):
             in_memory : set[ChatSessionId] = set()
             for session in self._sessions.values():
                 in_memory.add(session.uid)
@@ -63,7 +67,7 @@ class ChatSessionManager(Singleton):
         """Add or replace a session keyed by its uid."""
         session_id = session.uid
 
-        with self._lock:
+        with timed_lock(self._lock, LOCK_NAME):
             assert session_id not in self._sessions, f"Session with id {session_id} already exists"
             self._sessions[session_id] = session
             _logger.debug("Registered chat session", extra={"session_id": session_id})
@@ -75,8 +79,9 @@ class ChatSessionManager(Singleton):
         """
         session : ChatSession | None = None
 
-        with self._lock:
+        with timed_lock(self._lock, LOCK_NAME):
             session = self._sessions.get(session_id)
+            cache_lookup("sessions", session is not None)
             if session is not None:
                 _logger.debug("Found chat session in memory", extra={"session_id": session_id})
             else:
@@ -94,7 +99,7 @@ class ChatSessionManager(Singleton):
         """
         Close the session: remove it from memory and save it to disk.
         """
-        with self._lock:
+        with timed_lock(self._lock, LOCK_NAME):
             session = self._sessions.get(session_id, None)
             if session is None:
                 raise ChatSessionNotFound(session_id)
@@ -116,7 +121,8 @@ def _save_session(session: ChatSession) -> None:
 
     filename = os.path.join(path, f"{session.uid}.json")
     try:
-        session.save(filename)
+        with SESSION_IO.time(operation="save"), span("session.save"):
+            session.save(filename)
         _logger.debug("Saved chat session to disk", extra={"session_id": session.uid, "path": filename})
     except Exception as err:
         _logger.error(
@@ -132,7 +138,8 @@ def _load_session(session_id: ChatSessionId) -> ChatSession | None:
         return None
 
     try:
-        session = ChatSession.load(filename)
+        with SESSION_IO.time(operation="load"), span("session.load"):
+            session = ChatSession.load(filename)
         _logger.debug("Loaded chat session from disk", extra={"session_id": session_id, "path": filename})
         return session
 
@@ -144,6 +151,22 @@ def _load_session(session_id: ChatSessionId) -> ChatSession | None:
         return None
 
 
+def recent_session_ids(limit:int) -> list[ChatSessionId]:
+    """
+    Return the ids of the sessions saved most recently (by file modification time), newest first.
+    """
+    path = get_path()
+    if limit <= 0 or not os.path.isdir(path):
+        return []
+    files: list[tuple[float, str]] = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name.endswith(".json") and entry.is_file():
+                files.append((entry.stat().st_mtime, entry.name))
+    files.sort(reverse=True)
+    return [ChatSessionId(os.path.splitext(name)[0]) for _, name in files[:limit]]
+
+
 def get_path() -> str:
     """
     Return the directory where the sessions are stored.
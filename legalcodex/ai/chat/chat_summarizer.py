@@ -1,12 +1,23 @@
 import logging
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Final
 from dataclasses import dataclass
 
+from ..._deadline import Deadline
 from ..engine import Engine
 from ..message import Message
+from ..context import SimpleContext
+from ..tokens import estimate_tokens, truncate_middle
 
 _logger = logging.getLogger(__name__)
 
+SUMMARY_INPUT_TOKENS    :Final[int] = 6000   # Budget for the conversation input of one summarization request
+MESSAGE_TOKENS          :Final[int] = 1500   # Budget for a single message (or existing summary) in that input
+MIN_SHARE_TOKENS        :Final[int] = 250    # Smallest share of the budget given to a summary when merging
+MAX_MERGE_FAN_IN        :Final[int] = SUMMARY_INPUT_TOKENS // MIN_SHARE_TOKENS  # Summaries merged in one request
+MAX_PARALLEL_SUMMARIES  :Final[int] = 4      # Concurrent engine requests when the overflow is chunked
+
 SUMMARIZE_PROMPT : Final[str] = \
 """ You summarize chat history. Keep all important facts, decisions, constraints,
     names, dates, and unresolved questions. Be concise.
@@ -14,29 +25,75 @@ SUMMARIZE_PROMPT : Final[str] = \
     If the conversation is about a specific case, include the case name and jurisdiction in the summary
 """
 
+MERGE_PROMPT : Final[str] = \
+""" You merge consecutive summaries of an older chat history into a single summary.
+    The summaries are given in chronological order. Keep all important facts, decisions,
+    constraints, names, dates, case names, jurisdictions and unresolved questions.
+    Drop repetitions. Be concise.
+"""
+
 
 def summarize_overflow( engine:Engine,
                         existing_summary: Optional[str],
-                        overflow: list[Message]) -> str:
+                        overflow: list[Message],
+                        deadline: Optional[Deadline] = None) -> str:
     """
     Summarize the overflow messages into a single Message that can be prepended to the context.
     If summarization fails, returns an empty string to indicate that the overflow should be kept as-is.
+
+    The summarization input is kept under SUMMARY_INPUT_TOKENS: long messages are truncated
+    (head and tail kept) and, if the overflow still does not fit in one request, it is split in
+    chunks that are summarized in parallel and then merged (map-reduce).
     """
     _logger.debug("Summarizing overflow of %d messages", len(overflow))
     _logger.debug("Existing summary: %s", bool(existing_summary))
 
+    if existing_summary:
+        existing_summary = truncate_middle(existing_summary, MESSAGE_TOKENS)
+
+    budget = SUMMARY_INPUT_TOKENS - (estimate_tokens(existing_summary) if existing_summary else 0)
+    chunks = chunk_lines(collate_lines(overflow), budget)
+
+    if len(chunks) <= 1:
+        return _summarize_lines(engine, existing_summary, chunks[0] if chunks else [], deadline)
+
+    _logger.info("Overflow exceeds the summarization budget; summarizing %d chunks", len(chunks))
+    with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_SUMMARIES, len(chunks)),
+                            thread_name_prefix="summarize") as pool:
+        partials = list(pool.map(lambda lines: _summarize_lines(engine, None, lines, deadline), chunks))
+
+    summaries = [summary for summary in partials if summary]
+    if existing_summary:
+        summaries.insert(0, existing_summary)
+    if not summaries:
+        return ""
+    if len(summaries) == 1:
+        return summaries[0]
+    return merge_summaries(engine, summaries, deadline)
+
+
+def _summarize_lines(engine:Engine,
+                     existing_summary: Optional[str],
+                     lines: list[str],
+                     deadline: Optional[Deadline] = None) -> str:
+    """
+    Summarize collated conversation lines in a single engine request.
+    """
+    if deadline is not None:
+        deadline.check("summarizing the history")
     messages = [ Message("system",SUMMARIZE_PROMPT)]
 
     if existing_summary:
         messages.append(Message("user", f"Existing summary:\n{existing_summary}"))
 
-    summary_input = collate_messages(overflow)
+    summary = "\n".join(lines)
     messages.append(
         Message("user",
                 "Merge and compress the following older conversation turns into a short summary:\n"\
-                f"{summary_input.content}")
+                f"Conversation summary:\n{summary}")
     )
-    summary_text :str = engine.run_messages_stream(messages).all().strip()
+    context = SimpleContext(messages, request_class="summarize", deadline=deadline)
+    summary_text :str = engine.run_messages_stream(context).all().strip()
 
     if not summary_text:
         _logger.warning("Received empty overflow summary")
@@ -44,22 +101,149 @@ def summarize_overflow( engine:Engine,
     return summary_text
 
 
+def merge_summaries(engine:Engine,
+                    summaries: list[str],
+                    deadline: Optional[Deadline] = None) -> str:
+    """
+    Merge consecutive summaries (oldest first) into a single, higher-level summary.
+    Each summary is truncated to its share of SUMMARY_INPUT_TOKENS. More than MAX_MERGE_FAN_IN
+    summaries would not fit with their minimum share: they are merged in groups first, in
+    parallel, and then the group summaries are merged (tree reduce).
+    """
+    if deadline is not None:
+        deadline.check("merging summaries")
+
+    if len(summaries) > MAX_MERGE_FAN_IN:
+        groups = [summaries[start:start + MAX_MERGE_FAN_IN] for start in range(0, len(summaries), MAX_MERGE_FAN_IN)]
+        _logger.info("Too many summaries to merge at once; merging %d summaries in %d groups", len(summaries), len(groups))
+        with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_SUMMARIES, len(groups)),
+                                thread_name_prefix="merge") as pool:
+            partials = list(pool.map(lambda group: group[0] if len(group) == 1 else merge_summaries(engine, group, deadline), groups))
+        partials = [summary for summary in partials if summary]
+        if len(partials) <= 1:
+            return partials[0] if partials else ""
+        return merge_summaries(engine, partials, deadline)
+
+    _logger.debug("Merging %d summaries", len(summaries))
+    share = max(SUMMARY_INPUT_TOKENS // max(len(summaries), 1), MIN_SHARE_TOKENS)
+    numbered = "\n\n".join(f"[{index + 1}]\n{truncate_middle(summary, share)}" for index, summary in enumerate(summaries))
+    messages = [ Message("system", MERGE_PROMPT),
+                 Message("user", f"Merge the following summaries into one:\n{numbered}") ]
+
+    context = SimpleContext(messages, request_class="summarize", deadline=deadline)
+    merged :str = engine.run_messages_stream(context).all().strip()
+
+    if not merged:
+        _logger.warning("Received empty merged summary")
+
+    return merged
 
 
 def collate_messages(overflow: list[Message]) -> Message:
     """
     Build a compact summary Message from overflow messages.
+    Each message is truncated to MESSAGE_TOKENS.
     """
-    summary_lines: list[str] = []
-    for message in overflow:
-        summary_lines.append(f"{message.role}: {message.content}")
-
-    summary = "\n".join(summary_lines)
+    summary = "\n".join(collate_lines(overflow))
     return Message(role="system", content=f"Conversation summary:\n{summary}")
 
 
+def collate_lines(overflow: list[Message],
+                  message_tokens: int = MESSAGE_TOKENS) -> list[str]:
+    """
+    Return one "role: content" line per message, each truncated to message_tokens (head and tail kept).
+    """
+    return [f"{message.role}: {truncate_middle(message.content, message_tokens)}" for message in overflow]
+
+
+def chunk_lines(lines: list[str], max_tokens: int) -> list[list[str]]:
+    """
+    Group consecutive lines into chunks of at most max_tokens (a longer line gets its own chunk).
+    """
+    chunks: list[list[str]] = []
+    current: list[str] = []
+    size = 0
+    for line in lines:
+        tokens = estimate_tokens(line)
+        if current and size + tokens > max_tokens:
+            chunks.append(current)
+            current = []
+            size = 0
+        current.append(line)
+        size += tokens
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+
+class Summarizer(ABC):
+    """
+    A summarization backend used when the chat history is trimmed.
+
+    Each subclass must define a unique NAME class attribute used to select it per session.
+    """
+    NAME :str
+
+    @abstractmethod
+    def summarize(self, engine:Engine, overflow:list[Message], deadline:Optional[Deadline]=None) -> str:
+        """
+        Summarize a block of trimmed messages.
+        Raises DeadlineExceeded if the deadline passes before the summary is ready.
+        """
+        pass
+
+    @abstractmethod
+    def merge(self, engine:Engine, summaries:list[str], deadline:Optional[Deadline]=None) -> str:
+        """
+        Merge consecutive summaries (oldest first) into a single summary.
+        """
+        pass
 
 
+class LLMSummarizer(Summarizer):
+    """
+    Summarize through the session engine.
+    """
+    NAME :str = "llm"
+
+    def summarize(self, engine:Engine, overflow:list[Message], deadline:Optional[Deadline]=None) -> str:
+        return summarize_overflow(engine, None, overflow, deadline)
 
+    def merge(self, engine:Engine, summaries:list[str], deadline:Optional[Deadline]=None) -> str:
+        return merge_summaries(engine, summaries, deadline)
 
 
+class FallbackSummarizer(Summarizer):
+    """
+    Use a primary summarizer and fall back to a second one when it fails or returns nothing
+    (including when it runs out of time: a local fallback keeps the turn within its deadline).
+    """
+    _primary  : Final[Summarizer]
+    _fallback : Final[Summarizer]
+
+    def __init__(self, name:str, primary:Summarizer, fallback:Summarizer) -> None:
+        self.NAME = name
+        self._primary = primary
+        self._fallback = fallback
+
+    def summarize(self, engine:Engine, overflow:list[Message], deadline:Optional[Deadline]=None) -> str:
+        try:
+            summary = self._primary.summarize(engine, overflow, deadline)
+            if summary:
+                return summary
+            _logger.warning("Summarizer '%s' returned an empty summary; using '%s'", self._primary.NAME, self._fallback.NAME)
+        except Exception as err:
+            _logger.warning("Summarizer '%s' failed; using '%s': %s", self._primary.NAME, self._fallback.NAME, err)
+        return self._fallback.summarize(engine, overflow, deadline)
+
+    def merge(self, engine:Engine, summaries:list[str], deadline:Optional[Deadline]=None) -> str:
+        try:
+            merged = self._primary.merge(engine, summaries, deadline)
+            if merged:
+                return merged
+            _logger.warning("Summarizer '%s' returned an empty merge; using '%s'", self._primary.NAME, self._fallback.NAME)
+        except Exception as err:
+            _logger.warning("Summarizer '%s' failed to merge; using '%s': %s", self._primary.NAME, self._fallback.NAME, err)
+        return self._fallback.merge(engine, summaries, deadline)
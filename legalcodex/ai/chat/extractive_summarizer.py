@@ -0,0 +1,255 @@
+"""
+Local extractive summarizer.
+
+Selects the most central sentences of the trimmed messages with TextRank over
+TF-IDF sentence vectors. No engine call is made, so summarization is fast, free
+and works without network access.
+Sentences carrying named entities, dates or case citations are favoured, and
+those references are listed at the end of the summary so they are never lost.
+"""
+from __future__ import annotations
+
+import logging
+import re
+from typing import TYPE_CHECKING, Final, Iterable, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+from ..._deadline import Deadline
+from ..engine import Engine
+from ..message import Message
+from ..tokens import truncate_middle
+from .chat_summarizer import Summarizer, MESSAGE_TOKENS
+
+_logger = logging.getLogger(__name__)
+
+
+MAX_SUMMARY_CHARS   :Final[int]   = 1500    # Soft limit on the selected sentences
+MIN_SENTENCES       :Final[int]   = 2       # Always keep at least this many sentences (if available)
+DAMPING             :Final[float] = 0.85    # TextRank damping factor
+MAX_ITERATIONS      :Final[int]   = 50
+TOLERANCE           :Final[float] = 1.0e-6
+REFERENCE_BOOST     :Final[float] = 0.5     # Score boost per entity, date or citation in a sentence
+MAX_REFERENCES      :Final[int]   = 20
+MAX_SENTENCES       :Final[int]   = 400     # Bounds the size of the similarity matrix
+
+
+_MONTHS :Final[str] = r"(?:January|February|March|April|May|June|July|August|September|October|November|December|" \
+                      r"Jan|Feb|Mar|Apr|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)\.?"
+
+_DATE_PATTERNS :Final[list[re.Pattern[str]]] = [
+    re.compile(r"\b\d{4}-\d{2}-\d{2}\b"),
+    re.compile(r"\b\d{1,2}/\d{1,2}/\d{2,4}\b"),
+    re.compile(rf"\b{_MONTHS}\s+\d{{1,2}}(?:st|nd|rd|th)?,?\s+\d{{4}}\b"),
+    re.compile(rf"\b\d{{1,2}}(?:st|nd|rd|th)?\s+{_MONTHS}\s+\d{{4}}\b"),
+]
+
+_PARTY :Final[str] = r"(?:[A-Z][\w'&.-]*)(?:\s+(?:of|the|and|&|[A-Z][\w'&.-]*))*"
+
+_CITATION_PATTERNS :Final[list[re.Pattern[str]]] = [
+    re.compile(rf"\b{_PARTY}\s+v\.?\s+{_PARTY}"),                               # Smith v. Jones
+    re.compile(r"\[\d{4}\]\s+\d*\s*[A-Z][A-Za-z.]*\s+\d+"),                     # [2019] UKSC 12
+    re.compile(r"\b\d{4}\s+[A-Z]{2,}[A-Za-z]*\s+\d+\b"),                        # 2019 SCC 65
+    re.compile(r"\b\d+\s+(?:U\.S\.|S\.\s?Ct\.|S\.C\.R\.|F\.\s?(?:2d|3d|4th)|F\.\s?Supp\.(?:\s?[23]d)?)\s+\d+"),
+    re.compile(r"§+\s*\d+[\w.()-]*"),                                           # § 1983
+    re.compile(r"\b(?:art|arts|s|ss|para|paras)\.\s*\d+[\w.()-]*"),             # art. 1457, s. 7
+]
+
+_ENTITY_PATTERN :Final[re.Pattern[str]] = re.compile(r"\b[A-Z][a-z]+(?:\s+(?:[A-Z][a-z]+|[A-Z]\.))+")
+
+_ABBREVIATIONS :Final[frozenset[str]] = frozenset({
+    "v", "vs", "no", "nos", "inc", "corp", "ltd", "co", "art", "arts", "s", "ss", "para", "paras",
+    "mr", "mrs", "ms", "dr", "st", "e.g", "i.e", "cf", "al", "u.s", "s.c.r", "f", "supp", "ct", "j",
+})
+
+_SENTENCE_END :Final[re.Pattern[str]] = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD         :Final[re.Pattern[str]] = re.compile(r"[a-z0-9]+")
+
+_STOP_WORDS :Final[frozenset[str]] = frozenset("""
+    a about above after again against all am an and any are as at be because been before being below
+    between both but by can could did do does doing down during each few for from further had has have
+    having he her here hers herself him himself his how i if in into is it its itself just me more most
+    my myself no nor not now of off on once only or other our ours ourselves out over own same she should
+    so some such than that the their theirs them themselves then there these they this those through to
+    too under until up very was we were what when where which while who whom why will with would you your
+    yours yourself yourselves please thanks thank ok okay yes
+""".split())
+
+
+class ExtractiveSummarizer(Summarizer):
+    """
+    Summarize locally by extracting the most representative sentences.
+    """
+    NAME :str = "extractive"
+
+    def summarize(self, engine:Engine, overflow:list[Message], deadline:Optional[Deadline]=None) -> str:
+        _logger.debug("Extractive summary of %d messages", len(overflow))
+        return extract_summary((message.role, message.content) for message in overflow)
+
+    def merge(self, engine:Engine, summaries:list[str], deadline:Optional[Deadline]=None) -> str:
+        _logger.debug("Extractive merge of %d summaries", len(summaries))
+        return extract_summary(("", summary) for summary in summaries)
+
+
+def extract_summary(texts:Iterable[tuple[str, str]],
+                    max_chars:int=MAX_SUMMARY_CHARS) -> str:
+    """
+    Build an extractive summary from (role, text) pairs, in their original order.
+    An empty role means the text is not attributed to a speaker.
+    """
+    sentences: list[tuple[str, str]] = []
+    for role, text in texts:
+        text = truncate_middle(text, MESSAGE_TOKENS)
+        sentences.extend((role, sentence) for sentence in split_sentences(text))
+
+    if len(sentences) > MAX_SENTENCES:
+        _logger.debug("Keeping the first and last %d of %d sentences", MAX_SENTENCES // 2, len(sentences))
+        sentences = sentences[:MAX_SENTENCES // 2] + sentences[-(MAX_SENTENCES // 2):]
+
+    if not sentences:
+        return ""
+
+    scores = _score_sentences([sentence for _, sentence in sentences])
+    selected = _select(sentences, scores, max_chars)
+
+    lines = [f"{role}: {sentence}" if role else sentence for role, sentence in selected]
+
+    references = _missing_references(sentences, selected)
+    if references:
+        lines.append("Key references: " + "; ".join(references))
+
+    return "\n".join(lines)
+
+
+def split_sentences(text:str) -> list[str]:
+    """
+    Split a text into sentences, without breaking on common legal abbreviations (e.g. "v.", "art.").
+    """
+    sentences: list[str] = []
+    pending = ""
+    for part in _SENTENCE_END.split(text):
+        part = part.strip()
+        if not part:
+            continue
+        pending = f"{pending} {part}" if pending else part
+        last_word = pending.rsplit(None, 1)[-1].rstrip(".").lower()
+        if pending.endswith(".") and last_word in _ABBREVIATIONS:
+            continue
+        sentences.append(pending)
+        pending = ""
+
+    if pending:
+        sentences.append(pending)
+    return sentences
+
+
+def find_references(text:str) -> list[str]:
+    """
+    Return the case citations, dates and named entities mentioned in a text.
+    """
+    found: list[str] = []
+    for pattern in (*_CITATION_PATTERNS, *_DATE_PATTERNS, _ENTITY_PATTERN):
+        for match in pattern.finditer(text):
+            value = match.group(0).strip()
+            if value and not any(value in existing for existing in found):
+                found.append(value)
+    return found
+
+
+def _score_sentences(sentences:list[str]) -> np.ndarray:
+    """
+    Score the sentences with TextRank over TF-IDF vectors, boosted by the references they carry.
+    """
+    import numpy as np      # Deferred: only the processes that summarize pay for numpy
+    count = len(sentences)
+    if count == 1:
+        return np.ones(1)
+
+    tokens = [_tokenize(sentence) for sentence in sentences]
+    vocabulary = {word: index for index, word in enumerate(sorted({word for words in tokens for word in words}))}
+
+    boost = np.array([1.0 + REFERENCE_BOOST * len(find_references(sentence)) for sentence in sentences])
+
+    if not vocabulary:
+        return boost
+
+    term_freq = np.zeros((count, len(vocabulary)))
+    for row, words in enumerate(tokens):
+        for word in words:
+            term_freq[row, vocabulary[word]] += 1.0
+        if words:
+            term_freq[row] /= len(words)
+
+    doc_freq = np.count_nonzero(term_freq, axis=0)
+    idf = np.log((1.0 + count) / (1.0 + doc_freq)) + 1.0
+    vectors = term_freq * idf
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0.0)
+
+    scores: np.ndarray = _text_rank(similarity) * boost
+    return scores
+
+
+def _text_rank(similarity:np.ndarray) -> np.ndarray:
+    """
+    Rank the sentences with a PageRank power iteration over the similarity graph.
+    """
+    import numpy as np
+    count = similarity.shape[0]
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    # Sentences with no similar sentence link uniformly to every sentence
+    transition = np.where(out_weight > 0,
+                          np.divide(similarity, out_weight, out=np.zeros_like(similarity), where=out_weight > 0),
+                          1.0 / count)
+
+    rank = np.full(count, 1.0 / count)
+    for _ in range(MAX_ITERATIONS):
+        updated: np.ndarray = (1.0 - DAMPING) / count + DAMPING * (transition.T @ rank)
+        if np.abs(updated - rank).sum() < TOLERANCE:
+            return updated
+        rank = updated
+    return rank
+
+
+def _select(sentences:list[tuple[str, str]],
+            scores:np.ndarray,
+            max_chars:int) -> list[tuple[str, str]]:
+    """
+    Pick the best scoring sentences within the character budget, returned in their original order.
+    """
+    import numpy as np
+    chosen: list[int] = []
+    length = 0
+    for index in np.argsort(-scores, kind="stable"):
+        size = len(sentences[index][1])
+        if len(chosen) >= MIN_SENTENCES and length + size > max_chars:
+            continue
+        chosen.append(int(index))
+        length += size
+        if length >= max_chars:
+            break
+
+    return [sentences[index] for index in sorted(chosen)]
+
+
+def _missing_references(sentences:list[tuple[str, str]],
+                        selected:list[tuple[str, str]]) -> list[str]:
+    """
+    Return the references of the dropped sentences that the selected sentences do not mention.
+    """
+    kept_text = " ".join(sentence for _, sentence in selected)
+    missing: list[str] = []
+    for _, sentence in sentences:
+        for reference in find_references(sentence):
+            if reference not in kept_text and reference not in missing:
+                missing.append(reference)
+    return missing[:MAX_REFERENCES]
+
+
+def _tokenize(sentence:str) -> list[str]:
+    return [word for word in _WORD.findall(sentence.lower()) if word not in _STOP_WORDS and not (len(word) == 1 and not word.isdigit())]
@@ -0,0 +1,140 @@
+"""
+Hierarchical summary of the trimmed conversation history.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Final, Optional
+
+from ...exceptions import LCValueError
+from ..._deadline import Deadline
+from ..engine import Engine
+from ..message import Message
+
+from .chat_summarizer import Summarizer
+
+_logger = logging.getLogger(__name__)
+
+
+DEFAULT_FANOUT :Final[int] = 4
+
+
+class SummaryHierarchy:
+    """
+    Multi-level summary of the messages trimmed from a chat history.
+
+    Level 0 holds one leaf summary per trimmed block of messages.
+    When a level holds `fanout` summaries, they are merged into a single summary
+    one level up. Each trim therefore only summarizes its own overflow, and older
+    content is re-compressed once per level instead of on every trim.
+
+    Summaries at higher levels are always older than the ones below them.
+    """
+    _levels : list[list[str]]   # _levels[0] are the leaf summaries; oldest first within a level
+    _fanout : Final[int]
+
+    def __init__(self,
+                 levels:Optional[list[list[str]]]=None,
+                 fanout:int=DEFAULT_FANOUT) -> None:
+        if fanout < 2:
+            raise LCValueError("fanout must be at least 2")
+        self._levels = [list(level) for level in levels] if levels else []
+        self._fanout = fanout
+
+    @classmethod
+    def from_legacy(cls, summary:str) -> SummaryHierarchy:
+        """
+        Build a hierarchy from a flat summary string (sessions saved before hierarchical summaries).
+        The flat summary is placed one level above the leaves, as it already compresses several blocks.
+        """
+        if not summary:
+            return cls()
+        return cls(levels=[[], [summary]])
+
+    @property
+    def levels(self) -> list[list[str]]:
+        """
+        Return a copy of the summary levels, leaves first.
+        """
+        return [list(level) for level in self._levels]
+
+    @property
+    def depth(self) -> int:
+        return len(self._levels)
+
+    def __bool__(self) -> bool:
+        return any(self._levels)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SummaryHierarchy):
+            return False
+        return self._prune(self._levels) == self._prune(other._levels)
+
+    def clear(self) -> None:
+        self._levels = []
+
+    def render(self) -> str:
+        """
+        Return the summaries as a single text, oldest (highest level) first.
+        Empty levels are skipped, so only the levels holding content reach the prompt.
+        """
+        parts: list[str] = []
+        for level in reversed(self._levels):
+            parts.extend(level)
+        return "\n\n".join(parts)
+
+    def add(self,
+            summarizer:Summarizer,
+            engine:Engine,
+            overflow:list[Message],
+            deadline:Optional[Deadline]=None) -> bool:
+        """
+        Summarize a trimmed block into a new leaf and merge full levels upward.
+        Returns False if the block produced an empty summary.
+        """
+        leaf = summarizer.summarize(engine, overflow, deadline)
+        if not leaf:
+            return False
+
+        self._level(0).append(leaf)
+        self._compact(summarizer, engine, deadline)
+        return True
+
+    def _compact(self, summarizer:Summarizer, engine:Engine, deadline:Optional[Deadline]=None) -> None:
+        """
+        Merge every level that has reached the fanout into the level above it.
+        A failed merge leaves the level untouched; it will be retried on the next trim.
+        """
+        depth = 0
+        while depth < len(self._levels):
+            level = self._levels[depth]
+            if len(level) >= self._fanout:
+                try:
+                    merged = summarizer.merge(engine, level, deadline)
+                except Exception as err:
+                    _logger.warning("Failed to merge summary level %d; will retry on next trim: %s", depth, err)
+                    return
+
+                if not merged:
+                    _logger.warning("Received empty merged summary for level %d", depth)
+                    return
+
+                _logger.debug("Merged %d summaries from level %d into level %d", len(level), depth, depth + 1)
+                self._levels[depth] = []
+                self._level(depth + 1).append(merged)
+            depth += 1
+
+    def _level(self, depth:int) -> list[str]:
+        while len(self._levels) <= depth:
+            self._levels.append([])
+        return self._levels[depth]
+
+    @staticmethod
+    def _prune(levels:list[list[str]]) -> list[list[str]]:
+        """
+        Remove trailing empty levels so equivalent hierarchies compare equal.
+        """
+        pruned = [list(level) for level in levels]
+        while pruned and not pruned[-1]:
+            pruned.pop()
+        return pruned
@@ -1,8 +1,9 @@
 from abc import ABC, abstractmethod
 import logging
-from typing import Iterable, Type, Iterator
+from typing import Iterable, Type, Iterator, Literal, Optional
 
 from .._types import JSON_DICT
+from .._deadline import Deadline
 from .message import Message
 
 _logger = logging.getLogger(__name__)
@@ -11,11 +12,16 @@ _logger = logging.getLogger(__name__)
 
 Context = Iterable[Message]
 
+# Kind of request a context represents. Engines may use it as a hint (e.g. to pick a model).
+RequestClass = Literal["chat", "trivial", "research", "summarize"]
+
 
 class BaseContext(ABC):
     """
     Abstract conversation context passed to engine implementations.
     """
+    request_class : RequestClass = "chat"
+    deadline      : Optional[Deadline] = None   # Time budget of the request, if any; engines should honour it
 
     @abstractmethod
     def get_messages(self)->Iterable[Message]:
@@ -37,8 +43,32 @@ class SimpleContext(BaseContext):
     """
     _messages: list[Message]
 
-    def __init__(self, messages: Iterable[Message]):
+    def __init__(self,
+                 messages: Iterable[Message],
+                 request_class: RequestClass = "chat",
+                 deadline: Optional[Deadline] = None):
         self._messages = list(messages)
+        self.request_class = request_class
+        self.deadline = deadline
 
     def get_messages(self) -> Iterable[Message]:
         return self._messages
+
+
+def get_deadline(context: Context) -> Optional[Deadline]:
+    """
+    Return the deadline carried by a context, if any.
+    """
+    if isinstance(context, BaseContext):
+        return context.deadline
+    return None
+
+
+def snapshot(context: Context) -> SimpleContext:
+    """
+    Return a copy of a context that can be iterated several times,
+    keeping its request class and deadline (used by engines that delegate to other engines).
+    """
+    if isinstance(context, BaseContext):
+        return SimpleContext(context, request_class=context.request_class, deadline=context.deadline)
+    return SimpleContext(context)
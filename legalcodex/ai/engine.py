@@ -4,8 +4,10 @@ Represent an abstract AI Engine API
 from __future__ import annotations
 
 import logging
+import math
 from dataclasses import dataclass
-from typing import Final, Literal, Iterable, get_args, cast, Optional, TypeVar, cast
+from types import MappingProxyType
+from typing import ClassVar, Final, Literal, Iterable, get_args, cast, Optional, TypeVar, cast, Mapping, Sequence, TYPE_CHECKING
 from abc import ABC, abstractmethod
 
 
@@ -17,31 +19,122 @@ from .context import Context
 from .stream import Stream
 from .engines._models import MODELS, DEFAULT_MODEL
 
+if TYPE_CHECKING:
+    from .batch import BatchResult, BatchProgress
+
 _logger = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True)
+class EngineKey:
+    """
+    Identifies an engine configuration: engines with the same key are interchangeable.
+    """
+    name: str
+    model: str
+    parameters: tuple[tuple[str, str], ...] = ()
+
+    @classmethod
+    def create(cls, name:str, model:str, parameters:Optional[Mapping[str, str]]=None) -> EngineKey:
+        return cls(name=name, model=model, parameters=tuple(sorted((parameters or {}).items())))
+
+
+@dataclass(frozen=True)
+class ClientParameter:
+    """
+    An engine parameter that HTTP clients may set.
+
+    Numbers are clamped to [minimum, maximum]. Other values must be one of `choices`, or,
+    with max_items > 1, a comma separated list of at most max_items of them.
+    """
+    kind:       Literal["int", "float", "choice"]
+    minimum:    float = 0.0
+    maximum:    float = 0.0
+    choices:    tuple[str, ...] = ()
+    max_items:  int = 1
+
+    @classmethod
+    def Int(cls, minimum:int, maximum:int) -> ClientParameter:
+        return cls("int", minimum, maximum)
+
+    @classmethod
+    def Float(cls, minimum:float, maximum:float) -> ClientParameter:
+        return cls("float", minimum, maximum)
+
+    @classmethod
+    def Choice(cls, choices:Iterable[str], max_items:int=1) -> ClientParameter:
+        return cls("choice", choices=tuple(choices), max_items=max_items)
+
+    def clean(self, name:str, raw:str) -> str:
+        """
+        Return the value to use for a value sent by a client; raise LCValueError if it is invalid.
+        """
+        if self.kind == "choice":
+            items = [item.strip() for item in raw.split(",")] if self.max_items > 1 else [raw.strip()]
+            if not items or len(items) > self.max_items:
+                raise LCValueError(f"Engine parameter '{name}' takes 1 to {self.max_items} values")
+            for item in items:
+                if item not in self.choices:
+                    raise LCValueError(f"Invalid value '{item}' for engine parameter '{name}'")
+            return ",".join(items)
+
+        try:
+            value = int(raw) if self.kind == "int" else float(raw)
+        except ValueError:
+            raise LCValueError(f"Engine parameter '{name}' must be a number, got '{raw}'") from None
+        if not math.isfinite(value):
+            raise LCValueError(f"Engine parameter '{name}' must be finite")
+        value = min(max(value, self.minimum), self.maximum)
+        return str(int(value)) if self.kind == "int" else str(value)
+
+
 class Engine(ABC):
     """
     An abstract AI engine interface.
 
     All specific engine implementations should inherit from this class and implement the run() method.
     They must also have a class attribute NAME which is used to identify the engine type.
+
+    Engine instances are shared by all the sessions using the same configuration
+    (see `_engine_pool.EnginePool`): their configuration is immutable, they must not
+    hold per-session state and they must be safe to use from several threads.
     """
     DEFAULT : Final[str] = "openai"
 
 
     NAME :str # Each subclass must define a unique NAME class attribute to identify the engine type.
 
-    _model  : Final[str]
+    # The parameters HTTP clients may set; the others are reserved to the server
+    CLIENT_PARAMETERS : ClassVar[Mapping[str, ClientParameter]] = {}
 
-    def __init__(self, model:Optional[str]=None)->None:
+    _model      : Final[str]
+    _parameters : Final[Mapping[str, str]]
+
+    def __init__(self,
+                 model:Optional[str]=None,
+                 parameters:Optional[Mapping[str, str]]=None)->None:
         """
         Initialize the Engine with the given configuration.
         """
         self._model = model or DEFAULT_MODEL
-        _logger.info(f"Engine: '{self.name}'")
-        _logger.info(f"Model:  '{self._model}'")
+        self._parameters = MappingProxyType(dict(parameters or {}))
+        _logger.info("Engine: '%s', model: '%s'", self.name, self._model)
 
 
+    @classmethod
+    def client_parameters(cls, parameters:Mapping[str, str])->dict[str, str]:
+        """
+        Return parameters sent by a client, checked against CLIENT_PARAMETERS and clamped.
+        Raise LCValueError for a parameter clients may not set or an invalid value.
+        """
+        cleaned: dict[str, str] = {}
+        for name, raw in parameters.items():
+            spec = cls.CLIENT_PARAMETERS.get(name, None)
+            if spec is None:
+                raise LCValueError(f"Engine '{cls.NAME}' does not accept the parameter '{name}'")
+            cleaned[name] = spec.clean(name, raw)
+        return cleaned
+
     @property
     def name(self)->str:
         """
@@ -53,6 +146,47 @@ class Engine(ABC):
     def model(self)->str:
         return self._model
 
+    @property
+    def parameters(self)->Mapping[str, str]:
+        """
+        Get the engine specific parameters (read-only).
+        """
+        return self._parameters
+
+    @property
+    def key(self)->EngineKey:
+        return EngineKey.create(self.name, self.model, self._parameters)
+
+    def _param_str(self, name:str, default:str)->str:
+        return self._parameters.get(name, default)
+
+    def _param_float(self, name:str, default:float)->float:
+        raw = self._parameters.get(name, None)
+        if raw is None:
+            return default
+        try:
+            return float(raw)
+        except ValueError:
+            raise LCValueError(f"Engine parameter '{name}' must be a number, got '{raw}'") from None
+
+    def _param_int(self, name:str, default:int)->int:
+        raw = self._parameters.get(name, None)
+        if raw is None:
+            return default
+        try:
+            return int(raw)
+        except ValueError:
+            raise LCValueError(f"Engine parameter '{name}' must be an integer, got '{raw}'") from None
+
+    def _param_list(self, name:str, default:list[str])->list[str]:
+        """
+        Return a comma separated parameter as a list of non-empty, stripped items.
+        """
+        raw = self._parameters.get(name, None)
+        if raw is None:
+            return list(default)
+        return [item.strip() for item in raw.split(",") if item.strip()]
+
     @abstractmethod
     def run_messages_stream(self, context:Context)->Stream:
         """
@@ -60,26 +194,46 @@ class Engine(ABC):
         """
         pass
 
+    def warm_up(self)->None:
+        """
+        Prepare the engine for its first request: create the provider client, open pooled
+        connections. Called in the background at server start; nothing to do by default.
+        """
+        pass
+
+    def run_batch(self,
+                  contexts:Sequence[Context],
+                  concurrency:Optional[int]=None,
+                  retries:Optional[int]=None,
+                  progress:Optional[BatchProgress]=None)->list[BatchResult]:
+        """
+        Run many contexts with bounded concurrency and retries; results are returned in order.
+        See `batch.run_batch`.
+        """
+        from .batch import run_batch, DEFAULT_CONCURRENCY, DEFAULT_RETRIES
+        return run_batch(self,
+                         contexts,
+                         concurrency=concurrency if concurrency is not None else DEFAULT_CONCURRENCY,
+                         retries=retries if retries is not None else DEFAULT_RETRIES,
+                         progress=progress)
+
     def serialize(self) -> EngineSchema:
         """
         Serialize the Engine instance to a JSON dictionary.
         """
-        return EngineSchema(name=self.name, model=self.model, parameters=None)
+        return EngineSchema(name=self.name,
+                            model=self.model,
+                            parameters=dict(self._parameters) if self._parameters else None)
 
     @staticmethod
     def deserialize(data: EngineSchema) -> Engine:
         """
         Deserialize an Engine instance from a JSON dictionary.
+        The shared instance for this configuration is returned.
         """
         try:
-            from .engines.mock_engine import MockEngine
-            from .engines.openai_engine import OpenAIEngine
-            engine_dict :dict[str, type[Engine]] = {
-                MockEngine.NAME: MockEngine,
-                OpenAIEngine.NAME: OpenAIEngine
-            }
-            engine_cls = engine_dict[data.name]
-            return engine_cls(model=data.model)
+            from ._engine_pool import EnginePool
+            return EnginePool().get(data.name, data.model, data.parameters)
 
 
         except Exception as e:
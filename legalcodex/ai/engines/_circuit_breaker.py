@@ -0,0 +1,142 @@
+"""
+Circuit breaker guarding calls to an engine.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Final, Literal, Optional
+
+_logger = logging.getLogger(__name__)
+
+
+BreakerState = Literal["closed", "open", "half_open"]
+
+WINDOW          :Final[int]   = 20      # Number of recent calls considered
+MIN_CALLS       :Final[int]   = 5       # Calls needed in the window before the breaker can open
+FAILURE_RATE    :Final[float] = 0.5     # Open when this fraction of the recent calls failed...
+SLOW_CALL_S     :Final[float] = 20.0    # ...or when calls slower than this...
+SLOW_CALL_RATE  :Final[float] = 0.8     # ...make up this fraction of the recent calls
+OPEN_S          :Final[float] = 30.0    # Time before an open breaker lets a probe through
+
+
+@dataclass(frozen=True)
+class BreakerConfig:
+    window:         int   = WINDOW
+    min_calls:      int   = MIN_CALLS
+    failure_rate:   float = FAILURE_RATE
+    slow_call_s:    float = SLOW_CALL_S
+    slow_call_rate: float = SLOW_CALL_RATE
+    open_s:         float = OPEN_S
+
+
+@dataclass(frozen=True)
+class Permit:
+    """
+    Admission of a call by CircuitBreaker.allow(); `probe` is set for the half-open probe.
+    """
+    probe: bool = False
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker driven by the error rate and latency of recent calls.
+
+        closed      calls go through; outcomes are recorded in a rolling window
+        open        calls are rejected until open_s has elapsed
+        half_open   a single probe call goes through; its outcome closes or re-opens the breaker
+
+    Only the outcome of the probe settles a half-open breaker: calls admitted before the
+    breaker opened may still finish, and their outcomes are then dropped.
+    """
+    def __init__(self, name:str, config:BreakerConfig=BreakerConfig()) -> None:
+        self.name = name
+        self._config = config
+        self._outcomes: deque[tuple[bool, bool]] = deque(maxlen=config.window)  # (failed, slow)
+        self._state: BreakerState = "closed"
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> BreakerState:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def allow(self) -> Optional[Permit]:
+        """
+        Return a permit if a call may go through, None otherwise. In half-open state, only one
+        probe is allowed at a time. The outcome of the call is recorded with the permit's `probe`.
+        """
+        with self._lock:
+            self._refresh()
+            if self._state == "closed":
+                return Permit()
+            if self._state == "half_open" and not self._probing:
+                self._probing = True
+                return Permit(probe=True)
+            return None
+
+    def record_success(self, latency_s:float, probe:bool=False) -> None:
+        slow = latency_s >= self._config.slow_call_s
+        with self._lock:
+            if probe:
+                if slow:
+                    self._open("slow probe")
+                else:
+                    _logger.info("Circuit '%s' closed after a successful probe", self.name)
+                    self._state = "closed"
+                    self._outcomes.clear()
+                self._probing = False
+                return
+            if self._state != "closed":
+                return      # Admitted before the breaker opened
+            self._outcomes.append((False, slow))
+            self._evaluate()
+
+    def record_failure(self, probe:bool=False) -> None:
+        with self._lock:
+            if probe:
+                self._probing = False
+                self._open("failed probe")
+                return
+            if self._state != "closed":
+                return      # Admitted before the breaker opened
+            self._outcomes.append((True, False))
+            self._evaluate()
+
+    def release(self) -> None:
+        """
+        Give back the probe of a call that ended without an outcome (e.g. it was interrupted),
+        so that the next call may probe.
+        """
+        with self._lock:
+            self._probing = False
+
+    def _evaluate(self) -> None:
+        calls = len(self._outcomes)
+        if self._state != "closed" or calls < self._config.min_calls:
+            return
+
+        failures = sum(1 for failed, _ in self._outcomes if failed)
+        slow = sum(1 for _, is_slow in self._outcomes if is_slow)
+        if failures / calls >= self._config.failure_rate:
+            self._open(f"{failures}/{calls} recent calls failed")
+        elif slow / calls >= self._config.slow_call_rate:
+            self._open(f"{slow}/{calls} recent calls were slow")
+
+    def _open(self, reason:str) -> None:
+        _logger.warning("Circuit '%s' opened: %s", self.name, reason)
+        self._state = "open"
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+
+    def _refresh(self) -> None:
+        if self._state == "open" and time.monotonic() - self._opened_at >= self._config.open_s:
+            _logger.info("Circuit '%s' half-open; probing", self.name)
+            self._state = "half_open"
+            self._probing = False
@@ -1,24 +1,54 @@
-from typing import Final
+from dataclasses import dataclass
+from typing import Final, Optional
 
-MODELS :Final[list[str]] = [
-    #                             Input     Cached input    Output
-    "gpt-5-nano",	            # $0.05	    $0.005	        $0.40
-    "gpt-5-mini",	            # $0.25	    $0.025	        $2.00
-    "gpt-5-codex",	            # $1.25	    $0.125	        $10.00
 
-    "gpt-5.1",	                # $1.25	    $0.125	        $10.00
-    "gpt-5.1-chat-latest",	    # $1.25	    $0.125	        $10.00
-    "gpt-5.1-codex-max",	    # $1.25	    $0.125	        $10.00
-    "gpt-5.1-codex",	        # $1.25	    $0.125	        $10.00
+@dataclass(frozen=True)
+class ModelPricing:
+    """
+    Price of a model in USD per million tokens.
+    """
+    input:          float
+    cached_input:   Optional[float]
+    output:         float
 
-    "gpt-5-chat-latest",	    # $1.25	    $0.125	        $10.00
+    def cost(self, prompt_tokens:int, completion_tokens:int) -> float:
+        """
+        Return the cost in USD of a request (cached input is not accounted for).
+        """
+        return (prompt_tokens * self.input + completion_tokens * self.output) / 1_000_000
 
-    "gpt-5.2",	                # $1.75	    $0.175	        $14.00
-    "gpt-5.2-chat-latest",	    # $1.75	    $0.175	        $14.00
-    "gpt-5.2-codex",	        # $1.75	    $0.175	        $14.00
 
-    "gpt-5-pro",	            # $15.00    	-	        $120.00
-    "gpt-5.2-pro",	            # $21.00    	-	        $168.00
-]
+MODEL_PRICING :Final[dict[str, ModelPricing]] = {
+    #                                           Input   Cached input    Output
+    "gpt-5-nano":           ModelPricing(       0.05,   0.005,          0.40),
+    "gpt-5-mini":           ModelPricing(       0.25,   0.025,          2.00),
+    "gpt-5-codex":          ModelPricing(       1.25,   0.125,          10.00),
+
+    "gpt-5.1":              ModelPricing(       1.25,   0.125,          10.00),
+    "gpt-5.1-chat-latest":  ModelPricing(       1.25,   0.125,          10.00),
+    "gpt-5.1-codex-max":    ModelPricing(       1.25,   0.125,          10.00),
+    "gpt-5.1-codex":        ModelPricing(       1.25,   0.125,          10.00),
+
+    "gpt-5-chat-latest":    ModelPricing(       1.25,   0.125,          10.00),
+
+    "gpt-5.2":              ModelPricing(       1.75,   0.175,          14.00),
+    "gpt-5.2-chat-latest":  ModelPricing(       1.75,   0.175,          14.00),
+    "gpt-5.2-codex":        ModelPricing(       1.75,   0.175,          14.00),
+
+    "gpt-5-pro":            ModelPricing(       15.00,  None,           120.00),
+    "gpt-5.2-pro":          ModelPricing(       21.00,  None,           168.00),
+}
+
+MODELS :Final[list[str]] = list(MODEL_PRICING)
 
 DEFAULT_MODEL :Final[str] = "gpt-5-nano"
+
+
+def estimate_cost(model:str, prompt_tokens:int, completion_tokens:int) -> float:
+    """
+    Return the cost in USD of a request, or 0.0 for a model without known pricing.
+    """
+    pricing = MODEL_PRICING.get(model, None)
+    if pricing is None:
+        return 0.0
+    return pricing.cost(prompt_tokens, completion_tokens)
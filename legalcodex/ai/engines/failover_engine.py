@@ -0,0 +1,152 @@
+"""
+Failover across an ordered chain of engines, each guarded by a circuit breaker.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Final, Optional, Iterator, Mapping
+
+from ...exceptions import LCException, LCValueError, DeadlineExceeded
+from ..engine import Engine, ClientParameter
+from ..context import Context, SimpleContext, snapshot
+from ..stream import Stream
+from ._circuit_breaker import CircuitBreaker, BreakerConfig, BreakerState
+from ._models import MODELS
+
+_logger = logging.getLogger(__name__)
+
+
+MAX_LINKS       :Final[int] = 4
+_LINK_ENGINES   :Final[tuple[str, ...]] = ("openai", "mock", "router", "hedged")
+
+
+class FailoverEngine(Engine):
+    """
+    Engine that sends each request to the first healthy engine of an ordered chain.
+
+    Every link of the chain has its own circuit breaker. While a breaker is open, its
+    engine is skipped without waiting for it to time out, and traffic goes to the next
+    link; after a cool down, a single probe request decides whether it is healthy again.
+
+    Parameters:
+        chain           comma separated engine names, optionally with a model
+                        (e.g. "openai,openai:gpt-5-mini,mock"); the session model is used otherwise
+        window, min_calls, failure_rate, slow_call_s, slow_call_rate, open_s
+                        circuit breaker settings (see _circuit_breaker)
+    """
+    NAME : str = "failover"
+
+    CLIENT_PARAMETERS = {
+        "chain":            ClientParameter.Choice((*_LINK_ENGINES, *(f"{name}:{model}" for name in _LINK_ENGINES for model in MODELS)),
+                                                   max_items=MAX_LINKS),
+        "window":           ClientParameter.Int(1, 1_000),
+        "min_calls":        ClientParameter.Int(1, 1_000),
+        "failure_rate":     ClientParameter.Float(0.0, 1.0),
+        "slow_call_s":      ClientParameter.Float(0.1, 600.0),
+        "slow_call_rate":   ClientParameter.Float(0.0, 1.0),
+        "open_s":           ClientParameter.Float(1.0, 3_600.0),
+    }
+
+    _links    : Final[list[tuple[str, str]]]
+    _breakers : Final[dict[tuple[str, str], CircuitBreaker]]
+
+    def __init__(self,
+                 model:Optional[str]=None,
+                 parameters:Optional[Mapping[str, str]]=None)->None:
+        super().__init__(model=model, parameters=parameters)
+
+        from .._engine_selector import ENGINES
+        self._links = []
+        for link in self._param_list("chain", [Engine.DEFAULT]):
+            name, _, link_model = link.partition(":")
+            name = name.strip()
+            if name == self.NAME or name not in ENGINES:
+                raise LCValueError(f"Invalid engine '{name}' in failover chain")
+            self._links.append((name, link_model.strip() or self.model))
+        if not self._links:
+            raise LCValueError("The failover chain is empty")
+
+        config = BreakerConfig(window=         self._param_int("window", BreakerConfig.window),
+                               min_calls=      self._param_int("min_calls", BreakerConfig.min_calls),
+                               failure_rate=   self._param_float("failure_rate", BreakerConfig.failure_rate),
+                               slow_call_s=    self._param_float("slow_call_s", BreakerConfig.slow_call_s),
+                               slow_call_rate= self._param_float("slow_call_rate", BreakerConfig.slow_call_rate),
+                               open_s=         self._param_float("open_s", BreakerConfig.open_s))
+        self._breakers = {link: CircuitBreaker(f"{link[0]}:{link[1]}", config) for link in self._links}
+
+    def run_messages_stream(self, context:Context)->Stream:
+        return _FailoverStream(self, snapshot(context))
+
+    def warm_up(self)->None:
+        from .._engine_selector import get_engine
+        for name, model in self._links:
+            get_engine(name, model).warm_up()
+
+    def breaker_states(self)->dict[str, BreakerState]:
+        """
+        Return the state of the circuit breaker of each link.
+        """
+        return {breaker.name: breaker.state for breaker in self._breakers.values()}
+
+    def links(self)->list[tuple[str, str, CircuitBreaker]]:
+        return [(name, model, self._breakers[(name, model)]) for name, model in self._links]
+
+
+class _FailoverStream(Stream):
+    def __init__(self, engine:FailoverEngine, context:SimpleContext)->None:
+        self._engine = engine
+        self._context = context
+        self._current: Optional[Stream] = None
+
+    def close(self)->None:
+        if self._current is not None:
+            self._current.close()
+
+    def __iter__(self)->Iterator[str]:
+        from .._engine_selector import get_engine
+
+        last_error: Optional[LCException] = None
+        for name, model, breaker in self._engine.links():
+            permit = breaker.allow()
+            if permit is None:
+                _logger.debug("Skipping '%s': circuit %s", breaker.name, breaker.state)
+                continue
+
+            produced = False
+            start = time.perf_counter()
+            try:
+                stream = get_engine(name, model).run_messages_stream(self._context)
+                self._current = stream
+                for chunk in stream:
+                    if not produced:
+                        produced = True
+                        breaker.record_success(time.perf_counter() - start, permit.probe)
+                    yield chunk
+            except DeadlineExceeded:
+                if not produced:
+                    breaker.record_failure(permit.probe)
+                raise   # No time left to try another engine
+            except LCException as err:
+                if not produced:
+                    breaker.record_failure(permit.probe)
+                    _logger.warning("Engine '%s' failed; failing over: %s", breaker.name, err)
+                    last_error = err
+                    continue
+                raise   # Part of the response was already returned
+            except Exception:
+                if not produced:
+                    breaker.record_failure(permit.probe)    # An unexpected error is a failure as well
+                raise
+            except BaseException:
+                if not produced and permit.probe:
+                    breaker.release()           # Interrupted (e.g. GeneratorExit): no outcome
+                raise
+
+            if not produced:
+                breaker.record_success(time.perf_counter() - start, permit.probe)
+            return
+
+        if last_error is not None:
+            raise last_error
+        raise LCException("The AI service is temporarily unavailable. Please try again later.")
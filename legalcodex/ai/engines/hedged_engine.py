@@ -0,0 +1,286 @@
+"""
+Hedged requests: cut the tail of the time to first token.
+"""
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Final, Optional, Iterator, Mapping, Literal, Union
+
+from ..._stats import RollingWindow
+from ...exceptions import LCException, LCValueError, DeadlineExceeded
+from ..engine import Engine, ClientParameter
+from ..context import Context, SimpleContext, snapshot
+from ..stream import Stream
+
+_logger = logging.getLogger(__name__)
+
+
+PERCENTILE      :Final[float] = 95.0    # Hedge when the first chunk is later than this percentile of the observed TTFT
+MIN_DELAY_MS    :Final[float] = 250.0
+MAX_DELAY_MS    :Final[float] = 10_000.0
+INITIAL_DELAY_MS:Final[float] = 3_000.0 # Hedge delay until enough TTFT samples are observed
+MIN_SAMPLES     :Final[int]   = 20
+WINDOW_SIZE     :Final[int]   = 500
+BUDGET          :Final[float] = 0.05    # At most this fraction of the requests are hedged...
+BURST           :Final[float] = 2.0     # ...with at most this many hedges in a burst
+
+
+@dataclass
+class HedgeStats:
+    requests:   int = 0
+    hedged:     int = 0     # Requests for which a duplicate was sent
+    hedge_wins: int = 0     # Requests answered by the duplicate
+    throttled:  int = 0     # Hedges skipped because the budget was exhausted
+
+
+class HedgedEngine(Engine):
+    """
+    Opt-in wrapper that sends a duplicate request when the first chunk is late.
+
+    If no chunk arrives within a percentile of the observed time to first chunk, the
+    same request is sent again; the first request to produce a chunk is streamed and
+    the other one is cancelled. A token bucket bounds the fraction of hedged requests.
+
+    Parameters (all optional):
+        engine          inner engine name (default: openai), used with the same model
+        percentile      TTFT percentile used as the hedge delay
+        min_delay_ms, max_delay_ms
+                        bounds of the hedge delay
+        initial_delay_ms
+                        hedge delay until min_samples TTFT samples are observed
+        min_samples     number of samples needed to use the percentile
+        budget          maximum fraction of the requests that are hedged
+    """
+    NAME : str = "hedged"
+
+    CLIENT_PARAMETERS = {
+        "engine":           ClientParameter.Choice(("openai", "mock", "failover")),
+        "percentile":       ClientParameter.Float(50.0, 99.9),
+        "min_delay_ms":     ClientParameter.Float(0.0, 60_000.0),
+        "max_delay_ms":     ClientParameter.Float(0.0, 600_000.0),
+        "initial_delay_ms": ClientParameter.Float(0.0, 600_000.0),
+        "min_samples":      ClientParameter.Int(1, WINDOW_SIZE),
+        "budget":           ClientParameter.Float(0.0, 0.5),
+    }
+
+    _inner : Final[str]
+
+    def __init__(self,
+                 model:Optional[str]=None,
+                 parameters:Optional[Mapping[str, str]]=None)->None:
+        super().__init__(model=model, parameters=parameters)
+        self._inner = self._param_str("engine", Engine.DEFAULT)
+        if self._inner == self.NAME:
+            raise LCValueError("The hedged engine cannot wrap itself")
+
+        self._percentile        = self._param_float("percentile", PERCENTILE)
+        self._min_delay_ms      = self._param_float("min_delay_ms", MIN_DELAY_MS)
+        self._max_delay_ms      = self._param_float("max_delay_ms", MAX_DELAY_MS)
+        self._initial_delay_ms  = self._param_float("initial_delay_ms", INITIAL_DELAY_MS)
+        self._min_samples       = self._param_int("min_samples", MIN_SAMPLES)
+        self._budget            = self._param_float("budget", BUDGET)
+
+        self._ttft = RollingWindow(WINDOW_SIZE)
+        self._tokens = BURST
+        self._stats = HedgeStats()
+        self._lock = threading.Lock()
+
+    @property
+    def inner(self)->Engine:
+        """
+        Return the shared inner engine.
+        """
+        from .._engine_selector import get_engine
+        return get_engine(self._inner, self.model)
+
+    def run_messages_stream(self, context:Context)->Stream:
+        return _HedgedStream(self, snapshot(context))
+
+    def warm_up(self)->None:
+        self.inner.warm_up()
+
+    def hedge_delay(self)->float:
+        """
+        Return the current hedge delay, in seconds.
+        """
+        if len(self._ttft) < self._min_samples:
+            delay_ms = self._initial_delay_ms
+        else:
+            delay_ms = (self._ttft.percentile(self._percentile) or 0.0) * 1000
+        return min(max(delay_ms, self._min_delay_ms), self._max_delay_ms) / 1000
+
+    def stats(self)->HedgeStats:
+        with self._lock:
+            return replace(self._stats)
+
+    def _start_request(self)->None:
+        with self._lock:
+            self._stats.requests += 1
+            self._tokens = min(self._tokens + self._budget, BURST)
+
+    def _try_hedge(self)->bool:
+        """
+        Take a hedge from the budget; returns False if the budget is exhausted.
+        """
+        with self._lock:
+            if self._tokens < 1.0:
+                self._stats.throttled += 1
+                return False
+            self._tokens -= 1.0
+            self._stats.hedged += 1
+            return True
+
+    def _record_first_chunk(self, ttft_s:float, hedge_won:bool)->None:
+        """
+        Record the time to first chunk of the first request. When a hedge won, the first
+        request had not answered yet: its TTFT is at least ttft_s, recorded as such so that
+        the hedges' own (shorter) TTFT does not pull the hedge delay down.
+        """
+        self._ttft.add(ttft_s)
+        if hedge_won:
+            with self._lock:
+                self._stats.hedge_wins += 1
+
+
+_EventKind = Literal["chunk", "end", "error"]
+
+
+class _Attempt(threading.Thread):
+    """
+    One request to the inner engine, pumped into a queue shared with the other attempts.
+    """
+    def __init__(self,
+                 index:int,
+                 engine:Engine,
+                 context:SimpleContext,
+                 events:queue.Queue[tuple[_Attempt, _EventKind, Union[str, Exception, None]]])->None:
+        super().__init__(name=f"hedge-{index}", daemon=True)
+        self.index = index
+        self.started_at = time.perf_counter()
+        self._engine = engine
+        self._context = context
+        self._events = events
+        self._stream: Optional[Stream] = None
+        self._cancelled = threading.Event()
+
+    def run(self)->None:
+        try:
+            self._stream = self._engine.run_messages_stream(self._context)
+            if self._cancelled.is_set():
+                self._stream.close()
+                return
+            for chunk in self._stream:
+                if self._cancelled.is_set():
+                    return
+                self._events.put((self, "chunk", chunk))
+            self._events.put((self, "end", None))
+        except Exception as err:
+            if not self._cancelled.is_set():
+                self._events.put((self, "error", err))
+
+    def cancel(self)->None:
+        self._cancelled.set()
+        stream = self._stream
+        if stream is not None:
+            stream.close()
+
+
+class _HedgedStream(Stream):
+    def __init__(self, engine:HedgedEngine, context:SimpleContext)->None:
+        self._engine = engine
+        self._context = context
+        self._attempts: list[_Attempt] = []
+
+    def close(self)->None:
+        for attempt in self._attempts:
+            attempt.cancel()
+
+    def __iter__(self)->Iterator[str]:
+        events: queue.Queue[tuple[_Attempt, _EventKind, Union[str, Exception, None]]] = queue.Queue()
+        inner = self._engine.inner
+        self._engine._start_request()
+
+        def launch()->None:
+            attempt = _Attempt(len(self._attempts), inner, self._context, events)
+            self._attempts.append(attempt)
+            attempt.start()
+
+        deadline = self._context.deadline
+        launch()
+        hedge_at: Optional[float] = time.perf_counter() + self._engine.hedge_delay()
+        failed = 0
+
+        def wait()->tuple[_Attempt, _EventKind, Union[str, Exception, None]]:
+            """
+            Wait for the next event, until the hedge delay (if pending) or the deadline (if any).
+            Raises queue.Empty when the hedge delay elapses.
+            """
+            timeout = None if hedge_at is None else max(hedge_at - time.perf_counter(), 0.0)
+            if deadline is None:
+                return events.get(timeout=timeout)
+            try:
+                return events.get(timeout=deadline.timeout(timeout))
+            except queue.Empty:
+                deadline.check("waiting for the AI service")
+                raise
+
+        try:
+            winner: Optional[_Attempt] = None
+            while winner is None:
+                try:
+                    attempt, kind, payload = wait()
+                except queue.Empty:
+                    if hedge_at is None:
+                        continue
+                    hedge_at = None
+                    if self._engine._try_hedge():
+                        _logger.info("No first chunk after %.0f ms; sending a hedged request",
+                                     (time.perf_counter() - self._attempts[0].started_at) * 1000)
+                        launch()
+                    continue
+
+                if kind == "error":
+                    failed += 1
+                    _logger.warning("Request %d failed: %s", attempt.index, payload)
+                    if failed == len(self._attempts):
+                        # Nothing left in flight: fail now rather than wait for a pending hedge
+                        raise _as_lc_exception(payload)
+                    continue
+
+                winner = attempt
+                self._engine._record_first_chunk(time.perf_counter() - self._attempts[0].started_at, attempt.index > 0)
+                for other in self._attempts:
+                    if other is not winner:
+                        other.cancel()
+
+                if kind == "end":
+                    return
+                assert isinstance(payload, str)
+                yield payload
+
+            while True:
+                try:
+                    attempt, kind, payload = wait()
+                except queue.Empty:
+                    continue
+                if attempt is not winner:
+                    continue
+                if kind == "end":
+                    return
+                if kind == "error":
+                    raise _as_lc_exception(payload)
+                assert isinstance(payload, str)
+                yield payload
+        finally:
+            self.close()
+
+
+def _as_lc_exception(error:Union[str, Exception, None])->LCException:
+    if isinstance(error, LCException):
+        return error
+    _logger.error("Hedged request failed: %s", error)
+    return LCException("The AI request failed. Please try again.")
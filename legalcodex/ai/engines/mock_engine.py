@@ -1,30 +1,160 @@
 from __future__ import annotations
-from typing import Final, Optional, Iterator
+from dataclasses import dataclass, replace
+from typing import Final, Optional, Iterator, Mapping, Literal
 import logging
+import math
+import random
+import threading
 
-from ..engine import Engine
-from ..context import Context
-from ..stream import Stream
+from ...exceptions import LCException, LCValueError, QuotaExceeded, DeadlineExceeded
+from ..._deadline import Deadline
+from ..engine import Engine, ClientParameter
+from ..context import Context, get_deadline
+from ..stream import Stream, MeteredStream
+from ..tokens import estimate_messages_tokens
 from ._models import DEFAULT_MODEL
 
 
 _logger = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True)
+class SimulationConfig:
+    """
+    Latency, throughput and failure model of a simulated provider.
+    """
+    ttft_ms:            float = 600.0   # Median time to first token
+    ttft_sigma:         float = 0.5     # Spread of the (log-normal) time to first token
+    tokens_per_s:       float = 60.0    # Generation throughput after the first token
+    chunk_tokens:       int   = 1       # Tokens per streamed chunk
+    jitter:             float = 0.3     # Relative random variation of each inter-chunk delay
+    response_tokens:    int   = 250     # Median response length
+    error_rate:         float = 0.0     # Fraction of the requests failing with an error
+    rate_limit_rate:    float = 0.0     # Fraction of the requests rejected as over quota (429)
+    seed:               Optional[int] = None
+
+
+PROFILES :Final[dict[str, SimulationConfig]] = {
+    "fast":         SimulationConfig(ttft_ms=50.0, ttft_sigma=0.2, tokens_per_s=500.0, response_tokens=150, jitter=0.1),
+    "realistic":    SimulationConfig(),
+    "slow":         SimulationConfig(ttft_ms=3000.0, ttft_sigma=0.6, tokens_per_s=15.0, response_tokens=400),
+    "flaky":        SimulationConfig(error_rate=0.1, rate_limit_rate=0.05),
+}
+
+_SIMULATION_PARAMETERS :Final[tuple[str, ...]] = ("profile", *SimulationConfig.__dataclass_fields__)
+
+_SENTENCES :Final[tuple[str, ...]] = (
+    "Under the applicable legislation, the employer must give reasonable notice before changing the terms of employment.",
+    "The court will generally look at the intention of the parties as expressed in the written agreement.",
+    "A limitation period of three years usually applies, starting from the day the damage became known.",
+    "You should keep copies of every letter, email and payslip related to the dispute.",
+    "The tenant may ask the tribunal to order the landlord to carry out the necessary repairs.",
+    "In Smith v. Jones, the court held that a verbal promise could not vary a written lease.",
+    "Section 7 of the act protects the confidentiality of the information you provided.",
+    "This is general information and not legal advice; a lawyer can review the specific facts of your case.",
+    "The burden of proof rests on the party making the claim, on a balance of probabilities.",
+    "Mediation is often faster and less expensive than going to court.",
+    "A non-competition clause must be limited in time, territory and the type of activity it covers.",
+    "The contract may be cancelled if consent was obtained through fraud, threats or a serious error.",
+    "Damages are meant to compensate the actual loss, not to punish the other party.",
+    "Before filing a claim, a formal demand letter is usually sent to the other party.",
+    "The deadline to appeal the decision is thirty days from the date it was received.",
+)
+
+
+@dataclass(frozen=True)
+class SimulatedResponse:
+    """
+    A planned response: what to stream and when.
+    """
+    ttft_s:             float
+    chunks:             list[str]
+    delays_s:           list[float]     # Delay before each chunk after the first
+    failure:            Optional[Literal["error", "rate_limit"]]
+    prompt_tokens:      int
+    completion_tokens:  int
+
+
+class Simulator:
+    """
+    Plan simulated responses. Thread-safe; with a seed, the sequence of planned responses is reproducible.
+    """
+    def __init__(self, config:SimulationConfig) -> None:
+        self.config = config
+        self._random = random.Random(config.seed)
+        self._lock = threading.Lock()
+
+    def respond(self, prompt_tokens:int) -> SimulatedResponse:
+        config = self.config
+        with self._lock:
+            rng = self._random
+            roll = rng.random()
+            ttft_s = config.ttft_ms / 1000 * math.exp(rng.gauss(0.0, config.ttft_sigma))
+            if roll < config.rate_limit_rate:
+                return SimulatedResponse(ttft_s, [], [], "rate_limit", prompt_tokens, 0)
+            if roll < config.rate_limit_rate + config.error_rate:
+                return SimulatedResponse(ttft_s, [], [], "error", prompt_tokens, 0)
+
+            target = max(1, round(config.response_tokens * math.exp(rng.gauss(0.0, 0.4))))
+            words: list[str] = []
+            while len(words) < target:
+                words.extend(rng.choice(_SENTENCES).split())
+            words = words[:target]
+
+            size = max(config.chunk_tokens, 1)
+            chunks = [" ".join(words[i:i + size]) + " " for i in range(0, len(words), size)]
+            chunks[-1] = chunks[-1].rstrip()
+            base = size / config.tokens_per_s if config.tokens_per_s > 0 else 0.0
+            delays = [max(base * (1.0 + rng.uniform(-config.jitter, config.jitter)), 0.0) for _ in chunks[1:]]
+
+        return SimulatedResponse(ttft_s, chunks, delays, None, prompt_tokens, len(words))
+
+
 class MockEngine(Engine):
     """
     A mock engine for testing purposes.
+
+    By default, the response is a counter ("0", "1", ...) returned at once.
+    With simulation parameters, responses of realistic length are streamed with a
+    simulated latency, throughput and failure rate, for local load tests:
+
+        profile             fast, realistic, slow or flaky (defaults for the other parameters)
+        ttft_ms, ttft_sigma, tokens_per_s, chunk_tokens, jitter, response_tokens,
+        error_rate, rate_limit_rate, seed
+                            see SimulationConfig
     """
     NAME : str  = "mock"
 
+    CLIENT_PARAMETERS = {
+        "profile":          ClientParameter.Choice(PROFILES),
+        "ttft_ms":          ClientParameter.Float(0.0, 30_000.0),
+        "ttft_sigma":       ClientParameter.Float(0.0, 2.0),
+        "tokens_per_s":     ClientParameter.Float(1.0, 10_000.0),
+        "chunk_tokens":     ClientParameter.Int(1, 100),
+        "jitter":           ClientParameter.Float(0.0, 1.0),
+        "response_tokens":  ClientParameter.Int(1, 4_000),
+        "error_rate":       ClientParameter.Float(0.0, 1.0),
+        "rate_limit_rate":  ClientParameter.Float(0.0, 1.0),
+        "seed":             ClientParameter.Int(0, 2**31 - 1),
+    }
+
     _count:int = 0
 
-    def __init__(self, model:str=DEFAULT_MODEL)->None:
-        super().__init__(model=model)
+    def __init__(self,
+                 model:str=DEFAULT_MODEL,
+                 parameters:Optional[Mapping[str, str]]=None)->None:
+        super().__init__(model=model, parameters=parameters)
+        self._lock = threading.Lock()
+        self._simulator = self._get_simulator()
 
     @property
     def count(self)->int:
         return self._count
 
+    @property
+    def simulator(self)->Optional[Simulator]:
+        return self._simulator
+
     def run_messages_stream(self, context:Context)->Stream:
         """
         Return a deterministic response based
@@ -32,10 +162,37 @@ class MockEngine(Engine):
         """
         ctx = list(context)
         _logger.debug("MockEngine received context with %d messages", len(ctx))
-        response = str(self._count)
-        self._count += 1
+        with self._lock:
+            response = str(self._count)
+            self._count += 1
+        if self._simulator is not None:
+            simulated = SimulatedStream(self._simulator.respond(estimate_messages_tokens(ctx)), get_deadline(context))
+            return MeteredStream(simulated, self.NAME, self.model)
         return _TextStream(response)
 
+    def _get_simulator(self)->Optional[Simulator]:
+        if not any(name in self.parameters for name in _SIMULATION_PARAMETERS):
+            return None
+
+        profile = self._param_str("profile", "realistic")
+        if profile not in PROFILES:
+            raise LCValueError(f"Unknown simulation profile '{profile}'; expected one of {', '.join(PROFILES)}")
+        base = PROFILES[profile]
+
+        seed = self.parameters.get("seed", None)
+        config = replace(base,
+                         ttft_ms=           self._param_float("ttft_ms", base.ttft_ms),
+                         ttft_sigma=        self._param_float("ttft_sigma", base.ttft_sigma),
+                         tokens_per_s=      self._param_float("tokens_per_s", base.tokens_per_s),
+                         chunk_tokens=      self._param_int("chunk_tokens", base.chunk_tokens),
+                         jitter=            self._param_float("jitter", base.jitter),
+                         response_tokens=   self._param_int("response_tokens", base.response_tokens),
+                         error_rate=        self._param_float("error_rate", base.error_rate),
+                         rate_limit_rate=   self._param_float("rate_limit_rate", base.rate_limit_rate),
+                         seed=              self._param_int("seed", 0) if seed is not None else base.seed)
+        _logger.info("MockEngine simulation: %s", config)
+        return Simulator(config)
+
 
 class _TextStream(Stream):
     def __init__(self, text:str)->None:
@@ -44,3 +201,39 @@ class _TextStream(Stream):
     def __iter__(self)->Iterator[str]:
         yield self._text
 
+
+class SimulatedStream(Stream):
+    """
+    Stream a simulated response in real time. Waits are cut short by close() and by the deadline.
+    """
+    def __init__(self, response:SimulatedResponse, deadline:Optional[Deadline]=None)->None:
+        self._response = response
+        self._deadline = deadline
+        self._closed = threading.Event()
+
+    def __iter__(self)->Iterator[str]:
+        response = self._response
+        if not self._wait(response.ttft_s):
+            return
+        if response.failure == "rate_limit":
+            raise QuotaExceeded()
+        if response.failure == "error":
+            raise LCException("The AI request failed. Please try again.")
+
+        for index, chunk in enumerate(response.chunks):
+            if index > 0 and not self._wait(response.delays_s[index - 1]):
+                return
+            yield chunk
+
+    def close(self)->None:
+        self._closed.set()
+
+    def _wait(self, seconds:float)->bool:
+        """
+        Wait for the given time; returns False if the stream was closed meanwhile.
+        """
+        if self._deadline is not None and seconds >= self._deadline.remaining():
+            if self._closed.wait(self._deadline.remaining()):
+                return False
+            raise DeadlineExceeded("waiting for the AI service")
+        return not self._closed.wait(seconds)
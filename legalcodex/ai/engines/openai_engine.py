@@ -6,67 +6,121 @@ import os
 import sys
 import json
 import logging
+import threading
+import time
 from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Final, Optional, Iterator, cast, Generator
+from typing import Final, Optional, Iterator, cast, Generator, Mapping, Any, Union
 
-from openai import OpenAI, RateLimitError
+from openai import APIStatusError, OpenAI, RateLimitError
 
 from openai.types.chat.chat_completion import ChatCompletion
-from openai.types.chat import ChatCompletionMessageParam
+from openai.types.chat import ChatCompletionMessageParam, ChatCompletionChunk
 
-from ...exceptions import LCException, QuotaExceeded
-from ..._misc import log_timer
-from ..._environ import LC_API_KEY
+from ...exceptions import LCException, QuotaExceeded, DeadlineExceeded
+from ..._environ import LC_API_KEY, LC_OPENAI_BASE_URL
+from ..._deadline import Deadline
 
 from ..engine import Engine
-from ..context import Context
+from ..context import Context, get_deadline
 from ..message import Message
-from ..stream import Stream
+from ..stream import Stream, MeteredStream, ENGINE_REQUESTS
 
 _logger = logging.getLogger(__name__)
 
+WARM_UP_TIMEOUT_S :Final[float] = 10.0
+
 class OpenAIEngine(Engine):
     """
-    An abstract AI engine interface.
+    Engine backed by the OpenAI chat completions API.
+
+    The instance is shared by all the sessions using the same model, so the OpenAI
+    client (and its connection pool) and the token counter are shared as well.
+
+    The client is sent the server's API key, so where it connects is never taken from the
+    engine parameters (which HTTP clients choose): it is the `base_url` constructor argument
+    (benchmarks, tests), else LC_OPENAI_BASE_URL, else the OpenAI API. `max_retries` sets the
+    retries of the client on connection errors, 429 and 5xx responses.
     """
     NAME : str  = "openai"
 
-    #typing only
-    _client         : Optional[OpenAI] = None
-    _token_counter  : Optional[TokenCounter] = None
+    _client         : Optional[OpenAI]
+    _token_counter  : Final[TokenCounter]
+
+    def __init__(self,
+                 model:Optional[str]=None,
+                 parameters:Optional[Mapping[str, str]]=None,
+                 base_url:Optional[str]=None,
+                 max_retries:Optional[int]=None)->None:
+        super().__init__(model=model, parameters=parameters)
+        self._base_url = base_url
+        self._max_retries = max_retries
+        self._client = None
+        self._token_counter = TokenCounter()
+        self._lock = threading.Lock()
 
     @property
     def client(self)->OpenAI:
         """
         Get the OpenAI client, initializing it if necessary.
         """
-        if self._client is None:
-            api_key:str = _get_api_key()
-            self._client = OpenAI(api_key=api_key)
-        return self._client
+        client = self._client
+        if client is None:
+            with self._lock:
+                if self._client is None:
+                    base_url = self._base_url or os.environ.get(LC_OPENAI_BASE_URL, "")
+                    options: dict[str, Any] = {}
+                    if base_url:
+                        _logger.info("Using OpenAI compatible API at %s", base_url)
+                        options["base_url"] = base_url
+                    if self._max_retries is not None:
+                        options["max_retries"] = self._max_retries
+                    api_key:str = _get_api_key(required=not base_url)
+                    self._client = OpenAI(api_key=api_key, **options)
+                client = self._client
+        return client
 
 
     def run_messages_stream(self, context: Context) -> Stream:
-        with _handle_exceptions():
+        deadline = get_deadline(context)
+        with _handle_exceptions(deadline):
             messages = _context_to_messages(context)
 
-            with log_timer("OpenAI streaming response"):
+            options: dict[str, Any] = {}
+            if deadline is not None:
+                deadline.check("calling the AI service")
+                options["timeout"] = deadline.remaining()
+
+            start_ns = time.perf_counter_ns()
+            try:
                 stream = cast(
                     Iterator[object],
                     self.client.chat.completions.create(
                         model=self.model,
                         messages=messages,
                         stream=True,
+                        stream_options={"include_usage": True},
+                        **options,
                     ),
                 )
-            #self.token_counter.add_tokens(stream) # type: ignore
-            return _OpenAIStream(stream, self.token_counter)
+            except Exception:
+                ENGINE_REQUESTS.inc(engine=self.NAME, model=self.model, outcome="error")
+                raise
+            return MeteredStream(_OpenAIStream(stream, self.token_counter, deadline), self.NAME, self.model, start_ns)
+
+    def warm_up(self)->None:
+        """
+        Create the client and open a pooled connection (TCP and TLS) with a cheap request.
+        """
+        client = self.client.with_options(timeout=WARM_UP_TIMEOUT_S, max_retries=0)   # Shares the connection pool
+        try:
+            client.models.list()
+        except APIStatusError as err:
+            # Any HTTP answer means the connection is open (a stand-in server may not list models)
+            _logger.debug("Warm-up request answered %s", err.status_code)
 
     @property
     def token_counter(self)->TokenCounter:
-        if self._token_counter is None:
-            self._token_counter = TokenCounter()
         return self._token_counter
 
 def _context_to_messages(context:Context)->list[ChatCompletionMessageParam]:
@@ -89,13 +143,25 @@ def _message(message:Message)->ChatCompletionMessageParam:
 
 
 class _OpenAIStream(Stream):
-    def __init__(self, stream: Iterator[object], token_counter: TokenCounter)->None:
+    def __init__(self,
+                 stream: Iterator[object],
+                 token_counter: TokenCounter,
+                 deadline: Optional[Deadline] = None)->None:
         self._stream = stream
         self._token_counter = token_counter
+        self._deadline = deadline
 
     def __iter__(self)->Iterator[str]:
-        with _handle_exceptions():
+        with _handle_exceptions(self._deadline):
             for chunk in self._stream:
+                if self._deadline is not None and self._deadline.expired:
+                    self.close()
+                    self._deadline.check("streaming the response")
+
+                if getattr(chunk, "usage", None) is not None:
+                    # Sent in the last chunk, thanks to stream_options.include_usage
+                    self._token_counter.add_tokens(cast(ChatCompletionChunk, chunk))
+
                 choices = getattr(chunk, "choices", None)
                 if not choices:
                     continue
@@ -107,19 +173,33 @@ class _OpenAIStream(Stream):
                 content = getattr(delta, "content", None)
                 if content:
                     yield content
-        self._token_counter.add_tokens(self._stream) # type: ignore
+
+    def close(self)->None:
+        close = getattr(self._stream, "close", None)
+        if close is not None:
+            try:
+                close()
+            except Exception as err:
+                _logger.debug("Failed to close OpenAI stream: %s", err)
 
 class TokenCounter:
+    """
+    Thread-safe aggregate of the token usage of all the requests made through an engine.
+    """
     def __init__(self) -> None:
         self.total = TokenCount()
+        self._lock = threading.Lock()
 
-    def add_tokens(self, response:ChatCompletion) -> None:
+    def add_tokens(self, response:Union[ChatCompletion, ChatCompletionChunk]) -> None:
         count = _token_count(response)
-        self.total += count
+        with self._lock:
+            self.total += count
         count.log_usage(logging.DEBUG)
 
     def log_usage(self, log_level:int) -> None:
-        self.total.log_usage(log_level)
+        with self._lock:
+            total = self.total
+        total.log_usage(log_level)
 
 
 
@@ -143,7 +223,7 @@ class TokenCount:
         _logger.log(log_level,f"  Completion: {self.completion_tokens}")
         _logger.log(log_level,f"  Total:      {self.total_tokens}")
 
-def _token_count(response:ChatCompletion)->TokenCount:
+def _token_count(response:Union[ChatCompletion, ChatCompletionChunk])->TokenCount:
     usage = getattr(response, "usage", None)
     if usage is None:
         return TokenCount()
@@ -155,7 +235,7 @@ def _token_count(response:ChatCompletion)->TokenCount:
     )
 
 @contextmanager
-def _handle_exceptions()->Generator[None, None, None]:
+def _handle_exceptions(deadline:Optional[Deadline]=None)->Generator[None, None, None]:
     try:
         yield
     except RateLimitError:
@@ -164,13 +244,21 @@ def _handle_exceptions()->Generator[None, None, None]:
     except LCException:
         raise
     except Exception as e:
+        if deadline is not None and deadline.expired:
+            _logger.warning("OpenAI request timed out: %s", e)
+            raise DeadlineExceeded("waiting for the AI service") from e
         _logger.exception("OpenAI request failed")
         raise LCException("The AI request failed. Please try again.") from e
 
 
 
-def _get_api_key()-> str:
+def _get_api_key(required:bool=True)-> str:
+    """
+    Return the API key. A key is not required by a local OpenAI compatible server.
+    """
     key = os.environ.get(LC_API_KEY, None)
+    if key is None and not required:
+        return "not-needed"
     if key is None:
         if sys.platform == "win32" and os.path.exists("config.json"):
             #Only during development, not secure for production
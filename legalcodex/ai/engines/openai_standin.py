@@ -0,0 +1,221 @@
+"""
+Local stand-in for the OpenAI chat completions API, for offline end-to-end benchmarks.
+
+Speaks the chat completions wire format (JSON and server-sent events streaming, usage
+payloads, 429/500 error responses) over HTTP/1.1 keep-alive, with the latency, throughput
+and failure model of the MockEngine simulation. Point OpenAIEngine at it with the
+LC_OPENAI_BASE_URL environment variable (or its `base_url` constructor argument).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Final, Optional
+
+from ..tokens import estimate_tokens
+from .mock_engine import Simulator, SimulatedResponse
+
+_logger = logging.getLogger(__name__)
+
+
+COMPLETIONS_PATHS :Final[tuple[str, ...]] = ("/v1/chat/completions", "/chat/completions")
+RETRY_AFTER_S     :Final[int] = 1
+
+
+@dataclass
+class StandinStats:
+    connections:    int = 0
+    requests:       int = 0
+    rate_limited:   int = 0
+    errors:         int = 0
+    disconnects:    int = 0     # Clients that went away before the end of the response
+
+
+class OpenAIStandin:
+    """
+    Stand-in server. Use as a context manager, or call start() and stop().
+    """
+    def __init__(self, simulator:Simulator, host:str="127.0.0.1", port:int=0) -> None:
+        self._simulator = simulator
+        self._stats = StandinStats()
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _Handler, self)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}/v1"
+
+    def stats(self) -> StandinStats:
+        with self._lock:
+            return replace(self._stats)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._server.serve_forever, name="openai-standin", daemon=True)
+        self._thread.start()
+        _logger.info("OpenAI stand-in listening on %s", self.base_url)
+
+    def serve_forever(self) -> None:
+        _logger.info("OpenAI stand-in listening on %s", self.base_url)
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> OpenAIStandin:
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info:Any) -> None:
+        self.stop()
+
+    def _count(self, **increments:int) -> None:
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self._stats, name, getattr(self._stats, name) + value)
+
+    def _respond(self, messages:list[Any]) -> SimulatedResponse:
+        prompt = "\n".join(str(message.get("content", "")) for message in messages if isinstance(message, dict))
+        return self._simulator.respond(estimate_tokens(prompt))
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address:tuple[str, int], handler:type[_Handler], standin:OpenAIStandin) -> None:
+        super().__init__(address, handler)
+        self.standin = standin
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # Keep-alive, so client connection reuse can be measured
+    server: _Server
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.standin._count(connections=1)
+
+    def log_message(self, format:str, *args:Any) -> None:
+        _logger.debug("%s - %s", self.address_string(), format % args)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", "0"))
+        body = self.rfile.read(length)
+        if self.path not in COMPLETIONS_PATHS:
+            self._send_error(404, "not_found", f"Unknown path {self.path}")
+            return
+        try:
+            request = json.loads(body)
+            messages = request["messages"]
+            model = str(request.get("model", "gpt-5-mini"))
+        except (ValueError, KeyError, TypeError) as err:
+            self._send_error(400, "invalid_request_error", f"Invalid request: {err}")
+            return
+
+        standin = self.server.standin
+        standin._count(requests=1)
+        response = standin._respond(messages)
+
+        try:
+            if response.failure is not None:
+                time.sleep(response.ttft_s)
+                if response.failure == "rate_limit":
+                    standin._count(rate_limited=1)
+                    self._send_error(429, "rate_limit_exceeded", "Rate limit reached (simulated)",
+                                     {"Retry-After": str(RETRY_AFTER_S)})
+                else:
+                    standin._count(errors=1)
+                    self._send_error(500, "server_error", "The server had an error (simulated)")
+            elif request.get("stream"):
+                include_usage = bool((request.get("stream_options") or {}).get("include_usage"))
+                self._stream(model, response, include_usage)
+            else:
+                time.sleep(response.ttft_s + sum(response.delays_s))
+                self._send_json(200, _completion(model, response))
+        except (BrokenPipeError, ConnectionResetError):
+            standin._count(disconnects=1)
+            self.close_connection = True
+
+    def _stream(self, model:str, response:SimulatedResponse, include_usage:bool) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+
+        def event(delta:dict[str, Any], finish_reason:Optional[str]=None) -> None:
+            self._write_event(_chunk(completion_id, created, model, [{"index": 0,
+                                                                      "delta": delta,
+                                                                      "finish_reason": finish_reason}]))
+
+        time.sleep(response.ttft_s)
+        event({"role": "assistant", "content": ""})
+        for index, content in enumerate(response.chunks):
+            if index > 0:
+                time.sleep(response.delays_s[index - 1])
+            event({"content": content})
+        event({}, "stop")
+        if include_usage:
+            usage_chunk = _chunk(completion_id, created, model, [])
+            usage_chunk["usage"] = _usage(response)
+            self._write_event(usage_chunk)
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def _write_event(self, payload:dict[str, Any]) -> None:
+        self._write_chunk(b"data: " + json.dumps(payload).encode("utf-8") + b"\n\n")
+
+    def _write_chunk(self, data:bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status:int, payload:dict[str, Any], headers:Optional[dict[str, str]]=None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status:int, code:str, message:str, headers:Optional[dict[str, str]]=None) -> None:
+        self._send_json(status, {"error": {"message": message, "type": code, "param": None, "code": code}}, headers)
+
+
+def _chunk(completion_id:str, created:int, model:str, choices:list[dict[str, Any]]) -> dict[str, Any]:
+    return {"id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": choices}
+
+
+def _completion(model:str, response:SimulatedResponse) -> dict[str, Any]:
+    return {"id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0,
+                         "message": {"role": "assistant", "content": "".join(response.chunks)},
+                         "finish_reason": "stop"}],
+            "usage": _usage(response)}
+
+
+def _usage(response:SimulatedResponse) -> dict[str, int]:
+    return {"prompt_tokens": response.prompt_tokens,
+            "completion_tokens": response.completion_tokens,
+            "total_tokens": response.prompt_tokens + response.completion_tokens}
@@ -0,0 +1,263 @@
+"""
+Cost- and latency-aware model router.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Final, Optional, Iterator, Mapping, get_args
+
+from ...exceptions import LCException, LCValueError, DeadlineExceeded
+from ..engine import Engine, ClientParameter
+from ..context import Context, BaseContext, SimpleContext, RequestClass, snapshot
+from ..message import Message
+from ..stream import Stream
+from ..tokens import estimate_tokens, estimate_messages_tokens
+from ._models import MODELS, estimate_cost
+
+_logger = logging.getLogger(__name__)
+
+
+REQUEST_CLASSES :Final[tuple[str, ...]] = get_args(RequestClass)
+
+# Default candidate models per request class, preferred first.
+# The session model is used for "chat" and as the last resort for "research".
+DEFAULT_POLICY :Final[dict[str, list[str]]] = {
+    "summarize":    ["gpt-5-nano", "gpt-5-mini"],
+    "trivial":      ["gpt-5-nano", "gpt-5-mini"],
+    "chat":         ["gpt-5-mini"],
+    "research":     ["gpt-5.2", "gpt-5.1"],
+}
+
+TRIVIAL_TOKENS      :Final[int]   = 12      # A short user message without research cues is trivial
+RESEARCH_TOKENS     :Final[int]   = 300     # A long user message is a research question
+ERROR_COOLDOWN_S    :Final[float] = 30.0    # A model that failed is skipped for this long
+EWMA_ALPHA          :Final[float] = 0.2
+
+_RESEARCH_CUES :Final[re.Pattern[str]] = re.compile(
+    r"\b(case ?law|jurisprudence|precedents?|statutes?|regulations?|legislation|doctrine|authorit(?:y|ies)|"
+    r"citations?|research|compare|comparison|analy[sz]e|analysis|interpret\w*|\w+ v\. \w+)\b",
+    re.IGNORECASE)
+
+
+@dataclass
+class ModelStats:
+    """
+    Observed behaviour of a model behind the router.
+    """
+    requests:           int   = 0
+    errors:             int   = 0
+    latency_ms:         float = 0.0     # Moving average of the full request duration
+    ttft_ms:            float = 0.0     # Moving average of the time to the first chunk
+    prompt_tokens:      int   = 0       # Estimated
+    completion_tokens:  int   = 0       # Estimated
+    cost:               float = 0.0     # Estimated, in USD
+    last_error:         float = 0.0     # time.monotonic() of the last error
+
+
+class RouterEngine(Engine):
+    """
+    Engine that picks a model per request class and delegates to an inner engine.
+
+    Parameters (all optional):
+        engine              inner engine name (default: openai)
+        summarize, trivial, chat, research
+                            comma separated candidate models for the request class, preferred first
+        latency_budget_ms   candidates whose observed latency exceeds the budget are tried last
+        error_cooldown_s    how long a model that failed is skipped
+        trivial_tokens      user messages up to this size are trivial (unless they carry research cues)
+        research_tokens     user messages from this size are research questions
+
+    A model that fails before producing any output is skipped in favour of the next candidate.
+    """
+    NAME : str = "router"
+
+    CLIENT_PARAMETERS = {
+        "engine":               ClientParameter.Choice(("openai", "mock", "hedged", "failover")),
+        **{request_class:       ClientParameter.Choice(MODELS, max_items=len(MODELS)) for request_class in REQUEST_CLASSES},
+        "latency_budget_ms":    ClientParameter.Float(0.0, 600_000.0),
+        "error_cooldown_s":     ClientParameter.Float(0.0, 3_600.0),
+        "trivial_tokens":       ClientParameter.Int(0, 10_000),
+        "research_tokens":      ClientParameter.Int(0, 100_000),
+    }
+
+    _inner          : Final[str]
+    _policy         : Final[dict[str, list[str]]]
+    _stats          : dict[str, ModelStats]
+
+    def __init__(self,
+                 model:Optional[str]=None,
+                 parameters:Optional[Mapping[str, str]]=None)->None:
+        super().__init__(model=model, parameters=parameters)
+        self._inner = self._param_str("engine", Engine.DEFAULT)
+        if self._inner == self.NAME:
+            raise LCValueError("The router engine cannot route to itself")
+
+        self._latency_budget_ms = self._param_float("latency_budget_ms", 0.0)
+        self._error_cooldown_s  = self._param_float("error_cooldown_s", ERROR_COOLDOWN_S)
+        self._trivial_tokens    = self._param_int("trivial_tokens", TRIVIAL_TOKENS)
+        self._research_tokens   = self._param_int("research_tokens", RESEARCH_TOKENS)
+
+        self._policy = {}
+        for request_class in REQUEST_CLASSES:
+            candidates = self._param_list(request_class, DEFAULT_POLICY[request_class])
+            if request_class == "chat":
+                candidates = [self.model, *candidates]
+            elif request_class == "research":
+                candidates = [*candidates, self.model]
+            for candidate in candidates:
+                if candidate not in MODELS:
+                    raise LCValueError(f"Model '{candidate}' is not available")
+            self._policy[request_class] = list(dict.fromkeys(candidates))
+
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def run_messages_stream(self, context:Context)->Stream:
+        request = snapshot(context)
+        request_class = self.classify(context, list(request))
+        candidates = self.candidates(request_class)
+        _logger.debug("Routing %s request; candidates: %s", request_class, candidates)
+        return _RoutedStream(self, request, request_class, candidates)
+
+    def classify(self, context:Context, messages:list[Message])->RequestClass:
+        """
+        Return the request class of a context: the class set by the caller if any,
+        otherwise a guess based on the size and content of the latest user message.
+        """
+        if isinstance(context, BaseContext) and context.request_class != "chat":
+            return context.request_class
+
+        prompt = next((message.content for message in reversed(messages) if message.role == "user"), "")
+        tokens = estimate_tokens(prompt)
+        has_cues = _RESEARCH_CUES.search(prompt) is not None
+
+        if tokens >= self._research_tokens or has_cues:
+            return "research"
+        if tokens <= self._trivial_tokens:
+            return "trivial"
+        return "chat"
+
+    def candidates(self, request_class:RequestClass)->list[str]:
+        """
+        Return the models to try for a request class, best first.
+        Models in error cooldown come last; with a latency budget, models over budget come after the others.
+        """
+        now = time.monotonic()
+        with self._lock:
+            def rank(model:str)->tuple[bool, bool]:
+                stats = self._stats.get(model)
+                if stats is None:
+                    return (False, False)
+                cooling = stats.errors > 0 and now - stats.last_error < self._error_cooldown_s
+                slow = self._latency_budget_ms > 0 and stats.latency_ms > self._latency_budget_ms
+                return (cooling, slow)
+
+            return sorted(self._policy[request_class], key=rank)
+
+    def stats(self)->dict[str, ModelStats]:
+        """
+        Return a snapshot of the observed statistics per model.
+        """
+        with self._lock:
+            return {model: replace(stats) for model, stats in self._stats.items()}
+
+    def engine_for(self, model:str)->Engine:
+        """
+        Return the shared inner engine for a model.
+        """
+        from .._engine_selector import get_engine
+        return get_engine(self._inner, model)
+
+    def warm_up(self)->None:
+        for model in dict.fromkeys(model for models in self._policy.values() for model in models):
+            self.engine_for(model).warm_up()
+
+    def _record_success(self,
+                        model:str,
+                        messages:list[Message],
+                        response:str,
+                        ttft_s:float,
+                        total_s:float)->None:
+        prompt_tokens = estimate_messages_tokens(messages)
+        completion_tokens = estimate_tokens(response)
+        with self._lock:
+            stats = self._stats.setdefault(model, ModelStats())
+            stats.requests += 1
+            successes = stats.requests - stats.errors
+            stats.latency_ms = _ewma(stats.latency_ms, total_s * 1000, successes)
+            stats.ttft_ms = _ewma(stats.ttft_ms, ttft_s * 1000, successes)
+            stats.prompt_tokens += prompt_tokens
+            stats.completion_tokens += completion_tokens
+            stats.cost += estimate_cost(model, prompt_tokens, completion_tokens)
+
+    def _record_error(self, model:str)->None:
+        with self._lock:
+            stats = self._stats.setdefault(model, ModelStats())
+            stats.requests += 1
+            stats.errors += 1
+            stats.last_error = time.monotonic()
+
+
+class _RoutedStream(Stream):
+    """
+    Stream the response of the first candidate model that succeeds.
+    """
+    def __init__(self,
+                 router:RouterEngine,
+                 context:SimpleContext,
+                 request_class:RequestClass,
+                 candidates:list[str])->None:
+        self._router = router
+        self._context = context
+        self._request_class = request_class
+        self._candidates = candidates
+        self._current: Optional[Stream] = None
+
+    def close(self)->None:
+        if self._current is not None:
+            self._current.close()
+
+    def __iter__(self)->Iterator[str]:
+        last_error:Optional[LCException] = None
+
+        for model in self._candidates:
+            chunks: list[str] = []
+            start = time.perf_counter()
+            ttft = 0.0
+            try:
+                stream = self._router.engine_for(model).run_messages_stream(self._context)
+                self._current = stream
+                for chunk in stream:
+                    if not chunks:
+                        ttft = time.perf_counter() - start
+                    chunks.append(chunk)
+                    yield chunk
+            except DeadlineExceeded:
+                raise   # No time left to try another model
+            except LCException as err:
+                self._router._record_error(model)
+                if chunks:
+                    raise   # Part of the response was already returned
+                _logger.warning("Model '%s' failed for %s request; trying next candidate: %s",
+                                model, self._request_class, err)
+                last_error = err
+                continue
+
+            total = time.perf_counter() - start
+            self._router._record_success(model, list(self._context), "".join(chunks), ttft or total, total)
+            _logger.debug("Routed %s request to '%s' in %.0f ms", self._request_class, model, total * 1000)
+            return
+
+        if last_error is not None:
+            raise last_error
+        raise LCException(f"No model available for {self._request_class} requests")
+
+
+def _ewma(current:float, sample:float, count:int)->float:
+    if count <= 1:
+        return sample
+    return (1.0 - EWMA_ALPHA) * current + EWMA_ALPHA * sample
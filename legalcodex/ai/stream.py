@@ -1,7 +1,28 @@
 from __future__ import annotations
 
+import logging
+import time
 from abc import ABC, abstractmethod
-from typing import Iterator
+from typing import Final, Iterator, Optional
+
+from .._deadline import Deadline
+from .._metrics import Counter, Histogram, RATE_BUCKETS, counter, histogram
+from .._tracing import set_attribute
+from .tokens import CHARS_PER_TOKEN
+
+_logger = logging.getLogger(__name__)
+
+
+ENGINE_LABELS :Final[tuple[str, ...]] = ("engine", "model")
+
+ENGINE_REQUESTS :Final[Counter] = counter("lc_engine_requests_total", "Provider requests by outcome (ok, error, cancelled)",
+                                          (*ENGINE_LABELS, "outcome"))
+ENGINE_TTFT :Final[Histogram] = histogram("lc_engine_ttft_seconds", "Time from the provider request to the first content chunk",
+                                          ENGINE_LABELS)
+ENGINE_DURATION :Final[Histogram] = histogram("lc_engine_response_seconds", "Time from the provider request to the end of the response",
+                                              ENGINE_LABELS)
+ENGINE_TOKENS_PER_S :Final[Histogram] = histogram("lc_engine_tokens_per_second", "Generation throughput after the first chunk (estimated tokens)",
+                                                  ENGINE_LABELS, RATE_BUCKETS)
 
 
 class Stream(ABC):
@@ -9,8 +30,79 @@ class Stream(ABC):
     def __iter__(self) -> Iterator[str]:
         pass
 
+    def close(self) -> None:
+        """
+        Release the resources held by the stream (e.g. an open provider response).
+        Used to cancel a stream that will not be consumed; the default does nothing.
+        """
+        pass
+
     def all(self) -> str:
         """
         Collect the entire stream into a single string.
         """
         return "".join(self)
+
+
+class DeadlineStream(Stream):
+    """
+    Cut a stream short when the request deadline passes.
+    The deadline is checked between chunks; the wrapped stream is closed and DeadlineExceeded is raised.
+    """
+    def __init__(self, stream: Stream, deadline: Deadline) -> None:
+        self._stream = stream
+        self._deadline = deadline
+
+    def __iter__(self) -> Iterator[str]:
+        for chunk in self._stream:
+            if self._deadline.expired:
+                self._stream.close()
+                self._deadline.check("streaming the response")
+            yield chunk
+
+    def close(self) -> None:
+        self._stream.close()
+
+
+class MeteredStream(Stream):
+    """
+    Record the time to first chunk, the response time, the generation throughput and the
+    outcome of a provider response. Create it with the time the request was sent.
+    """
+    def __init__(self, stream: Stream, engine: str, model: str, start_ns: Optional[int] = None) -> None:
+        self._stream = stream
+        self._labels = {"engine": engine, "model": model}
+        self._start_ns = start_ns if start_ns is not None else time.perf_counter_ns()
+
+    def __iter__(self) -> Iterator[str]:
+        first_ns: Optional[int] = None
+        characters = 0
+        outcome = "cancelled"
+        try:
+            for chunk in self._stream:
+                if first_ns is None:
+                    first_ns = time.perf_counter_ns()
+                    ENGINE_TTFT.observe((first_ns - self._start_ns) / 1e9, **self._labels)
+                    set_attribute("ttft_ms", round((first_ns - self._start_ns) / 1e6, 3))
+                characters += len(chunk)
+                yield chunk
+            outcome = "ok"
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            self._record(outcome, first_ns, characters)
+
+    def close(self) -> None:
+        self._stream.close()
+
+    def _record(self, outcome: str, first_ns: Optional[int], characters: int) -> None:
+        end_ns = time.perf_counter_ns()
+        ENGINE_REQUESTS.inc(outcome=outcome, **self._labels)
+        if outcome != "ok":
+            return
+        ENGINE_DURATION.observe((end_ns - self._start_ns) / 1e9, **self._labels)
+        if first_ns is not None and end_ns > first_ns and characters:
+            ENGINE_TOKENS_PER_S.observe(characters / CHARS_PER_TOKEN / ((end_ns - first_ns) / 1e9), **self._labels)
+        _logger.debug("%s response: ttft=%.3fs total=%.3fs", self._labels["engine"],
+                      ((first_ns or end_ns) - self._start_ns) / 1e9, (end_ns - self._start_ns) / 1e9)
@@ -0,0 +1,45 @@
+"""
+Provider-agnostic token estimates.
+
+Engines do not expose a tokenizer, so budgets are enforced with a character based
+estimate, which is close enough for English and French legal text.
+"""
+from __future__ import annotations
+
+from typing import Final, Iterable
+
+from .message import Message
+
+
+CHARS_PER_TOKEN :Final[int] = 4
+MESSAGE_OVERHEAD_TOKENS :Final[int] = 4      # role and separators added by the providers
+
+
+def estimate_tokens(text:str) -> int:
+    """
+    Return an estimate of the number of tokens in a text.
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def estimate_messages_tokens(messages:Iterable[Message]) -> int:
+    """
+    Return an estimate of the number of prompt tokens for a list of messages.
+    """
+    return sum(estimate_tokens(message.content) + MESSAGE_OVERHEAD_TOKENS for message in messages)
+
+
+def truncate_middle(text:str, max_tokens:int) -> str:
+    """
+    Truncate a text to about max_tokens, keeping its head and tail.
+    The beginning and end of a pasted document (parties, conclusion) usually carry the most information.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+
+    omitted = len(text) - max_chars
+    marker = f"\n[... {omitted} characters omitted ...]\n"
+    head = (max_chars * 2) // 3
+    tail = max_chars - head
+    return text[:head].rstrip() + marker + text[-tail:].lstrip()
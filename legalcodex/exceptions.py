@@ -38,4 +38,27 @@ class UserNotFound(LCException):
 class ChatSessionNotFound(LCException):
     """Exception raised when a chat session is not found."""
     def __init__(self, session_id: str) -> None:
-        super().__init__(f"Chat session with id '{session_id}' not found")
\ No newline at end of file
+        super().__init__(f"Chat session with id '{session_id}' not found")
+
+class DeadlineExceeded(LCException):
+    """Exception raised when a request runs out of its time budget."""
+    def __init__(self, stage: str) -> None:
+        super().__init__(f"The request took too long ({stage})")
+        self.stage = stage
+
+class AdmissionRejected(LCException):
+    """Exception raised when a request is not admitted: too many concurrent requests."""
+    def __init__(self, reason: str, retry_after: float) -> None:
+        super().__init__(f"Too many concurrent requests ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+class IdempotencyKeyReused(LCException):
+    """Exception raised when an idempotency key is reused for a different request."""
+    def __init__(self, key: str) -> None:
+        super().__init__(f"Idempotency key '{key}' was already used for a different request")
+
+class RequestInProgress(LCException):
+    """Exception raised when the request with the same idempotency key is still running."""
+    def __init__(self, key: str) -> None:
+        super().__init__(f"The request with idempotency key '{key}' is still in progress")
@@ -1,3 +1,3 @@
-from legalcodex.http_server.app import app, create_app
+from legalcodex.http_server.app import create_app
 
-__all__ = ["app", "create_app"]
+__all__ = ["create_app"]
@@ -0,0 +1,121 @@
+"""
+Content encoding negotiation and compression of the responses.
+
+Brotli is used when the `brotli` package is installed (the `brotli` extra) and the client
+accepts it, gzip otherwise. JSON responses are compressed by CompressionMiddleware when they
+are large enough for it to pay off; streamed responses are left alone so that their chunks
+reach the client as soon as they are produced.
+"""
+from __future__ import annotations
+
+import functools
+import gzip
+import logging
+from typing import Any, Final, Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+_logger = logging.getLogger(__name__)
+
+
+BROTLI  :Final[str] = "br"
+GZIP    :Final[str] = "gzip"
+
+JSON_MIN_SIZE       :Final[int] = 1024      # Smaller JSON bodies are sent as they are
+DYNAMIC_GZIP_LEVEL  :Final[int] = 6         # Compressed per request: favour speed...
+DYNAMIC_BROTLI_LEVEL:Final[int] = 5
+STATIC_GZIP_LEVEL   :Final[int] = 9         # ...compressed once: favour size
+STATIC_BROTLI_LEVEL :Final[int] = 11
+
+
+@functools.cache
+def _brotli() -> Any:
+    try:
+        import brotli
+    except ImportError:
+        _logger.debug("brotli is not installed; responses are compressed with gzip only")
+        return None
+    return brotli
+
+
+def available_encodings() -> tuple[str, ...]:
+    """
+    Encodings the server can produce, in order of preference.
+    """
+    return (BROTLI, GZIP) if _brotli() is not None else (GZIP,)
+
+
+def compress(data: bytes, encoding: str, static: bool = False) -> bytes:
+    if encoding == BROTLI:
+        return bytes(_brotli().compress(data, quality=STATIC_BROTLI_LEVEL if static else DYNAMIC_BROTLI_LEVEL))
+    if encoding == GZIP:
+        return gzip.compress(data, compresslevel=STATIC_GZIP_LEVEL if static else DYNAMIC_GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unsupported encoding {encoding}")
+
+
+def negotiate(accept_encoding: str, available: Iterable[str]) -> Optional[str]:
+    """
+    Return the preferred of the available encodings that the Accept-Encoding header accepts,
+    or None for the identity encoding.
+    """
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    for encoding in available:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0.0:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    """
+    Compress the JSON responses of at least `minimum_size` bytes sent in a single body message.
+    """
+    def __init__(self, app: ASGIApp, minimum_size: int = JSON_MIN_SIZE) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), available_encodings())
+        start: Optional[Message] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message         # Held until the body shows whether to compress
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            held, start = start, None
+            headers = MutableHeaders(raw=held["headers"])
+            body: bytes = message.get("body", b"")
+            if not message.get("more_body", False) \
+                    and len(body) >= self.minimum_size \
+                    and headers.get("content-type", "").startswith("application/json") \
+                    and "content-encoding" not in headers:
+                headers.add_vary_header("Accept-Encoding")
+                if encoding is not None:
+                    body = compress(body, encoding)
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(body))
+                    message = {**message, "body": body}
+            await send(held)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
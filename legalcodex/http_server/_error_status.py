@@ -0,0 +1,22 @@
+"""
+HTTP status of the errors of the chat turns, for the routes that report them in a body
+(WebSocket frames, streamed batch results) rather than as the status of the response.
+"""
+from fastapi import status
+
+from ..exceptions import AdmissionRejected, ChatSessionNotFound, DeadlineExceeded, LCException
+
+
+def error_status(err: Exception) -> int:
+    """
+    Return the status the HTTP routes answer for the error.
+    """
+    if isinstance(err, AdmissionRejected):
+        return status.HTTP_429_TOO_MANY_REQUESTS
+    if isinstance(err, DeadlineExceeded):
+        return status.HTTP_504_GATEWAY_TIMEOUT
+    if isinstance(err, ChatSessionNotFound):
+        return status.HTTP_404_NOT_FOUND
+    if isinstance(err, LCException):
+        return status.HTTP_400_BAD_REQUEST
+    return status.HTTP_500_INTERNAL_SERVER_ERROR
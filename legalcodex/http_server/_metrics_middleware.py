@@ -0,0 +1,61 @@
+"""
+ASGI middleware measuring the HTTP requests, labelled by route template (not raw path, to bound the label set).
+"""
+import time
+from typing import Final
+
+from starlette.routing import Mount
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .._metrics import Counter, Histogram, counter, histogram
+
+
+HTTP_LABELS :Final[tuple[str, ...]] = ("method", "route", "status")
+
+HTTP_DURATION :Final[Histogram] = histogram("lc_http_request_duration_seconds",
+                                            "Time to serve an HTTP request, until the end of the response body",
+                                            HTTP_LABELS)
+HTTP_REQUESTS :Final[Counter] = counter("lc_http_requests_total", "HTTP requests served", HTTP_LABELS)
+
+UNMATCHED_ROUTE :Final[str] = "unmatched"
+MOUNTED_ROUTE   :Final[str] = "/{path}"     # Applications mounted at the root, i.e. the frontend files
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter_ns()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            labels = {"method": scope["method"], "route": route_template(scope), "status": str(status)}
+            HTTP_DURATION.observe((time.perf_counter_ns() - start) / 1e9, **labels)
+            HTTP_REQUESTS.inc(**labels)
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Return the template of the matched route (e.g. /api/v1/chat/sessions/{session_id}/messages),
+    rebuilt from the request path and the path parameters extracted by the router.
+    """
+    if "endpoint" not in scope:
+        return UNMATCHED_ROUTE
+    if isinstance(scope.get("route", None), (Mount, type(None))):
+        return MOUNTED_ROUTE
+    names = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    segments = str(scope["path"]).split("/")
+    return "/".join("{" + names[segment] + "}" if segment in names else segment for segment in segments)
@@ -0,0 +1,45 @@
+"""
+Admission of the chat turns of the routes (see legalcodex/_admission.py).
+"""
+import logging
+import time
+from contextlib import contextmanager
+from typing import Final, Iterator
+
+from fastapi import HTTPException, status
+
+from .._admission import AdmissionController
+from .._deadline import Deadline
+from .._tracing import span
+from .._user_access import User
+from ..exceptions import AdmissionRejected
+
+_logger = logging.getLogger(__name__)
+
+
+RETRY_AFTER_HEADER :Final[str] = "Retry-After"
+
+
+@contextmanager
+def admitted(user: User, deadline: Deadline) -> Iterator[None]:
+    """
+    Hold an admission slot of the user for the duration of the block; answer 429 with
+    Retry-After when the turn cannot be admitted (within the request's time budget).
+
+    Entered by the route once it knows that the turn runs, so that requests answered without
+    running one (idempotent replays) do not take a slot.
+    """
+    controller = AdmissionController()
+    try:
+        with span("admission"):
+            controller.acquire(user.username, deadline.remaining())
+    except AdmissionRejected as exc:
+        _logger.info("Turn of user %s rejected: %s", user.username, exc.reason)
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                            detail=str(exc),
+                            headers={RETRY_AFTER_HEADER: str(int(exc.retry_after))}) from exc
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        controller.release(user.username, time.monotonic() - start)
@@ -0,0 +1,51 @@
+"""
+Request deadline dependency: the time budget of a request starts when its route is entered.
+"""
+import logging
+import os
+from typing import Final, Optional
+
+from fastapi import Header, HTTPException, status
+
+from .._deadline import Deadline
+from .._environ import LC_REQUEST_TIMEOUT
+
+_logger = logging.getLogger(__name__)
+
+
+DEFAULT_REQUEST_TIMEOUT_S :Final[float] = 60.0
+
+REQUEST_TIMEOUT_HEADER :Final[str] = "X-Request-Timeout"
+
+
+def get_request_timeout() -> float:
+    """
+    Return the server time budget of a request, in seconds.
+    """
+    raw = os.environ.get(LC_REQUEST_TIMEOUT, None)
+    if raw is None:
+        return DEFAULT_REQUEST_TIMEOUT_S
+    try:
+        timeout = float(raw)
+    except ValueError:
+        _logger.warning("Invalid %s=%r; using %.0fs", LC_REQUEST_TIMEOUT, raw, DEFAULT_REQUEST_TIMEOUT_S)
+        return DEFAULT_REQUEST_TIMEOUT_S
+    return timeout if timeout > 0 else DEFAULT_REQUEST_TIMEOUT_S
+
+
+def request_deadline(x_request_timeout: Optional[str] = Header(default=None)) -> Deadline:
+    """
+    Return the deadline of the current request.
+    A client may ask for a shorter budget than the server's with the X-Request-Timeout header (seconds).
+    """
+    timeout = get_request_timeout()
+    if x_request_timeout is not None:
+        try:
+            requested = float(x_request_timeout)
+        except ValueError:
+            requested = 0.0
+        if requested <= 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail=f"Invalid {REQUEST_TIMEOUT_HEADER} header")
+        timeout = min(timeout, requested)
+    return Deadline(timeout)
@@ -0,0 +1,54 @@
+"""
+Idempotency-Key header of the chat turn routes (see legalcodex/_idempotency.py).
+"""
+import logging
+import re
+from typing import Callable, Final, Optional, TypeVar
+
+from fastapi import HTTPException, Response, status
+
+from .._deadline import Deadline
+from .._idempotency import IdempotencyStore
+from .._tracing import set_attribute
+from ..exceptions import IdempotencyKeyReused, RequestInProgress
+from ._request_admission import RETRY_AFTER_HEADER
+
+_logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+IDEMPOTENCY_KEY_HEADER  :Final[str] = "Idempotency-Key"
+REPLAYED_HEADER         :Final[str] = "Idempotent-Replayed"
+
+_KEY_PATTERN = re.compile(r"[\x21-\x7e]{1,255}")      # Printable ASCII, no spaces
+
+
+def run_idempotent(key: Optional[str],
+                   scope: tuple[str, ...],
+                   fingerprint: str,
+                   execute: Callable[[], T],
+                   response: Response,
+                   deadline: Deadline) -> T:
+    """
+    Run the request once per key within the scope (user and session): a repeat gets the
+    stored result, marked with the Idempotent-Replayed header, or waits for the first request
+    while it runs. Without a key, the request simply runs.
+    """
+    if key is None:
+        return execute()
+    if not _KEY_PATTERN.fullmatch(key):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"{IDEMPOTENCY_KEY_HEADER} must be 1 to 255 printable characters")
+    try:
+        result, replayed = IdempotencyStore().run((*scope, key), fingerprint, execute, deadline.remaining())
+    except IdempotencyKeyReused as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=str(exc)) from exc
+    except RequestInProgress as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail=str(exc),
+                            headers={RETRY_AFTER_HEADER: "1"}) from exc
+    if replayed:
+        _logger.info("Replayed the request with %s %s", IDEMPOTENCY_KEY_HEADER, key)
+        set_attribute("idempotent.replayed", True)
+        response.headers[REPLAYED_HEADER] = "true"
+    return result
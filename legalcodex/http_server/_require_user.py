@@ -1,4 +1,7 @@
 
+from typing import Optional
+
+import jwt
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel
 
@@ -7,6 +10,7 @@ from ..exceptions import UserNotFound
 from .._user_access import UsersAccess, User
 
 from .auth_service import verify_access_token
+from ._token_cache import TokenCache
 
 
 ACCESS_COOKIE_NAME = "lc_access"
@@ -15,17 +19,33 @@ ACCESS_COOKIE_NAME = "lc_access"
 
 
 def require_user(request: Request) -> User:
-    token = request.cookies.get(ACCESS_COOKIE_NAME)
+    return authenticate(request.cookies.get(ACCESS_COOKIE_NAME))
+
+
+def authenticate(token: Optional[str]) -> User:
+    """
+    Return the user of an access token; raise 401 if it is missing, invalid or revoked.
+    Used by require_user, and by the WebSocket routes with the cookie of the handshake.
+    """
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
 
-    token_payload = verify_access_token(token)
-    if token_payload is None:
+    cache = TokenCache()
+    cached_user = cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
+    try:
+        token_payload = verify_access_token(token)
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
+    if token_payload is None or cache.is_revoked(token_payload):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
 
     user_access = UsersAccess.get_instance()
     try:
         user = user_access.find(token_payload.username)
-        return user
     except UserNotFound:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
+    cache.put(token, token_payload, user)
+    return user
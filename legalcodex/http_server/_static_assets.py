@@ -0,0 +1,182 @@
+"""
+Serving of the frontend files from memory, precompressed and with cache-friendly URLs.
+
+The files are loaded and compressed (brotli and gzip) once, when the app is created. Each
+file is also served under a content-hashed URL (e.g. /js/chat-api.3f2a9c1b04de.js) that
+never changes content, so browsers may cache it for a year without revalidating. The
+references between the files (index.html to the scripts and styles, and the ES module
+imports) are rewritten to the hashed URLs, so a page load only revalidates index.html.
+The plain URLs stay available, revalidated on every use with their ETag.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import mimetypes
+import posixpath
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Final, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import PlainTextResponse, Response
+from starlette.types import Receive, Scope, Send
+
+from ._compression import available_encodings, compress, negotiate
+
+_logger = logging.getLogger(__name__)
+
+
+INDEX                   :Final[str] = "/index.html"
+HASH_LENGTH             :Final[int] = 12
+IMMUTABLE_CACHE_CONTROL :Final[str] = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL:Final[str] = "no-cache"
+MIN_COMPRESS_SIZE       :Final[int] = 256
+COMPRESSIBLE_TYPES      :Final[tuple[str, ...]] = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+# Local references: ES module imports in scripts, src and href attributes in pages
+_SCRIPT_REFERENCE = re.compile(r"""(\bfrom\s*|\bimport\s*\(?\s*)(["'])(\.{1,2}/[^"']+|/[^/"'][^"']*)\2""")
+_PAGE_REFERENCE = re.compile(r"""(\b(?:src|href)=)(["'])(/[^/"'][^"']*)\2""")
+
+
+@dataclass(frozen=True)
+class _Asset:
+    content: bytes
+    media_type: str
+    digest: str
+    immutable: bool
+    encoded: dict[str, bytes] = field(default_factory=dict)     # Encoding -> body, when smaller
+
+    @property
+    def cache_control(self) -> str:
+        return IMMUTABLE_CACHE_CONTROL if self.immutable else REVALIDATE_CACHE_CONTROL
+
+    def etag(self, encoding: Optional[str]) -> str:
+        return f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+
+
+class FrontendAssets:
+    """
+    ASGI app serving the files of a directory (GET and HEAD), with "/" serving index.html.
+    """
+    def __init__(self, directory: Path) -> None:
+        self._assets: dict[str, _Asset] = {}
+        if directory.is_dir():
+            self._load(directory)
+        _logger.info("Loaded %d frontend files (%d URLs, encodings: %s)",
+                     sum(1 for asset in self._assets.values() if not asset.immutable),
+                     len(self._assets), ", ".join(available_encodings()))
+
+    def url_of(self, path: str) -> str:
+        """
+        Return the content-hashed URL of a file (e.g. "/js/auth-app.js").
+        """
+        asset = self._assets[path]
+        return _hashed_path(path, asset.digest)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        response = self._response(scope)
+        await response(scope, receive, send)
+
+    def _response(self, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            return PlainTextResponse("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})
+        path: str = scope["path"]
+        asset = self._assets.get(INDEX if path == "/" else path)
+        if asset is None:
+            return PlainTextResponse("Not Found", status_code=404)
+
+        request_headers = Headers(scope=scope)
+        encoding = negotiate(request_headers.get("accept-encoding", ""), [name for name in available_encodings() if name in asset.encoded])
+        headers = {"ETag": asset.etag(encoding), "Cache-Control": asset.cache_control}
+        if asset.encoded:
+            headers["Vary"] = "Accept-Encoding"
+
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None and _matches(if_none_match, asset.digest):
+            return Response(status_code=304, headers=headers)
+
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+            return Response(asset.encoded[encoding], media_type=asset.media_type, headers=headers)
+        return Response(asset.content, media_type=asset.media_type, headers=headers)
+
+    def _load(self, directory: Path) -> None:
+        files = {"/" + file.relative_to(directory).as_posix(): file.read_bytes()
+                 for file in sorted(directory.rglob("*")) if file.is_file()}
+        digests: dict[str, str] = {}
+        for path in files:
+            self._add(path, files, digests, set())
+
+    def _add(self, path: str, files: dict[str, bytes], digests: dict[str, str], visiting: set[str]) -> str:
+        """
+        Add a file under its plain and hashed URLs, after the files it refers to (whose hashed
+        URLs it is rewritten with); return its digest.
+        """
+        digest = digests.get(path)
+        if digest is not None:
+            return digest
+        visiting.add(path)
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        content = self._rewrite(path, media_type, files, digests, visiting)
+        digest = digests[path] = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+        visiting.discard(path)
+
+        encoded: dict[str, bytes] = {}
+        if len(content) >= MIN_COMPRESS_SIZE and media_type.startswith(COMPRESSIBLE_TYPES):
+            for encoding in available_encodings():
+                body = compress(content, encoding, static=True)
+                if len(body) < len(content):
+                    encoded[encoding] = body
+        self._assets[path] = _Asset(content, _with_charset(media_type), digest, immutable=False, encoded=encoded)
+        if path != INDEX:
+            self._assets[_hashed_path(path, digest)] = _Asset(content, _with_charset(media_type), digest, immutable=True, encoded=encoded)
+        return digest
+
+    def _rewrite(self, path: str, media_type: str, files: dict[str, bytes], digests: dict[str, str], visiting: set[str]) -> bytes:
+        content = files[path]
+        if media_type == "text/html":
+            pattern = _PAGE_REFERENCE
+        elif media_type in ("application/javascript", "text/javascript"):
+            pattern = _SCRIPT_REFERENCE
+        else:
+            return content
+
+        def hashed(match: re.Match[str]) -> str:
+            reference = match.group(3)
+            target = posixpath.normpath(posixpath.join(posixpath.dirname(path), reference))
+            if target not in files or target == INDEX or target in visiting:
+                return match.group(0)       # External, or a cycle: left as it is
+            digest = self._add(target, files, digests, visiting)
+            url = _hashed_path(target, digest)
+            if reference.startswith("."):
+                url = posixpath.relpath(url, posixpath.dirname(path))
+                url = url if url.startswith("../") else f"./{url}"
+            return f"{match.group(1)}{match.group(2)}{url}{match.group(2)}"
+
+        return pattern.sub(hashed, content.decode("utf-8")).encode("utf-8")
+
+
+def _hashed_path(path: str, digest: str) -> str:
+    stem, dot, extension = path.rpartition(".")
+    return f"{stem}.{digest}.{extension}" if dot and "/" not in extension else f"{path}.{digest}"
+
+
+def _with_charset(media_type: str) -> str:
+    if media_type.startswith("text/") or media_type in ("application/javascript", "application/json"):
+        return f"{media_type}; charset=utf-8"
+    return media_type
+
+
+def _matches(if_none_match: str, digest: str) -> bool:
+    """
+    Whether an If-None-Match header holds an ETag of the asset (in any encoding).
+    """
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip().removeprefix("W/").strip('"')
+        if tag == digest or tag.startswith(f"{digest}-"):
+            return True
+    return False
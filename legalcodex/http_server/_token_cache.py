@@ -0,0 +1,117 @@
+"""
+Cache of verified access tokens, so that require_user does not decode the JWT and look the
+user up on every request.
+
+An entry lives until the token expires, and at most TOKEN_CACHE_TTL_S so that changes to the
+user are picked up. Tokens are revoked by id (jti, on logout) or by user (every token issued
+until then); revocations are checked on cache hits as well as after a full verification.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Final, Optional
+
+from .._metrics import cache_lookup
+from .._singleton import Singleton
+from .._user_access import User
+from .auth_service import TokenPayload
+
+_logger = logging.getLogger(__name__)
+
+
+TOKEN_CACHE_SIZE    :Final[int]   = 4096
+TOKEN_CACHE_TTL_S   :Final[float] = 300.0
+
+
+@dataclass(frozen=True)
+class _Entry:
+    user: User
+    payload: TokenPayload
+    expires_at: float       # Unix time
+
+
+class TokenCache(Singleton):
+    """
+    Thread-safe LRU cache of verified token -> User, with revocation.
+    """
+    def __init__(self, max_entries:int=TOKEN_CACHE_SIZE, ttl_s:float=TOKEN_CACHE_TTL_S) -> None:
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._revoked_tokens: dict[str, float] = {}        # jti -> token expiry
+        self._revoked_users: dict[str, float] = {}         # username -> revocation time
+        self._lock = threading.Lock()
+
+    def get(self, token:str) -> Optional[User]:
+        """
+        Return the user of a token verified earlier, or None if it must be verified.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None:
+                if entry.expires_at <= now or self._is_revoked(entry.payload):
+                    del self._entries[token]
+                    entry = None
+                else:
+                    self._entries.move_to_end(token)
+        cache_lookup("tokens", entry is not None)
+        return entry.user if entry is not None else None
+
+    def put(self, token:str, payload:TokenPayload, user:User) -> None:
+        expires_at = time.time() + self.ttl_s
+        if payload.expires_at:
+            expires_at = min(expires_at, payload.expires_at)
+        with self._lock:
+            self._entries[token] = _Entry(user, payload, expires_at)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def is_revoked(self, payload:TokenPayload) -> bool:
+        with self._lock:
+            return self._is_revoked(payload)
+
+    def revoke_token(self, payload:TokenPayload) -> None:
+        """
+        Reject the token from now on; it is remembered until it expires.
+        """
+        if not payload.token_id:
+            return
+        now = time.time()
+        with self._lock:
+            self._revoked_tokens = {token_id: expires_at
+                                    for token_id, expires_at in self._revoked_tokens.items()
+                                    if expires_at > now}
+            self._revoked_tokens[payload.token_id] = payload.expires_at or now + self.ttl_s
+        _logger.info("Revoked token %s of user %s", payload.token_id, payload.username)
+
+    def revoke_user(self, username:str) -> None:
+        """
+        Reject every token of the user issued until now.
+        """
+        with self._lock:
+            self._revoked_users[username] = time.time()
+            for token in [token for token, entry in self._entries.items() if entry.user.username == username]:
+                del self._entries[token]
+        _logger.info("Revoked the tokens of user %s", username)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._revoked_tokens.clear()
+            self._revoked_users.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _is_revoked(self, payload:TokenPayload) -> bool:
+        if payload.token_id and payload.token_id in self._revoked_tokens:
+            return True
+        revoked_at = self._revoked_users.get(payload.username)
+        return revoked_at is not None and payload.issued_at <= revoked_at
@@ -0,0 +1,60 @@
+"""
+ASGI middleware giving every HTTP request an id (X-Request-ID) and tracing it under that id.
+"""
+import re
+from typing import Final
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .._tracing import Tracer, new_request_id
+from ._metrics_middleware import route_template
+
+
+REQUEST_ID_HEADER :Final[str] = "X-Request-ID"
+
+_REQUEST_ID_PATTERN :Final[re.Pattern[str]] = re.compile(r"[A-Za-z0-9._-]{1,64}")
+
+
+class TracingMiddleware:
+    """
+    Use the client's X-Request-ID when it is a safe token, or a new id; echo it in the response.
+    """
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _request_id(scope)
+        status = 500
+
+        async def send_with_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []),
+                                      (REQUEST_ID_HEADER.lower().encode("latin-1"), request_id.encode("latin-1"))]
+            await send(message)
+
+        method = scope["method"]
+        with Tracer().trace(f"{method} {scope['path']}", trace_id=request_id) as root:
+            try:
+                await self.app(scope, receive, send_with_id)
+            finally:
+                if root is not None:
+                    root.name = f"{method} {route_template(scope)}"
+                    root.attributes["path"] = scope["path"]
+                    root.attributes["status"] = status
+
+
+def _request_id(scope: Scope) -> str:
+    header = REQUEST_ID_HEADER.lower().encode("latin-1")
+    for name, value in scope.get("headers", []):
+        if name == header:
+            candidate: str = value.decode("latin-1")
+            if _REQUEST_ID_PATTERN.fullmatch(candidate):
+                return candidate
+            break
+    return new_request_id()
@@ -0,0 +1,132 @@
+"""
+Warm-up of a server process, started from the app lifespan.
+
+In a background thread, the configured engines create their clients and open their pooled
+connections, then the most recently active sessions are loaded into the session manager (and
+their engines warmed up as well). The server reports ready (/api/v1/status/ready) once the
+warm-up is over, or when it takes longer than its timeout.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Final, Optional
+
+from .._environ import LC_WARMUP_ENGINES, LC_WARMUP_SESSIONS, LC_WARMUP_TIMEOUT
+from ..ai._engine_selector import DEFAULT_ENGINE, get_engine
+from ..ai.engine import Engine, EngineKey
+from ..ai.engines._models import DEFAULT_MODEL
+from ..ai.chat.chat_session_manager import ChatSessionManager, recent_session_ids
+from ..exceptions import LCException
+
+_logger = logging.getLogger(__name__)
+
+
+WARMUP_SESSIONS     :Final[int]   = 20
+WARMUP_TIMEOUT_S    :Final[float] = 30.0
+
+
+class WarmUp:
+    """
+    Background warm-up of a server process, and its readiness.
+    """
+    def __init__(self,
+                 engines:list[tuple[str, str]],
+                 sessions:int=WARMUP_SESSIONS,
+                 timeout_s:float=WARMUP_TIMEOUT_S) -> None:
+        self.engines = engines
+        self.sessions = sessions
+        self.timeout_s = timeout_s
+        self.engine_status: dict[str, str] = {}
+        self.sessions_loaded = 0
+        self._warmed: set[EngineKey] = set()
+        self._start: Optional[float] = None
+        self._elapsed: Optional[float] = None
+        self._done = threading.Event()
+
+    @classmethod
+    def from_environ(cls) -> WarmUp:
+        engines: list[tuple[str, str]] = []
+        for item in os.environ.get(LC_WARMUP_ENGINES, DEFAULT_ENGINE).split(","):
+            name, _, model = item.strip().partition(":")
+            if name:
+                engines.append((name, model.strip() or DEFAULT_MODEL))
+        return cls(engines,
+                   sessions=int(_env_float(LC_WARMUP_SESSIONS, WARMUP_SESSIONS)),
+                   timeout_s=_env_float(LC_WARMUP_TIMEOUT, WARMUP_TIMEOUT_S))
+
+    def start(self) -> None:
+        self._start = time.monotonic()
+        threading.Thread(target=self.run, name="lc-warmup", daemon=True).start()
+
+    def run(self) -> None:
+        if self._start is None:
+            self._start = time.monotonic()
+        try:
+            for name, model in self.engines:
+                try:
+                    self._warm_up(get_engine(name, model))
+                except LCException as err:
+                    self.engine_status[f"{name}:{model}"] = f"error: {err}"
+                    _logger.warning("Warm-up of engine %s:%s failed: %s", name, model, err)
+            self._preload_sessions()
+        finally:
+            self._elapsed = time.monotonic() - self._start
+            self._done.set()
+            _logger.info("Warm-up done in %.2fs: engines=%s, sessions loaded=%d",
+                         self._elapsed, self.engine_status, self.sessions_loaded)
+
+    @property
+    def ready(self) -> bool:
+        if self._done.is_set():
+            return True
+        return self._start is not None and time.monotonic() - self._start >= self.timeout_s
+
+    def wait(self, timeout:Optional[float]=None) -> bool:
+        return self._done.wait(timeout)
+
+    def status(self) -> dict[str, Any]:
+        return {"ready": self.ready,
+                "warm_up_done": self._done.is_set(),
+                "warm_up_s": round(self._elapsed, 3) if self._elapsed is not None else None,
+                "engines": dict(self.engine_status),
+                "sessions_loaded": self.sessions_loaded}
+
+    def _warm_up(self, engine:Engine) -> None:
+        key = engine.key
+        if key in self._warmed:
+            return
+        self._warmed.add(key)
+        label = f"{engine.name}:{engine.model}"
+        start = time.perf_counter()
+        try:
+            engine.warm_up()
+            self.engine_status[label] = "ok"
+            _logger.info("Warmed up engine %s in %.2fs", label, time.perf_counter() - start)
+        except Exception as err:     # A warm-up failure must not stop the server
+            self.engine_status[label] = f"error: {type(err).__name__}"
+            _logger.warning("Warm-up of engine %s failed: %s", label, err)
+
+    def _preload_sessions(self) -> None:
+        manager = ChatSessionManager()
+        for session_id in recent_session_ids(self.sessions):
+            try:
+                session = manager.get_session(session_id)
+            except LCException as err:
+                _logger.debug("Session %s not preloaded: %s", session_id, err)
+                continue
+            self.sessions_loaded += 1
+            self._warm_up(session.engine)
+
+
+def _env_float(name:str, default:float) -> float:
+    raw = os.environ.get(name, None)
+    if raw is None:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        _logger.warning("Invalid %s=%r; using %g", name, raw, default)
+        return default
@@ -3,16 +3,20 @@ import sys
 import os
 import logging
 import mimetypes
-from typing import Final
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Final, Optional
 from pathlib import Path
 from fastapi import FastAPI
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
-from .routes import auth, status, chat
+from .routes import auth, status, chat, chat_ws, metrics
+from ._compression import CompressionMiddleware
+from ._metrics_middleware import MetricsMiddleware
+from ._static_assets import FrontendAssets
+from ._tracing_middleware import TracingMiddleware
+from ._warmup import WarmUp
 
 _logger = logging.getLogger(__name__)
 
-from .._logs import get_log_file_handler, silence_loggers
+from .._logs import get_log_file_handler, silence_loggers, start_log_queue
 from .._misc import get_root_path
 
 
@@ -21,23 +25,31 @@ def create_app() -> FastAPI:
     _init_log(verbose=False)
     _configure_static_mime_types()
     _logger.info("Initializing HTTP server application")
-    app = FastAPI(title="legalcodex-http-server")
-
-
-
-    @app.get("/")
-    def get_frontend_index() -> FileResponse:
-        index_path = _get_frontend_path() / "index.html"
-        _logger.debug("Serving frontend index from: %s", index_path)
-        return FileResponse(index_path, media_type="text/html")
+    app = FastAPI(title="legalcodex-http-server", lifespan=_lifespan)
+    app.add_middleware(CompressionMiddleware)
+    app.add_middleware(TracingMiddleware)
+    app.add_middleware(MetricsMiddleware)
 
     app.include_router(auth.router, prefix="/api/v1")
     app.include_router(status.router, prefix="/api/v1")
     app.include_router(chat.router, prefix="/api/v1")
-    app.mount("/", StaticFiles(directory=_get_frontend_path()), name="frontend")
+    app.include_router(chat_ws.router, prefix="/api/v1")
+    app.include_router(metrics.router, prefix="/api/v1")
+    app.mount("/", FrontendAssets(_get_frontend_path()), name="frontend")
     return app
 
 
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Warm the process up in the background; /api/v1/status/ready reports when it is done.
+    """
+    warm_up = WarmUp.from_environ()
+    app.state.warm_up = warm_up
+    warm_up.start()
+    yield
+
+
 def _configure_static_mime_types() -> None:
     mimetypes.add_type("application/javascript", ".js")
     mimetypes.add_type("application/javascript", ".mjs")
@@ -49,9 +61,7 @@ def _init_log(verbose:bool=False)->None:
 
     root_logger = logging.getLogger()
     root_logger.setLevel(level=level)
-    handler = get_log_file_handler(verbose)
-    root_logger.addHandler(handler)
-    root_logger.addHandler(logging.StreamHandler(sys.stderr))
+    start_log_queue(lambda: [get_log_file_handler(verbose), logging.StreamHandler(sys.stderr)])
 
     silence_loggers()
 
@@ -63,4 +73,18 @@ def _get_frontend_path() -> Path:
         _logger.warning("Frontend path does not exist: %s", path)
     return path
 
-app = create_app()
+
+_app : Optional[FastAPI] = None
+
+
+def __getattr__(name: str) -> FastAPI:
+    """
+    Build the module level `app` (the legalcodex.http_server.app:app target) on first access
+    rather than at import time; `lc serve` uses the create_app factory.
+    """
+    global _app
+    if name != "app":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if _app is None:
+        _app = create_app()
+    return _app
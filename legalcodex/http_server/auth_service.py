@@ -9,7 +9,8 @@ from __future__ import annotations
 
 import logging
 import os
-from datetime import datetime, timedelta
+import uuid
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 from dataclasses import dataclass
 
@@ -29,6 +30,9 @@ class TokenPayload:
     """Represents the data encoded in a JWT token."""
     username: str
     roles: list[str]
+    token_id: str = ""          # jti; set on the tokens created by create_access_token
+    issued_at: float = 0.0      # Unix time
+    expires_at: float = 0.0     # Unix time
 
 
 def create_access_token(
@@ -49,14 +53,15 @@ def create_access_token(
     if expires_delta is None:
         expires_delta = timedelta(minutes=JWT_EXPIRATION_MINUTES)
 
-    now = datetime.utcnow()
+    now = datetime.now(timezone.utc)
     exp = now + expires_delta
 
     payload = {
         "sub": token_payload.username,  # Subject: the user identifier (username)
         "roles": token_payload.roles,   # Custom claim: list of security group names (e.g., ["user", "admin"])
         "exp": exp,       # Expiration Time: when the token becomes invalid (Unix timestamp)
-        "iat": now,       # Issued At: when the token was created (Unix timestamp)
+        "iat": now.timestamp(),  # Issued At: when the token was created (Unix timestamp, sub-second for revocations)
+        "jti": uuid.uuid4().hex, # JWT ID: identifies the token for revocation
     }
 
     token = jwt.encode(payload, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
@@ -87,7 +92,11 @@ def verify_access_token(token: str) -> Optional[TokenPayload]:
             _logger.warning("Token missing 'sub' claim")
             return None
 
-        return TokenPayload(username=username, roles=roles)
+        return TokenPayload(username=username,
+                            roles=roles,
+                            token_id=str(payload.get("jti", "")),
+                            issued_at=float(payload.get("iat", 0.0)),
+                            expires_at=float(payload.get("exp", 0.0)))
 
     except jwt.ExpiredSignatureError:
         _logger.debug("Token has expired")
@@ -18,6 +18,7 @@ from pydantic import BaseModel
 from ..._user_access import UsersAccess
 from ..auth_service import create_access_token, verify_access_token, TokenPayload
 from .._require_user import ACCESS_COOKIE_NAME
+from .._token_cache import TokenCache
 
 _logger = logging.getLogger(__name__)
 
@@ -60,7 +61,16 @@ def login(payload: LoginRequest, response: Response) -> None:
 
 
 @router.post("/auth/logout", status_code=status.HTTP_204_NO_CONTENT)
-def logout(response: Response) -> None:
+def logout(request: Request, response: Response) -> None:
+    token = request.cookies.get(ACCESS_COOKIE_NAME)
+    if token:
+        try:
+            token_payload = verify_access_token(token)
+            if token_payload is not None:
+                TokenCache().revoke_token(token_payload)
+        except jwt.InvalidTokenError:
+            pass
+
     response.delete_cookie(
         key=ACCESS_COOKIE_NAME,
         path="/api/v1",
@@ -88,8 +98,8 @@ def session(request: Request) -> dict[str, bool | str | list[str]] | JSONRespons
 
     try:
         token_payload = verify_access_token(token)
-        if token_payload is None:
-            _logger.debug("Session check: token payload is None")
+        if token_payload is None or TokenCache().is_revoked(token_payload):
+            _logger.debug("Session check: token payload is None or revoked")
             return JSONResponse(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 content={"authenticated": False}
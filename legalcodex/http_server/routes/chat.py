@@ -1,26 +1,44 @@
 from __future__ import annotations
 
+import json
 import logging
+from contextlib import ExitStack
+from typing import Final, Iterator
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 
 from ..._schema import ChatContextSchema
 from ..._user_access import User
-from ...exceptions import LCException, ChatSessionNotFound
+from ..._deadline import Deadline
+from ..._idempotency import fingerprint
+from ..._tracing import span
+from ...exceptions import LCException, ChatSessionNotFound, DeadlineExceeded
+from ...ai._engine_selector import client_parameters
 from ...ai.chat import chat_behaviour
+from ...ai.chat.chat_questions import DEFAULT_CONCURRENCY, MAX_QUESTIONS, Question, QuestionResult, SessionSetup, ask_questions
 from ...ai.chat._chat_types import ChatSessionId
 from .._require_user import require_user
+from .._request_deadline import request_deadline
+from .._error_status import error_status
+from .._request_admission import admitted
+from .._request_idempotency import IDEMPOTENCY_KEY_HEADER, run_idempotent
 
 _logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+NDJSON_MEDIA_TYPE :Final[str] = "application/x-ndjson"
+
+
 class CreateSessionRequest(BaseModel):
     session_id: str | None = None
     engine: str | None = None
     model: str | None = None
     max_messages: int | None = None
+    summarizer: str | None = None
+    parameters: dict[str, str] | None = None
 
 
 class MessageRequest(BaseModel):
@@ -36,6 +54,23 @@ class MessageResponse(BaseModel):
     response: str
 
 
+class QuestionItem(BaseModel):
+    question: str
+    id: str | None = None
+    session_id: str | None = None
+
+
+class QuestionsRequest(BaseModel):
+    questions: list[str | QuestionItem] = Field(..., max_length=MAX_QUESTIONS)
+    engine: str | None = None
+    model: str | None = None
+    max_messages: int | None = None
+    summarizer: str | None = None
+    parameters: dict[str, str] | None = None
+    concurrency: int = DEFAULT_CONCURRENCY
+    keep_sessions: bool = False
+
+
 
 
 
@@ -68,6 +103,8 @@ def create_session(
             max_messages=payload.max_messages,
             engine_name=payload.engine,
             model=payload.model,
+            summarizer=payload.summarizer,
+            parameters=client_parameters(payload.engine, payload.parameters),
         )
         description = _find_session_description(session_id, user)
         response.status_code = status.HTTP_201_CREATED
@@ -92,14 +129,83 @@ def get_context(session_id: str, user: User = Depends(require_user)) -> ChatCont
     status_code=status.HTTP_200_OK,
 )
 def send_message(
-    session_id: str, payload: MessageRequest, user: User = Depends(require_user)
+    session_id: str,
+    payload: MessageRequest,
+    response: Response,
+    user: User = Depends(require_user),
+    deadline: Deadline = Depends(request_deadline),
+    idempotency_key: str | None = Header(default=None, alias=IDEMPOTENCY_KEY_HEADER),
 ) -> MessageResponse:
+    def run_turn() -> MessageResponse:
+        with admitted(user, deadline):
+            return _run_turn(ChatSessionId(session_id), payload.message, deadline)
+
+    return run_idempotent(idempotency_key, (user.username, session_id), fingerprint(payload.message),
+                          run_turn, response, deadline)
+
+
+@router.post("/chat/sessions/{session_id}/messages/stream", response_class=StreamingResponse)
+def stream_message(
+    session_id: str,
+    payload: MessageRequest,
+    user: User = Depends(require_user),
+    deadline: Deadline = Depends(request_deadline),
+) -> StreamingResponse:
+    """
+    Send a message and stream the response as JSON lines: {"delta": ...} for each chunk as it
+    is generated, then {"done": true}, or {"error": ..., "status": ...} if the turn fails once
+    streaming has started.
+    """
+    turn = ExitStack()
+    turn.enter_context(admitted(user, deadline))     # Held until the stream ends
     try:
-        stream = chat_behaviour.send_message(ChatSessionId(session_id), payload.message)
-        response_parts: list[str] = [chunk for chunk in stream]
-        return MessageResponse(response="".join(response_parts))
+        stream = chat_behaviour.send_message(ChatSessionId(session_id), payload.message, deadline)
+    except BaseException as exc:
+        turn.close()
+        if isinstance(exc, LCException):
+            raise HTTPException(status_code=error_status(exc), detail=str(exc)) from exc
+        raise
+
+    def lines() -> Iterator[str]:
+        with turn:
+            try:
+                with span("response.stream"):
+                    for chunk in stream:
+                        yield json.dumps({"delta": chunk}, ensure_ascii=False) + "\n"
+            except LCException as exc:
+                _logger.warning("Streamed chat turn failed: %s", exc)
+                yield json.dumps({"error": str(exc), "status": error_status(exc)}) + "\n"
+                return
+            finally:
+                stream.close()
+            yield json.dumps({"done": True}) + "\n"
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.post("/chat/questions", response_class=StreamingResponse)
+def ask_batch(
+    payload: QuestionsRequest,
+    user: User = Depends(require_user),
+    deadline: Deadline = Depends(request_deadline),
+) -> StreamingResponse:
+    """
+    Ask independent questions concurrently; each result is streamed as a JSON line as soon as
+    its question is answered. The time budget applies to each question.
+    """
+    questions = [Question(item) if isinstance(item, str)
+                 else Question(item.question, item.id, ChatSessionId(item.session_id) if item.session_id else None)
+                 for item in payload.questions]
+    try:
+        setup = SessionSetup(engine=payload.engine,
+                             model=payload.model,
+                             max_messages=payload.max_messages,
+                             summarizer=payload.summarizer,
+                             parameters=client_parameters(payload.engine, payload.parameters))
+        results = ask_questions(user, questions, setup, payload.concurrency, deadline.budget, payload.keep_sessions)
     except LCException as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return StreamingResponse((_result_line(result) for result in results), media_type=NDJSON_MEDIA_TYPE)
 
 
 @router.post("/chat/sessions/{session_id}/reset", status_code=status.HTTP_204_NO_CONTENT)
@@ -120,6 +226,29 @@ def close_session(session_id: str, user: User = Depends(require_user)) -> None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
 
+def _run_turn(session_id: ChatSessionId, message: str, deadline: Deadline) -> MessageResponse:
+    try:
+        stream = chat_behaviour.send_message(session_id, message, deadline)
+        with span("response.stream"):
+            response_parts: list[str] = [chunk for chunk in stream]
+        return MessageResponse(response="".join(response_parts))
+    except LCException as exc:
+        if isinstance(exc, DeadlineExceeded):
+            _logger.warning("Chat turn exceeded its %.1fs budget: %s", deadline.budget, exc)
+        raise HTTPException(status_code=error_status(exc), detail=str(exc)) from exc
+
+
+def _result_line(result: QuestionResult) -> str:
+    record = {"index": result.index,
+              "id": result.id,
+              "session_id": result.session_id,
+              "status": status.HTTP_200_OK if result.error is None else error_status(result.error),
+              "response": result.response,
+              "error": str(result.error) if result.error is not None else None,
+              "duration_ms": round(result.duration_s * 1000, 1)}
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
 def _find_session_description(session_id: ChatSessionId, user: User) -> str | None:
     for session in chat_behaviour.get_sessions(user):
         if str(session.session_id) == str(session_id):
@@ -0,0 +1,330 @@
+"""
+WebSocket chat transport: one authenticated connection carrying the requests of several
+sessions, with the responses of the turns streamed as deltas.
+
+The client sends JSON frames with a `type` and an `id` chosen by the client; every frame
+sent back for a request carries its id:
+
+    create   {engine, model, ...}           -> session {session_id, description}
+    send     {session_id, message, timeout} -> delta {text}..., then done | cancelled
+    cancel   {id of a running send}         -> (the turn ends with cancelled)
+    context  {session_id}                   -> context {context}
+    reset    {session_id}                   -> context {context}
+    close    {session_id}                   -> closed
+
+Failures are answered with an `error` frame with the HTTP status of the matching route
+(400, 404, 429 with retry_after, 504).
+
+The handshake is refused (close code 1008) unless it carries the session cookie and, when
+it comes from a browser, the server's own Origin, so that other sites cannot open a socket
+with the user's cookie. The token is checked again before each request: once it expires or
+is revoked, the connection is closed with code 1008.
+
+Turns run in worker threads, as the HTTP routes do. A turn may have at most
+SEND_QUEUE_SIZE chunks waiting to be sent: when the client reads slowly the turn waits,
+so the provider stream is not read faster than the connection drains. The chunks waiting
+when the connection is ready are sent as a single delta.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import urllib.parse
+from typing import Any, Callable, Final, Optional, Union
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+from pydantic import BaseModel, ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from ..._admission import AdmissionController
+from ..._deadline import Deadline
+from ..._metrics import counter
+from ..._user_access import User
+from ...exceptions import AdmissionRejected, LCValueError
+from ...ai._engine_selector import client_parameters
+from ...ai.chat import chat_behaviour
+from ...ai.chat._chat_types import ChatSessionId
+from .._error_status import error_status
+from .._request_deadline import get_request_timeout
+from .._require_user import ACCESS_COOKIE_NAME, authenticate
+
+_logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+SEND_QUEUE_SIZE         :Final[int]   = 32      # Chunks of a turn waiting to be sent
+MAX_TURNS_PER_SOCKET    :Final[int]   = 8       # Turns running at once on a connection
+CREDIT_POLL_S           :Final[float] = 0.1     # How often a waiting turn checks for cancellation
+
+WS_FRAMES = counter("lc_ws_frames_total", "WebSocket chat frames by direction (in, out) and type", ("direction", "type"))
+
+_END = object()     # End of the chunks of a turn
+
+
+class ClientFrame(BaseModel):
+    type: str
+    id: str = ""
+    session_id: Optional[str] = None
+    message: Optional[str] = None
+    timeout: Optional[float] = None
+    engine: Optional[str] = None
+    model: Optional[str] = None
+    max_messages: Optional[int] = None
+    summarizer: Optional[str] = None
+    parameters: Optional[dict[str, str]] = None
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class _Turn:
+    __slots__ = ("cancelled",)
+
+    def __init__(self) -> None:
+        self.cancelled = threading.Event()
+
+
+@router.websocket("/chat/ws")
+async def chat_socket(websocket: WebSocket) -> None:
+    if not _same_origin(websocket):
+        _logger.warning("Chat socket refused for origin %s", websocket.headers.get("origin"))
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    token = websocket.cookies.get(ACCESS_COOKIE_NAME)
+    try:
+        user = authenticate(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    _logger.info("Chat socket opened for user %s", user.username)
+    await _Connection(websocket, user, token or "").run()
+
+
+def _same_origin(websocket: WebSocket) -> bool:
+    """
+    Whether the Origin of the handshake, if any, is the server's host. Browsers always send
+    it; other clients (e.g. the CLI) may not, and cannot be driven by another site anyway.
+    """
+    origin = websocket.headers.get("origin")
+    if origin is None:
+        return True
+    host = websocket.headers.get("host", "")
+    return bool(host) and urllib.parse.urlsplit(origin).netloc.lower() == host.lower()
+
+
+class _Connection:
+    def __init__(self, websocket: WebSocket, user: User, token: str) -> None:
+        self._websocket = websocket
+        self._user = user
+        self._token = token
+        self._send_lock = asyncio.Lock()
+        self._turns: dict[str, _Turn] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def run(self) -> None:
+        try:
+            while True:
+                text = await self._websocket.receive_text()
+                await self._receive(text)
+        except WebSocketDisconnect:
+            _logger.info("Chat socket closed for user %s", self._user.username)
+        finally:
+            for turn in self._turns.values():
+                turn.cancelled.set()
+            for task in self._tasks:
+                task.cancel()
+
+    async def send(self, frame: dict[str, Any]) -> None:
+        async with self._send_lock:
+            await self._websocket.send_json(frame)
+        WS_FRAMES.inc(direction="out", type=frame["type"])
+
+    async def _receive(self, text: str) -> None:
+        try:
+            frame = ClientFrame.model_validate(json.loads(text))
+        except (ValueError, ValidationError) as err:
+            WS_FRAMES.inc(direction="in", type="invalid")
+            await self._error("", status.HTTP_400_BAD_REQUEST, f"Invalid frame: {err}")
+            return
+        WS_FRAMES.inc(direction="in", type=frame.type if frame.type in _HANDLERS or frame.type == "cancel" else "unknown")
+
+        if frame.type != "cancel" and not self._authorized():
+            _logger.info("Closing the chat socket of user %s: its token expired or was revoked", self._user.username)
+            await self._websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Unauthorized")
+            raise WebSocketDisconnect(status.WS_1008_POLICY_VIOLATION)
+
+        if frame.type == "cancel":
+            turn = self._turns.get(frame.id)
+            if turn is not None:
+                turn.cancelled.set()
+            return
+        handler = _HANDLERS.get(frame.type)
+        if handler is None:
+            await self._error(frame.id, status.HTTP_400_BAD_REQUEST, f"Unknown frame type: {frame.type}")
+            return
+        if frame.type == "send":
+            if frame.id in self._turns:
+                await self._error(frame.id, status.HTTP_400_BAD_REQUEST, f"A turn with id '{frame.id}' is running")
+                return
+            if len(self._turns) >= MAX_TURNS_PER_SOCKET:
+                await self._error(frame.id, status.HTTP_429_TOO_MANY_REQUESTS, "Too many turns on this connection")
+                return
+            self._turns[frame.id] = _Turn()
+        self._start(frame, handler)
+
+    def _start(self, frame: ClientFrame, handler: Callable[[_Connection, ClientFrame], Any]) -> None:
+        async def run() -> None:
+            try:
+                await handler(self, frame)
+            except WebSocketDisconnect:
+                pass        # Connection closed while answering
+            except Exception as err:
+                status_code, detail, extra = _error_of(err)
+                try:
+                    await self._error(frame.id, status_code, detail, **extra)
+                except (WebSocketDisconnect, RuntimeError):
+                    pass
+            finally:
+                if frame.type == "send":
+                    self._turns.pop(frame.id, None)
+
+        task = asyncio.ensure_future(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _authorized(self) -> bool:
+        """
+        Whether the token of the handshake is still valid (verified tokens are cached).
+        """
+        try:
+            return authenticate(self._token).username == self._user.username
+        except HTTPException:
+            return False
+
+    async def _error(self, request_id: str, status_code: int, detail: str, **extra: Any) -> None:
+        await self.send({"type": "error", "id": request_id, "status": status_code, "detail": detail, **extra})
+
+    async def _create(self, frame: ClientFrame) -> None:
+        user = self._user
+
+        def create() -> tuple[str, Optional[str]]:
+            if frame.session_id:
+                session_id = ChatSessionId(frame.session_id)
+                chat_behaviour.open_session(user, session_id)
+            else:
+                session_id = chat_behaviour.new_session(user=user,
+                                                        max_messages=frame.max_messages,
+                                                        engine_name=frame.engine,
+                                                        model=frame.model,
+                                                        summarizer=frame.summarizer,
+                                                        parameters=client_parameters(frame.engine, frame.parameters))
+            description = next((getattr(session, "description", None) for session in chat_behaviour.get_sessions(user)
+                                if str(session.session_id) == str(session_id)), None)
+            return str(session_id), description
+
+        session_id, description = await run_in_threadpool(create)
+        await self.send({"type": "session", "id": frame.id, "session_id": session_id, "description": description})
+
+    async def _context(self, frame: ClientFrame) -> None:
+        session_id = _session_id(frame)
+        if frame.type == "reset":
+            await run_in_threadpool(chat_behaviour.reset_context, session_id)
+        context = await run_in_threadpool(chat_behaviour.get_context, session_id)
+        await self.send({"type": "context", "id": frame.id, "session_id": session_id,
+                         "context": context.model_dump(mode="json")})
+
+    async def _close(self, frame: ClientFrame) -> None:
+        session_id = _session_id(frame)
+        await run_in_threadpool(chat_behaviour.close_session, session_id)
+        await self.send({"type": "closed", "id": frame.id, "session_id": session_id})
+
+    async def _send_message(self, frame: ClientFrame) -> None:
+        session_id = _session_id(frame)
+        if not frame.message:
+            raise LCValueError("message must not be empty")
+        deadline = Deadline(min(get_request_timeout(), frame.timeout) if frame.timeout and frame.timeout > 0
+                            else get_request_timeout())
+        turn = self._turns[frame.id]
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue[Union[str, object]] = asyncio.Queue()
+        credits = threading.Semaphore(SEND_QUEUE_SIZE)
+        username = self._user.username
+
+        def emit(chunk: str) -> None:
+            while not credits.acquire(timeout=CREDIT_POLL_S):
+                if turn.cancelled.is_set():
+                    raise _Cancelled()
+            loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+
+        def produce() -> bool:
+            """
+            Run the turn, handing its chunks to the event loop; return False if it was cancelled.
+            """
+            try:
+                with AdmissionController().admit(username, deadline.remaining()):
+                    stream = chat_behaviour.send_message(session_id, frame.message or "", deadline)
+                    try:
+                        for chunk in stream:
+                            if turn.cancelled.is_set():
+                                raise _Cancelled()
+                            emit(chunk)
+                    except _Cancelled:
+                        stream.close()
+                        return False
+                return True
+            finally:
+                loop.call_soon_threadsafe(chunks.put_nowait, _END)
+
+        producer = asyncio.ensure_future(run_in_threadpool(produce))
+        try:
+            ended = False
+            while not ended:
+                parts: list[str] = []
+                item = await chunks.get()
+                while True:
+                    if item is _END:
+                        ended = True
+                        break
+                    parts.append(str(item))
+                    credits.release()
+                    if chunks.empty():
+                        break
+                    item = chunks.get_nowait()
+                if parts:
+                    await self.send({"type": "delta", "id": frame.id, "session_id": session_id, "text": "".join(parts)})
+            completed = await producer
+        finally:
+            turn.cancelled.set()            # Stops the turn if the connection is gone
+        await self.send({"type": "done" if completed else "cancelled", "id": frame.id, "session_id": session_id})
+
+
+_HANDLERS: dict[str, Callable[[_Connection, ClientFrame], Any]] = {
+    "create":   _Connection._create,
+    "send":     _Connection._send_message,
+    "context":  _Connection._context,
+    "reset":    _Connection._context,
+    "close":    _Connection._close,
+}
+
+
+def _session_id(frame: ClientFrame) -> ChatSessionId:
+    if not frame.session_id:
+        raise LCValueError("session_id is required")
+    return ChatSessionId(frame.session_id)
+
+
+def _error_of(err: Exception) -> tuple[int, str, dict[str, Any]]:
+    """
+    Status, detail and extra fields of the error frame of a failed request.
+    """
+    status_code = error_status(err)
+    if status_code == status.HTTP_500_INTERNAL_SERVER_ERROR:
+        _logger.exception("Chat socket request failed: %s", err)
+        return status_code, "Internal server error", {}
+    if isinstance(err, AdmissionRejected):
+        return status_code, str(err), {"retry_after": int(err.retry_after)}
+    return status_code, str(err), {}
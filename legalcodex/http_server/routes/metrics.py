@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import logging
+
+from fastapi import APIRouter, Response
+
+from ..._metrics import CONTENT_TYPE, MetricsRegistry
+
+_logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=Response)
+def get_metrics() -> Response:
+    """
+    Return the server metrics in the Prometheus text format.
+    """
+    return Response(content=MetricsRegistry().render(), media_type=CONTENT_TYPE)
@@ -4,7 +4,10 @@ import logging
 from datetime import datetime, timezone
 import os
 
-from fastapi import APIRouter
+from typing import Any
+
+from fastapi import APIRouter, Request, status
+from fastapi.responses import JSONResponse
 
 _logger = logging.getLogger(__name__)
 
@@ -21,3 +24,19 @@ def get_status() -> dict[str, str]:
         "cwd": str(os.getcwd()),
         "timestamp_utc": timestamp,
     }
+
+
+@router.get("/status/ready", response_model=None)
+def get_ready(request: Request) -> dict[str, Any] | JSONResponse:
+    """
+    Readiness: 200 once the process is warmed up (see _warmup), 503 until then.
+    """
+    warm_up = getattr(request.app.state, "warm_up", None)
+    if warm_up is None:         # Started without a lifespan: nothing to wait for
+        return {"status": "ready"}
+    details = warm_up.status()
+    if not warm_up.ready:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            content={"status": "warming_up", **details},
+                            headers={"Retry-After": "1"})
+    return {"status": "ready", **details}
@@ -0,0 +1,50 @@
+import unittest
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from legalcodex._admission import AdmissionController, AdmissionLimits
+from legalcodex._singleton import SingletonMeta
+from legalcodex.ai.chat.chat_session_manager import ChatSessionManager, get_path
+from legalcodex.ai.chat._chat_types import ChatSessionId
+from legalcodex.http_server.app import create_app
+
+
+class TestAdmissionRoutes(unittest.TestCase):
+    def setUp(self) -> None:
+        SingletonMeta._instances.pop(AdmissionController, None)
+        AdmissionController().configure(AdmissionLimits(max_concurrent=4, max_per_user=1, max_user_queue=0))
+        self.client = TestClient(create_app())
+        self.client.post("/api/v1/auth/login", json={"username": "test", "password": "hello"})
+        self.session_id = self.client.post("/api/v1/chat/sessions", json={"engine": "mock"}).json()["session_id"]
+
+    def tearDown(self) -> None:
+        ChatSessionManager().close_session(ChatSessionId(self.session_id))
+        (Path(get_path()) / f"{self.session_id}.json").unlink(missing_ok=True)
+        SingletonMeta._instances.pop(AdmissionController, None)
+
+    def _send(self) -> int:
+        response = self.client.post(f"/api/v1/chat/sessions/{self.session_id}/messages", json={"message": "Hello"})
+        self.retry_after = response.headers.get("retry-after")
+        status: int = response.status_code
+        return status
+
+    def test_turn_over_the_user_limit_is_rejected_with_retry_after(self) -> None:
+        controller = AdmissionController()
+        controller.acquire("test")          # A turn of the same user is running
+        try:
+            self.assertEqual(self._send(), 429)
+            assert self.retry_after is not None
+            self.assertGreaterEqual(int(self.retry_after), 1)
+
+            controller.acquire("dan")       # Other users keep their own slots
+            controller.release("dan")
+        finally:
+            controller.release("test")
+
+        self.assertEqual(self._send(), 200)
+        self.assertEqual(controller.snapshot(), {"running": 0, "queued": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,19 @@
+import time
 import unittest
 from pathlib import Path
+from typing import Iterator
 from uuid import uuid4
 
 from fastapi.testclient import TestClient
 
+from legalcodex.exceptions import AdmissionRejected
 from legalcodex.http_server.app import create_app
 from legalcodex.ai.chat.chat_session_manager import ChatSessionManager, get_path
+from legalcodex.ai.chat._chat_types import ChatSessionId
+from legalcodex.ai._engine_selector import ENGINES
+from legalcodex.ai.context import Context
+from legalcodex.ai.stream import Stream
+from legalcodex.ai.engines.mock_engine import MockEngine
 
 
 class TestChatRoutes(unittest.TestCase):
@@ -61,6 +69,106 @@ class TestChatRoutes(unittest.TestCase):
         self.assertEqual(response.status_code, 404)
 
 
+    def test_send_message_past_deadline_returns_504(self) -> None:
+        ENGINES[_SlowEngine.NAME] = _SlowEngine
+        try:
+            create_response = self.client.post("/api/v1/chat/sessions", json={"engine": _SlowEngine.NAME})
+            session_id = create_response.json()["session_id"]
+
+            response = self.client.post(
+                f"/api/v1/chat/sessions/{session_id}/messages",
+                json={"message": "Hello"},
+                headers={"X-Request-Timeout": "0.05"},
+            )
+        finally:
+            ENGINES.pop(_SlowEngine.NAME, None)
+        self.assertEqual(response.status_code, 504)
+
+    def test_streamed_turn_releases_the_engine_stream(self) -> None:
+        ENGINES[_SlowEngine.NAME] = _SlowEngine
+        _SlowStream.closed = 0
+        try:
+            session_id = self.client.post("/api/v1/chat/sessions", json={"engine": _SlowEngine.NAME}).json()["session_id"]
+
+            response = self.client.post(f"/api/v1/chat/sessions/{session_id}/messages/stream", json={"message": "Hello"})
+        finally:
+            ENGINES.pop(_SlowEngine.NAME, None)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text.splitlines()[-1], '{"done": true}')
+        self.assertEqual(_SlowStream.closed, 1)
+
+    def test_send_message_to_missing_session_returns_404(self) -> None:
+        response = self.client.post(f"/api/v1/chat/sessions/{uuid4()}/messages", json={"message": "Hello"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_send_message_rejected_by_the_engine_returns_429(self) -> None:
+        ENGINES[_BusyEngine.NAME] = _BusyEngine
+        try:
+            session_id = self.client.post("/api/v1/chat/sessions", json={"engine": _BusyEngine.NAME}).json()["session_id"]
+
+            response = self.client.post(f"/api/v1/chat/sessions/{session_id}/messages", json={"message": "Hello"})
+        finally:
+            ENGINES.pop(_BusyEngine.NAME, None)
+        self.assertEqual(response.status_code, 429)
+
+    def test_send_message_rejects_invalid_timeout(self) -> None:
+        create_response = self.client.post("/api/v1/chat/sessions", json={})
+        session_id = create_response.json()["session_id"]
+
+        response = self.client.post(
+            f"/api/v1/chat/sessions/{session_id}/messages",
+            json={"message": "Hello"},
+            headers={"X-Request-Timeout": "soon"},
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_create_session_rejects_server_only_parameters(self) -> None:
+        for payload in ({"engine": "openai", "parameters": {"base_url": "http://attacker.invalid/v1"}},
+                        {"engine": "mock", "parameters": {"unknown": "1"}},
+                        {"engine": "mock", "parameters": {"response_tokens": "many"}},
+                        {"engine": "mock", "parameters": {"profile": "huge"}}):
+            response = self.client.post("/api/v1/chat/sessions", json=payload)
+            self.assertEqual(response.status_code, 400, payload)
+
+    def test_create_session_clamps_numeric_parameters(self) -> None:
+        response = self.client.post("/api/v1/chat/sessions",
+                                    json={"engine": "mock", "parameters": {"response_tokens": "100000000", "ttft_ms": "-5"}})
+        self.assertEqual(response.status_code, 201)
+
+        engine = ChatSessionManager().get_session(ChatSessionId(response.json()["session_id"])).engine
+        self.assertEqual(engine.parameters["response_tokens"], "4000")
+        self.assertEqual(engine.parameters["ttft_ms"], "0.0")
+
+    def test_questions_reject_server_only_parameters(self) -> None:
+        response = self.client.post("/api/v1/chat/questions",
+                                    json={"questions": ["q"], "engine": "openai", "parameters": {"max_retries": "100"}})
+        self.assertEqual(response.status_code, 400)
+
+
+class _SlowStream(Stream):
+    closed = 0
+
+    def __iter__(self) -> Iterator[str]:
+        for word in ["slow ", "response ", "from ", "the ", "engine"]:
+            time.sleep(0.03)
+            yield word
+
+    def close(self) -> None:
+        _SlowStream.closed += 1
+
+
+class _SlowEngine(MockEngine):
+    NAME = "test-slow"
+
+    def run_messages_stream(self, context: Context) -> Stream:
+        return _SlowStream()
+
+
+class _BusyEngine(MockEngine):
+    NAME = "test-busy"
+
+    def run_messages_stream(self, context: Context) -> Stream:
+        raise AdmissionRejected("queue full", 1.0)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,171 @@
+import time
+import unittest
+from pathlib import Path
+from typing import Any, Iterator
+
+from fastapi.testclient import TestClient
+from starlette.testclient import WebSocketTestSession
+from starlette.websockets import WebSocketDisconnect
+
+from legalcodex._admission import AdmissionController
+from legalcodex._singleton import SingletonMeta
+from legalcodex.ai._engine_selector import ENGINES
+from legalcodex.ai.chat.chat_session_manager import ChatSessionManager, get_path
+from legalcodex.ai.chat._chat_types import ChatSessionId
+from legalcodex.ai.context import Context
+from legalcodex.ai.engines.mock_engine import MockEngine
+from legalcodex.ai.stream import Stream
+from legalcodex.http_server.app import create_app
+from legalcodex.http_server._token_cache import TokenCache
+
+
+class TestChatSocket(unittest.TestCase):
+    def setUp(self) -> None:
+        SingletonMeta._instances.pop(AdmissionController, None)
+        SingletonMeta._instances.pop(TokenCache, None)
+        ENGINES[_SlowEngine.NAME] = _SlowEngine
+        _SlowStream.closed = 0
+        self.client = TestClient(create_app())
+        self.client.post("/api/v1/auth/login", json={"username": "test", "password": "hello"})
+        self.session_ids: list[str] = []
+
+    def tearDown(self) -> None:
+        ENGINES.pop(_SlowEngine.NAME, None)
+        for session_id in self.session_ids:
+            try:
+                ChatSessionManager().close_session(ChatSessionId(session_id))
+            except Exception:
+                pass
+            (Path(get_path()) / f"{session_id}.json").unlink(missing_ok=True)
+        SingletonMeta._instances.pop(AdmissionController, None)
+        SingletonMeta._instances.pop(TokenCache, None)
+
+    def _create(self, socket: WebSocketTestSession, engine: str = "mock") -> str:
+        socket.send_json({"type": "create", "id": f"create-{len(self.session_ids)}", "engine": engine})
+        frame: dict[str, Any] = socket.receive_json()
+        self.assertEqual(frame["type"], "session")
+        session_id: str = frame["session_id"]
+        self.session_ids.append(session_id)
+        return session_id
+
+    def _until(self, socket: WebSocketTestSession, *types: str) -> list[dict[str, Any]]:
+        """
+        Receive frames until one of each of the types has been received.
+        """
+        frames: list[dict[str, Any]] = []
+        pending = list(types)
+        while pending:
+            frame: dict[str, Any] = socket.receive_json()
+            frames.append(frame)
+            if frame["type"] in pending:
+                pending.remove(frame["type"])
+        return frames
+
+    def test_rejects_unauthenticated_connection(self) -> None:
+        client = TestClient(create_app())
+        with self.assertRaises(WebSocketDisconnect) as closed:
+            with client.websocket_connect("/api/v1/chat/ws"):
+                pass
+        self.assertEqual(closed.exception.code, 1008)
+
+    def test_rejects_other_origins(self) -> None:
+        with self.assertRaises(WebSocketDisconnect) as closed:
+            with self.client.websocket_connect("/api/v1/chat/ws", headers={"Origin": "https://attacker.example"}):
+                pass
+        self.assertEqual(closed.exception.code, 1008)
+
+        with self.client.websocket_connect("/api/v1/chat/ws", headers={"Origin": "http://testserver"}) as socket:
+            self._create(socket)
+
+    def test_revoked_token_closes_the_connection(self) -> None:
+        with self.client.websocket_connect("/api/v1/chat/ws") as socket:
+            self._create(socket)
+            TokenCache().revoke_user("test")
+            socket.send_json({"type": "create", "id": "after-revoke", "engine": "mock"})
+            with self.assertRaises(WebSocketDisconnect) as closed:
+                socket.receive_json()
+        self.assertEqual(closed.exception.code, 1008)
+
+    def test_turn_is_streamed_and_added_to_the_context(self) -> None:
+        with self.client.websocket_connect("/api/v1/chat/ws") as socket:
+            session_id = self._create(socket, _SlowEngine.NAME)
+            socket.send_json({"type": "send", "id": "t1", "session_id": session_id, "message": "Hello"})
+            frames = self._until(socket, "done")
+
+            self.assertTrue(all(frame["id"] == "t1" for frame in frames))
+            self.assertEqual("".join(frame["text"] for frame in frames if frame["type"] == "delta"), "".join(_WORDS))
+
+            socket.send_json({"type": "context", "id": "c1", "session_id": session_id})
+            context = socket.receive_json()
+            self.assertEqual([message["role"] for message in context["context"]["history"]], ["user", "assistant"])
+
+            socket.send_json({"type": "reset", "id": "r1", "session_id": session_id})
+            self.assertEqual(socket.receive_json()["context"]["history"], [])
+
+    def test_sessions_are_multiplexed(self) -> None:
+        with self.client.websocket_connect("/api/v1/chat/ws") as socket:
+            first = self._create(socket, _SlowEngine.NAME)
+            second = self._create(socket, _SlowEngine.NAME)
+            socket.send_json({"type": "send", "id": "a", "session_id": first, "message": "Hello"})
+            socket.send_json({"type": "send", "id": "b", "session_id": second, "message": "Hello"})
+            frames = self._until(socket, "done", "done")
+
+        for request_id, session_id in (("a", first), ("b", second)):
+            mine = [frame for frame in frames if frame["id"] == request_id]
+            self.assertTrue(all(frame["session_id"] == session_id for frame in mine))
+            self.assertEqual(mine[-1]["type"], "done")
+            self.assertEqual("".join(frame["text"] for frame in mine if frame["type"] == "delta"), "".join(_WORDS))
+
+    def test_cancel_stops_the_turn(self) -> None:
+        with self.client.websocket_connect("/api/v1/chat/ws") as socket:
+            session_id = self._create(socket, _SlowEngine.NAME)
+            socket.send_json({"type": "send", "id": "t1", "session_id": session_id, "message": "Hello"})
+            self.assertEqual(socket.receive_json()["type"], "delta")
+            socket.send_json({"type": "cancel", "id": "t1"})
+            frames = self._until(socket, "cancelled")
+
+        self.assertNotIn("done", [frame["type"] for frame in frames])
+        self.assertEqual(AdmissionController().snapshot()["running"], 0)
+        self.assertEqual(_SlowStream.closed, 1)     # The engine stream is released at once
+
+    def test_errors_are_answered_with_the_request_id(self) -> None:
+        with self.client.websocket_connect("/api/v1/chat/ws") as socket:
+            socket.send_json({"type": "send", "id": "t1", "session_id": "missing", "message": "Hello"})
+            missing = socket.receive_json()
+            socket.send_json({"type": "unknown", "id": "u1"})
+            unknown = socket.receive_json()
+            socket.send_text("not json")
+            invalid = socket.receive_json()
+            socket.send_json({"type": "create", "id": "c1", "engine": "openai", "parameters": {"base_url": "http://attacker.invalid"}})
+            forbidden = socket.receive_json()
+
+        self.assertEqual((missing["type"], missing["id"], missing["status"]), ("error", "t1", 404))
+        self.assertEqual((unknown["id"], unknown["status"]), ("u1", 400))
+        self.assertEqual(invalid["status"], 400)
+        self.assertEqual((forbidden["type"], forbidden["id"], forbidden["status"]), ("error", "c1", 400))
+
+
+_WORDS = ["slow ", "response ", "from ", "the ", "engine"]
+
+
+class _SlowStream(Stream):
+    closed = 0
+
+    def __iter__(self) -> Iterator[str]:
+        for word in _WORDS:
+            time.sleep(0.03)
+            yield word
+
+    def close(self) -> None:
+        _SlowStream.closed += 1
+
+
+class _SlowEngine(MockEngine):
+    NAME = "test-ws-slow"
+
+    def run_messages_stream(self, context: Context) -> Stream:
+        return _SlowStream()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import re
+import unittest
+from typing import Any
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from legalcodex.http_server._compression import JSON_MIN_SIZE, CompressionMiddleware, negotiate
+from legalcodex.http_server._static_assets import IMMUTABLE_CACHE_CONTROL
+from legalcodex.http_server.app import create_app
+
+
+class TestFrontendAssets(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = TestClient(create_app())
+
+    def _index_references(self) -> list[str]:
+        index = self.client.get("/", headers={"Accept-Encoding": "identity"}).text
+        return re.findall(r'(?:src|href)="(/[^/"][^"]*)"', index)
+
+    def test_index_refers_to_hashed_assets_and_is_revalidated(self) -> None:
+        response = self.client.get("/")
+
+        self.assertEqual(response.headers["cache-control"], "no-cache")
+        self.assertIn("etag", response.headers)
+        references = self._index_references()
+        self.assertTrue(any(re.fullmatch(r"/styles\.[0-9a-f]{12}\.css", url) for url in references))
+        self.assertTrue(any(re.fullmatch(r"/js/auth-app\.[0-9a-f]{12}\.js", url) for url in references))
+
+    def test_hashed_assets_are_immutable_and_precompressed(self) -> None:
+        script = next(url for url in self._index_references() if url.startswith("/js/auth-app."))
+
+        response = self.client.get(script, headers={"Accept-Encoding": "gzip"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["cache-control"], IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertEqual(response.headers["vary"], "Accept-Encoding")
+        self.assertIn("javascript", response.headers["content-type"])
+        self.assertLess(int(response.headers["content-length"]), len(response.content))
+        self.assertRegex(response.text, r'from "\./chat-api\.[0-9a-f]{12}\.js"')
+
+    def test_identity_when_compression_is_not_accepted(self) -> None:
+        response = self.client.get("/styles.css", headers={"Accept-Encoding": "identity"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("content-encoding", response.headers)
+        self.assertEqual(int(response.headers["content-length"]), len(response.content))
+
+    def test_matching_etag_returns_not_modified(self) -> None:
+        etag = self.client.get("/styles.css").headers["etag"]
+
+        response = self.client.get("/styles.css", headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_unknown_file_returns_404(self) -> None:
+        self.assertEqual(self.client.get("/missing.js").status_code, 404)
+
+
+class TestCompressionMiddleware(unittest.TestCase):
+    def setUp(self) -> None:
+        app = FastAPI()
+        app.add_middleware(CompressionMiddleware)
+
+        @app.get("/items")
+        def items(count: int) -> list[dict[str, Any]]:
+            return [{"index": index, "text": "history entry"} for index in range(count)]
+
+        @app.get("/stream")
+        def stream() -> StreamingResponse:
+            return StreamingResponse(iter([b'{"a": 1}\n'] * 200), media_type="application/json")
+
+        self.client = TestClient(app)
+
+    def test_large_json_is_compressed(self) -> None:
+        response = self.client.get("/items", params={"count": 200}, headers={"Accept-Encoding": "gzip"})
+
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertEqual(response.headers["vary"], "Accept-Encoding")
+        self.assertEqual(len(response.json()), 200)
+        self.assertLess(int(response.headers["content-length"]), len(response.content) // 4)
+
+    def test_small_json_is_not_compressed(self) -> None:
+        response = self.client.get("/items", params={"count": 1}, headers={"Accept-Encoding": "gzip"})
+
+        self.assertLess(len(response.content), JSON_MIN_SIZE)
+        self.assertNotIn("content-encoding", response.headers)
+
+    def test_json_is_not_compressed_when_not_accepted(self) -> None:
+        response = self.client.get("/items", params={"count": 200}, headers={"Accept-Encoding": "identity"})
+
+        self.assertNotIn("content-encoding", response.headers)
+        self.assertEqual(response.headers["vary"], "Accept-Encoding")
+        self.assertEqual(len(response.json()), 200)
+
+    def test_streamed_responses_are_not_compressed(self) -> None:
+        response = self.client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+        self.assertNotIn("content-encoding", response.headers)
+        self.assertEqual(len(response.text.splitlines()), 200)
+
+    def test_negotiate_honours_quality(self) -> None:
+        self.assertEqual(negotiate("gzip, deflate, br", ("br", "gzip")), "br")
+        self.assertEqual(negotiate("br;q=0, gzip;q=0.5", ("br", "gzip")), "gzip")
+        self.assertEqual(negotiate("*", ("gzip",)), "gzip")
+        self.assertIsNone(negotiate("identity", ("br", "gzip")))
+        self.assertIsNone(negotiate("", ("gzip",)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from pathlib import Path
+
+import httpx
+from fastapi.testclient import TestClient
+
+from legalcodex._admission import AdmissionController
+from legalcodex._idempotency import IdempotencyStore
+from legalcodex._singleton import SingletonMeta
+from legalcodex.ai.chat.chat_session_manager import ChatSessionManager, get_path
+from legalcodex.ai.chat._chat_types import ChatSessionId
+from legalcodex.http_server.app import create_app
+
+
+class TestIdempotencyRoutes(unittest.TestCase):
+    def setUp(self) -> None:
+        SingletonMeta._instances.pop(IdempotencyStore, None)
+        SingletonMeta._instances.pop(AdmissionController, None)
+        self.client = TestClient(create_app())
+        self.client.post("/api/v1/auth/login", json={"username": "test", "password": "hello"})
+        self.session_id = self.client.post("/api/v1/chat/sessions", json={"engine": "mock"}).json()["session_id"]
+
+    def tearDown(self) -> None:
+        ChatSessionManager().close_session(ChatSessionId(self.session_id))
+        (Path(get_path()) / f"{self.session_id}.json").unlink(missing_ok=True)
+        SingletonMeta._instances.pop(IdempotencyStore, None)
+        SingletonMeta._instances.pop(AdmissionController, None)
+
+    def _send(self, message: str, key: str | None) -> httpx.Response:
+        headers = {"Idempotency-Key": key} if key is not None else {}
+        response: httpx.Response = self.client.post(f"/api/v1/chat/sessions/{self.session_id}/messages",
+                                                    json={"message": message}, headers=headers)
+        return response
+
+    def _history(self) -> list[dict[str, str]]:
+        history: list[dict[str, str]] = self.client.get(f"/api/v1/chat/sessions/{self.session_id}/context").json()["history"]
+        return history
+
+    def test_retry_with_the_same_key_is_replayed(self) -> None:
+        first = self._send("Hello", "retry-1")
+        retry = self._send("Hello", "retry-1")
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry.json(), first.json())
+        self.assertNotIn("idempotent-replayed", first.headers)
+        self.assertEqual(retry.headers["idempotent-replayed"], "true")
+        self.assertEqual(len(self._history()), 2)        # A single turn
+
+    def test_requests_without_key_or_with_new_key_run(self) -> None:
+        self._send("Hello", None)
+        self._send("Hello", None)
+        self._send("Hello", "a")
+        self._send("Hello", "b")
+
+        self.assertEqual(len(self._history()), 8)
+
+    def test_key_reused_for_another_message_is_rejected(self) -> None:
+        self._send("Hello", "reused")
+
+        self.assertEqual(self._send("Goodbye", "reused").status_code, 422)
+        self.assertEqual(len(self._history()), 2)
+
+    def test_invalid_key_is_rejected(self) -> None:
+        self.assertEqual(self._send("Hello", "with space").status_code, 400)
+        self.assertEqual(self._send("Hello", "x" * 256).status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
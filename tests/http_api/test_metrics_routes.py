@@ -0,0 +1,34 @@
+import unittest
+
+from fastapi.testclient import TestClient
+
+from legalcodex.http_server.app import create_app
+from legalcodex.http_server._metrics_middleware import HTTP_REQUESTS
+
+
+class TestMetricsRoutes(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = TestClient(create_app())
+
+    def test_metrics_are_exposed_in_prometheus_format(self) -> None:
+        self.assertEqual(self.client.get("/api/v1/status").status_code, 200)
+
+        response = self.client.get("/api/v1/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn("# TYPE lc_http_request_duration_seconds histogram", response.text)
+        self.assertIn('lc_http_requests_total{method="GET",route="/api/v1/status",status="200"}', response.text)
+
+    def test_requests_are_labelled_by_route_template(self) -> None:
+        labels = {"method": "GET", "route": "/api/v1/chat/sessions/{session_id}/context", "status": "401"}
+        before = HTTP_REQUESTS.value(**labels)
+
+        response = self.client.get("/api/v1/chat/sessions/some-session/context")
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(HTTP_REQUESTS.value(**labels), before + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
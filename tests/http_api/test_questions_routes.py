@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+import unittest
+from pathlib import Path
+from typing import Any, Iterator
+
+from fastapi.testclient import TestClient
+
+from legalcodex._admission import AdmissionController, AdmissionLimits
+from legalcodex._singleton import SingletonMeta
+from legalcodex.ai._engine_selector import ENGINES
+from legalcodex.ai.chat.chat_session_manager import ChatSessionManager, get_path
+from legalcodex.ai.chat._chat_types import ChatSessionId
+from legalcodex.ai.context import Context
+from legalcodex.ai.engines.mock_engine import MockEngine
+from legalcodex.ai.stream import Stream
+from legalcodex.http_server.app import create_app
+
+
+class TestQuestionsRoutes(unittest.TestCase):
+    def setUp(self) -> None:
+        SingletonMeta._instances.pop(AdmissionController, None)
+        AdmissionController().configure(AdmissionLimits(max_concurrent=8, max_per_user=4))
+        ENGINES[_SlowEngine.NAME] = _SlowEngine
+        _SlowEngine.running = 0
+        _SlowEngine.peak = 0
+        self.client = TestClient(create_app())
+        self.client.post("/api/v1/auth/login", json={"username": "test", "password": "hello"})
+        self.results: list[dict[str, Any]] = []
+
+    def tearDown(self) -> None:
+        ENGINES.pop(_SlowEngine.NAME, None)
+        for result in self.results:
+            if result["session_id"]:
+                (Path(get_path()) / f"{result['session_id']}.json").unlink(missing_ok=True)
+        SingletonMeta._instances.pop(AdmissionController, None)
+
+    def _ask(self, payload: dict[str, Any]) -> list[dict[str, Any]]:
+        response = self.client.post("/api/v1/chat/questions", json={"engine": _SlowEngine.NAME, **payload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        self.results = [json.loads(line) for line in response.text.splitlines() if line]
+        return self.results
+
+    def test_questions_run_concurrently_in_their_own_sessions(self) -> None:
+        start = time.monotonic()
+        results = self._ask({"questions": ["q0", "q1", {"question": "q2", "id": "third"}, "q3"], "concurrency": 4})
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(sorted(result["index"] for result in results), [0, 1, 2, 3])
+        self.assertTrue(all(result["status"] == 200 and result["response"] == "answer" for result in results))
+        self.assertEqual(len({result["session_id"] for result in results}), 4)
+        self.assertEqual([result["id"] for result in results if result["index"] == 2], ["third"])
+        self.assertEqual(_SlowEngine.peak, 4)
+        self.assertLess(elapsed, 4 * _SlowEngine.DELAY_S)
+
+    def test_concurrency_is_bounded_by_the_user_turn_limit(self) -> None:
+        AdmissionController().configure(AdmissionLimits(max_concurrent=8, max_per_user=2))
+
+        results = self._ask({"questions": ["a", "b", "c", "d", "e"], "concurrency": 10})
+
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(result["status"] == 200 for result in results))
+        self.assertEqual(_SlowEngine.peak, 2)
+
+    def test_questions_of_an_existing_session_run_in_order(self) -> None:
+        session_id = self.client.post("/api/v1/chat/sessions", json={"engine": _SlowEngine.NAME}).json()["session_id"]
+        try:
+            questions = [{"question": "first", "session_id": session_id},
+                         {"question": "second", "session_id": session_id},
+                         {"question": "elsewhere", "session_id": "missing"}]
+            results = self._ask({"questions": questions})
+            history = self.client.get(f"/api/v1/chat/sessions/{session_id}/context").json()["history"]
+        finally:
+            ChatSessionManager().close_session(ChatSessionId(session_id))
+            (Path(get_path()) / f"{session_id}.json").unlink(missing_ok=True)
+
+        self.assertEqual([message["content"] for message in history if message["role"] == "user"], ["first", "second"])
+        self.assertEqual([result["status"] for result in results if result["index"] == 2], [404])
+
+    def test_invalid_batch_is_rejected(self) -> None:
+        response = self.client.post("/api/v1/chat/questions", json={"questions": ["fine", "  "]})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post("/api/v1/chat/questions", json={"questions": ["q"], "concurrency": 0})
+        self.assertEqual(response.status_code, 400)
+
+
+class _SlowStream(Stream):
+    def __iter__(self) -> Iterator[str]:
+        with _SlowEngine.lock:
+            _SlowEngine.running += 1
+            _SlowEngine.peak = max(_SlowEngine.peak, _SlowEngine.running)
+        try:
+            time.sleep(_SlowEngine.DELAY_S)
+        finally:
+            with _SlowEngine.lock:
+                _SlowEngine.running -= 1
+        yield "answer"
+
+
+class _SlowEngine(MockEngine):
+    NAME = "test-questions-slow"
+    DELAY_S = 0.2
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def run_messages_stream(self, context: Context) -> Stream:
+        return _SlowStream()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import time
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from legalcodex._singleton import SingletonMeta
+from legalcodex._user_access import UsersAccess
+from legalcodex.http_server import _require_user
+from legalcodex.http_server._token_cache import TokenCache
+from legalcodex.http_server.app import create_app
+from legalcodex.http_server.auth_service import TokenPayload, create_access_token, verify_access_token
+
+
+def _payload(username: str = "test", token_id: str = "t1", ttl_s: float = 60.0) -> TokenPayload:
+    now = time.time()
+    return TokenPayload(username, ["user"], token_id=token_id, issued_at=now, expires_at=now + ttl_s)
+
+
+class TestTokenCache(unittest.TestCase):
+    def setUp(self) -> None:
+        SingletonMeta._instances.pop(TokenCache, None)
+        self.user = UsersAccess.get_instance().find("test")
+
+    def tearDown(self) -> None:
+        SingletonMeta._instances.pop(TokenCache, None)
+
+    def test_token_payload_round_trip(self) -> None:
+        token = create_access_token(TokenPayload("test", ["user"]))
+
+        payload = verify_access_token(token)
+
+        assert payload is not None
+        self.assertEqual(len(payload.token_id), 32)
+        self.assertAlmostEqual(payload.issued_at, time.time(), delta=5.0)
+        self.assertAlmostEqual(payload.expires_at - payload.issued_at, 30 * 60, delta=1.0)
+
+    def test_entries_expire_with_the_token(self) -> None:
+        cache = TokenCache(ttl_s=60.0)
+        cache.put("short", _payload(ttl_s=0.05), self.user)
+        cache.put("long", _payload(token_id="t2"), self.user)
+
+        time.sleep(0.1)
+
+        self.assertIsNone(cache.get("short"))
+        self.assertIs(cache.get("long"), self.user)
+
+    def test_least_recently_used_entry_is_evicted(self) -> None:
+        cache = TokenCache(max_entries=2)
+        cache.put("a", _payload(token_id="a"), self.user)
+        cache.put("b", _payload(token_id="b"), self.user)
+        cache.get("a")
+        cache.put("c", _payload(token_id="c"), self.user)
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+
+    def test_revocation_by_token_and_by_user(self) -> None:
+        cache = TokenCache()
+        first, second = _payload(token_id="a"), _payload(token_id="b")
+        cache.put("a", first, self.user)
+        cache.put("b", second, self.user)
+
+        cache.revoke_token(first)
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("b"))
+
+        cache.revoke_user("test")
+        self.assertIsNone(cache.get("b"))
+        self.assertTrue(cache.is_revoked(second))
+        time.sleep(0.01)
+        self.assertFalse(cache.is_revoked(_payload(token_id="c")))   # Issued after the revocation
+
+
+class TestRequireUserCache(unittest.TestCase):
+    def setUp(self) -> None:
+        SingletonMeta._instances.pop(TokenCache, None)
+        self.client = TestClient(create_app())
+        self.client.post("/api/v1/auth/login", json={"username": "test", "password": "hello"})
+
+    def tearDown(self) -> None:
+        SingletonMeta._instances.pop(TokenCache, None)
+
+    def test_token_is_verified_once(self) -> None:
+        with patch.object(_require_user, "verify_access_token", wraps=verify_access_token) as verify:
+            for _ in range(3):
+                self.assertEqual(self.client.get("/api/v1/chat/sessions").status_code, 200)
+
+        self.assertEqual(verify.call_count, 1)
+
+    def test_logout_revokes_the_token(self) -> None:
+        token = self.client.cookies.get("lc_access")
+        assert token is not None
+        self.assertEqual(self.client.get("/api/v1/chat/sessions").status_code, 200)
+
+        self.assertEqual(self.client.post("/api/v1/auth/logout").status_code, 204)
+
+        self.client.cookies.set("lc_access", token, path="/api/v1")
+        self.assertEqual(self.client.get("/api/v1/chat/sessions").status_code, 401)
+        self.assertEqual(self.client.get("/api/v1/auth/session").status_code, 401)
+
+    def test_invalid_token_is_unauthorized(self) -> None:
+        self.client.cookies.set("lc_access", "invalid.token.signature", path="/api/v1")
+
+        self.assertEqual(self.client.get("/api/v1/chat/sessions").status_code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
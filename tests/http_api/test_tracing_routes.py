@@ -0,0 +1,44 @@
+import unittest
+
+from fastapi.testclient import TestClient
+
+from legalcodex._tracing import Span, SpanExporter, Tracer
+from legalcodex.http_server.app import create_app
+
+
+class _MemoryExporter(SpanExporter):
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+
+    def export(self, spans: list[Span]) -> None:
+        self.spans.extend(spans)
+
+
+class TestTracingRoutes(unittest.TestCase):
+    def setUp(self) -> None:
+        self.exporter = _MemoryExporter()
+        Tracer().configure(sample_rate=1.0, exporter=self.exporter)
+        self.client = TestClient(create_app())
+
+    def tearDown(self) -> None:
+        Tracer().configure()
+
+    def test_request_id_is_echoed_and_used_as_trace_id(self) -> None:
+        response = self.client.get("/api/v1/status", headers={"X-Request-ID": "client-id.1"})
+
+        self.assertEqual(response.headers["x-request-id"], "client-id.1")
+        [root] = [item for item in self.exporter.spans if item.parent_id is None]
+        self.assertEqual(root.trace_id, "client-id.1")
+        self.assertEqual(root.name, "GET /api/v1/status")
+        self.assertEqual(root.attributes["status"], 200)
+
+    def test_unsafe_request_id_is_replaced(self) -> None:
+        response = self.client.get("/api/v1/status", headers={"X-Request-ID": "bad id\n"})
+
+        request_id = response.headers["x-request-id"]
+        self.assertNotEqual(request_id, "bad id\n")
+        self.assertEqual(self.exporter.spans[0].trace_id, request_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+import unittest
+from typing import Optional
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from legalcodex._environ import LC_WARMUP_ENGINES, LC_WARMUP_SESSIONS
+from legalcodex._singleton import SingletonMeta
+from legalcodex.ai._engine_pool import EnginePool
+from legalcodex.ai._engine_selector import ENGINES
+from legalcodex.ai.chat.chat_session import ChatSession
+from legalcodex.ai.chat.chat_session_manager import ChatSessionManager, get_path
+from legalcodex.ai.chat._chat_types import ChatSessionId
+from legalcodex.ai.engines.mock_engine import MockEngine
+from legalcodex.http_server._warmup import WarmUp
+from legalcodex.http_server.app import create_app
+
+
+class _WarmUpEngine(MockEngine):
+    """
+    Mock engine whose warm-up waits for the test, or fails when asked to.
+    """
+    NAME = "_warmup"
+    release = threading.Event()
+    warmed: list[str] = []
+
+    def warm_up(self) -> None:
+        if self._param_str("fail", ""):
+            raise ConnectionError("provider unreachable")
+        self.release.wait(5.0)
+        self.warmed.append(self.model)
+
+
+class TestWarmUp(unittest.TestCase):
+    def setUp(self) -> None:
+        SingletonMeta._instances.pop(EnginePool, None)
+        ENGINES[_WarmUpEngine.NAME] = _WarmUpEngine
+        _WarmUpEngine.release.set()
+        _WarmUpEngine.warmed = []
+        self.session_ids: list[ChatSessionId] = []
+
+    def tearDown(self) -> None:
+        ENGINES.pop(_WarmUpEngine.NAME, None)
+        SingletonMeta._instances.pop(EnginePool, None)
+        manager = ChatSessionManager()
+        for session_id in self.session_ids:
+            with manager._lock:
+                manager._sessions.pop(session_id, None)
+            path = os.path.join(get_path(), f"{session_id}.json")
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _saved_session(self, model: str, mtime: float) -> ChatSessionId:
+        session = ChatSession.new_chat_session(username="test", system_prompt="You are helpful.",
+                                               max_messages=10, engine_name=_WarmUpEngine.NAME, model=model)
+        manager = ChatSessionManager()
+        manager.add_session(session)
+        manager.close_session(session.uid)
+        os.utime(os.path.join(get_path(), f"{session.uid}.json"), (mtime, mtime))
+        self.session_ids.append(session.uid)
+        return session.uid
+
+    def test_warms_engines_and_preloads_recent_sessions(self) -> None:
+        now = time.time()
+        old = self._saved_session("gpt-5-mini", now + 1000)
+        newest = self._saved_session("gpt-5.1", now + 2000)
+
+        warm_up = WarmUp([(_WarmUpEngine.NAME, "gpt-5-nano")], sessions=1)
+        warm_up.run()
+
+        self.assertTrue(warm_up.ready)
+        self.assertEqual(warm_up.sessions_loaded, 1)
+        self.assertIn(newest, ChatSessionManager()._sessions)
+        self.assertNotIn(old, ChatSessionManager()._sessions)
+        self.assertEqual(_WarmUpEngine.warmed, ["gpt-5-nano", "gpt-5.1"])
+        self.assertEqual(warm_up.status()["engines"], {"_warmup:gpt-5-nano": "ok", "_warmup:gpt-5.1": "ok"})
+
+    def test_engine_failure_does_not_block_readiness(self) -> None:
+        with patch.object(EnginePool, "get", return_value=_WarmUpEngine(parameters={"fail": "1"})):
+            warm_up = WarmUp([(_WarmUpEngine.NAME, "gpt-5-nano")], sessions=0)
+            warm_up.run()
+
+        self.assertTrue(warm_up.ready)
+        self.assertEqual(warm_up.status()["engines"], {"_warmup:gpt-5-nano": "error: ConnectionError"})
+
+    def test_ready_after_timeout(self) -> None:
+        _WarmUpEngine.release.clear()
+        warm_up = WarmUp([(_WarmUpEngine.NAME, "gpt-5-nano")], sessions=0, timeout_s=0.05)
+        warm_up.start()
+
+        self.assertFalse(warm_up.ready)
+        time.sleep(0.1)
+        self.assertTrue(warm_up.ready)
+        _WarmUpEngine.release.set()
+        self.assertTrue(warm_up.wait(5.0))
+
+    def test_ready_route_reports_the_warm_up(self) -> None:
+        _WarmUpEngine.release.clear()
+        environ = {LC_WARMUP_ENGINES: _WarmUpEngine.NAME, LC_WARMUP_SESSIONS: "0"}
+        with patch.dict(os.environ, environ), TestClient(create_app()) as client:
+            response = client.get("/api/v1/status/ready")
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.json()["status"], "warming_up")
+            self.assertEqual(client.get("/api/v1/status").status_code, 200)      # Alive meanwhile
+
+            _WarmUpEngine.release.set()
+            warm_up: Optional[WarmUp] = getattr(client.app.state, "warm_up", None)     # type: ignore[attr-defined]
+            assert warm_up is not None
+            self.assertTrue(warm_up.wait(5.0))
+
+            response = client.get("/api/v1/status/ready")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["engines"], {"_warmup:gpt-5-nano": "ok"})
+
+
+if __name__ == "__main__":
+    unittest.main()
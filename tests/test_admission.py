@@ -0,0 +1,96 @@
+import threading
+import time
+import unittest
+
+from legalcodex._admission import AdmissionController, AdmissionLimits
+from legalcodex._singleton import SingletonMeta
+from legalcodex.exceptions import AdmissionRejected, LCValueError
+
+
+class TestAdmissionController(unittest.TestCase):
+    def setUp(self) -> None:
+        SingletonMeta._instances.pop(AdmissionController, None)
+        self.controller = AdmissionController()
+
+    def tearDown(self) -> None:
+        SingletonMeta._instances.pop(AdmissionController, None)
+
+    def _wait_for_queue(self, queued: int) -> None:
+        deadline = time.monotonic() + 5.0
+        while self.controller.snapshot()["queued"] != queued:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.001)
+
+    def _queue(self, user: str, admitted: list[str]) -> threading.Thread:
+        def turn() -> None:
+            self.controller.acquire(user)
+            admitted.append(user)
+        thread = threading.Thread(target=turn)
+        thread.start()
+        return thread
+
+    def test_per_user_limit_queues_and_rejects(self) -> None:
+        self.controller.configure(AdmissionLimits(max_concurrent=10, max_per_user=1, max_user_queue=1, max_wait_s=0.05))
+
+        self.controller.acquire("alice")
+        self.controller.acquire("bob")          # Other users are not affected
+
+        start = time.monotonic()
+        with self.assertRaises(AdmissionRejected) as timed_out:
+            self.controller.acquire("alice")
+        self.assertEqual(timed_out.exception.reason, "timed out waiting")
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+        self.assertGreaterEqual(timed_out.exception.retry_after, 1.0)
+
+        self.controller.configure(AdmissionLimits(max_concurrent=10, max_per_user=1, max_user_queue=1, max_wait_s=5.0))
+        admitted: list[str] = []
+        waiting = self._queue("alice", admitted)
+        self._wait_for_queue(1)
+        with self.assertRaises(AdmissionRejected) as full:
+            self.controller.acquire("alice")        # Queue of alice is full: rejected at once
+        self.assertEqual(full.exception.reason, "queue full")
+
+        self.controller.release("alice")
+        waiting.join(5.0)
+        self.assertEqual(admitted, ["alice"])
+        self.assertEqual(self.controller.snapshot(), {"running": 2, "queued": 0})
+
+    def test_free_slots_go_to_users_in_turn(self) -> None:
+        self.controller.configure(AdmissionLimits(max_concurrent=1, max_per_user=1, max_user_queue=4, max_wait_s=5.0))
+        self.controller.acquire("noisy")
+        admitted: list[str] = []
+
+        threads = []
+        for user in ["noisy", "noisy", "noisy", "quiet"]:
+            threads.append(self._queue(user, admitted))
+            self._wait_for_queue(len(threads))
+
+        for expected in range(1, 5):
+            self.controller.release(admitted[-1] if admitted else "noisy")
+            deadline = time.monotonic() + 5.0
+            while len(admitted) < expected:
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.001)
+        for thread in threads:
+            thread.join(5.0)
+
+        self.assertEqual(admitted, ["noisy", "quiet", "noisy", "noisy"])
+
+    def test_admit_releases_the_slot(self) -> None:
+        self.controller.configure(AdmissionLimits(max_concurrent=1, max_per_user=1, max_user_queue=0))
+
+        with self.controller.admit("alice"):
+            with self.assertRaises(AdmissionRejected):
+                self.controller.acquire("bob")      # No queueing at all
+        with self.controller.admit("bob"):
+            pass
+
+        self.assertEqual(self.controller.snapshot(), {"running": 0, "queued": 0})
+
+    def test_rejects_invalid_limits(self) -> None:
+        with self.assertRaises(LCValueError):
+            AdmissionLimits(max_concurrent=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from legalcodex.exceptions import LCException, LCValueError
+from legalcodex.ai.context import Context
+from legalcodex.ai.message import Message
+from legalcodex.ai.stream import Stream
+from legalcodex.ai.engines.mock_engine import MockEngine, _TextStream
+
+
+class _EchoEngine(MockEngine):
+    """
+    Echo the prompt after a short delay, failing the prompts starting with "flaky" once
+    and the prompts starting with "invalid" always.
+    """
+    NAME = "test-echo"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.attempts: dict[str, int] = {}
+        self._state_lock = threading.Lock()
+
+    def run_messages_stream(self, context: Context) -> Stream:
+        prompt = list(context)[-1].content
+        with self._state_lock:
+            self.attempts[prompt] = self.attempts.get(prompt, 0) + 1
+            attempts = self.attempts[prompt]
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(0.01)
+            if prompt.startswith("invalid"):
+                raise LCValueError("invalid prompt")
+            if prompt.startswith("flaky") and attempts == 1:
+                raise LCException("temporary failure")
+            return _TextStream(prompt.upper())
+        finally:
+            with self._state_lock:
+                self.in_flight -= 1
+
+
+def _contexts(*prompts: str) -> list[Context]:
+    return [[Message.User(prompt)] for prompt in prompts]
+
+
+@patch("legalcodex.ai.batch._backoff", return_value=0.0)
+class TestBatch(unittest.TestCase):
+
+    def test_results_are_in_order_with_bounded_concurrency(self, _backoff: object) -> None:
+        engine = _EchoEngine()
+        prompts = [f"prompt {index}" for index in range(20)]
+
+        results = engine.run_batch(_contexts(*prompts), concurrency=4)
+
+        self.assertEqual([result.response for result in results], [prompt.upper() for prompt in prompts])
+        self.assertEqual([result.index for result in results], list(range(20)))
+        self.assertLessEqual(engine.max_in_flight, 4)
+        self.assertGreater(engine.max_in_flight, 1)
+
+    def test_failed_requests_are_retried(self, _backoff: object) -> None:
+        engine = _EchoEngine()
+
+        results = engine.run_batch(_contexts("flaky", "steady"), retries=2)
+
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(results[0].attempts, 2)
+        self.assertEqual(results[1].attempts, 1)
+
+    def test_failures_are_reported_not_raised(self, _backoff: object) -> None:
+        engine = _EchoEngine()
+
+        results = engine.run_batch(_contexts("flaky", "invalid"), retries=0)
+
+        self.assertEqual(results[0].error, "temporary failure")
+        self.assertEqual(results[1].error, "invalid prompt")
+        self.assertIsNone(results[1].response)
+
+    def test_invalid_requests_are_not_retried(self, _backoff: object) -> None:
+        engine = _EchoEngine()
+
+        results = engine.run_batch(_contexts("invalid"), retries=3)
+
+        self.assertEqual(results[0].attempts, 1)
+
+    def test_progress_is_reported_for_each_item(self, _backoff: object) -> None:
+        engine = _EchoEngine()
+        reported: list[tuple[int, int]] = []
+
+        engine.run_batch(_contexts("a", "b", "c"),
+                         concurrency=1,
+                         progress=lambda done, total, result: reported.append((done, total)))
+
+        self.assertEqual(reported, [(1, 3), (2, 3), (3, 3)])
@@ -0,0 +1,97 @@
+import time
+import unittest
+from typing import Any, Iterator
+
+from legalcodex._bench import BENCHMARKS, Operation, benchmark, compare, run_suite, select
+from legalcodex._stats import welch_t_test
+from legalcodex.exceptions import LCValueError
+
+
+def _results(samples: dict[str, list[float]]) -> dict[str, Any]:
+    return {"benchmarks": {name: {"samples": values} for name, values in samples.items()}}
+
+
+class TestWelchTTest(unittest.TestCase):
+    def test_known_values(self) -> None:
+        first = [27.5, 21.0, 19.0, 23.6, 17.0, 17.9, 16.9, 20.1, 21.9, 22.6, 23.1, 19.6, 19.0, 21.7, 21.4]
+        second = [27.1, 22.0, 20.8, 23.4, 23.4, 23.5, 25.8, 22.0, 24.8, 20.2, 21.9, 22.1, 22.9, 20.5, 24.4]
+        t, p = welch_t_test(first, second)
+        self.assertAlmostEqual(t, 2.455, places=3)
+        self.assertAlmostEqual(p, 0.021, places=3)
+
+    def test_identical_samples_are_not_significant(self) -> None:
+        _, p = welch_t_test([1.0, 1.0, 1.0], [1.0, 1.0, 1.0])
+        self.assertEqual(p, 1.0)
+
+
+class TestCompare(unittest.TestCase):
+    def test_detects_regression_and_improvement(self) -> None:
+        baseline = _results({"slower": [1.00, 1.01, 0.99, 1.00, 1.02],
+                             "faster": [1.00, 1.01, 0.99, 1.00, 1.02],
+                             "noisy":  [1.00, 1.50, 0.70, 1.20, 0.90],
+                             "removed": [1.0, 1.0]})
+        current = _results({"slower": [1.20, 1.21, 1.19, 1.22, 1.20],
+                            "faster": [0.80, 0.81, 0.79, 0.80, 0.82],
+                            "noisy":  [1.10, 0.60, 1.60, 0.90, 1.30],
+                            "added":  [1.0, 1.0]})
+
+        verdicts = {comparison.name: comparison.verdict for comparison in compare(baseline, current)}
+
+        self.assertEqual(verdicts, {"slower": "regression", "faster": "improvement", "noisy": "unchanged"})
+
+    def test_small_changes_are_below_threshold(self) -> None:
+        baseline = _results({"bench": [1.000, 1.001, 1.000, 1.001]})
+        current = _results({"bench": [1.010, 1.011, 1.010, 1.011]})
+
+        [comparison] = compare(baseline, current, threshold=0.05)
+
+        self.assertLess(comparison.p_value, 0.05)
+        self.assertEqual(comparison.verdict, "unchanged")
+
+
+class TestRunSuite(unittest.TestCase):
+    def setUp(self) -> None:
+        self.calls = 0
+        self.torn_down = False
+
+        def sleeper() -> Iterator[Operation]:
+            """
+            Sleep for a millisecond.
+            """
+            def operation() -> None:
+                self.calls += 1
+                time.sleep(0.001)
+            try:
+                yield operation
+            finally:
+                self.torn_down = True
+
+        benchmark("test.sleep", number=3)(sleeper)
+
+    def tearDown(self) -> None:
+        BENCHMARKS.pop("test.sleep", None)
+
+    def test_runs_warmup_and_repetitions(self) -> None:
+        results = run_suite(select(["test.*"]), warmup=1, repetitions=4)
+
+        result = results["benchmarks"]["test.sleep"]
+        self.assertEqual(self.calls, 3 * 5)
+        self.assertEqual(len(result["samples"]), 4)
+        self.assertGreaterEqual(result["min"], 0.001)
+        self.assertTrue(self.torn_down)
+        self.assertEqual(results["meta"]["repetitions"], 4)
+        self.assertEqual(BENCHMARKS["test.sleep"].description, "Sleep for a millisecond.")
+
+    def test_rejects_unknown_names_and_duplicates(self) -> None:
+        with self.assertRaises(LCValueError):
+            select(["no-such-benchmark"])
+        with self.assertRaises(LCValueError):
+            benchmark("test.sleep")(lambda: iter([]))
+
+    def test_registered_benchmark_runs(self) -> None:
+        results = run_suite(select(["context.append_trim"]), warmup=0, repetitions=2)
+        self.assertGreater(results["benchmarks"]["context.append_trim"]["mean"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -65,12 +65,12 @@ class TestChatContext(unittest.TestCase):
             chat_context.append(engine, Message.User(f"Message {i}"))
         self.assertEqual(len(chat_context._history), N)
         self.assertEqual(engine.count, 0)
-        self.assertEqual(chat_context._summary,"")
+        self.assertEqual(chat_context.summary,"")
 
         chat_context.append(engine, Message.User(f"Message {i}"))
 
         self.assertEqual(engine.count, 1)
-        self.assertNotEqual(chat_context._summary,"")
+        self.assertNotEqual(chat_context.summary,"")
         self.assertEqual(len(chat_context._history), N - T + 1)
 
 
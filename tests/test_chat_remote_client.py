@@ -0,0 +1,160 @@
+import socket
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import uvicorn
+
+from legalcodex._cli.cmd_chat_remote import _RemoteChatClient
+from legalcodex.ai.chat.chat_session_manager import get_path
+from legalcodex.exceptions import LCException
+from legalcodex.http_server.app import create_app
+
+
+class TestRemoteChatClient(unittest.TestCase):
+    """
+    The client against a server running in a thread.
+    """
+    server: uvicorn.Server
+    thread: threading.Thread
+    url: str
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        cls.server = uvicorn.Server(uvicorn.Config(create_app(), host="127.0.0.1", port=port, log_level="warning"))
+        cls.thread = threading.Thread(target=cls.server.run, daemon=True)
+        cls.thread.start()
+        deadline = time.monotonic() + 10.0
+        while not cls.server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("The test server did not start")
+            time.sleep(0.01)
+        cls.url = f"http://127.0.0.1:{port}/api/v1"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.should_exit = True
+        cls.thread.join(10.0)
+
+    def setUp(self) -> None:
+        self.client = _RemoteChatClient(self.url, timeout=10.0)
+        self.client.login("test", "hello")
+        self.session_id = self.client.new_session(None, "mock", None)
+
+    def tearDown(self) -> None:
+        self.client.close_session(self.session_id)
+        self.client.close()
+        (Path(get_path()) / f"{self.session_id}.json").unlink(missing_ok=True)
+
+    def test_requests_reuse_one_connection(self) -> None:
+        self.client.send_message(self.session_id, "Hello")
+        self.client.get_context(self.session_id)
+
+        timings = list(self.client.timings)
+        self.assertEqual([timing.reused for timing in timings], [False, True, True, True])
+        self.assertGreater(timings[0].connect_s, 0.0)
+        self.assertTrue(all(timing.connect_s == 0.0 for timing in timings[1:]))
+        self.assertTrue(all(0.0 < timing.ttfb_s <= timing.total_s for timing in timings))
+
+    def test_streamed_response_is_rendered_incrementally(self) -> None:
+        chunks: list[str] = []
+
+        response = self.client.stream_message(self.session_id, "Hello", chunks.append)
+
+        self.assertTrue(chunks)
+        self.assertEqual("".join(chunks), response)
+        timing = self.client.last_timing
+        assert timing is not None and timing.first_chunk_s is not None
+        self.assertTrue(timing.path.endswith("/messages/stream"))
+        self.assertLessEqual(timing.ttfb_s, timing.first_chunk_s)
+        history = self.client.get_context(self.session_id)["history"]
+        self.assertEqual(history[-1], {"role": "assistant", "content": response})
+
+    def test_reconnects_after_the_server_closed_the_connection(self) -> None:
+        connection = self.client._connection
+        assert connection is not None and connection.sock is not None
+        connection.sock.shutdown(socket.SHUT_RDWR)     # As an idle timeout of the server would
+
+        self.client.get_context(self.session_id)
+
+        timing = self.client.last_timing
+        assert timing is not None
+        self.assertFalse(timing.reused)
+
+    def test_errors_keep_the_http_status(self) -> None:
+        with self.assertRaises(LCException) as failed:
+            self.client.stream_message("missing", "Hello", lambda chunk: None)
+        self.assertTrue(str(failed.exception).startswith("HTTP 404"))
+
+
+class _DroppingServer:
+    """
+    Keep-alive HTTP server that reads the second request of a connection and closes the
+    connection without answering, as a server restarting mid-request would.
+    """
+    def __init__(self) -> None:
+        self.requests: list[str] = []
+        self._listener = socket.create_server(("127.0.0.1", 0))
+        self.url = f"http://127.0.0.1:{self._listener.getsockname()[1]}"
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def close(self) -> None:
+        self._listener.close()
+
+    def _serve(self) -> None:
+        while True:
+            try:
+                connection, _ = self._listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(connection,), daemon=True).start()
+
+    def _handle(self, connection: socket.socket) -> None:
+        with connection, connection.makefile("rb") as reader:
+            for served in range(2):
+                request_line = reader.readline().decode()
+                if not request_line:
+                    return
+                length = 0
+                while (header := reader.readline()) not in (b"\r\n", b""):
+                    name, _, value = header.decode().partition(":")
+                    if name.lower() == "content-length":
+                        length = int(value)
+                reader.read(length)
+                self.requests.append(request_line.split()[0])
+                if served == 1:
+                    return      # Read, maybe run, but never answered
+                connection.sendall(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: 2\r\n\r\n{}")
+
+
+class TestRemoteChatClientRetries(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = _DroppingServer()
+        self.client = _RemoteChatClient(self.server.url, timeout=5.0)
+        self.client.get_context("session")      # Opens the connection that will be dropped
+
+    def tearDown(self) -> None:
+        self.client.close()
+        self.server.close()
+
+    def test_post_without_idempotency_key_is_not_sent_twice(self) -> None:
+        with self.assertRaises(LCException):
+            self.client.reset_context("session")
+
+        self.assertEqual(self.server.requests, ["GET", "POST"])
+
+    def test_get_is_retried_on_a_new_connection(self) -> None:
+        self.client.get_context("session")
+
+        self.assertEqual(self.server.requests, ["GET", "GET", "GET"])
+        timing = self.client.last_timing
+        assert timing is not None
+        self.assertFalse(timing.reused)
+
+
+if __name__ == "__main__":
+    unittest.main()
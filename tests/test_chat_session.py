@@ -106,7 +106,7 @@ class TestChatSession(unittest.TestCase):
         self.session.context.reset()
 
 
-        self.assertEqual(self.session.context._summary, "")
+        self.assertEqual(self.session.context.summary, "")
 
         N = MAX_MESSAGES//2
         for i in range(N):
@@ -122,7 +122,7 @@ class TestChatSession(unittest.TestCase):
 
         self.assertEqual(self._mock_engine.count, N + 2) # one for the extra message, one for the summary generation
 
-        self.assertNotEqual(self.session.context._summary, "")
+        self.assertNotEqual(self.session.context.summary, "")
 
 
 
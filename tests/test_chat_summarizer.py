@@ -0,0 +1,72 @@
+import threading
+import unittest
+
+from legalcodex.ai.context import Context
+from legalcodex.ai.stream import Stream
+from legalcodex.ai.message import Message
+from legalcodex.ai.tokens import estimate_tokens, truncate_middle
+from legalcodex.ai.chat.chat_summarizer import (summarize_overflow, collate_messages, merge_summaries,
+                                                SUMMARY_INPUT_TOKENS, MESSAGE_TOKENS)
+from legalcodex.ai.engines.mock_engine import MockEngine
+
+
+class _RecordingEngine(MockEngine):
+    """MockEngine that records the prompt size of every request."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.prompt_tokens: list[int] = []
+        self._record_lock = threading.Lock()
+
+    def run_messages_stream(self, context: Context) -> Stream:
+        messages = list(context)
+        with self._record_lock:
+            self.prompt_tokens.append(sum(estimate_tokens(message.content) for message in messages))
+        return super().run_messages_stream(messages)
+
+
+class TestChatSummarizer(unittest.TestCase):
+
+    def test_truncate_middle_keeps_head_and_tail(self) -> None:
+        text = "HEAD " + "x" * 10_000 + " TAIL"
+
+        truncated = truncate_middle(text, 100)
+
+        self.assertTrue(truncated.startswith("HEAD"))
+        self.assertTrue(truncated.endswith("TAIL"))
+        self.assertIn("characters omitted", truncated)
+        self.assertLess(estimate_tokens(truncated), 120)
+
+    def test_collate_truncates_long_messages(self) -> None:
+        collated = collate_messages([Message.User("y" * 100_000)])
+
+        self.assertLess(estimate_tokens(collated.content), MESSAGE_TOKENS + 50)
+
+    def test_small_overflow_uses_a_single_request(self) -> None:
+        engine = _RecordingEngine()
+
+        summarize_overflow(engine, None, [Message.User("hello"), Message("assistant", "hi")])
+
+        self.assertEqual(engine.count, 1)
+
+    def test_large_overflow_is_summarized_with_map_reduce(self) -> None:
+        engine = _RecordingEngine()
+        overflow = [Message.User("z" * 50_000) for _ in range(10)]
+
+        summary = summarize_overflow(engine, None, overflow)
+
+        self.assertTrue(summary)
+        self.assertGreater(engine.count, 2)     # several map requests and one reduce
+        for tokens in engine.prompt_tokens:
+            self.assertLess(tokens, SUMMARY_INPUT_TOKENS + 200)
+
+    def test_many_summaries_are_merged_within_the_budget(self) -> None:
+        engine = _RecordingEngine()
+        summaries = [f"summary {index} " + "w" * 8_000 for index in range(100)]
+
+        merged = merge_summaries(engine, summaries)
+
+        self.assertTrue(merged)
+        self.assertEqual(engine.count, 6)      # Five groups, then the group summaries
+        for tokens in engine.prompt_tokens:
+            self.assertLess(tokens, SUMMARY_INPUT_TOKENS * 1.1)    # The shares, plus their truncation markers
@@ -0,0 +1,80 @@
+import time
+import unittest
+from typing import Iterator
+
+from legalcodex._deadline import Deadline
+from legalcodex.exceptions import DeadlineExceeded
+from legalcodex.ai.context import Context, SimpleContext, get_deadline
+from legalcodex.ai.message import Message
+from legalcodex.ai.stream import Stream, DeadlineStream
+from legalcodex.ai.chat.chat_context import ChatContext
+from legalcodex.ai.engines.mock_engine import MockEngine
+
+
+class _SlowStream(Stream):
+    def __iter__(self) -> Iterator[str]:
+        for index in range(100):
+            time.sleep(0.01)
+            yield str(index)
+
+
+class _DeadlineRecordingEngine(MockEngine):
+    NAME = "test-deadline-recording"
+
+    def run_messages_stream(self, context: Context) -> Stream:
+        self.deadline = get_deadline(context)
+        return super().run_messages_stream(context)
+
+
+class TestDeadline(unittest.TestCase):
+
+    def test_stream_is_cut_when_deadline_passes(self) -> None:
+        chunks: list[str] = []
+
+        with self.assertRaises(DeadlineExceeded):
+            for chunk in DeadlineStream(_SlowStream(), Deadline(0.05)):
+                chunks.append(chunk)
+
+        self.assertTrue(chunks)
+        self.assertLess(len(chunks), 100)
+
+    def test_summarization_is_deferred_when_time_is_short(self) -> None:
+        engine = MockEngine()
+        context = ChatContext(system_prompt="System prompt", max_messages=6, trim_length=3, summarizer="llm")
+        deadline = Deadline(1.0)
+
+        for index in range(7):
+            context.append(engine, Message.User(f"message {index}"), deadline)
+
+        self.assertEqual(len(context), 7)
+        self.assertEqual(engine.count, 0)
+        self.assertEqual(context.summary, "")
+
+    def test_deferred_trim_is_forced_after_one_block(self) -> None:
+        engine = MockEngine()
+        context = ChatContext(system_prompt="System prompt", max_messages=6, trim_length=3, summarizer="llm")
+        deadline = Deadline(1.0)
+
+        for index in range(10):
+            context.append(engine, Message.User(f"message {index}"), deadline)
+
+        self.assertEqual(len(context), 7)
+        self.assertEqual(engine.count, 1)
+
+    def test_summary_requests_carry_the_deadline(self) -> None:
+        engine = _DeadlineRecordingEngine()
+        context = ChatContext(system_prompt="System prompt", max_messages=6, trim_length=3, summarizer="llm")
+        deadline = Deadline(60.0)
+
+        for index in range(7):
+            context.append(engine, Message.User(f"message {index}"), deadline)
+
+        self.assertIs(engine.deadline, deadline)
+        self.assertEqual(len(context), 4)
+
+    def test_snapshot_keeps_the_deadline(self) -> None:
+        deadline = Deadline(60.0)
+        context = SimpleContext([Message.User("Hello")], request_class="trivial", deadline=deadline)
+
+        self.assertIs(get_deadline(context), deadline)
+        self.assertIsNone(get_deadline([Message.User("Hello")]))
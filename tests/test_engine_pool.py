@@ -0,0 +1,74 @@
+import unittest
+
+from legalcodex._schema import EngineSchema
+from legalcodex._singleton import SingletonMeta
+from legalcodex.exceptions import LCValueError
+from legalcodex.ai.engine import Engine
+from legalcodex.ai.message import Message
+from legalcodex.ai._engine_pool import EnginePool
+from legalcodex.ai.engines.mock_engine import MockEngine
+
+
+class TestEnginePool(unittest.TestCase):
+
+    def setUp(self) -> None:
+        SingletonMeta._instances.pop(EnginePool, None)
+
+    def tearDown(self) -> None:
+        SingletonMeta._instances.pop(EnginePool, None)
+
+    def test_same_configuration_returns_same_instance(self) -> None:
+        first = EnginePool().get("mock", "gpt-5-nano")
+        second = EnginePool().get("mock", "gpt-5-nano")
+
+        self.assertIsInstance(first, MockEngine)
+        self.assertIs(first, second)
+
+    def test_parameters_are_part_of_the_key(self) -> None:
+        plain = EnginePool().get("mock", "gpt-5-nano")
+        configured = EnginePool().get("mock", "gpt-5-nano", {"seed": "1"})
+
+        self.assertIsNot(plain, configured)
+        self.assertEqual(dict(configured.parameters), {"seed": "1"})
+        self.assertIs(configured, EnginePool().get("mock", "gpt-5-nano", {"seed": "1"}))
+
+    def test_deserialize_shares_engines(self) -> None:
+        schema = EngineSchema(name="mock", model="gpt-5-mini", parameters={"seed": "7"})
+
+        first = Engine.deserialize(schema)
+        second = Engine.deserialize(schema)
+
+        self.assertIs(first, second)
+        self.assertEqual(first.serialize(), schema)
+
+    def test_configured_engines_are_evicted_least_recently_used_first(self) -> None:
+        SingletonMeta._instances[EnginePool] = EnginePool(max_configured=2)
+        plain = EnginePool().get("mock", "gpt-5-nano")
+        first = EnginePool().get("mock", "gpt-5-nano", {"seed": "1"})
+        second = EnginePool().get("mock", "gpt-5-nano", {"seed": "2"})
+        EnginePool().get("mock", "gpt-5-nano", {"seed": "1"})      # Now the most recently used
+
+        EnginePool().get("mock", "gpt-5-nano", {"seed": "3"})
+
+        self.assertIs(EnginePool().get("mock", "gpt-5-nano", {"seed": "1"}), first)
+        self.assertIsNot(EnginePool().get("mock", "gpt-5-nano", {"seed": "2"}), second)
+        self.assertIs(EnginePool().get("mock", "gpt-5-nano"), plain)
+        self.assertEqual(len(EnginePool().engines()), 3)
+
+    def test_evicted_engine_keeps_streaming(self) -> None:
+        SingletonMeta._instances[EnginePool] = EnginePool(max_configured=1)
+        parameters = {"seed": "1", "ttft_ms": "0", "tokens_per_s": "100000", "response_tokens": "40", "chunk_tokens": "2"}
+        engine = EnginePool().get("mock", "gpt-5-nano", parameters)
+        chunks = iter(engine.run_messages_stream([Message.User("Hello")]))
+        first = next(chunks)
+
+        EnginePool().get("mock", "gpt-5-nano", {"seed": "2"})      # Evicts the engine mid-stream
+
+        response = first + "".join(chunks)
+        self.assertGreater(len(response.split()), 5)
+        self.assertIsNot(EnginePool().get("mock", "gpt-5-nano", parameters), engine)
+        self.assertTrue(engine.run_messages_stream([Message.User("Again")]).all())      # Still usable by its sessions
+
+    def test_unknown_engine_is_rejected(self) -> None:
+        with self.assertRaises(LCValueError):
+            EnginePool().get("unknown", "gpt-5-nano")
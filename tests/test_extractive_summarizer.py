@@ -0,0 +1,52 @@
+import unittest
+
+from legalcodex.exceptions import LCException
+from legalcodex.ai.context import Context
+from legalcodex.ai.stream import Stream
+from legalcodex.ai.message import Message
+from legalcodex.ai.chat.chat_context import ChatContext
+from legalcodex.ai.chat.extractive_summarizer import extract_summary, split_sentences
+from legalcodex.ai.engines.mock_engine import MockEngine
+
+
+class _FailingEngine(MockEngine):
+    def run_messages_stream(self, context: Context) -> Stream:
+        raise LCException("provider unavailable")
+
+
+class TestExtractiveSummarizer(unittest.TestCase):
+
+    def test_split_sentences_keeps_case_names_together(self) -> None:
+        sentences = split_sentences("The court followed Smith v. Jones in 2019. The appeal was dismissed.")
+
+        self.assertEqual(sentences, ["The court followed Smith v. Jones in 2019.", "The appeal was dismissed."])
+
+    def test_summary_keeps_citations_and_dates(self) -> None:
+        texts = [
+            ("user", "My landlord kept the deposit. I moved out on March 3, 2024. The weather was nice."),
+            ("assistant", "The leading case is R. v. Oakes, [1986] 1 SCR 103. Deposits must be returned. Deposits are regulated."),
+        ] * 4
+
+        summary = extract_summary(texts, max_chars=200)
+
+        self.assertIn("March 3, 2024", summary)
+        self.assertIn("[1986] 1 SCR 103", summary)
+
+    def test_extractive_context_trims_without_engine_call(self) -> None:
+        engine = MockEngine()
+        context = ChatContext(system_prompt="System prompt", max_messages=6, summarizer="extractive")
+
+        for i in range(7):
+            context.append(engine, Message.User(f"Message {i} was sent on 2024-01-0{i + 1}."))
+
+        self.assertEqual(engine.count, 0)
+        self.assertIn("2024-01-01", context.summary)
+
+    def test_default_summarizer_falls_back_when_engine_fails(self) -> None:
+        context = ChatContext(system_prompt="System prompt", max_messages=6)
+
+        for i in range(7):
+            context.append(_FailingEngine(), Message.User(f"Fact number {i} about Acme Corporation."))
+
+        self.assertIn("Acme Corporation", context.summary)
+        self.assertEqual(len(context), 4)
@@ -0,0 +1,156 @@
+import time
+import unittest
+from typing import Optional
+
+from legalcodex.exceptions import LCException, LCValueError
+from legalcodex.ai.context import Context
+from legalcodex.ai.stream import Stream
+from legalcodex.ai.message import Message
+from legalcodex.ai._engine_selector import ENGINES
+from legalcodex.ai._engine_pool import EnginePool
+from legalcodex.ai.engines.mock_engine import MockEngine
+from legalcodex.ai.engines.failover_engine import FailoverEngine
+from legalcodex.ai.engines._circuit_breaker import CircuitBreaker, BreakerConfig
+
+
+class _DownEngine(MockEngine):
+    NAME = "test-down"
+    healthy = False
+    crash: Optional[BaseException] = None     # Raised instead of an LCException
+
+    def run_messages_stream(self, context: Context) -> Stream:
+        if _DownEngine.crash is not None:
+            raise _DownEngine.crash
+        if not _DownEngine.healthy:
+            with self._lock:
+                self._count += 1
+            raise LCException("service unavailable")
+        return super().run_messages_stream(context)
+
+
+QUESTION = [Message("system", "System prompt"), Message.User("Hello")]
+
+PARAMETERS = {"chain": f"{_DownEngine.NAME},mock", "min_calls": "3", "open_s": "0.05"}
+
+
+class TestFailoverEngine(unittest.TestCase):
+
+    def setUp(self) -> None:
+        ENGINES[_DownEngine.NAME] = _DownEngine
+        _DownEngine.healthy = False
+        _DownEngine.crash = None
+        EnginePool().clear()
+        self.engine = FailoverEngine(model="gpt-5-mini", parameters=PARAMETERS)
+        down = EnginePool().get(_DownEngine.NAME, "gpt-5-mini")
+        assert isinstance(down, _DownEngine)
+        self.down = down
+
+    def tearDown(self) -> None:
+        ENGINES.pop(_DownEngine.NAME, None)
+        EnginePool().clear()
+
+    def test_fails_over_to_next_engine(self) -> None:
+        response = self.engine.run_messages_stream(QUESTION).all()
+
+        self.assertEqual(response, "0")
+        self.assertEqual(self.down.count, 1)
+
+    def test_open_circuit_sheds_traffic(self) -> None:
+        for _ in range(5):
+            self.engine.run_messages_stream(QUESTION).all()
+
+        # The breaker opened after min_calls failures; later requests skip the sick engine
+        self.assertEqual(self.down.count, 3)
+        self.assertEqual(self.engine.breaker_states()[f"{_DownEngine.NAME}:gpt-5-mini"], "open")
+
+    def test_half_open_probe_recovers(self) -> None:
+        for _ in range(3):
+            self.engine.run_messages_stream(QUESTION).all()
+        _DownEngine.healthy = True
+        time.sleep(0.06)
+
+        self.engine.run_messages_stream(QUESTION).all()
+
+        self.assertEqual(self.down.count, 4)
+        self.assertEqual(self.engine.breaker_states()[f"{_DownEngine.NAME}:gpt-5-mini"], "closed")
+
+    def test_unexpected_probe_error_reopens_the_circuit(self) -> None:
+        for _ in range(3):
+            self.engine.run_messages_stream(QUESTION).all()
+        time.sleep(0.06)
+        _DownEngine.crash = RuntimeError("bug")
+
+        with self.assertRaises(RuntimeError):
+            self.engine.run_messages_stream(QUESTION).all()
+        self.assertEqual(self.engine.breaker_states()[f"{_DownEngine.NAME}:gpt-5-mini"], "open")
+
+        _DownEngine.crash = None
+        _DownEngine.healthy = True
+        time.sleep(0.06)
+        self.engine.run_messages_stream(QUESTION).all()
+        self.assertEqual(self.engine.breaker_states()[f"{_DownEngine.NAME}:gpt-5-mini"], "closed")
+
+    def test_interrupted_probe_is_released(self) -> None:
+        for _ in range(3):
+            self.engine.run_messages_stream(QUESTION).all()
+        time.sleep(0.06)
+        _DownEngine.crash = KeyboardInterrupt()
+
+        with self.assertRaises(KeyboardInterrupt):
+            self.engine.run_messages_stream(QUESTION).all()
+
+        breaker = self.engine.links()[0][2]
+        self.assertEqual(breaker.state, "half_open")
+        self.assertTrue(breaker.allow())        # The next call may probe
+
+    def test_fails_fast_when_every_circuit_is_open(self) -> None:
+        engine = FailoverEngine(model="gpt-5-mini",
+                                parameters={"chain": _DownEngine.NAME, "min_calls": "1"})
+        with self.assertRaises(LCException):
+            engine.run_messages_stream(QUESTION).all()
+
+        with self.assertRaises(LCException):
+            engine.run_messages_stream(QUESTION).all()
+        self.assertEqual(self.down.count, 1)
+
+    def test_rejects_unknown_engine(self) -> None:
+        with self.assertRaises(LCValueError):
+            FailoverEngine(model="gpt-5-mini", parameters={"chain": "unknown,mock"})
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_slow_calls_open_the_circuit(self) -> None:
+        breaker = CircuitBreaker("test", BreakerConfig(min_calls=2, slow_call_s=1.0, slow_call_rate=0.5))
+
+        breaker.record_success(2.0)
+        breaker.record_success(2.0)
+
+        self.assertFalse(breaker.allow())
+        self.assertEqual(breaker.state, "open")
+
+    def test_half_open_allows_a_single_probe(self) -> None:
+        breaker = CircuitBreaker("test", BreakerConfig(min_calls=1, open_s=0.0))
+        breaker.record_failure()
+
+        permit = breaker.allow()
+        self.assertTrue(permit is not None and permit.probe)
+        self.assertIsNone(breaker.allow())
+
+    def test_only_the_probe_settles_a_half_open_circuit(self) -> None:
+        breaker = CircuitBreaker("test", BreakerConfig(min_calls=1, open_s=0.05))
+        slow_call = breaker.allow()     # Admitted while closed, still running
+        assert slow_call is not None and not slow_call.probe
+        breaker.record_failure()
+        time.sleep(0.06)
+        probe = breaker.allow()
+        assert probe is not None and probe.probe
+
+        breaker.record_success(0.1, slow_call.probe)
+        self.assertEqual(breaker.state, "half_open")
+        self.assertIsNone(breaker.allow())      # The probe is still in flight
+        breaker.record_failure(slow_call.probe)
+        self.assertEqual(breaker.state, "half_open")
+
+        breaker.record_failure(probe.probe)
+        self.assertEqual(breaker.state, "open")
@@ -0,0 +1,104 @@
+import threading
+import time
+import unittest
+from typing import Iterator
+
+from legalcodex.ai.context import Context
+from legalcodex.ai.stream import Stream
+from legalcodex.ai.message import Message
+from legalcodex.ai._engine_selector import ENGINES
+from legalcodex.ai.engines.mock_engine import MockEngine
+from legalcodex.ai.engines.hedged_engine import HedgedEngine
+
+
+class _SlowStream(Stream):
+    def __init__(self, text: str, delay: float) -> None:
+        self._text = text
+        self._delay = delay
+        self.closed = threading.Event()
+
+    def __iter__(self) -> Iterator[str]:
+        if self.closed.wait(self._delay):
+            return
+        yield self._text
+
+    def close(self) -> None:
+        self.closed.set()
+
+
+class _FirstCallStuckEngine(MockEngine):
+    """The first request is stuck before its first chunk; the others are immediate."""
+    NAME = "test-first-call-stuck"
+    streams: list[_SlowStream] = []
+    stuck_delay = 5.0
+
+    def run_messages_stream(self, context: Context) -> Stream:
+        first = not self.streams
+        stream = _SlowStream("slow" if first else "fast", self.stuck_delay if first else 0.0)
+        self.streams.append(stream)
+        return stream
+
+
+class _PrimaryAlwaysSlowEngine(MockEngine):
+    """The first request of every hedged call is slow; the hedges are immediate."""
+    NAME = "test-primary-always-slow"
+
+    def run_messages_stream(self, context: Context) -> Stream:
+        first = threading.current_thread().name == "hedge-0"
+        return _SlowStream("slow" if first else "fast", 0.3 if first else 0.0)
+
+
+PARAMETERS = {"engine": _FirstCallStuckEngine.NAME, "initial_delay_ms": "50", "min_delay_ms": "10"}
+
+
+class TestHedgedEngine(unittest.TestCase):
+
+    def setUp(self) -> None:
+        _FirstCallStuckEngine.streams = []
+        _FirstCallStuckEngine.stuck_delay = 5.0
+        ENGINES[_FirstCallStuckEngine.NAME] = _FirstCallStuckEngine
+
+    def tearDown(self) -> None:
+        ENGINES.pop(_FirstCallStuckEngine.NAME, None)
+        ENGINES.pop(_PrimaryAlwaysSlowEngine.NAME, None)
+
+    def test_hedge_answers_when_first_request_is_stuck(self) -> None:
+        engine = HedgedEngine(model="gpt-5-nano", parameters=PARAMETERS)
+
+        start = time.perf_counter()
+        response = engine.run_messages_stream([Message.User("Hello")]).all()
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(response, "fast")
+        self.assertLess(elapsed, 2.0)
+        self.assertEqual(engine.stats().hedge_wins, 1)
+        self.assertTrue(_FirstCallStuckEngine.streams[0].closed.wait(1.0))  # the loser was cancelled
+
+    def test_hedges_are_bounded_by_budget(self) -> None:
+        _FirstCallStuckEngine.stuck_delay = 0.3
+        engine = HedgedEngine(model="gpt-5-nano", parameters={**PARAMETERS, "budget": "0"})
+        engine._tokens = 0.0    # burst already used
+
+        response = engine.run_messages_stream([Message.User("Hello")]).all()
+
+        self.assertEqual(response, "slow")
+        self.assertEqual(engine.stats().hedged, 0)
+        self.assertEqual(engine.stats().throttled, 1)
+
+    def test_hedge_delay_follows_observed_ttft(self) -> None:
+        engine = HedgedEngine(model="gpt-5-nano", parameters={"min_samples": "5", "min_delay_ms": "1"})
+        for _ in range(10):
+            engine._record_first_chunk(0.2, hedge_won=False)
+
+        self.assertAlmostEqual(engine.hedge_delay(), 0.2)
+
+    def test_hedge_wins_do_not_pull_the_delay_below_the_first_request_ttft(self) -> None:
+        ENGINES[_PrimaryAlwaysSlowEngine.NAME] = _PrimaryAlwaysSlowEngine
+        engine = HedgedEngine(model="gpt-5-nano", parameters={"engine": _PrimaryAlwaysSlowEngine.NAME,
+                                                              "initial_delay_ms": "50", "min_delay_ms": "1",
+                                                              "min_samples": "3", "budget": "1"})
+        for _ in range(6):
+            self.assertEqual(engine.run_messages_stream([Message.User("Hello")]).all(), "fast")
+
+        self.assertEqual(engine.stats().hedge_wins, 6)
+        self.assertGreaterEqual(engine.hedge_delay(), 0.05)     # The first request never answered sooner
@@ -0,0 +1,109 @@
+import threading
+import time
+import unittest
+
+from legalcodex._idempotency import IdempotencyStore, fingerprint
+from legalcodex._singleton import SingletonMeta
+from legalcodex.exceptions import IdempotencyKeyReused, LCException, RequestInProgress
+
+
+class TestIdempotencyStore(unittest.TestCase):
+    def setUp(self) -> None:
+        SingletonMeta._instances.pop(IdempotencyStore, None)
+        self.store = IdempotencyStore()
+        self.calls = 0
+
+    def tearDown(self) -> None:
+        SingletonMeta._instances.pop(IdempotencyStore, None)
+
+    def _execute(self) -> str:
+        self.calls += 1
+        return f"answer {self.calls}"
+
+    def test_repeat_returns_the_stored_result(self) -> None:
+        first = self.store.run(("alice", "s1", "k"), fingerprint("Hello"), self._execute, 1.0)
+        again = self.store.run(("alice", "s1", "k"), fingerprint("Hello"), self._execute, 1.0)
+        other = self.store.run(("bob", "s1", "k"), fingerprint("Hello"), self._execute, 1.0)
+
+        self.assertEqual(first, ("answer 1", False))
+        self.assertEqual(again, ("answer 1", True))
+        self.assertEqual(other, ("answer 2", False))     # Keys are scoped by user
+        self.assertEqual(self.calls, 2)
+
+    def test_key_reused_for_another_request_is_rejected(self) -> None:
+        self.store.run(("alice", "s1", "k"), fingerprint("Hello"), self._execute, 1.0)
+
+        with self.assertRaises(IdempotencyKeyReused):
+            self.store.run(("alice", "s1", "k"), fingerprint("Goodbye"), self._execute, 1.0)
+        self.assertEqual(self.calls, 1)
+
+    def test_repeat_attaches_to_the_running_request(self) -> None:
+        started = threading.Event()
+        finish = threading.Event()
+
+        def slow() -> str:
+            started.set()
+            finish.wait(5.0)
+            return self._execute()
+
+        results: list[tuple[str, bool]] = []
+        first = threading.Thread(target=lambda: results.append(self.store.run(("a", "k"), "f", slow, 5.0)))
+        first.start()
+        started.wait(5.0)
+
+        with self.assertRaises(RequestInProgress):
+            self.store.run(("a", "k"), "f", self._execute, 0.01)
+
+        attached = threading.Thread(target=lambda: results.append(self.store.run(("a", "k"), "f", self._execute, 5.0)))
+        attached.start()
+        time.sleep(0.02)
+        finish.set()
+        first.join(5.0)
+        attached.join(5.0)
+
+        self.assertEqual(sorted(results), [("answer 1", False), ("answer 1", True)])
+        self.assertEqual(self.calls, 1)
+
+    def test_failed_request_is_not_remembered(self) -> None:
+        def fail() -> str:
+            raise LCException("provider down")
+
+        with self.assertRaises(LCException):
+            self.store.run(("a", "k"), "f", fail, 1.0)
+
+        self.assertEqual(self.store.run(("a", "k"), "f", self._execute, 1.0), ("answer 1", False))
+
+    def test_results_expire(self) -> None:
+        self.store.ttl_s = 0.01
+        self.store.run(("a", "k"), "f", self._execute, 1.0)
+        time.sleep(0.02)
+
+        self.assertEqual(self.store.run(("a", "k"), "f", self._execute, 1.0), ("answer 2", False))
+
+    def test_running_request_does_not_block_eviction(self) -> None:
+        self.store.max_keys = 3
+        started = threading.Event()
+        finish = threading.Event()
+
+        def slow() -> str:
+            started.set()
+            finish.wait(5.0)
+            return "slow"
+
+        first = threading.Thread(target=self.store.run, args=(("a", "slow"), "f", slow, 5.0))
+        first.start()
+        started.wait(5.0)
+        try:
+            for index in range(self.store.max_keys + 1):
+                self.store.run(("a", str(index)), "f", self._execute, 1.0)
+
+            self.assertLessEqual(len(self.store._entries), self.store.max_keys)
+            self.assertIn(("a", "slow"), self.store._entries)
+            self.assertNotIn(("a", "0"), self.store._entries)      # The oldest finished one
+        finally:
+            finish.set()
+            first.join(5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
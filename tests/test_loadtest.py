@@ -0,0 +1,152 @@
+import os
+import signal
+import threading
+import time
+import unittest
+
+from legalcodex._cli.cmd_loadtest import (CLOSE_SESSION, CREATE_SESSION, LOGIN, MESSAGE, EndpointReport,
+                                          LoadProfile, StepReport, capacity, run_step)
+from legalcodex._cli.cmd_chat_remote import _RemoteChatClient
+from legalcodex.exceptions import LCException, LCValueError
+
+
+class _FakeClient(_RemoteChatClient):
+    """
+    In-memory client: each turn takes 5 ms, and every fourth turn fails.
+    """
+    lock = threading.Lock()
+    clients = 0
+    turns = 0
+    open_sessions: set[str] = set()
+
+    def __init__(self) -> None:
+        super().__init__("http://fake/api/v1")
+        with self.lock:
+            _FakeClient.clients += 1
+
+    def login(self, username: str, password: str) -> None:
+        if password != "hello":
+            raise LCException("HTTP 401: Invalid credentials")
+
+    def new_session(self, max_messages: int | None, engine: str | None, model: str | None,
+                    summarizer: str | None = None, parameters: dict[str, str] | None = None) -> str:
+        with self.lock:
+            session_id = f"s{len(self.open_sessions)}-{time.monotonic_ns()}"
+            self.open_sessions.add(session_id)
+        return session_id
+
+    def send_message(self, session_id: str, message: str) -> str:
+        time.sleep(0.005)
+        with self.lock:
+            _FakeClient.turns += 1
+            failed = _FakeClient.turns % 4 == 0
+        if failed:
+            raise LCException("HTTP 504: The request exceeded its time budget")
+        return "answer"
+
+    def close_session(self, session_id: str) -> None:
+        with self.lock:
+            self.open_sessions.remove(session_id)
+
+
+class _SlowClient(_FakeClient):
+    """
+    Client whose turns take 300 ms and never fail.
+    """
+    def send_message(self, session_id: str, message: str) -> str:
+        time.sleep(0.3)
+        return "answer"
+
+
+def _step(users: int, throughput: float, error_rate: float, p95_s: float) -> StepReport:
+    endpoint = EndpointReport(requests=10, errors=0, p50_s=p95_s, p90_s=p95_s, p95_s=p95_s, p99_s=p95_s, max_s=p95_s)
+    return StepReport(users=users, duration_s=1.0, conversations=1, turns=10, throughput=throughput,
+                      error_rate=error_rate, endpoints={MESSAGE: endpoint})
+
+
+class TestLoadTest(unittest.TestCase):
+    def setUp(self) -> None:
+        _FakeClient.clients = 0
+        _FakeClient.turns = 0
+        _FakeClient.open_sessions = set()
+
+    def test_step_measures_every_endpoint(self) -> None:
+        profile = LoadProfile(users=3, duration_s=0.4, ramp_up_s=0.1, turns=3, think_s=0.01)
+
+        report = run_step(profile, _FakeClient, seed=1)
+
+        self.assertEqual(_FakeClient.clients, 3)
+        self.assertEqual(_FakeClient.open_sessions, set())     # Every session was closed
+        self.assertEqual(report.endpoints[LOGIN].requests, 3)
+        self.assertEqual(report.endpoints[CREATE_SESSION].requests, report.endpoints[CLOSE_SESSION].requests)
+        self.assertEqual(report.endpoints[MESSAGE].requests, _FakeClient.turns)
+        self.assertEqual(report.endpoints[MESSAGE].errors, _FakeClient.turns // 4)
+        self.assertEqual(report.turns, _FakeClient.turns - _FakeClient.turns // 4)
+        self.assertGreater(report.conversations, 0)
+        self.assertGreater(report.throughput, 0.0)
+        self.assertGreaterEqual(report.endpoints[MESSAGE].p50_s, 0.005)
+        self.assertEqual(list(report.errors), ["HTTP 504: The request exceeded its time budget"])
+
+    def test_failed_login_is_retried_and_counted(self) -> None:
+        profile = LoadProfile(users=1, duration_s=0.5, ramp_up_s=0.0, think_s=0.02)
+
+        report = run_step(profile, _FakeClient, password="wrong", seed=1)
+
+        self.assertGreater(report.endpoints[LOGIN].errors, 1)
+        self.assertEqual(report.endpoints[MESSAGE].requests, 0)
+        self.assertEqual(report.error_rate, 1.0)
+
+    def test_stop_event_ends_the_step(self) -> None:
+        stop = threading.Event()
+        profile = LoadProfile(users=2, duration_s=30.0, ramp_up_s=0.0, think_s=0.01)
+        threading.Timer(0.1, stop.set).start()
+
+        start = time.monotonic()
+        run_step(profile, _FakeClient, stop=stop)
+
+        self.assertLess(time.monotonic() - start, 5.0)
+        self.assertEqual(_FakeClient.open_sessions, set())
+
+    def test_throughput_covers_the_turns_that_end_after_the_step(self) -> None:
+        profile = LoadProfile(users=2, duration_s=0.1, ramp_up_s=0.0, turns=1, think_s=0.0)
+
+        report = run_step(profile, _SlowClient, seed=1)
+
+        self.assertEqual(report.turns, 2)
+        self.assertGreaterEqual(report.duration_s, 0.3)
+        self.assertAlmostEqual(report.throughput, report.turns / report.duration_s)
+
+    def test_interrupted_step_returns_its_measurements(self) -> None:
+        stop = threading.Event()
+        profile = LoadProfile(users=2, duration_s=30.0, ramp_up_s=0.0, think_s=0.01)
+        threading.Timer(0.2, os.kill, (os.getpid(), signal.SIGINT)).start()
+
+        report = run_step(profile, _FakeClient, stop=stop)
+
+        self.assertTrue(stop.is_set())
+        self.assertLess(report.duration_s, 5.0)
+        self.assertGreater(report.turns, 0)
+        self.assertEqual(_FakeClient.open_sessions, set())
+
+    def test_capacity_is_best_step_within_limits(self) -> None:
+        steps = [_step(1, 2.0, 0.0, 0.5), _step(4, 7.0, 0.0, 1.5), _step(8, 9.0, 0.05, 3.0)]
+
+        best = capacity(steps, max_error_rate=0.01)
+        assert best is not None
+        self.assertEqual(best.users, 4)
+
+        best = capacity(steps, max_error_rate=0.01, max_p95_s=1.0)
+        assert best is not None
+        self.assertEqual(best.users, 1)
+
+        self.assertIsNone(capacity(steps, max_error_rate=0.01, max_p95_s=0.1))
+
+    def test_rejects_invalid_profile(self) -> None:
+        with self.assertRaises(LCValueError):
+            run_step(LoadProfile(users=0), _FakeClient)
+        with self.assertRaises(LCValueError):
+            run_step(LoadProfile(users=1, prompts=()), _FakeClient)
+
+
+if __name__ == "__main__":
+    unittest.main()
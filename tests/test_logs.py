@@ -0,0 +1,85 @@
+import logging
+import queue
+import threading
+import unittest
+
+from legalcodex._logs import (LOG_RECORDS_DROPPED, DroppingQueueHandler, RateLimitFilter, _Listener,
+                             start_log_queue, stop_log_queue)
+
+
+def _record(name: str, level: int = logging.DEBUG) -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, "message %d", (1,), None)
+
+
+class _SlowHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.unblock = threading.Event()
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.unblock.wait(5.0)
+        self.messages.append(record.getMessage())
+
+
+class TestRateLimitFilter(unittest.TestCase):
+    def test_limits_debug_records_of_noisy_loggers(self) -> None:
+        rate_limit = RateLimitFilter(loggers=("lc.noisy",), rate=0.0, burst=3)
+
+        passed = [rate_limit.filter(_record("lc.noisy.child")) for _ in range(5)]
+
+        self.assertEqual(passed, [True, True, True, False, False])
+        self.assertEqual(rate_limit.suppressed, 2)
+        self.assertTrue(rate_limit.filter(_record("lc.noisy", logging.INFO)))
+        self.assertTrue(rate_limit.filter(_record("lc.noisy_other")))
+        self.assertTrue(rate_limit.filter(_record("lc.noisy.other_child")))  # Each logger has its own budget
+
+    def test_tokens_refill_over_time(self) -> None:
+        rate_limit = RateLimitFilter(loggers=("lc.noisy",), rate=1000.0, burst=1)
+
+        self.assertTrue(rate_limit.filter(_record("lc.noisy")))
+        threading.Event().wait(0.01)
+        self.assertTrue(rate_limit.filter(_record("lc.noisy")))
+
+
+class TestQueuedLogging(unittest.TestCase):
+    def test_full_queue_drops_records_without_blocking(self) -> None:
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=2)
+        handler = DroppingQueueHandler(log_queue)
+        slow = _SlowHandler()
+        listener = _Listener(log_queue, slow, respect_handler_level=True)
+        dropped_before = LOG_RECORDS_DROPPED.value(reason="queue_full")
+
+        listener.start()
+        try:
+            for index in range(10):
+                handler.handle(logging.LogRecord("lc.test", logging.INFO, __file__, 1, "record %d", (index,), None))
+            self.assertGreaterEqual(handler.dropped, 7)
+            self.assertEqual(LOG_RECORDS_DROPPED.value(reason="queue_full") - dropped_before, handler.dropped)
+        finally:
+            slow.unblock.set()
+            listener.stop()
+
+        self.assertEqual(len(slow.messages), 10 - handler.dropped)
+        self.assertEqual(slow.messages[0], "record 0")
+
+    def test_handlers_are_built_once(self) -> None:
+        built: list[logging.Handler] = []
+
+        def handlers() -> list[logging.Handler]:
+            built.append(logging.NullHandler())
+            return built[-1:]
+
+        stop_log_queue()
+        try:
+            first = start_log_queue(handlers)
+            again = start_log_queue(handlers)
+        finally:
+            stop_log_queue()
+
+        self.assertIs(again, first)
+        self.assertEqual(len(built), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
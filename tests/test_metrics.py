@@ -0,0 +1,110 @@
+import threading
+import unittest
+from typing import Iterator
+
+from legalcodex._metrics import CACHE_REQUESTS, LOCK_WAIT, MetricsRegistry, cache_lookup, counter, histogram, timed_lock
+from legalcodex.ai.engines.mock_engine import MockEngine
+from legalcodex.ai.message import Message
+from legalcodex.ai.stream import ENGINE_REQUESTS, ENGINE_TTFT, ENGINE_DURATION, MeteredStream, Stream
+from legalcodex.exceptions import LCException, LCValueError
+
+
+class _ListStream(Stream):
+    def __init__(self, chunks: list[str], error: bool = False) -> None:
+        self._chunks = chunks
+        self._error = error
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._chunks
+        if self._error:
+            raise LCException("provider failure")
+
+
+class TestMetrics(unittest.TestCase):
+    def test_counter_renders_labelled_samples(self) -> None:
+        requests = counter("test_requests_total", "Test requests", ("route",))
+        requests.inc(route="/a")
+        requests.inc(2, route='/b"quoted"')
+
+        text = MetricsRegistry().render()
+
+        self.assertIn("# TYPE test_requests_total counter", text)
+        self.assertIn('test_requests_total{route="/a"} 1', text)
+        self.assertIn('test_requests_total{route="/b\\"quoted\\""} 2', text)
+
+    def test_histogram_buckets_are_cumulative(self) -> None:
+        latency = histogram("test_latency_seconds", "Test latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            latency.observe(value)
+
+        text = MetricsRegistry().render()
+
+        self.assertIn('test_latency_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('test_latency_seconds_bucket{le="1"} 3', text)
+        self.assertIn('test_latency_seconds_bucket{le="+Inf"} 4', text)
+        self.assertIn("test_latency_seconds_count 4", text)
+        self.assertAlmostEqual(latency.sum(), 4.25)
+
+    def test_registry_returns_existing_metric_and_rejects_conflicts(self) -> None:
+        first = counter("test_shared_total", "Shared", ("kind",))
+        self.assertIs(counter("test_shared_total", "Shared", ("kind",)), first)
+        with self.assertRaises(LCValueError):
+            histogram("test_shared_total", "Shared", ("kind",))
+        with self.assertRaises(LCValueError):
+            first.inc(other="x")
+
+    def test_timed_lock_records_wait_and_releases(self) -> None:
+        lock = threading.Lock()
+        before = LOCK_WAIT.count(lock="test")
+
+        with timed_lock(lock, "test"):
+            self.assertTrue(lock.locked())
+
+        self.assertFalse(lock.locked())
+        self.assertEqual(LOCK_WAIT.count(lock="test"), before + 1)
+
+    def test_cache_lookup_counts_hits_and_misses(self) -> None:
+        hits = CACHE_REQUESTS.value(cache="test", result="hit")
+        cache_lookup("test", True)
+        cache_lookup("test", False)
+        self.assertEqual(CACHE_REQUESTS.value(cache="test", result="hit"), hits + 1)
+        self.assertEqual(CACHE_REQUESTS.value(cache="test", result="miss"), 1)
+
+
+class TestMeteredStream(unittest.TestCase):
+    def test_records_ttft_duration_and_outcome(self) -> None:
+        labels = {"engine": "test-metered", "model": "ok"}
+        before = ENGINE_TTFT.count(**labels)
+
+        text = MeteredStream(_ListStream(["Hello", " world"]), "test-metered", "ok").all()
+
+        self.assertEqual(text, "Hello world")
+        self.assertEqual(ENGINE_TTFT.count(**labels), before + 1)
+        self.assertEqual(ENGINE_DURATION.count(**labels), before + 1)
+        self.assertEqual(ENGINE_REQUESTS.value(outcome="ok", **labels), before + 1)
+
+    def test_records_errors_and_cancellations(self) -> None:
+        labels = {"engine": "test-metered", "model": "failing"}
+
+        with self.assertRaises(LCException):
+            MeteredStream(_ListStream(["partial"], error=True), "test-metered", "failing").all()
+
+        iterator = iter(MeteredStream(_ListStream(["a", "b", "c"]), "test-metered", "failing"))
+        next(iterator)
+        iterator.close()        # type: ignore[attr-defined]
+
+        self.assertEqual(ENGINE_REQUESTS.value(outcome="error", **labels), 1)
+        self.assertEqual(ENGINE_REQUESTS.value(outcome="cancelled", **labels), 1)
+        self.assertEqual(ENGINE_DURATION.count(**labels), 0)
+
+    def test_simulated_mock_engine_is_metered(self) -> None:
+        engine = MockEngine(model="gpt-5-mini", parameters={"profile": "fast", "ttft_ms": "1", "tokens_per_s": "0", "seed": "3"})
+        before = ENGINE_TTFT.count(engine="mock", model="gpt-5-mini")
+
+        engine.run_messages_stream([Message.User("Hello")]).all()
+
+        self.assertEqual(ENGINE_TTFT.count(engine="mock", model="gpt-5-mini"), before + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
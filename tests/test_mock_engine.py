@@ -0,0 +1,65 @@
+import time
+import unittest
+
+from legalcodex._deadline import Deadline
+from legalcodex.exceptions import LCException, QuotaExceeded, DeadlineExceeded
+from legalcodex.ai.context import SimpleContext
+from legalcodex.ai.message import Message
+from legalcodex.ai.engines.mock_engine import MockEngine
+
+
+QUESTION = [Message("system", "System prompt"), Message.User("Can my landlord raise the rent?")]
+
+FAST = {"ttft_ms": "1", "tokens_per_s": "100000", "jitter": "0"}
+
+
+class TestMockEngine(unittest.TestCase):
+
+    def test_default_is_a_counter(self) -> None:
+        engine = MockEngine()
+
+        self.assertEqual(engine.run_messages_stream(QUESTION).all(), "0")
+        self.assertEqual(engine.run_messages_stream(QUESTION).all(), "1")
+        self.assertIsNone(engine.simulator)
+
+    def test_simulation_streams_realistic_responses(self) -> None:
+        engine = MockEngine(parameters={**FAST, "response_tokens": "100", "chunk_tokens": "2", "seed": "1"})
+
+        chunks = list(engine.run_messages_stream(QUESTION))
+
+        self.assertGreater(len(chunks), 10)
+        self.assertGreater(len("".join(chunks).split()), 20)
+
+    def test_seed_makes_simulation_reproducible(self) -> None:
+        parameters = {**FAST, "seed": "42"}
+        first = MockEngine(parameters=parameters)
+        second = MockEngine(parameters=parameters)
+
+        self.assertEqual([first.run_messages_stream(QUESTION).all() for _ in range(3)],
+                         [second.run_messages_stream(QUESTION).all() for _ in range(3)])
+
+    def test_time_to_first_token_is_simulated(self) -> None:
+        engine = MockEngine(parameters={"ttft_ms": "50", "ttft_sigma": "0", "tokens_per_s": "100000"})
+
+        start = time.perf_counter()
+        next(iter(engine.run_messages_stream(QUESTION)))
+
+        self.assertGreaterEqual(time.perf_counter() - start, 0.045)
+
+    def test_failures_are_injected(self) -> None:
+        errors = MockEngine(parameters={**FAST, "error_rate": "1"})
+        rate_limited = MockEngine(parameters={**FAST, "rate_limit_rate": "1"})
+
+        with self.assertRaises(LCException):
+            errors.run_messages_stream(QUESTION).all()
+        with self.assertRaises(QuotaExceeded):
+            rate_limited.run_messages_stream(QUESTION).all()
+
+    def test_simulation_honours_the_deadline(self) -> None:
+        engine = MockEngine(parameters={"profile": "slow", "ttft_sigma": "0"})
+        context = SimpleContext(QUESTION, deadline=Deadline(0.05))
+
+        start = time.perf_counter()
+        with self.assertRaises(DeadlineExceeded):
+            engine.run_messages_stream(context).all()
+        self.assertLess(time.perf_counter() - start, 1.0)
@@ -0,0 +1,60 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from legalcodex._environ import LC_API_KEY, LC_OPENAI_BASE_URL
+from legalcodex.exceptions import QuotaExceeded
+from legalcodex.ai.message import Message
+from legalcodex.ai.engines.mock_engine import MockEngine, Simulator
+from legalcodex.ai.engines.openai_engine import OpenAIEngine
+from legalcodex.ai.engines.openai_standin import OpenAIStandin
+
+
+QUESTION = [Message("system", "System prompt"), Message.User("Can my landlord raise the rent?")]
+
+
+def _simulator(**parameters: str) -> Simulator:
+    simulator = MockEngine(parameters={"ttft_ms": "1", "tokens_per_s": "100000", "seed": "3", **parameters}).simulator
+    assert simulator is not None
+    return simulator
+
+
+class TestOpenAIStandin(unittest.TestCase):
+
+    def test_engine_streams_from_standin(self) -> None:
+        with OpenAIStandin(_simulator(response_tokens="40", chunk_tokens="2")) as standin:
+            engine = OpenAIEngine(base_url=standin.base_url)
+
+            first = engine.run_messages_stream(QUESTION).all()
+            second = engine.run_messages_stream(QUESTION).all()
+            stats = standin.stats()
+
+        self.assertGreater(len(first.split()), 5)
+        self.assertTrue(second)
+        self.assertEqual(stats.requests, 2)
+        self.assertEqual(stats.connections, 1)  # The connection is reused
+
+    def test_usage_is_recorded_from_the_last_chunk(self) -> None:
+        with OpenAIStandin(_simulator(response_tokens="30")) as standin:
+            engine = OpenAIEngine(base_url=standin.base_url)
+            response = engine.run_messages_stream(QUESTION).all()
+
+        total = engine.token_counter.total
+        self.assertEqual(total.completion_tokens, len(response.split()))
+        self.assertGreater(total.prompt_tokens, 0)
+        self.assertEqual(total.total_tokens, total.prompt_tokens + total.completion_tokens)
+
+    def test_rate_limit_maps_to_quota_exceeded(self) -> None:
+        with OpenAIStandin(_simulator(rate_limit_rate="1")) as standin:
+            engine = OpenAIEngine(base_url=standin.base_url, max_retries=0)
+
+            with self.assertRaises(QuotaExceeded):
+                engine.run_messages_stream(QUESTION).all()
+            self.assertEqual(standin.stats().rate_limited, 1)
+
+    def test_base_url_is_not_taken_from_the_parameters(self) -> None:
+        with patch.dict(os.environ, {LC_API_KEY: "secret"}):
+            os.environ.pop(LC_OPENAI_BASE_URL, None)
+            engine = OpenAIEngine(parameters={"base_url": "http://attacker.invalid/v1"})
+
+            self.assertNotIn("attacker", str(engine.client.base_url))
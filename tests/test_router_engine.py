@@ -0,0 +1,62 @@
+import unittest
+
+from legalcodex.exceptions import LCException
+from legalcodex.ai.context import Context, SimpleContext
+from legalcodex.ai.stream import Stream
+from legalcodex.ai.message import Message
+from legalcodex.ai._engine_selector import ENGINES
+from legalcodex.ai.engines.mock_engine import MockEngine
+from legalcodex.ai.engines.router_engine import RouterEngine
+
+
+class _FailingOnNanoEngine(MockEngine):
+    NAME = "test-failing-on-nano"
+
+    def run_messages_stream(self, context: Context) -> Stream:
+        if self.model == "gpt-5-nano":
+            raise LCException("model overloaded")
+        return super().run_messages_stream(context)
+
+
+def _question(text: str) -> list[Message]:
+    return [Message("system", "System prompt"), Message.User(text)]
+
+
+class TestRouterEngine(unittest.TestCase):
+
+    def setUp(self) -> None:
+        ENGINES[_FailingOnNanoEngine.NAME] = _FailingOnNanoEngine
+        self.router = RouterEngine(model="gpt-5-mini", parameters={"engine": "mock"})
+
+    def tearDown(self) -> None:
+        ENGINES.pop(_FailingOnNanoEngine.NAME, None)
+
+    def test_summarization_uses_cheap_model(self) -> None:
+        context = SimpleContext(_question("Summarize this"), request_class="summarize")
+
+        self.router.run_messages_stream(context).all()
+
+        self.assertEqual(list(self.router.stats()), ["gpt-5-nano"])
+
+    def test_classifies_requests(self) -> None:
+        trivial = _question("Thanks!")
+        chat = _question("Can my employer change my schedule without notice? I work part time in a shop.")
+        research = _question("What precedents apply to wrongful dismissal in Quebec?")
+
+        self.assertEqual(self.router.classify(trivial, trivial), "trivial")
+        self.assertEqual(self.router.classify(chat, chat), "chat")
+        self.assertEqual(self.router.classify(research, research), "research")
+        self.assertEqual(self.router.candidates("research")[0], "gpt-5.2")
+
+    def test_falls_back_to_next_model_on_error(self) -> None:
+        router = RouterEngine(model="gpt-5-mini", parameters={"engine": _FailingOnNanoEngine.NAME})
+
+        response = router.run_messages_stream(_question("Hi")).all()
+        stats = router.stats()
+
+        self.assertTrue(response)
+        self.assertEqual(stats["gpt-5-nano"].errors, 1)
+        self.assertEqual(stats["gpt-5-mini"].errors, 0)
+        self.assertGreater(stats["gpt-5-mini"].cost, 0.0)
+        # The failed model is tried last while it cools down
+        self.assertEqual(router.candidates("trivial"), ["gpt-5-mini", "gpt-5-nano"])
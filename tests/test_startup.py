@@ -0,0 +1,56 @@
+import json
+import subprocess
+import sys
+import unittest
+from typing import Any, Final
+
+from legalcodex._benchmarks import APP_CREATE, CLI_IMPORT
+
+# Import time budgets, in seconds; the CLI took about 1.1s when it imported every engine SDK
+CLI_IMPORT_BUDGET   :Final[float] = 0.8
+APP_CREATE_BUDGET   :Final[float] = 2.5
+
+# Loaded on demand only: by the engines, the summarizer, the server or the log window
+DEFERRED_MODULES    :Final[tuple[str, ...]] = ("openai", "numpy", "tkinter", "uvicorn", "fastapi", "httpx")
+
+
+def _measure(code: str) -> dict[str, Any]:
+    """
+    Run the code in a fresh interpreter; return its duration and the heavy modules it loaded.
+    """
+    script = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"{code}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps({{'elapsed': elapsed, 'loaded': [name for name in {DEFERRED_MODULES!r} if name in sys.modules]}}))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], check=True, capture_output=True, text=True, timeout=60)
+    measure: dict[str, Any] = json.loads(result.stdout.strip().splitlines()[-1])
+    return measure
+
+
+class TestStartup(unittest.TestCase):
+    def test_cli_import_defers_heavy_modules(self) -> None:
+        measure = _measure(CLI_IMPORT)
+
+        self.assertEqual(measure["loaded"], [])
+        self.assertLess(measure["elapsed"], CLI_IMPORT_BUDGET)
+
+    def test_app_creation_defers_engine_sdks(self) -> None:
+        measure = _measure(APP_CREATE)
+
+        self.assertNotIn("openai", measure["loaded"])
+        self.assertNotIn("numpy", measure["loaded"])
+        self.assertLess(measure["elapsed"], APP_CREATE_BUDGET)
+
+    def test_engines_are_imported_on_first_use(self) -> None:
+        measure = _measure("from legalcodex.ai._engine_selector import ENGINES\n"
+                           "assert 'openai' in ENGINES and 'openai' not in sys.modules\n"
+                           "assert ENGINES['openai'].NAME == 'openai'")
+
+        self.assertIn("openai", measure["loaded"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+from legalcodex.ai.message import Message
+from legalcodex.ai.chat.chat_context import ChatContext
+from legalcodex.ai.chat.summary_hierarchy import SummaryHierarchy
+from legalcodex.ai.chat.chat_summarizer import LLMSummarizer
+from legalcodex.ai.engines.mock_engine import MockEngine
+
+
+FANOUT = 3
+
+
+class TestSummaryHierarchy(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.engine = MockEngine()
+        self.hierarchy = SummaryHierarchy(fanout=FANOUT)
+
+    def test_each_trim_adds_one_leaf(self) -> None:
+        self.hierarchy.add(LLMSummarizer(), self.engine, [Message.User("a")])
+        self.hierarchy.add(LLMSummarizer(), self.engine, [Message.User("b")])
+
+        self.assertEqual(self.engine.count, 2)
+        self.assertEqual(self.hierarchy.levels, [["0", "1"]])
+
+    def test_full_level_is_merged_into_next_level(self) -> None:
+        for i in range(FANOUT):
+            self.hierarchy.add(LLMSummarizer(), self.engine, [Message.User(str(i))])
+
+        # FANOUT leaf summaries + one merge
+        self.assertEqual(self.engine.count, FANOUT + 1)
+        self.assertEqual(self.hierarchy.levels, [[], [str(FANOUT)]])
+
+    def test_render_puts_oldest_level_first(self) -> None:
+        hierarchy = SummaryHierarchy(levels=[["new"], [], ["old"]], fanout=FANOUT)
+
+        self.assertEqual(hierarchy.render(), "old\n\nnew")
+
+    def test_legacy_flat_summary_is_kept(self) -> None:
+        context = ChatContext.deserialize(
+            ChatContext(system_prompt="System prompt", max_messages=10).serialize().model_copy(
+                update={"summary": "legacy summary", "summary_levels": []}))
+
+        self.assertEqual(context.summary, "legacy summary")
+        self.assertEqual(context.summary_levels, [[], ["legacy summary"]])
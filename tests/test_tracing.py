@@ -0,0 +1,117 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from legalcodex._cli.cmd_trace import render_waterfall
+from legalcodex._tracing import JsonlExporter, Span, SpanExporter, Tracer, current_trace_id, read_spans, set_attribute, span
+
+
+class _MemoryExporter(SpanExporter):
+    def __init__(self) -> None:
+        self.traces: list[list[Span]] = []
+
+    def export(self, spans: list[Span]) -> None:
+        self.traces.append(spans)
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self) -> None:
+        self.exporter = _MemoryExporter()
+
+    def tearDown(self) -> None:
+        Tracer().configure()
+
+    def test_spans_nest_under_the_request(self) -> None:
+        Tracer().configure(sample_rate=1.0, exporter=self.exporter)
+
+        with Tracer().trace("POST /chat", trace_id="req-1", path="/chat"):
+            self.assertEqual(current_trace_id(), "req-1")
+            with span("session.get"):
+                pass
+            with span("engine.request", engine="mock"):
+                with span("response.stream"):
+                    set_attribute("ttft_ms", 12.5)
+
+        [spans] = self.exporter.traces
+        by_name = {item.name: item for item in spans}
+        self.assertEqual([item.name for item in spans], ["POST /chat", "session.get", "engine.request", "response.stream"])
+        self.assertTrue(all(item.trace_id == "req-1" for item in spans))
+        self.assertIsNone(by_name["POST /chat"].parent_id)
+        self.assertEqual(by_name["session.get"].parent_id, by_name["POST /chat"].span_id)
+        self.assertEqual(by_name["response.stream"].parent_id, by_name["engine.request"].span_id)
+        self.assertEqual(by_name["response.stream"].attributes, {"ttft_ms": 12.5})
+        self.assertEqual(by_name["engine.request"].attributes, {"engine": "mock"})
+        self.assertIsNone(current_trace_id())
+
+    def test_disabled_tracing_is_a_no_op(self) -> None:
+        Tracer().configure(sample_rate=0.0, exporter=self.exporter)
+
+        with Tracer().trace("GET /status") as root:
+            with span("stage") as child:
+                set_attribute("key", "value")
+
+        self.assertIsNone(root)
+        self.assertIsNone(child)
+        self.assertEqual(self.exporter.traces, [])
+
+    def test_slow_traces_are_kept_when_not_sampled(self) -> None:
+        Tracer().configure(sample_rate=0.0, slow_s=0.01, exporter=self.exporter)
+
+        with Tracer().trace("fast"):
+            pass
+        with Tracer().trace("slow"):
+            time.sleep(0.02)
+
+        self.assertEqual([spans[0].name for spans in self.exporter.traces], ["slow"])
+
+    def test_exception_marks_the_span_as_error(self) -> None:
+        Tracer().configure(sample_rate=1.0, exporter=self.exporter)
+
+        with self.assertRaises(ValueError):
+            with Tracer().trace("request"):
+                with span("engine.request"):
+                    raise ValueError("boom")
+
+        [spans] = self.exporter.traces
+        self.assertEqual([item.status for item in spans], ["error", "error"])
+        self.assertEqual(spans[1].attributes["error"], "ValueError: boom")
+
+    def test_jsonl_export_renders_as_waterfall(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "traces.jsonl")
+            exporter = JsonlExporter(path)
+            Tracer().configure(sample_rate=1.0, exporter=exporter)
+
+            with Tracer().trace("POST /chat", trace_id="req-2"):
+                with span("engine.request"):
+                    time.sleep(0.005)
+            exporter.flush()
+            with open(path, "a", encoding="utf-8") as file:
+                file.write("not json\n" + json.dumps({"unrelated": True}) + "\n")
+
+            spans = read_spans(path)
+
+        self.assertEqual(len(spans), 2)
+        lines = render_waterfall(spans)
+        self.assertTrue(lines[0].startswith("Trace req-2"))
+        self.assertTrue(lines[2].startswith("POST /chat"))
+        self.assertTrue(lines[3].startswith("  engine.request"))
+        self.assertIn("#", lines[3])
+
+    def test_jsonl_export_does_not_wait_for_the_file(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            exporter = JsonlExporter(os.path.join(directory, "missing", "traces.jsonl"), queue_size=1)
+            spans = [Span(trace_id="t", span_id="s", parent_id=None, name="request", start_unix_ns=0)]
+
+            with self.assertLogs("legalcodex._tracing", "WARNING"):
+                for _ in range(50):
+                    exporter.export(spans)      # Unwritable file: logged by the writer, never raised
+                exporter.flush()
+
+        self.assertGreater(exporter.dropped, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()